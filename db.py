@@ -4,7 +4,11 @@ import time
 import importlib
 import site
 import sys
+import re
 import math
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+import pandas as pd
 import pymssql
 
 try:
@@ -21,6 +25,7 @@ except Exception:
 _DB_DRIVER = None
 _LAST_CANDIDATES = None
 _LOGGER = logging.getLogger(__name__)
+_FETCH_MANY_MAX_WORKERS = int(os.environ.get("DB_FETCH_MANY_WORKERS", "8"))
 
 
 def _normalize_sql_param(value):
@@ -346,8 +351,12 @@ def _refresh_optional_drivers():
                 pass
 
 
-def _open_conn():
-    """Open DB connection with retries for Azure SQL cold starts/network jitter."""
+def _open_conn_with_driver():
+    """Open DB connection with retries for Azure SQL cold starts/network jitter.
+
+    Returns ``(conn, driver)`` so callers running in worker threads use the
+    driver of their own connection rather than the module-wide last driver.
+    """
     global _DB_DRIVER, _LAST_CANDIDATES
     last_exc = None
     max_attempts = 12
@@ -382,7 +391,7 @@ def _open_conn():
                     conn = _open_conn_pymssql()
                 _DB_DRIVER = driver
                 _log(f"DB connect success driver={driver} attempt={attempt} elapsed={time.time() - started:.2f}s")
-                return conn
+                return conn, driver
             except Exception as exc:
                 last_exc = exc
                 _log(f"DB connect failed driver={driver} attempt={attempt} error={type(exc).__name__}: {exc}")
@@ -400,11 +409,16 @@ def _open_conn():
     raise RuntimeError(f"DB connection failed after {max_attempts} attempts (driver={driver_hint}): {last_exc}")
 
 
-def _as_dict_rows(cursor):
-    if _DB_DRIVER == "pyodbc":
+def _open_conn():
+    return _open_conn_with_driver()[0]
+
+
+def _as_dict_rows(cursor, driver=None):
+    driver = driver or _DB_DRIVER
+    if driver == "pyodbc":
         cols = [c[0] for c in cursor.description] if cursor.description else []
         return [dict(zip(cols, row)) for row in cursor.fetchall()]
-    if _DB_DRIVER == "pytds":
+    if driver == "pytds":
         cols = [c[0] for c in cursor.description] if cursor.description else []
         return [dict(zip(cols, row)) for row in cursor.fetchall()]
     return cursor.fetchall()
@@ -412,12 +426,12 @@ def _as_dict_rows(cursor):
 
 def query(sql, params=None):
     """Execute SELECT, return list of dicts."""
-    conn = _open_conn()
+    conn, driver = _open_conn_with_driver()
     try:
-        if _DB_DRIVER == "pyodbc":
+        if driver == "pyodbc":
             cursor = conn.cursor()
             sql_exec = sql.replace("%s", "?")
-        elif _DB_DRIVER == "pytds":
+        elif driver == "pytds":
             cursor = conn.cursor()
             sql_exec = sql
         else:
@@ -425,14 +439,14 @@ def query(sql, params=None):
             sql_exec = sql
         started = time.time()
         params_exec = _normalize_sql_params(params)
-        _log(f"DB query start driver={_DB_DRIVER} sql={sql_exec!r} params={params!r}")
+        _log(f"DB query start driver={driver} sql={sql_exec!r} params={params!r}")
         cursor.execute(sql_exec, params_exec)
-        rows = _as_dict_rows(cursor)
-        _log(f"DB query success driver={_DB_DRIVER} rows={len(rows)} elapsed={time.time() - started:.2f}s sql={sql_exec!r}")
+        rows = _as_dict_rows(cursor, driver)
+        _log(f"DB query success driver={driver} rows={len(rows)} elapsed={time.time() - started:.2f}s sql={sql_exec!r}")
         return rows
     except Exception as exc:
         sql_exec = locals().get("sql_exec", sql)
-        _log(f"DB query failed driver={_DB_DRIVER} error={type(exc).__name__}: {exc} sql={sql_exec!r} params={params!r}")
+        _log(f"DB query failed driver={driver} error={type(exc).__name__}: {exc} sql={sql_exec!r} params={params!r}")
         raise
     finally:
         conn.close()
@@ -440,23 +454,345 @@ def query(sql, params=None):
 
 def execute(sql, params=None):
     """Execute INSERT/UPDATE/DELETE."""
-    conn = _open_conn()
+    conn, driver = _open_conn_with_driver()
     try:
         cursor = conn.cursor()
-        sql_exec = sql.replace("%s", "?") if _DB_DRIVER == "pyodbc" else sql
+        sql_exec = sql.replace("%s", "?") if driver == "pyodbc" else sql
         params_exec = _normalize_sql_params(params)
-        _log(f"DB execute start driver={_DB_DRIVER} sql={sql_exec!r} params={params!r}")
+        _log(f"DB execute start driver={driver} sql={sql_exec!r} params={params!r}")
         cursor.execute(sql_exec, params_exec)
         conn.commit()
-        _log(f"DB execute success driver={_DB_DRIVER} sql={sql_exec!r}")
+        _log(f"DB execute success driver={driver} sql={sql_exec!r}")
+    except Exception as exc:
+        sql_exec = locals().get("sql_exec", sql)
+        _log(f"DB execute failed driver={driver} error={type(exc).__name__}: {exc} sql={sql_exec!r} params={params!r}")
+        raise
+    finally:
+        conn.close()
+
+
+# --- Transactions ---
+
+class Transaction:
+    """Statements on one connection; committed together by ``transaction()``.
+
+    ``execute``/``executemany`` return the affected row count.
+    """
+
+    def __init__(self, conn, driver):
+        self._conn = conn
+        self._driver = driver
+
+    def _sql(self, sql):
+        return sql.replace("%s", "?") if self._driver == "pyodbc" else sql
+
+    def _cursor(self):
+        if self._driver in ("pyodbc", "pytds"):
+            return self._conn.cursor()
+        return self._conn.cursor(as_dict=True)
+
+    def query(self, sql, params=None):
+        cursor = self._cursor()
+        cursor.execute(self._sql(sql), _normalize_sql_params(params))
+        return _as_dict_rows(cursor, self._driver)
+
+    def execute(self, sql, params=None):
+        cursor = self._conn.cursor()
+        sql_exec = self._sql(sql)
+        _log(f"DB tx execute driver={self._driver} sql={sql_exec!r} params={params!r}")
+        cursor.execute(sql_exec, _normalize_sql_params(params))
+        return cursor.rowcount
+
+    def executemany(self, sql, seq_of_params):
+        seq = [_normalize_sql_params(p) for p in seq_of_params]
+        if not seq:
+            return 0
+        cursor = self._conn.cursor()
+        sql_exec = self._sql(sql)
+        _log(f"DB tx executemany driver={self._driver} sql={sql_exec!r} rows={len(seq)}")
+        cursor.executemany(sql_exec, seq)
+        return cursor.rowcount
+
+    def table_insert(self, table, data: dict):
+        return self.execute(*_insert_statement(table, data, self.query))
+
+    def table_update(self, table, data: dict, **filters):
+        return self.execute(*_update_statement(table, data, filters))
+
+    def table_delete(self, table, **filters):
+        return self.execute(*_delete_statement(table, filters))
+
+
+@contextmanager
+def transaction():
+    """Yield a ``Transaction``; commit on success, roll back on any exception."""
+    conn, driver = _open_conn_with_driver()
+    started = time.time()
+    try:
+        yield Transaction(conn, driver)
+        conn.commit()
+        _log(f"DB tx commit driver={driver} elapsed={time.time() - started:.3f}s")
+    except Exception as exc:
+        try:
+            conn.rollback()
+        except Exception:
+            pass
+        _log(f"DB tx rollback driver={driver} error={type(exc).__name__}: {exc}")
+        raise
+    finally:
+        conn.close()
+
+
+def _run_fetch_spec(spec):
+    if callable(spec):
+        return spec()
+    if isinstance(spec, (tuple, list)):
+        sql, params = spec[0], (spec[1] if len(spec) > 1 else None)
+        return query(sql, params)
+    return query(spec)
+
+
+def fetch_many(specs, max_workers=None):
+    """Run independent SELECTs concurrently and return ``{name: rows}``.
+
+    ``specs`` maps a name to a SQL string, a ``(sql, params)`` tuple or a
+    zero-argument callable (e.g. ``lambda: table_select("athletes")``). Every
+    worker opens its own connection, so page-entry latency is roughly that of
+    the slowest query instead of the sum. The first failing query re-raises.
+    """
+    specs = dict(specs or {})
+    if not specs:
+        return {}
+    if len(specs) == 1:
+        name, spec = next(iter(specs.items()))
+        return {name: _run_fetch_spec(spec)}
+
+    workers = max_workers or min(len(specs), _FETCH_MANY_MAX_WORKERS)
+    started = time.time()
+    results = {}
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="db-fetch") as pool:
+        futures = {name: pool.submit(_run_fetch_spec, spec) for name, spec in specs.items()}
+        for name, future in futures.items():
+            results[name] = future.result()
+    _log(f"DB fetch_many done queries={len(specs)} workers={workers} elapsed={time.time() - started:.2f}s")
+    return results
+
+
+# --- Typed DataFrame queries -------------------------------------------------
+
+_YES_VALUES = {"yes", "y", "ja", "j", "true", "1"}
+_NO_VALUES = {"no", "n", "nein", "false", "0"}
+
+
+def _clean_numeric_text(series):
+    text = series.astype("string").str.strip()
+    text = text.str.replace("%", "", regex=False).str.replace("\u00a0", "", regex=False)
+    # "1'234,5" / "1 234,5" / "350,5" -> "1234.5" / "350.5"
+    text = text.str.replace("'", "", regex=False).str.replace(" ", "", regex=False)
+    return text.str.replace(",", ".", regex=False)
+
+
+def _coerce_series(series, kind):
+    kind = str(kind).lower()
+    if kind in ("float", "decimal", "percent", "number"):
+        if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+            return series.astype("float64")
+        return pd.to_numeric(_clean_numeric_text(series), errors="coerce").astype("float64")
+    if kind == "int":
+        values = pd.to_numeric(_clean_numeric_text(series), errors="coerce")
+        whole = values.where(values.isna() | (values == values.round()))
+        return whole.astype("Int64")
+    if kind in ("yesno", "bool", "flag"):
+        text = series.astype("string").str.strip().str.lower()
+        out = pd.Series(pd.NA, index=series.index, dtype="boolean")
+        out[text.isin(_YES_VALUES).fillna(False)] = True
+        out[text.isin(_NO_VALUES).fillna(False)] = False
+        return out
+    if kind == "date":
+        return pd.to_datetime(series, errors="coerce")
+    if kind in ("str", "string", "text"):
+        return series.astype("string").str.strip()
+    raise ValueError(f"Unknown column type in schema: {kind}")
+
+
+def coerce_frame(df, schema):
+    """Apply ``schema`` ({column: type}) to ``df`` with vectorized parsing.
+
+    Types: "float"/"percent" (comma decimals, %-suffix, thousands separators),
+    "int" (nullable Int64), "yesno" (nullable boolean from yes/no/ja/nein/1/0),
+    "date" and "str" (stripped). Unparsable values become NA. Columns missing
+    from ``df`` are ignored.
+    """
+    if not schema or df is None or df.empty:
+        return df
+    for col, kind in schema.items():
+        if col in df.columns:
+            df[col] = _coerce_series(df[col], kind)
+    return df
+
+
+def query_df(sql, params=None, schema=None):
+    """Execute SELECT and return a DataFrame, typed via ``schema`` (see coerce_frame)."""
+    conn, driver = _open_conn_with_driver()
+    try:
+        cursor = conn.cursor()
+        sql_exec = sql.replace("%s", "?") if driver == "pyodbc" else sql
+        started = time.time()
+        params_exec = _normalize_sql_params(params)
+        _log(f"DB query_df start driver={driver} sql={sql_exec!r} params={params!r}")
+        cursor.execute(sql_exec, params_exec)
+        cols = [c[0] for c in cursor.description] if cursor.description else []
+        rows = cursor.fetchall()
+        df = pd.DataFrame.from_records([tuple(r) for r in rows], columns=cols)
+        _log(f"DB query_df success driver={driver} rows={len(df)} elapsed={time.time() - started:.2f}s sql={sql_exec!r}")
     except Exception as exc:
         sql_exec = locals().get("sql_exec", sql)
-        _log(f"DB execute failed driver={_DB_DRIVER} error={type(exc).__name__}: {exc} sql={sql_exec!r} params={params!r}")
+        _log(f"DB query_df failed driver={driver} error={type(exc).__name__}: {exc} sql={sql_exec!r} params={params!r}")
         raise
     finally:
         conn.close()
+    return coerce_frame(df, schema)
+
+
+def table_select_df(table, select="*", schema=None, **filters):
+    """Like table_select, but returns a typed DataFrame."""
+    if _is_athleteyearstatus_table(table):
+        mapped_filters = _athleteyearstatus_filters(filters)
+        return table_select_df("socadditionalvalues", _athleteyearstatus_select_sql(select), schema=schema, **mapped_filters)
+    where = ""
+    params = []
+    if filters:
+        clauses = [f"[{k}] = %s" for k in filters]
+        where = " WHERE " + " AND ".join(clauses)
+        params = list(filters.values())
+    return query_df(f"SELECT {select} FROM [{table}]{where}", params or None, schema=schema)
+
+
+_IDENTIFIER_RE = re.compile(r"^[A-Za-z_][\w\- %]*$")
+
+
+def _quote_identifier(name):
+    name = str(name).strip()
+    if not _IDENTIFIER_RE.match(name):
+        raise ValueError(f"Invalid column name: {name!r}")
+    return f"[{name}]"
+
+
+def _filter_clause(filters, search=None, search_columns=None):
+    clauses = [f"{_quote_identifier(k)} = %s" for k in filters]
+    params = list(filters.values())
+    term = str(search or "").strip()
+    if term and search_columns:
+        like = "%" + term.replace("[", "[[]").replace("%", "[%]").replace("_", "[_]") + "%"
+        clauses.append(
+            "(" + " OR ".join(f"CAST({_quote_identifier(c)} AS NVARCHAR(4000)) LIKE %s" for c in search_columns) + ")"
+        )
+        params += [like] * len(search_columns)
+    return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+
+def table_page(
+    table,
+    select="*",
+    page=1,
+    page_size=50,
+    order_by="id",
+    descending=False,
+    search=None,
+    search_columns=None,
+    schema=None,
+    **filters,
+):
+    """One page of ``table`` with server-side filter, search and sort.
+
+    ``search`` is matched with LIKE against ``search_columns``. Returns
+    ``(DataFrame, total_rows)``; the frame holds at most ``page_size`` rows.
+    """
+    if _is_athleteyearstatus_table(table):
+        return table_page(
+            "socadditionalvalues",
+            _athleteyearstatus_select_sql(select),
+            page=page,
+            page_size=page_size,
+            order_by=order_by,
+            descending=descending,
+            search=search,
+            search_columns=search_columns,
+            schema=schema,
+            **_athleteyearstatus_filters(filters),
+        )
+    page_size = max(1, int(page_size))
+    page = max(1, int(page))
+    where, params = _filter_clause(filters, search, search_columns)
+    # Stabile Reihenfolge über Seiten hinweg: id als Tie-Breaker
+    order_cols = [order_by] if isinstance(order_by, str) else list(order_by or ["id"])
+    if "id" not in order_cols:
+        order_cols.append("id")
+    direction = "DESC" if descending else "ASC"
+    order_sql = ", ".join(f"{_quote_identifier(c)} {direction}" for c in order_cols)
+
+    count_rows = query(f"SELECT COUNT(*) AS n FROM [{table}]{where}", params or None)
+    total = int(count_rows[0]["n"]) if count_rows else 0
+    df = query_df(
+        f"SELECT {select} FROM [{table}]{where} ORDER BY {order_sql} "
+        f"OFFSET %s ROWS FETCH NEXT %s ROWS ONLY",
+        params + [(page - 1) * page_size, page_size],
+        schema=schema,
+    )
+    return df, total
+
+
+def table_distinct(table, column, **filters):
+    """Sorted distinct non-empty values of ``column``, without loading the table."""
+    col = _quote_identifier(column)
+    where, params = _filter_clause(filters)
+    rows = query(
+        f"SELECT DISTINCT {col} AS value FROM [{table}]{where}{' AND' if where else ' WHERE'} {col} IS NOT NULL",
+        params or None,
+    )
+    values = {str(r["value"]).strip() for r in rows if r.get("value") is not None}
+    return sorted(v for v in values if v and v.lower() != "nan")
+
+
+
+_HAS_COLUMN_TTL_SECONDS = 300
+_HAS_COLUMN_CACHE = {}
+# sqltables/migrate.py touches this file after applying migrations (also from another process)
+SCHEMA_MARKER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sqltables", ".schema_applied")
+_SCHEMA_MARKER_SEEN = None
+
+
+def invalidate_columns():
+    """Drop all cached has_column answers, e.g. after applying a migration in-process."""
+    _HAS_COLUMN_CACHE.clear()
 
 
+def _schema_marker_mtime():
+    try:
+        return os.path.getmtime(SCHEMA_MARKER)
+    except OSError:
+        return None
+
+
+def has_column(table, column):
+    """True if ``table.column`` exists, e.g. once a migration added it (cached until TTL or the next migration)."""
+    global _SCHEMA_MARKER_SEEN
+    marker = _schema_marker_mtime()
+    if marker != _SCHEMA_MARKER_SEEN:
+        invalidate_columns()
+        _SCHEMA_MARKER_SEEN = marker
+    key = (str(table).strip().lower(), str(column).strip().lower())
+    cached = _HAS_COLUMN_CACHE.get(key)
+    if cached and time.time() - cached[1] <= _HAS_COLUMN_TTL_SECONDS:
+        return cached[0]
+    rows = query(
+        "SELECT COUNT(*) AS n FROM INFORMATION_SCHEMA.COLUMNS WHERE TABLE_NAME = %s AND COLUMN_NAME = %s",
+        key,
+    )
+    present = bool(rows and rows[0]["n"])
+    _HAS_COLUMN_CACHE[key] = (present, time.time())
+    return present
+
 def _is_athleteyearstatus_table(table):
     return str(table).strip().lower() == "athleteyearstatus"
 
@@ -499,6 +835,346 @@ def _athleteyearstatus_payload(data):
     return mapped
 
 
+# Columns typed by sqltables/migrations/001_typed_numeric_columns.sql.
+# Text input (e.g. "350,5", "92.3%", "") is normalized before it reaches the DB,
+# so writes work against both the old NVARCHAR and the migrated schema; text that
+# is no number raises ValueError (table.column) instead of being written as NULL.
+_TYPED_COLUMNS = {
+    "compresults": {
+        "Points": "decimal", "Difficulty": "decimal", "AveragePoints": "decimal",
+        "JEM%": "decimal", "EM%": "decimal", "WM%": "decimal",
+    },
+    "selectionpoints": {"points": "decimal", "difficulty": "decimal"},
+    "competitions": {"PisteYear": "int"},
+    "pisteresults": {"TestYear": "int"},
+    "pisterefcompresults": {
+        "PisteYear": "int",
+        "points1": "decimal", "points2": "decimal", "points3": "decimal",
+        "reference1": "decimal", "reference2": "decimal", "reference3": "decimal",
+        "pointsaverage1": "decimal", "pointsaverage2": "decimal", "pointsaverage3": "decimal",
+        "pointsaverageaverage": "decimal", "pointsaverageref%": "decimal",
+        "refaverage": "decimal", "performance": "decimal", "quality": "decimal",
+    },
+    "pisterefminpoints": {"points_max": "decimal", "regio_min": "decimal", "national_min": "decimal"},
+    "pisterefcomppointsage": {"age": "int", "ref": "decimal", "quality": "decimal"},
+    "pistereftrainingsincepoints": {"age": "int", "years": "int", "points": "decimal"},
+    "pistereftrainingtimepoints": {"age": "int", "hours": "int", "points": "decimal"},
+    "compresultsrefpercent": {"PisteYear": "int", "refpercent": "decimal"},
+    "socadditionalvalues": {
+        "trainingperf": "decimal", "resilience": "decimal", "trainingsince": "decimal",
+        "trainingtime": "decimal", "piste": "decimal", "competitions": "decimal",
+        "compenhancement": "decimal", "totalpoints": "decimal",
+        "bioagevalue": "decimal", "mirwaldvalue": "decimal",
+    },
+}
+
+
+def _normalize_typed_text(value, kind):
+    """Numeric text for a typed column; None for empty values, ValueError if unparsable."""
+    if not isinstance(value, str):
+        return value
+    text = value.strip().replace("%", "").replace("\u00a0", "").replace("'", "").replace(" ", "").replace(",", ".")
+    if text == "" or text.lower() in ("nan", "none", "null", "-"):
+        return None
+    try:
+        number = float(text)
+    except ValueError:
+        raise ValueError(f"keine Zahl: {value!r}") from None
+    if not math.isfinite(number):
+        raise ValueError(f"keine endliche Zahl: {value!r}")
+    if kind == "int":
+        if not number.is_integer():
+            raise ValueError(f"keine ganze Zahl: {value!r}")
+        return str(int(number))
+    return text
+
+
+_WRITE_HOOKS = []
+
+
+def add_write_hook(hook):
+    """Register ``hook(op, table, data) -> data`` for table_insert/update/delete.
+
+    ``op`` is "insert", "update" or "delete"; for deletes ``data`` holds the filters.
+    """
+    if hook not in _WRITE_HOOKS:
+        _WRITE_HOOKS.append(hook)
+
+
+def _apply_write_hooks(op, table, data):
+    for hook in _WRITE_HOOKS:
+        data = hook(op, table, data)
+    return data
+
+
+def _normalize_typed_payload(table, data):
+    typed = _TYPED_COLUMNS.get(str(table).strip().lower())
+    if not typed:
+        return data
+    normalized = dict(data)
+    for column, kind in typed.items():
+        if column not in data:
+            continue
+        try:
+            normalized[column] = _normalize_typed_text(data[column], kind)
+        except ValueError as exc:
+            # lieber abbrechen als still NULL schreiben
+            raise ValueError(f"{table}.{column}: {exc}") from None
+    return normalized
+
+
+# --- Bulk writes ---
+
+# SQL Server allows 2100 parameters per statement and 1000 rows per VALUES list.
+_MAX_PARAMS_PER_STATEMENT = 2000
+_MAX_ROWS_PER_VALUES = 1000
+_ID_IS_INT_CACHE = {}
+
+
+def _id_is_int(table, query_fn=None):
+    """True if ``table.id`` is an integer column (cached per process)."""
+    key = str(table).strip().lower()
+    if key not in _ID_IS_INT_CACHE:
+        rows = (query_fn or query)(
+            "SELECT DATA_TYPE FROM INFORMATION_SCHEMA.COLUMNS WHERE TABLE_NAME = %s AND COLUMN_NAME = 'id'",
+            (key,),
+        )
+        data_type = str(rows[0]["DATA_TYPE"]).lower() if rows else ""
+        _ID_IS_INT_CACHE[key] = data_type in ("int", "bigint", "smallint", "tinyint")
+    return _ID_IS_INT_CACHE[key]
+
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _group_by_columns(rows):
+    groups = {}
+    for row in rows:
+        groups.setdefault(tuple(row.keys()), []).append(row)
+    return groups
+
+
+def insert_many(table, rows, tx=None):
+    """INSERT ``rows`` (dicts) with multi-row VALUES statements; returns the count.
+
+    Missing INT ids are assigned from MAX(id)+1 once for the whole batch.
+    Without ``tx`` the batch runs in a transaction of its own.
+    """
+    rows = [dict(r) for r in rows or []]
+    if not rows:
+        return 0
+    if tx is None:
+        with transaction() as own_tx:
+            return insert_many(table, rows, own_tx)
+    if _is_athleteyearstatus_table(table):
+        return insert_many("socadditionalvalues", [_athleteyearstatus_payload(r) for r in rows], tx)
+
+    prepared = [_normalize_typed_payload(table, _apply_write_hooks("insert", table, r)) for r in rows]
+    if any("id" not in r for r in prepared) and _id_is_int(table, tx.query):
+        max_rows = tx.query(f"SELECT ISNULL(MAX(id), 0) AS max_id FROM [{table}]")
+        next_id = (max_rows[0]["max_id"] if max_rows else 0) + 1
+        for r in prepared:
+            if "id" not in r:
+                r["id"] = next_id
+                next_id += 1
+
+    inserted = 0
+    for columns, group in _group_by_columns(prepared).items():
+        col_sql = ", ".join(f"[{c}]" for c in columns)
+        row_sql = "(" + ", ".join("%s" for _ in columns) + ")"
+        chunk_size = max(1, min(_MAX_ROWS_PER_VALUES, _MAX_PARAMS_PER_STATEMENT // max(len(columns), 1)))
+        for chunk in _chunks(group, chunk_size):
+            params = [r[c] for r in chunk for c in columns]
+            tx.execute(f"INSERT INTO [{table}] ({col_sql}) VALUES {', '.join(row_sql for _ in chunk)}", params)
+            inserted += len(chunk)
+    return inserted
+
+
+def update_many(table, updates, key="id", tx=None):
+    """Apply ``updates`` = [(key_value, {column: value}), ...]; returns affected rows.
+
+    Rows that change the same set of columns share one statement: a single
+    row becomes a plain UPDATE, several rows an UPDATE joined to a VALUES list.
+    """
+    updates = [(k, dict(data)) for k, data in updates or [] if data]
+    if not updates:
+        return 0
+    if tx is None:
+        with transaction() as own_tx:
+            return update_many(table, updates, key, own_tx)
+    extra_where, extra_params = "", []
+    if _is_athleteyearstatus_table(table):
+        updates = [(k, _athleteyearstatus_payload(data)) for k, data in updates]
+        table = "socadditionalvalues"
+        extra_where, extra_params = " AND t.[toolenvironment] = %s", ["injuryflags"]
+
+    groups = {}
+    for key_value, data in updates:
+        data = _normalize_typed_payload(table, _apply_write_hooks("update", table, data))
+        groups.setdefault(tuple(data.keys()), []).append((key_value, data))
+
+    affected = 0
+    for columns, group in groups.items():
+        if len(group) == 1:
+            key_value, data = group[0]
+            set_sql = ", ".join(f"t.[{c}] = %s" for c in columns)
+            affected += tx.execute(
+                f"UPDATE t SET {set_sql} FROM [{table}] t WHERE t.[{key}] = %s{extra_where}",
+                [data[c] for c in columns] + [key_value] + extra_params,
+            )
+            continue
+        names = ["_key"] + [f"c{i}" for i in range(len(columns))]
+        set_sql = ", ".join(f"t.[{c}] = v.[c{i}]" for i, c in enumerate(columns))
+        row_sql = "(" + ", ".join("%s" for _ in names) + ")"
+        chunk_size = max(1, min(_MAX_ROWS_PER_VALUES, _MAX_PARAMS_PER_STATEMENT // len(names)))
+        for chunk in _chunks(group, chunk_size):
+            params = [p for key_value, data in chunk for p in [key_value] + [data[c] for c in columns]]
+            affected += tx.execute(
+                f"UPDATE t SET {set_sql} FROM [{table}] t "
+                f"JOIN (VALUES {', '.join(row_sql for _ in chunk)}) AS v({', '.join(names)}) "
+                f"ON t.[{key}] = v.[_key]{extra_where}",
+                params + extra_params,
+            )
+    return affected
+
+
+def existing_row_indexes(table, rows, keys, tx=None):
+    """Positions of ``rows`` whose ``keys`` values already exist in ``table``.
+
+    One keyed join per chunk: the candidate keys go to the server as a
+    VALUES list, so matching follows the column types and collation.
+    """
+    keys = list(keys)
+    rows = list(rows or [])
+    if not rows:
+        return set()
+    query_fn = tx.query if tx is not None else query
+    names = ["_i"] + [f"k{i}" for i in range(len(keys))]
+    on_sql = " AND ".join(f"t.[{k}] = v.[k{i}]" for i, k in enumerate(keys))
+    row_sql = "(" + ", ".join("%s" for _ in names) + ")"
+    chunk_size = max(1, min(_MAX_ROWS_PER_VALUES, _MAX_PARAMS_PER_STATEMENT // len(names)))
+    found = set()
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+        params = [p for i, r in enumerate(chunk, start=start) for p in [i] + [r.get(k) for k in keys]]
+        result = query_fn(
+            f"SELECT DISTINCT v.[_i] AS i FROM (VALUES {', '.join(row_sql for _ in chunk)}) AS v({', '.join(names)}) "
+            f"JOIN [{table}] t ON {on_sql}",
+            params,
+        )
+        found.update(int(r["i"]) for r in result)
+    return found
+
+
+def _upsert_key(row, keys):
+    """Dedupe key of ``row`` as the MERGE matches it: NULL equals NULL, text case-insensitive."""
+    parts = []
+    for k in keys:
+        value = row.get(k)
+        if value is None or (isinstance(value, float) and math.isnan(value)):
+            parts.append(None)
+        else:
+            parts.append(str(value).strip().lower())
+    return tuple(parts)
+
+
+def upsert_many(table, rows, keys, tx=None):
+    """MERGE ``rows`` into ``table`` matched on the ``keys`` columns.
+
+    The rows are loaded into a ``#upsert_stage`` temp table that copies the
+    target's column types, then one MERGE updates matching rows and inserts
+    the rest. INT ids missing in ``rows`` are assigned as MAX(id)+n inside
+    the MERGE source; GUID tables use their server default.
+    Key columns match null-safely (a NULL key matches a NULL key), so
+    re-importing a row with an empty key part updates it instead of adding
+    a copy. Duplicate keys within ``rows`` collapse to the last one.
+    Returns ``{"inserted": n, "updated": n}``.
+    """
+    keys = list(keys)
+    counts = {"inserted": 0, "updated": 0}
+    rows = list(rows or [])
+    if not rows:
+        return counts
+    if tx is None:
+        with transaction() as own_tx:
+            return upsert_many(table, rows, keys, own_tx)
+
+    stage = "#upsert_stage"
+    # erst nach Hooks/Typisierung deduplizieren: "" und None sind für den MERGE beide NULL
+    deduped = {}
+    for row in rows:
+        prepared_row = _normalize_typed_payload(table, _apply_write_hooks("insert", table, dict(row)))
+        deduped[_upsert_key(prepared_row, keys)] = prepared_row
+    prepared = list(deduped.values())
+    for columns, group in _group_by_columns(prepared).items():
+        missing = [k for k in keys if k not in columns]
+        if missing:
+            raise ValueError(f"upsert_many: key column(s) missing in rows: {missing}")
+        col_sql = ", ".join(f"[{c}]" for c in columns)
+        tx.execute(f"IF OBJECT_ID('tempdb..{stage}') IS NOT NULL DROP TABLE {stage}")
+        tx.execute(f"SELECT TOP 0 {col_sql} INTO {stage} FROM [{table}]")
+        row_sql = "(" + ", ".join("%s" for _ in columns) + ")"
+        chunk_size = max(1, min(_MAX_ROWS_PER_VALUES, _MAX_PARAMS_PER_STATEMENT // len(columns)))
+        for chunk in _chunks(group, chunk_size):
+            tx.execute(
+                f"INSERT INTO {stage} ({col_sql}) VALUES {', '.join(row_sql for _ in chunk)}",
+                [r[c] for r in chunk for c in columns],
+            )
+
+        insert_cols, insert_vals = list(columns), [f"s.[{c}]" for c in columns]
+        source_sql = f"SELECT * FROM {stage}"
+        if "id" not in columns and _id_is_int(table, tx.query):
+            # Neue INT-ids serverseitig vergeben; UPDLOCK hält MAX(id) bis zum Commit.
+            source_sql = (
+                f"SELECT s.*, (SELECT ISNULL(MAX(id), 0) FROM [{table}] WITH (UPDLOCK, HOLDLOCK)) "
+                f"+ ROW_NUMBER() OVER (ORDER BY (SELECT NULL)) AS [_new_id] FROM {stage} s"
+            )
+            insert_cols.append("id")
+            insert_vals.append("s.[_new_id]")
+        on_sql = " AND ".join(f"(t.[{k}] = s.[{k}] OR (t.[{k}] IS NULL AND s.[{k}] IS NULL))" for k in keys)
+        set_sql = ", ".join(f"t.[{c}] = s.[{c}]" for c in columns if c not in keys)
+        result = tx.query(
+            f"MERGE [{table}] WITH (HOLDLOCK) AS t USING ({source_sql}) AS s ON {on_sql} "
+            + (f"WHEN MATCHED THEN UPDATE SET {set_sql} " if set_sql else "")
+            + f"WHEN NOT MATCHED THEN INSERT ({', '.join(f'[{c}]' for c in insert_cols)}) "
+            f"VALUES ({', '.join(insert_vals)}) "
+            f"OUTPUT $action AS merge_action;"
+        )
+        tx.execute(f"DROP TABLE {stage}")
+        for r in result:
+            action = str(r.get("merge_action") or "").upper()
+            if action == "INSERT":
+                counts["inserted"] += 1
+            elif action == "UPDATE":
+                counts["updated"] += 1
+    return counts
+
+
+def delete_many(table, key_values, key="id", tx=None):
+    """DELETE rows whose ``key`` is in ``key_values``; returns affected rows."""
+    key_values = [v for v in key_values or [] if v is not None]
+    if not key_values:
+        return 0
+    if tx is None:
+        with transaction() as own_tx:
+            return delete_many(table, key_values, key, own_tx)
+    extra_where, extra_params = "", []
+    if _is_athleteyearstatus_table(table):
+        table = "socadditionalvalues"
+        extra_where, extra_params = " AND [toolenvironment] = %s", ["injuryflags"]
+    _apply_write_hooks("delete", table, {key: list(key_values)})
+    deleted = 0
+    for chunk in _chunks(key_values, _MAX_ROWS_PER_VALUES):
+        placeholders = ", ".join("%s" for _ in chunk)
+        deleted += tx.execute(
+            f"DELETE FROM [{table}] WHERE [{key}] IN ({placeholders}){extra_where}",
+            list(chunk) + extra_params,
+        )
+    return deleted
+
+
 def table_select(table, select="*", **filters):
     """Simple SELECT with optional equality filters."""
     if _is_athleteyearstatus_table(table):
@@ -513,34 +1189,49 @@ def table_select(table, select="*", **filters):
     return query(f"SELECT {select} FROM [{table}]{where}", params or None)
 
 
-def table_insert(table, data: dict):
-    """INSERT a single row. Auto-assigns integer id if not provided (skipped for UNIQUEIDENTIFIER tables)."""
+def _insert_statement(table, data, query_fn):
     if _is_athleteyearstatus_table(table):
-        return table_insert("socadditionalvalues", _athleteyearstatus_payload(data))
+        return _insert_statement("socadditionalvalues", _athleteyearstatus_payload(data), query_fn)
+    data = _normalize_typed_payload(table, _apply_write_hooks("insert", table, data))
     if "id" not in data:
         try:
-            rows = query(f"SELECT ISNULL(MAX(id), 0) AS max_id FROM [{table}]")
+            rows = query_fn(f"SELECT ISNULL(MAX(id), 0) AS max_id FROM [{table}]")
             data = {"id": (rows[0]["max_id"] if rows else 0) + 1, **data}
         except Exception:
             pass  # id is UNIQUEIDENTIFIER or has DEFAULT — let DB handle it
     cols = ", ".join(f"[{k}]" for k in data)
     placeholders = ", ".join("%s" for _ in data)
-    execute(f"INSERT INTO [{table}] ({cols}) VALUES ({placeholders})", list(data.values()))
+    return f"INSERT INTO [{table}] ({cols}) VALUES ({placeholders})", list(data.values())
 
 
-def table_update(table, data: dict, **filters):
-    """UPDATE rows matching filters."""
+def _update_statement(table, data, filters):
     if _is_athleteyearstatus_table(table):
-        return table_update("socadditionalvalues", _athleteyearstatus_payload(data), **_athleteyearstatus_filters(filters))
+        return _update_statement("socadditionalvalues", _athleteyearstatus_payload(data), _athleteyearstatus_filters(filters))
+    data = _normalize_typed_payload(table, _apply_write_hooks("update", table, data))
     set_clause = ", ".join(f"[{k}] = %s" for k in data)
     where_clause = " AND ".join(f"[{k}] = %s" for k in filters)
     params = list(data.values()) + list(filters.values())
-    execute(f"UPDATE [{table}] SET {set_clause} WHERE {where_clause}", params)
+    return f"UPDATE [{table}] SET {set_clause} WHERE {where_clause}", params
 
 
-def table_delete(table, **filters):
-    """DELETE rows matching filters."""
+def _delete_statement(table, filters):
     if _is_athleteyearstatus_table(table):
-        return table_delete("socadditionalvalues", **_athleteyearstatus_filters(filters))
+        return _delete_statement("socadditionalvalues", _athleteyearstatus_filters(filters))
+    _apply_write_hooks("delete", table, dict(filters))
     where_clause = " AND ".join(f"[{k}] = %s" for k in filters)
-    execute(f"DELETE FROM [{table}] WHERE {where_clause}", list(filters.values()))
+    return f"DELETE FROM [{table}] WHERE {where_clause}", list(filters.values())
+
+
+def table_insert(table, data: dict):
+    """INSERT a single row. Auto-assigns integer id if not provided (skipped for UNIQUEIDENTIFIER tables)."""
+    execute(*_insert_statement(table, data, query))
+
+
+def table_update(table, data: dict, **filters):
+    """UPDATE rows matching filters."""
+    execute(*_update_statement(table, data, filters))
+
+
+def table_delete(table, **filters):
+    """DELETE rows matching filters."""
+    execute(*_delete_statement(table, filters))
@@ -0,0 +1,5 @@
+"""Recalculation engines of Diving Evaluation, importable without Streamlit.
+
+The Streamlit pages, the background jobs and ``python -m divingeval recompute``
+call the same functions here.
+"""
@@ -0,0 +1,67 @@
+"""Command line for the recalculation engines (no Streamlit needed).
+
+    python -m divingeval recompute --year 2026                 # alle Stufen
+    python -m divingeval recompute --year 2026 --stage soc     # nur SOC, auf den gespeicherten Vorstufen
+    python -m divingeval recompute --year 2026 --stage soc --with-deps --dry-run
+    python -m divingeval recompute --year 2026 --profile recompute.prof
+"""
+import argparse
+import cProfile
+import pstats
+import sys
+
+import identity
+import refdata
+
+from divingeval.pipeline import STAGES, format_report, run_pipeline
+
+
+def _recompute(args):
+    identity.install()
+    refdata.install()
+    profiler = cProfile.Profile() if args.profile else None
+    failed = False
+    for year in args.year:
+        try:
+            if profiler:
+                profiler.enable()
+            report = run_pipeline(
+                year,
+                stages=args.stage,
+                dry_run=args.dry_run,
+                with_dependencies=args.with_deps or not args.stage,
+            )
+        except (ValueError, RuntimeError) as e:
+            print(f"PisteYear {year}: {e}", file=sys.stderr)
+            failed = True
+            continue
+        finally:
+            if profiler:
+                profiler.disable()
+        print(format_report(report))
+        if args.dry_run:
+            print("  (dry run, nichts geschrieben)")
+    if profiler:
+        profiler.dump_stats(args.profile)
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(25)
+    return 1 if failed else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m divingeval", description="Diving Evaluation recalculation engines")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    recompute = commands.add_parser("recompute", help="recompute PisteYears (Piste Punkte → Wettkampf → RefPoints → SOC)")
+    recompute.add_argument("--year", action="append", required=True, help="PisteYear, repeatable")
+    recompute.add_argument("--stage", action="append", choices=list(STAGES), help="only this stage, repeatable (default: all)")
+    recompute.add_argument("--with-deps", action="store_true", help="also run the stages a selected stage depends on")
+    recompute.add_argument("--dry-run", action="store_true", help="compute everything but write nothing")
+    recompute.add_argument("--profile", metavar="FILE", help="write cProfile stats to FILE and print the top entries")
+    recompute.set_defaults(func=_recompute)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
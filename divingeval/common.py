@@ -0,0 +1,172 @@
+"""Small helpers shared by the engines and the Streamlit pages."""
+import math
+import re
+
+import db
+import refdata
+
+# Spaltentypen für db.query_df / db.table_select_df: NVARCHAR-Zahlen werden einmal beim Laden geparst.
+SELECTIONPOINTS_SCHEMA = {"points": "float", "difficulty": "float"}
+
+
+def norm_str(val) -> str:
+    if val is None:
+        return ""
+    return str(val).strip().lower()
+
+
+def normalize_sex_value(val):
+    s = norm_str(val)
+    if not s or s == "nan":
+        return None
+    mapping = {
+        "m": "male",
+        "male": "male",
+        "man": "male",
+        "w": "female",
+        "f": "female",
+        "female": "female",
+        "woman": "female",
+        "mixed": "mixed",
+        "mix": "mixed",
+    }
+    return mapping.get(s, s)
+
+
+def name_tokens(first_name, last_name):
+    first = norm_str(first_name)
+    last = norm_str(last_name)
+    first_tok = first.split()[0] if first else ""
+    last_tok = last.split()[-1] if last else ""
+    return first_tok, last_tok
+
+
+def safe_numeric_value(val):
+    if val in ("", None):
+        return None
+    try:
+        if isinstance(val, str):
+            cleaned = val.replace("%", "").replace(",", ".").strip()
+            if cleaned == "":
+                return None
+            val = float(cleaned)
+        else:
+            val = float(val)
+        return None if math.isnan(val) else val
+    except Exception:
+        return None
+
+
+def extract_year_from_text(text):
+    try:
+        s = str(text or "")
+    except Exception:
+        return None
+    m = re.search(r"(20\d{2})", s)
+    if not m:
+        return None
+    try:
+        return int(m.group(1))
+    except Exception:
+        return None
+
+
+def get_points_with_next_higher(scoretable_rows, value):
+    """Return scoretable points for value; if no exact range matches, use next higher threshold."""
+    try:
+        v = float(value)
+    except Exception:
+        return None
+
+    next_higher = None
+    next_higher_min = None
+
+    for row in scoretable_rows or []:
+        try:
+            rmin = float(row['result_min'])
+            rmax = float(row['result_max'])
+            points = row.get('points')
+
+            if rmin <= v <= rmax:
+                return points
+
+            if rmin >= v and (next_higher_min is None or rmin < next_higher_min):
+                next_higher_min = rmin
+                next_higher = points
+        except Exception:
+            continue
+
+    return next_higher
+
+
+def injury_status_year_from_key(piste_year):
+    value = str(piste_year or "").strip()
+    prefix = "injuryflags:"
+    return value[len(prefix):] if value.lower().startswith(prefix) else value
+
+
+def load_athleteyearstatus_map():
+    """``{(first, last, year): injured}`` from the injuryflags rows of socadditionalvalues."""
+    try:
+        rows = db.table_select(
+            "socadditionalvalues",
+            "first_name, last_name, PisteYear, quality",
+            toolenvironment="injuryflags",
+        )
+    except Exception:
+        return {}
+
+    status_map = {}
+    for row in rows or []:
+        key = (
+            norm_str(row.get("first_name")),
+            norm_str(row.get("last_name")),
+            norm_str(injury_status_year_from_key(row.get("PisteYear"))),
+        )
+        status_map[key] = norm_str(row.get("quality")) in ("injured", "verletzt", "1", "true", "yes", "y")
+    return status_map
+
+
+def load_compresults_for_year(year, select="*"):
+    """compresults of the competitions with PisteYear ``year``.
+
+    An indexed WHERE on compresults.PisteYear (migration 005); before that,
+    Competition is mapped through the cached competitions index.
+    """
+    if db.has_column("compresults", "competition_id"):
+        return db.table_select("compresults", select, PisteYear=int(year))
+    index = refdata.competition_index()
+    rows = []
+    for r in db.table_select("compresults", select):
+        comp = index.get(r.get("Competition"))
+        if comp and str(comp["PisteYear"]) == str(year):
+            rows.append({**r, "PisteYear": comp["PisteYear"]})
+    return rows
+
+
+def load_pisteresults_for_year(year):
+    """All pisteresults of one TestYear."""
+    return db.table_select("pisteresults", "*", TestYear=int(year))
+
+
+def compresults_years():
+    """PisteYears that have competition results, newest first."""
+    if db.has_column("compresults", "competition_id"):
+        years = {str(y) for y in db.table_distinct("compresults", "PisteYear") if y is not None}
+    else:
+        index = refdata.competition_index()
+        years = {
+            str(comp["PisteYear"])
+            for comp in (index.get(name) for name in db.table_distinct("compresults", "Competition"))
+            if comp and comp["PisteYear"] is not None
+        }
+    return sorted(years, reverse=True)
+
+
+def with_competition_year(df):
+    """Make sure a compresults frame has PisteYear (mapped only before migration 005)."""
+    if "PisteYear" in df.columns and db.has_column("compresults", "competition_id"):
+        return df
+    df = df.copy()
+    df["PisteYear"] = refdata.competition_index().years(df["Competition"]) if "Competition" in df.columns else None
+    return df
@@ -0,0 +1,504 @@
+"""Wettkampf-Bewertung: compresults against selectionpoints and kader thresholds."""
+import datetime
+
+import pandas as pd
+
+import db
+import refdata
+
+from divingeval.common import (
+    SELECTIONPOINTS_SCHEMA,
+    extract_year_from_text,
+    load_compresults_for_year,
+    name_tokens,
+    norm_str,
+    normalize_sex_value,
+    safe_numeric_value,
+)
+from divingeval.workspace import Workspace
+
+
+def _build_compresult_sex_resolver(df_athletes):
+    """Return ``resolve(result_row)`` that fills a missing compresults sex from athletes."""
+    athlete_sex_by_id = {}
+    athlete_sex_by_name = {}
+    athlete_sex_by_tokens = {}
+    try:
+        if not df_athletes.empty:
+            if 'id' in df_athletes.columns and 'sex' in df_athletes.columns:
+                athlete_sex_by_id = {
+                    str(r['id']): normalize_sex_value(r.get('sex'))
+                    for _, r in df_athletes.iterrows()
+                    if r.get('id') is not None
+                }
+            if all(c in df_athletes.columns for c in ['first_name', 'last_name', 'sex']):
+                for _, r in df_athletes.iterrows():
+                    key = (norm_str(r.get('first_name')), norm_str(r.get('last_name')))
+                    sex_val = normalize_sex_value(r.get('sex'))
+                    if key != ("", "") and sex_val and key not in athlete_sex_by_name:
+                        athlete_sex_by_name[key] = sex_val
+
+                    tok = name_tokens(r.get('first_name'), r.get('last_name'))
+                    if tok != ("", "") and sex_val and tok not in athlete_sex_by_tokens:
+                        athlete_sex_by_tokens[tok] = sex_val
+
+            # Also learn from full_name if present
+            if 'full_name' in df_athletes.columns and 'sex' in df_athletes.columns:
+                for _, r in df_athletes.iterrows():
+                    full = norm_str(r.get('full_name'))
+                    if not full:
+                        continue
+                    parts = full.split()
+                    if len(parts) < 2:
+                        continue
+                    tok = (parts[0], parts[-1])
+                    sex_val = normalize_sex_value(r.get('sex'))
+                    if tok != ("", "") and sex_val and tok not in athlete_sex_by_tokens:
+                        athlete_sex_by_tokens[tok] = sex_val
+    except Exception:
+        athlete_sex_by_id = {}
+        athlete_sex_by_name = {}
+        athlete_sex_by_tokens = {}
+
+    def resolve_sex_for_compresult(result_row):
+        current = normalize_sex_value(result_row.get('sex'))
+        if current:
+            return current
+        athlete_id = result_row.get('athlete_id')
+        if athlete_id not in (None, "", "nan"):
+            lookup = athlete_sex_by_id.get(str(athlete_id))
+            if lookup:
+                return lookup
+        first = norm_str(result_row.get('first_name'))
+        last = norm_str(result_row.get('last_name'))
+        lookup = athlete_sex_by_name.get((first, last))
+        if lookup:
+            return lookup
+        tok_lookup = athlete_sex_by_tokens.get(name_tokens(first, last))
+        return tok_lookup
+
+    return resolve_sex_for_compresult
+
+
+def resolve_kader_thresholds(discipline, category_start, rules=None):
+    """``(national_percent, regional_percent)`` from the cached ``refdata.KaderThresholds``."""
+    rules = rules if rules is not None else refdata.kader_thresholds()
+    return rules.resolve(discipline, category_start)
+
+_REGIONAL_SELECTION_LABELS = ["regional", "regionalteam", "regional team", "regio"]
+_SYNCHRO_EXCLUDED_CATEGORIES = ["jugend c", "jugend d"]
+_SYNCHRO_DISCIPLINES = ["1m synchro", "3m synchro", "platform synchro", "turm synchro"]
+
+
+def _prepare_selectionpoints(selectionpoints_df):
+    """selectionpoints with the normalized match columns used by the team-flag rules."""
+    sel = selectionpoints_df
+    if sel is None or sel.empty or "_sex" in sel.columns:
+        return sel
+    sel = sel.copy()
+    sel["_sex"] = sel.get("sex").astype(str).str.strip().str.lower()
+    sel["_discipline"] = sel.get("Discipline").astype(str).str.strip().str.lower()
+    sel["_category"] = sel.get("category").astype(str).str.strip().str.lower()
+    sel["_competition"] = sel.get("Competition").astype(str).str.strip().str.lower()
+    if "year" in sel.columns:
+        sel["_year"] = sel["year"].astype(str).str.strip()
+    return sel
+
+
+def _team_flag_limits(competition_name, sex, discipline, category_start, competitions_df, selectionpoints_df, rules=None):
+    """Selection references for one (competition, sex, discipline, category) key.
+
+    IMPORTANT: selection thresholds are year-dependent; we use competitions.PisteYear
+    (not the calendar year of the competition date). Returns None without selectionpoints.
+    """
+    national_threshold, regional_threshold = resolve_kader_thresholds(discipline, category_start, rules=rules)
+
+    comp_row = {}
+    piste_year = None
+    fallback_year = None
+    if competitions_df is not None and not competitions_df.empty and "Name" in competitions_df.columns:
+        comp_match = competitions_df[
+            competitions_df["Name"].astype(str).str.strip().str.lower() == norm_str(competition_name)
+        ]
+        if not comp_match.empty:
+            comp_row = comp_match.iloc[0].to_dict()
+            piste_year = comp_row.get("PisteYear")
+            if comp_row.get("Date"):
+                fallback_year = extract_year_from_text(comp_row.get("Date"))
+
+    if fallback_year is None:
+        fallback_year = extract_year_from_text(competition_name)
+
+    sel = _prepare_selectionpoints(selectionpoints_df)
+    if sel is None or sel.empty:
+        return None
+
+    # Base filter (sex/discipline/category)
+    relevant_selection = sel[
+        (sel["_sex"] == norm_str(sex))
+        & (sel["_discipline"] == norm_str(discipline))
+        & (sel["_category"] == norm_str(category_start))
+    ]
+
+    # Year filter: prefer competitions.PisteYear; if no match, fall back to calendar year
+    # (some selectionpoints datasets are maintained by calendar year).
+    base_selection = relevant_selection
+    if "_year" in relevant_selection.columns:
+        filtered_by_year = None
+        if piste_year not in (None, "", "nan"):
+            filtered_by_year = relevant_selection[relevant_selection["_year"] == str(piste_year).strip()]
+        if filtered_by_year is not None and not filtered_by_year.empty:
+            relevant_selection = filtered_by_year
+        elif fallback_year is not None:
+            filtered_by_fallback = base_selection[base_selection["_year"] == str(fallback_year).strip()]
+            if not filtered_by_fallback.empty:
+                relevant_selection = filtered_by_fallback
+
+    def first_points(rows):
+        if rows.empty or "points" not in rows.columns:
+            return None
+        return safe_numeric_value(rows.iloc[0].get("points"))
+
+    # NationalTeam is derived from the selection thresholds (JEM/EM/WM)
+    comp_col = relevant_selection["_competition"]
+    jem_row = relevant_selection[comp_col == "jem"]
+    # RegionalTeam is derived from a reference value (usually "Regional"; if not present, fall back to JEM)
+    # Be tolerant: some datasets use different labels (e.g. "Regional-Kader", "Regional Team", etc.)
+    is_regional = comp_col.isin(_REGIONAL_SELECTION_LABELS) | comp_col.str.contains("reg", na=False)
+    regional_row = relevant_selection[is_regional]
+
+    return {
+        "national_threshold": float(national_threshold),
+        "regional_threshold": float(regional_threshold),
+        "national_limits": [
+            first_points(jem_row),
+            first_points(relevant_selection[comp_col == "em"]),
+            first_points(relevant_selection[comp_col == "wm"]),
+        ],
+        # Many datasets only contain JEM/EM/WM thresholds; use JEM as Regional fallback reference.
+        "regional_ref": first_points(regional_row if not regional_row.empty else jem_row),
+        "regional_qual": bool(comp_row.get("qual-Regional", False)),
+        "excluded_synchro": (
+            norm_str(category_start) in _SYNCHRO_EXCLUDED_CATEGORIES
+            and norm_str(discipline) in _SYNCHRO_DISCIPLINES
+        ),
+    }
+
+
+def _team_flags_from_limits(limits, points_val):
+    if limits is None or points_val is None:
+        return {"NationalTeam": "no", "RegionalTeam": "no"}
+
+    nationalteam = "no"
+    for limit in limits["national_limits"]:
+        if limit and round((float(points_val) / float(limit)) * 100, 1) >= limits["national_threshold"]:
+            nationalteam = "yes"
+
+    regionalteam = "no"
+    ref_val = limits["regional_ref"]
+    regional_pct = round((float(points_val) / float(ref_val)) * 100, 1) if ref_val else None
+    if (
+        limits["regional_qual"]
+        and not limits["excluded_synchro"]
+        and regional_pct is not None
+        and regional_pct >= limits["regional_threshold"]
+    ):
+        regionalteam = "yes"
+
+    return {"NationalTeam": nationalteam, "RegionalTeam": regionalteam}
+
+
+def compute_compresult_team_flags(
+    *,
+    competition_name,
+    sex,
+    discipline,
+    category_start,
+    points,
+    competitions_df: pd.DataFrame,
+    selectionpoints_df: pd.DataFrame,
+    rules=None,
+):
+    """Compute NationalTeam/RegionalTeam for a compresult."""
+    points_val = safe_numeric_value(points)
+    if points_val is None:
+        return {"NationalTeam": "no", "RegionalTeam": "no"}
+    limits = _team_flag_limits(
+        competition_name, sex, discipline, category_start, competitions_df, selectionpoints_df, rules=rules
+    )
+    return _team_flags_from_limits(limits, points_val)
+
+
+def compute_compresult_team_flags_frame(results: pd.DataFrame, competitions_df, selectionpoints_df):
+    """Team flags for a batch of compresults (columns Competition, sex, Discipline, CategoryStart, Points).
+
+    Kader rules and normalized selectionpoints are loaded once; the selection
+    references are resolved once per distinct key and joined back onto the
+    rows. Returns a frame with NationalTeam/RegionalTeam aligned to ``results``.
+    """
+    key_cols = ["Competition", "sex", "Discipline", "CategoryStart"]
+    out = pd.DataFrame({"NationalTeam": "no", "RegionalTeam": "no"}, index=results.index)
+    if results.empty:
+        return out
+    rules = refdata.kader_thresholds()
+    sel = _prepare_selectionpoints(selectionpoints_df)
+    keys = results[key_cols].astype(object).where(results[key_cols].notna(), None)
+    key_tuples = list(keys.itertuples(index=False, name=None))
+    limits_by_key = {
+        key: _team_flag_limits(*key, competitions_df, sel, rules=rules)
+        for key in dict.fromkeys(key_tuples)
+    }
+    flags = [
+        _team_flags_from_limits(limits_by_key[key], safe_numeric_value(points))
+        for key, points in zip(key_tuples, results["Points"].tolist())
+    ]
+    return pd.DataFrame(flags, index=results.index)
+
+
+def _needs_sex_update(raw_val):
+    return norm_str(raw_val) in ("", "nan", "none")
+
+
+def _selection_status(selection_row, qual_flag, points, national_threshold):
+    if selection_row.empty:
+        return "no", "", "no"
+    limit = safe_numeric_value(selection_row.iloc[0].get('points'))
+    if not limit:
+        return "no", "", "no"
+    points_val = safe_numeric_value(points)
+    if points_val is None:
+        return "no", "", "no"
+    percentage = round((points_val / limit) * 100, 1)
+    if qual_flag:
+        status = "yes" if points_val >= limit else "no"
+    else:
+        status = "no"
+    national = "yes" if percentage >= float(national_threshold) else "no"
+    return status, f"{percentage}%", national
+
+
+def _comp_label_col(df: pd.DataFrame) -> pd.Series:
+    if df is None or df.empty or 'Competition' not in df.columns:
+        return pd.Series([], dtype=str)
+    return df['Competition'].astype(str).str.strip().str.lower()
+
+
+def _extract_comp_calendar_year(comp_row, competition_name):
+    try:
+        dt = comp_row.get("Date") if isinstance(comp_row, dict) else None
+        y = extract_year_from_text(dt)
+        if y is not None:
+            return y
+    except Exception:
+        pass
+    return extract_year_from_text(competition_name)
+
+
+def run_wettkampf_bewertung(scope="all", pisteyear=None, progress=None, ws=None):
+    """Evaluate compresults against selectionpoints and kader thresholds.
+
+    ``scope`` is "all", "year" (only competitions of ``pisteyear``) or "new"
+    (only rows without timestamp). Returns a summary dict with counts,
+    diagnostics and warnings for the page to show. Without ``ws`` the
+    changes are committed at the end.
+    """
+    own_ws = ws is None
+    ws = ws or Workspace()
+    results_key = f"compresults:{pisteyear}" if scope == "year" else "compresults"
+    loaded = ws.load_many({
+        "selectionpoints": lambda: db.table_select_df('selectionpoints', schema=SELECTIONPOINTS_SCHEMA),
+        "competitions": lambda: db.table_select('competitions'),
+        "agedives": lambda: db.table_select('agedives'),
+        "athletes": lambda: db.table_select('athletes'),
+        results_key: (lambda: load_compresults_for_year(pisteyear)) if scope == "year" else (lambda: db.table_select('compresults')),
+        "kader_rules": refdata.kader_thresholds,
+    })
+    df_athletes = pd.DataFrame(loaded["athletes"])
+    df_agedives = pd.DataFrame(loaded["agedives"])
+    now_str = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    resolve_sex_for_compresult = _build_compresult_sex_resolver(df_athletes)
+
+    comp_results = loaded[results_key]
+    if scope == "new":
+        comp_results = [r for r in comp_results if not r.get("timestamp")]
+    df_results = pd.DataFrame(comp_results)
+    df_selection = loaded["selectionpoints"]
+    df_comp = pd.DataFrame(loaded["competitions"])
+    kader_rules = loaded["kader_rules"]
+
+    # Vergleichsschlüssel einmal normalisieren statt pro Resultat über die ganze Tabelle.
+    if all(col in df_agedives.columns for col in ['sex', 'category', 'Discipline', 'dives']):
+        agedives_sex = df_agedives['sex'].astype(str).str.strip().str.lower()
+        agedives_category = df_agedives['category'].astype(str).str.strip().str.lower()
+        agedives_discipline = df_agedives['Discipline'].astype(str).str.strip().str.lower()
+    else:
+        agedives_sex = agedives_category = agedives_discipline = None
+    selection_sex = df_selection['sex'].astype(str).str.strip().str.lower()
+    selection_discipline = df_selection['Discipline'].astype(str).str.strip().str.lower()
+    selection_category = df_selection['category'].astype(str).str.strip().str.lower()
+
+    summary = {
+        "updated": 0,
+        "total_in_scope": 0,
+        "missing_selection_combos": [],  # combinations where no selectionpoints exist (after base filter)
+        "no_threshold_rows": 0,  # rows where we have selectionpoints but none for JEM/EM/WM/Regional
+        "no_regional_ref_rows": 0,
+        "seen_regional_labels": set(),
+        "warnings": [],
+    }
+    total_rows = len(df_results)
+
+    for step, (result_row, (_, row)) in enumerate(zip(comp_results, df_results.iterrows()), start=1):
+        if progress:
+            progress(step, total_rows, "Wettkampfbewertung")
+        sex = resolve_sex_for_compresult(row)
+        discipline = row["Discipline"]
+        category = row["CategoryStart"]
+        points = row["Points"]
+        competition_name = row["Competition"]
+        national_threshold, regional_threshold = resolve_kader_thresholds(discipline, category, rules=kader_rules)
+
+        comp_row = df_comp[df_comp["Name"] == competition_name]
+        comp_row = comp_row.iloc[0] if not comp_row.empty else {}
+        piste_year = comp_row.get("PisteYear")
+        comp_calendar_year = _extract_comp_calendar_year(comp_row, competition_name)
+        if scope == "year" and str(piste_year).strip() != str(pisteyear).strip():
+            continue
+
+        summary["total_in_scope"] += 1
+
+        # Fehlendes Geschlecht mitschreiben (wird für den selectionpoints-Abgleich gebraucht)
+        if sex and _needs_sex_update(row.get('sex')):
+            ws.update('compresults', result_row, {"sex": sex})
+
+        dives = None
+        if agedives_sex is not None:
+            dives_row = df_agedives[
+                (agedives_sex == str(sex).strip().lower()) &
+                (agedives_category == str(category).strip().lower()) &
+                (agedives_discipline == str(discipline).strip().lower())
+            ]
+            dives = dives_row.iloc[0]['dives'] if not dives_row.empty else None
+
+        if scope == "all":
+            if dives is None:
+                summary["warnings"].append(f"Keine dives für {sex}, {category}, {discipline}")
+            if points in (None, "", "nan"):
+                summary["warnings"].append(f"Keine Punkte für {row}")
+
+        average_points = None
+        try:
+            points_val = float(points)
+            dives_val = float(dives)
+            average_points = points_val / dives_val if dives_val else None
+        except Exception:
+            average_points = None
+
+        relevant_selection = df_selection[
+            (selection_sex == str(sex).strip().lower()) &
+            (selection_discipline == str(discipline).strip().lower()) &
+            (selection_category == str(category).strip().lower())
+        ]
+        if relevant_selection.empty and scope != "new":
+            summary["missing_selection_combos"].append({
+                "sex": str(sex),
+                "Discipline": str(discipline),
+                "CategoryStart": str(category),
+            })
+
+        jem_qual = bool(comp_row.get("qual-JEM", False))
+        em_qual = bool(comp_row.get("qual-EM", False))
+        wm_qual = bool(comp_row.get("qual-WM", False))
+        regional_qual = bool(comp_row.get("qual-Regional", False))
+
+        excluded_synchro = (
+            str(category).strip().lower() in ["jugend c", "jugend d"] and
+            str(discipline).strip().lower() in ["1m synchro", "3m synchro", "platform synchro", "turm synchro"]
+        )
+
+        base_selection = relevant_selection
+        if "year" in relevant_selection.columns:
+            by_piste = None
+            if piste_year not in (None, "", "nan"):
+                by_piste = relevant_selection[
+                    relevant_selection["year"].astype(str).str.strip() == str(piste_year).strip()
+                ]
+            if by_piste is not None and not by_piste.empty:
+                relevant_selection = by_piste
+            elif comp_calendar_year is not None:
+                by_cal = base_selection[
+                    base_selection["year"].astype(str).str.strip() == str(comp_calendar_year).strip()
+                ]
+                if not by_cal.empty:
+                    relevant_selection = by_cal
+
+        comp_col = _comp_label_col(relevant_selection)
+        jem_row = relevant_selection[comp_col == "jem"]
+        em_row = relevant_selection[comp_col == "em"]
+        wm_row = relevant_selection[comp_col == "wm"]
+        is_regional = comp_col.isin(["regional", "regionalteam", "regional team", "regio"]) | comp_col.str.contains("reg", na=False)
+        regional_row = relevant_selection[is_regional]
+
+        if scope == "year":
+            if not relevant_selection.empty:
+                for lbl in comp_col[is_regional].dropna().unique().tolist():
+                    summary["seen_regional_labels"].add(str(lbl))
+
+            if relevant_selection.empty:
+                # already counted by missing_selection_combos
+                pass
+            elif regional_qual and not excluded_synchro and regional_row.empty and jem_row.empty:
+                summary["no_regional_ref_rows"] += 1
+
+            if (not relevant_selection.empty) and jem_row.empty and em_row.empty and wm_row.empty and regional_row.empty:
+                summary["no_threshold_rows"] += 1
+
+        if scope == "new":
+            # Neue Einträge werden auch ohne gültige Punkte gestempelt (Status bleibt "no").
+            status_points = points
+        else:
+            try:
+                status_points = float(points)
+            except Exception:
+                status_points = None
+            if status_points is None:
+                continue
+
+        jem, jem_pct, jem_nt = _selection_status(jem_row, jem_qual, status_points, national_threshold)
+        em, em_pct, em_nt = _selection_status(em_row, em_qual, status_points, national_threshold)
+        wm, wm_pct, wm_nt = _selection_status(wm_row, wm_qual, status_points, national_threshold)
+        nationalteam = "yes" if "yes" in [jem_nt, em_nt, wm_nt] else "no"
+
+        # RegionalTeam-Berechnung
+        regional_pct = None
+        regionalteam = "no"
+        regional_ref_row = regional_row if not regional_row.empty else jem_row
+        if not regional_ref_row.empty and 'points' in regional_ref_row.columns:
+            try:
+                ref_val = safe_numeric_value(regional_ref_row.iloc[0].get('points'))
+                points_val_local = safe_numeric_value(points)
+                percent = round((float(points_val_local) / float(ref_val)) * 100, 1) if ref_val and points_val_local is not None else None
+                regional_pct = percent
+            except Exception:
+                pass
+
+        if regional_qual and not excluded_synchro and regional_pct is not None and regional_pct >= float(regional_threshold):
+            regionalteam = "yes"
+
+        ws.update('compresults', result_row, {
+            "JEM": jem,
+            "JEM%": safe_numeric_value(jem_pct),
+            "EM": em,
+            "EM%": safe_numeric_value(em_pct),
+            "WM": wm,
+            "WM%": safe_numeric_value(wm_pct),
+            "NationalTeam": nationalteam,
+            "RegionalTeam": regionalteam,
+            "AveragePoints": average_points,
+            "timestamp": now_str
+        })
+        summary["updated"] += 1
+
+    if own_ws:
+        ws.commit()
+    return summary
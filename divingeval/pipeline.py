@@ -0,0 +1,92 @@
+"""End-to-end recompute of one PisteYear.
+
+Runs Piste Punkte → Wettkampf-Bewertung → RefPoint Full Analyse → SOC on one
+shared :class:`~divingeval.workspace.Workspace`: every stage reads the
+in-memory results of the stages before it, and all changes are written in a
+single transaction at the end. Command line: ``python -m divingeval recompute``.
+"""
+import time
+
+from divingeval.competitions import run_wettkampf_bewertung
+from divingeval.refpoints import run_refpoint_full_analyse
+from divingeval.scoring import run_punkte_neuberechnen
+from divingeval.soc import run_soc_full_calculation
+from divingeval.workspace import Workspace
+
+
+def _run_refpoints(year, progress, ws):
+    messages = run_refpoint_full_analyse(year, progress=progress, ws=ws)
+    errors = [text for level, text in messages if level == "error"]
+    if errors:
+        raise RuntimeError(errors[0])
+    return messages
+
+
+# name → (label, depends on, run(year, progress, ws))
+STAGES = {
+    "scoring": ("Piste Punkte", (), lambda year, progress, ws: run_punkte_neuberechnen(year, progress=progress, ws=ws)),
+    "competitions": ("Wettkampf-Bewertung", (), lambda year, progress, ws: run_wettkampf_bewertung("year", pisteyear=year, progress=progress, ws=ws)),
+    "refpoints": ("RefPoint Full Analyse", ("competitions",), _run_refpoints),
+    "soc": ("SOC Full Calculation", ("scoring", "refpoints"), lambda year, progress, ws: run_soc_full_calculation(year, progress=progress, ws=ws)),
+}
+
+
+def stage_order(stages=None, with_dependencies=True):
+    """Selected stages in dependency order, by default plus their dependencies."""
+    selected = list(stages or STAGES)
+    order = []
+
+    def visit(name, path=()):
+        if name not in STAGES:
+            raise ValueError(f"Unbekannte Stufe: {name}")
+        if name in path:
+            raise ValueError(f"Zyklische Abhängigkeit: {' → '.join(path + (name,))}")
+        if name in order:
+            return
+        for dep in STAGES[name][1]:
+            if with_dependencies or dep in selected:
+                visit(dep, path + (name,))
+        order.append(name)
+
+    for name in selected:
+        visit(name)
+    return order
+
+
+def run_pipeline(year, stages=None, progress=None, dry_run=False, with_dependencies=True):
+    """Recompute one PisteYear; returns timings, stage results and written counts.
+
+    ``stages`` limits the run to these stages, plus their dependencies unless
+    ``with_dependencies`` is False (the stage then reads the stored results
+    of the stages before it). ``progress(done, total, text)`` is forwarded to
+    every stage. With ``dry_run`` nothing is written and ``counts`` shows the
+    pending changes.
+    """
+    ws = Workspace()
+    report = {"year": str(year), "stages": [], "results": {}, "counts": {}, "commit_seconds": 0.0}
+    started = time.perf_counter()
+    for name in stage_order(stages, with_dependencies):
+        label, _, run = STAGES[name]
+        stage_started = time.perf_counter()
+        report["results"][name] = run(year, progress, ws)
+        report["stages"].append({"stage": name, "label": label, "seconds": time.perf_counter() - stage_started})
+
+    commit_started = time.perf_counter()
+    report["counts"] = ws.pending() if dry_run else ws.commit()
+    report["commit_seconds"] = time.perf_counter() - commit_started
+    report["total_seconds"] = time.perf_counter() - started
+    return report
+
+
+def format_report(report):
+    lines = [f"PisteYear {report['year']}"]
+    for stage in report["stages"]:
+        lines.append(f"  {stage['label']:<24} {stage['seconds']:8.2f}s")
+    lines.append(f"  {'Schreiben':<24} {report['commit_seconds']:8.2f}s")
+    lines.append(f"  {'Total':<24} {report['total_seconds']:8.2f}s")
+    for table, counts in report["counts"].items():
+        changed = ", ".join(f"{k}={v}" for k, v in counts.items() if v)
+        if changed:
+            lines.append(f"  {table}: {changed}")
+    return "\n".join(lines)
+
@@ -0,0 +1,421 @@
+"""Piste RefPoint Full Analyse: RefPoints-%, Top3, Entwicklung and DiveQuality of one PisteYear."""
+import math
+
+import numpy as np
+import pandas as pd
+
+import db
+import refdata
+
+from divingeval.common import load_compresults_for_year, norm_str, safe_numeric_value
+from divingeval.workspace import Workspace
+
+
+def load_ref_percents(year):
+    """RefPoints-% rows (compresult_id, PisteYear, refpercent) of one PisteYear."""
+    return db.table_select("compresultsrefpercent", "compresult_id, PisteYear, refpercent", PisteYear=int(year))
+
+
+def load_refcompresults_for_year(year):
+    """pisterefcompresults of one PisteYear."""
+    return db.table_select("pisterefcompresults", "*", PisteYear=str(year))
+
+
+def _name_key(row):
+    return (norm_str(row.get("first_name")), norm_str(row.get("last_name")))
+
+
+def run_refpoint_full_analyse(selected_year, progress=None, ws=None):
+    """RefPoints, Top3, Entwicklung and DiveQuality for one PisteYear.
+
+    Returns a list of ``(level, text)`` messages for the page to render.
+    Without ``ws`` the changes are committed at the end.
+    """
+    # compresultsrefpercent gibt es erst ab Migration 006; vorher nicht rechnen statt halb zu schreiben
+    if not refdata.has_long_table("compresultsrefpercent"):
+        return [("error", f"❌ {refdata.MIGRATION_006_PENDING}")]
+    own_ws = ws is None
+    ws = ws or Workspace()
+    messages = []
+    loaded = ws.load_many({
+        "selectionpoints:raw": lambda: db.table_select('selectionpoints'),
+        "competitions": lambda: db.table_select('competitions'),
+        f"compresults:{selected_year}": lambda: load_compresults_for_year(selected_year),
+        "athletes:refpoints": lambda: db.table_select('athletes', 'id, vintage, first_name, last_name'),
+        f"compresultsrefpercent:{selected_year}": lambda: load_ref_percents(selected_year),
+        f"pisterefcompresults:{selected_year}": lambda: load_refcompresults_for_year(selected_year),
+    })
+    age_resolver = refdata.age_categories()
+    ref_points = refdata.ref_comp_points()
+    sel_df = pd.DataFrame(loaded["selectionpoints:raw"])
+
+    messages.append(("info", "Starte: Berechnen ..."))
+    selected_year_int = int(selected_year)
+
+    competitions = loaded["competitions"]
+    compresults = loaded[f"compresults:{selected_year}"]
+    athletes = loaded["athletes:refpoints"]
+    percent_rows_loaded = loaded[f"compresultsrefpercent:{selected_year}"]
+    refcompresults_year = loaded[f"pisterefcompresults:{selected_year}"]
+    percents = {r["compresult_id"]: safe_numeric_value(r.get("refpercent")) for r in percent_rows_loaded}
+
+    comp_qual_lookup = {str(c['Name']).strip().lower(): c for c in competitions}
+    athlete_vintage = {a['id']: a['vintage'] for a in athletes}
+    athlete_name_lookup = {(a['first_name'].strip().lower(), a['last_name'].strip().lower()): a['vintage'] for a in athletes}
+
+    if ref_points.empty:
+        messages.append(("error", "❌ Tabelle 'pisterefcomppointsage' ist leer. Bitte Referenzpunkte unter Datenpflege erfassen."))
+        return messages
+
+    updated = 0
+    percent_rows = []
+
+    for step, row in enumerate(compresults, start=1):
+        if progress:
+            progress(step, len(compresults), f"RefPoints {selected_year}")
+        competition_name = str(row.get("Competition", "")).strip().lower()
+        comp_row = comp_qual_lookup.get(competition_name, {})
+        comp_pisteyear = comp_row.get("PisteYear")
+
+        # Nur Wettkämpfe mit passendem PisteYear verarbeiten!
+        if str(comp_pisteyear) != str(selected_year):
+            continue
+
+        existing_percent = percents.get(row["id"])
+
+        discipline = row.get("Discipline")
+        sex = row.get("sex")
+        points = row.get("Points")
+        comp_date = comp_row.get("Date")
+        if comp_date:
+            comp_year = int(str(comp_date)[:4])
+        else:
+            comp_year = comp_row.get("PisteYear") or selected_year_int
+
+        athlete_id = row.get("athlete_id")
+        vintage = None
+        if athlete_id and athlete_id in athlete_vintage:
+            vintage = athlete_vintage[athlete_id]
+        else:
+            first = row.get("first_name", "").strip().lower()
+            last = row.get("last_name", "").strip().lower()
+            vintage = athlete_name_lookup.get((first, last))
+        if not vintage:
+            continue
+
+        try:
+            age = int(comp_year) - int(vintage)
+        except Exception:
+            continue
+
+        if not (8 <= age <= 19):
+            continue
+
+        category = str(row.get("CategoryStart", "")).strip().lower()
+        if category == "elite":
+            continue
+
+        if not (discipline and sex and points):
+            continue
+
+        if age_resolver.is_excluded_discipline(discipline, age):
+            continue
+
+        ref_value = ref_points.value(discipline, sex, age)
+        if ref_value is None:
+            continue
+
+        try:
+            points_val = float(points)
+            percent = round((points_val / ref_value) * 100, 1) if ref_value else None
+        except Exception:
+            percent = None
+            continue
+
+        # % bei Änderungen immer neu schreiben
+        if percent is not None:
+            try:
+                old_percent = float(existing_percent) if existing_percent is not None and not pd.isna(existing_percent) else None
+                changed = old_percent is None or abs(old_percent - percent) >= 0.05
+            except Exception:
+                changed = True
+            if changed:
+                percent_rows.append({"compresult_id": row["id"], "PisteYear": selected_year_int, "refpercent": percent})
+                percents[row["id"]] = percent
+                updated += 1
+
+        # --- RegionalTeam ---
+        discipline_lower = discipline.strip().lower()
+        val = comp_row.get("qual-Regional", False)
+        regional_qual = bool(val)
+        excluded_synchro_regio = (
+            category in ["jugend c", "jugend d"] and
+            discipline_lower in ["1m synchro", "3m synchro", "platform synchro"]
+        )
+        if regional_qual and not excluded_synchro_regio and percent is not None and percent >= 70:
+            regionalteam = "yes"
+        else:
+            regionalteam = "no"
+
+        # --- NationalTeam ---
+        val_nat = comp_row.get("qual-National", False)
+        national_qual = bool(val_nat)
+        excluded_synchro_nat = (
+            category in ["jugend c", "jugend d"] and
+            discipline_lower in ["3m synchro", "turm synchro"]
+        )
+        percent_nt = None
+
+        if national_qual and not excluded_synchro_nat:
+            if category in ["jugend c", "jugend d"]:
+                # Jugend C/D: gleiche Referenz wie die RefPoints oben
+                percent_nt = percent
+            else:
+                sel_row_nt = sel_df[
+                    (sel_df["Competition"].astype(str).str.strip().str.lower() == "jem") &
+                    (sel_df["category"].astype(str).str.strip().str.lower() == category) &
+                    (sel_df["Discipline"].astype(str).str.strip().str.lower() == discipline_lower) &
+                    (sel_df["sex"].astype(str).str.strip().str.lower() == sex.strip().lower()) &
+                    (sel_df["year"].astype(str) == str(comp_year))
+                ]
+                if not sel_row_nt.empty:
+                    try:
+                        ref_value_nt = float(sel_row_nt.iloc[0]["points"])
+                        points_val_nt = float(points)
+                        percent_nt = round((points_val_nt / ref_value_nt) * 100, 1) if ref_value_nt else None
+                    except Exception:
+                        percent_nt = None
+
+            nationalteam = "yes" if percent_nt is not None and percent_nt >= 90 else "no"
+        else:
+            nationalteam = "no"
+        ws.update('compresults', row, {"RegionalTeam": regionalteam, "NationalTeam": nationalteam})
+
+    ws.upsert('compresultsrefpercent', percent_rows, keys=["compresult_id", "PisteYear"])
+    messages.append(("success", f"Berechnen abgeschlossen. {updated} Einträge für {selected_year} aktualisiert."))
+
+    # --- Top3 ---
+    ref_col = "refpercent"
+    df = pd.DataFrame(compresults)
+    if df.empty:
+        messages.append(("info", f"Keine Wettkampfresultate für {selected_year}."))
+    else:
+        df[ref_col] = pd.to_numeric(df["id"].map(percents), errors="coerce")
+        athlete_vintage = {(a['first_name'].strip().lower(), a['last_name'].strip().lower()): a['vintage'] for a in athletes}
+
+        # Altersberechnung
+        vintages = pd.to_numeric(df["vintage"], errors="coerce") if "vintage" in df.columns else pd.Series(np.nan, index=df.index)
+        df["age"] = int(selected_year) - vintages
+        # Ausschluss Synchro etc.
+        df = df[~age_resolver.excluded_disciplines(df["Discipline"], df["age"])]
+
+        # --- NEU: Elite ausschließen ---
+        df = df[df["CategoryStart"].str.strip().str.lower() != "elite"]
+
+        grouped = df[df[ref_col].notnull() & (df[ref_col] != "")].groupby([
+            df['first_name'].str.strip().str.lower(),
+            df['last_name'].str.strip().str.lower()
+        ])
+        max_id_row = db.query("SELECT ISNULL(MAX(id), 0) AS max_id FROM [pisterefcompresults]")
+        next_id = (max_id_row[0]['max_id'] if max_id_row else 0) + 1
+        inserted = 0
+        for step, ((first, last), group) in enumerate(grouped, start=1):
+            if progress:
+                progress(step, grouped.ngroups, f"Top3 {selected_year}")
+            group = group.sort_values(ref_col, ascending=False)
+            top3 = group.head(3)
+            if top3.empty:
+                continue
+            vintage = athlete_vintage.get((first, last))
+            if not vintage:
+                continue
+            age = int(selected_year) - int(vintage)
+            data = {
+                "id": next_id,
+                "first_name": top3.iloc[0]['first_name'],
+                "last_name": top3.iloc[0]['last_name'],
+                "age": age,
+                "PisteYear": int(selected_year),
+            }
+            next_id += 1
+            pointsaverage = []
+            for i in range(1, 4):
+                if len(top3) >= i:
+                    row = top3.iloc[i-1]
+                    data[f"competition{i}"] = row.get("Competition")
+                    data[f"discipline{i}"] = row.get("Discipline")
+                    data[f"points{i}"] = row.get("Points")
+                    data[f"reference{i}"] = row.get(ref_col)
+                    avg_points = None
+                    avg_row = df[
+                        (df['first_name'].str.strip().str.lower() == first) &
+                        (df['last_name'].str.strip().str.lower() == last) &
+                        (df['Competition'] == row.get("Competition")) &
+                        (df['Discipline'] == row.get("Discipline")) &
+                        (df['PisteYear'] == int(selected_year))
+                    ]
+                    if not avg_row.empty:
+                        avg_points = avg_row.iloc[0].get("AveragePoints")
+                    data[f"pointsaverage{i}"] = avg_points
+                    if avg_points not in (None, "", "nan"):
+                        try:
+                            pointsaverage.append(float(avg_points))
+                        except Exception:
+                            pass
+                else:
+                    data[f"competition{i}"] = None
+                    data[f"discipline{i}"] = None
+                    data[f"points{i}"] = None
+                    data[f"reference{i}"] = None
+                    data[f"pointsaverage{i}"] = None
+            data["pointsaverageaverage"] = round(sum(pointsaverage) / len(pointsaverage), 2) if pointsaverage else None
+            refs = [data[f"reference{i}"] for i in range(1, 4) if data[f"reference{i}"] is not None]
+            try:
+                refs = [float(r) for r in refs if r not in ("", None)]
+                data["refaverage"] = round(sum(refs) / len(refs), 1) if refs else None
+            except Exception:
+                data["refaverage"] = None
+            pointsaverageref = None
+            try:
+                discipline = data.get("discipline1")
+                if not discipline:
+                    discipline = top3.iloc[0].get("Discipline") if len(top3) > 0 else None
+                sex = None
+                cr_row = df[
+                    (df['first_name'].str.strip().str.lower() == first) &
+                    (df['last_name'].str.strip().str.lower() == last) &
+                    (df['PisteYear'] == int(selected_year))
+                ]
+                if not cr_row.empty:
+                    sex = cr_row.iloc[0].get("sex")
+                if not sex or sex == "":
+                    athlete_row = [a for a in athletes if a['first_name'].strip().lower() == first and a['last_name'].strip().lower() == last]
+                    if athlete_row:
+                        sex = athlete_row[0].get("sex")
+                ref_value = ref_points.value(discipline, sex, age, "quality")
+                if ref_value is not None:
+                    avg_val = data.get("pointsaverageaverage")
+                    if avg_val not in (None, "", "nan"):
+                        try:
+                            avg_val = float(avg_val)
+                            if ref_value != 0:
+                                pointsaverageref = round((avg_val / ref_value) * 100, 1)
+                        except Exception:
+                            pointsaverageref = None
+            except Exception:
+                pointsaverageref = None
+            data["pointsaverageref%"] = pointsaverageref
+            name_key = _name_key(data)
+            for old in [r for r in refcompresults_year if _name_key(r) == name_key]:
+                ws.delete('pisterefcompresults', old, into=refcompresults_year)
+            ws.insert('pisterefcompresults', data, into=refcompresults_year)
+            inserted += 1
+        messages.append(("success", f"Top3-Auswertung abgeschlossen. {inserted} Einträge für {selected_year} gespeichert."))
+
+    # --- ENTWICKLUNG RECHNEN ---
+    messages.append(("info", "Starte: Entwicklung rechnen ..."))
+    earlier_years = [str(y) for y in range(2024, int(selected_year))]
+    earlier = ws.load_many({
+        f"pisterefcompresults:{y}": (lambda y=y: load_refcompresults_for_year(y)) for y in earlier_years
+    })
+    refcompresults = [r for y in earlier_years for r in earlier[f"pisterefcompresults:{y}"]] + list(refcompresults_year)
+    if not refcompresults:
+        messages.append(("warning", "Keine Daten in pisterefcompresults für die gewählten Jahre gefunden."))
+    else:
+        year_rows_by_name = {}
+        for r in refcompresults_year:
+            year_rows_by_name.setdefault(_name_key(r), []).append(r)
+
+        df = pd.DataFrame(refcompresults)
+        df["PisteYear"] = df["PisteYear"].astype(str)
+        grouped = df.groupby([df['first_name'].str.strip().str.lower(), df['last_name'].str.strip().str.lower()])
+        updated = 0
+        for (first, last), group in grouped:
+            group = group.sort_values("PisteYear")
+            this_year_row = group[group["PisteYear"] == str(selected_year)]
+            if this_year_row.empty:
+                continue
+            this_year_value = this_year_row.iloc[0].get("refaverage")
+            prev_years = group[group["PisteYear"] != str(selected_year)]
+            prev_values = prev_years["refaverage"].dropna().tolist()
+            if len(prev_values) < 1 or this_year_value is None:
+                continue
+            try:
+                prev_avg = sum([float(v) for v in prev_values]) / len(prev_values)
+                this_val = float(this_year_value)
+                if prev_avg == 0:
+                    performance = None
+                else:
+                    performance = round(((this_val - prev_avg) / prev_avg) * 100, 1)
+            except Exception:
+                performance = None
+            for target in year_rows_by_name.get((first, last), []):
+                ws.update('pisterefcompresults', target, {"performance": performance})
+            updated += 1
+
+        # DiveQuality-Berechnung
+        compresults_df = pd.DataFrame(compresults)
+        for col in ["first_name", "last_name", "Competition", "Points", "PisteYear"]:
+            if col not in compresults_df.columns:
+                compresults_df[col] = None
+        for (first, last), group in grouped:
+            group = group.sort_values("PisteYear")
+            this_year_row = group[group["PisteYear"] == str(selected_year)]
+            if this_year_row.empty:
+                continue
+            age = this_year_row.iloc[0].get("age")
+            sex = this_year_row.iloc[0].get("sex", None)
+            try:
+                age_int = int(float(age)) if pd.notna(age) else None
+            except Exception:
+                age_int = None
+            if not age or not sex:
+                cr = compresults_df[
+                    (compresults_df['first_name'].str.strip().str.lower() == first) &
+                    (compresults_df['last_name'].str.strip().str.lower() == last) &
+                    (compresults_df['PisteYear'] == int(selected_year))
+                ]
+                if not cr.empty:
+                    sex = cr.iloc[0].get("sex")
+            if age_int is None:
+                continue
+            cr_rows = compresults_df[
+                (compresults_df['first_name'].str.strip().str.lower() == first) &
+                (compresults_df['last_name'].str.strip().str.lower() == last) &
+                (compresults_df['Competition'].notnull()) &
+                (compresults_df['Points'].notnull()) &
+                (compresults_df['PisteYear'] == int(selected_year))
+            ]
+            quality_vals = []
+            for _, cr_row in cr_rows.iterrows():
+                discipline = cr_row.get("Discipline")
+                avg_points = cr_row.get("AveragePoints")
+                # --- AUSSCHLUSS HIER ---
+                if age_resolver.is_excluded_discipline(discipline, age):
+                    continue
+                if not (discipline and sex):
+                    continue
+                if pd.isna(avg_points):
+                    continue
+                ref_value = ref_points.value(discipline, sex, age_int, "quality")
+                if ref_value is None:
+                    continue
+                try:
+                    avg_points_val = float(avg_points)
+                    if not math.isfinite(ref_value) or not math.isfinite(avg_points_val):
+                        continue
+                    deviation = round(((avg_points_val - ref_value) / ref_value) * 100, 1) if ref_value else None
+                    if deviation is not None and pd.notna(deviation) and math.isfinite(float(deviation)):
+                        quality_vals.append(deviation)
+                except Exception:
+                    continue
+            quality = round(sum(quality_vals) / len(quality_vals), 1) if quality_vals else None
+            if pd.isna(quality) or (quality is not None and not math.isfinite(float(quality))):
+                quality = None
+            for target in year_rows_by_name.get((first, last), []):
+                ws.update('pisterefcompresults', target, {"quality": quality})
+        messages.append(("success", f"Entwicklung für {updated} Personen berechnet und gespeichert."))
+
+    if own_ws:
+        ws.commit()
+    return messages
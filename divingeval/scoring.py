@@ -0,0 +1,190 @@
+"""Piste Punkte: re-score the pisteresults of one TestYear."""
+import db
+import refdata
+
+from divingeval.common import get_points_with_next_higher, load_pisteresults_for_year, norm_str, safe_numeric_value
+from divingeval.workspace import Workspace
+
+# Körpermasse werden erfasst, aber nicht bewertet.
+EXCLUDED_DISCIPLINE_IDS = {
+    "640260ec-a094-462d-a69e-d91bbe35d94c",  # BodyWeight
+    "5906836a-24aa-40e1-a71f-614a7ea4a825",  # BodySize
+    "7eb062f7-3329-4cde-8875-bd6fd362137b",  # UpperBodySize
+}
+
+
+class ScoreTables:
+    """scoretables grouped by (discipline_id, category, sex), loaded once per run.
+
+    ``points`` follows ``get_points``: keys compare case-insensitively, the
+    first range containing the result wins, and a group with an unparsable
+    ``result_min`` scores 0.
+    """
+
+    def __init__(self, rows):
+        self.rows = list(rows or [])
+        groups = {}
+        for row in self.rows:
+            key = (norm_str(row.get("discipline_id")), norm_str(row.get("category")), norm_str(row.get("sex")))
+            groups.setdefault(key, []).append(row)
+        self._groups = {}
+        for key, group in groups.items():
+            try:
+                self._groups[key] = sorted(group, key=lambda r: float(r["result_min"]))
+            except Exception:
+                self._groups[key] = None
+
+    def for_discipline(self, discipline_id):
+        """All rows of one discipline, in table order."""
+        key = norm_str(discipline_id)
+        return [r for r in self.rows if norm_str(r.get("discipline_id")) == key]
+
+    def points(self, discipline_id, result, category, sex):
+        if not discipline_id or not category or not sex:
+            return 0
+        group = self._groups.get((norm_str(discipline_id), norm_str(category), norm_str(sex)), [])
+        if group is None:
+            return 0
+        try:
+            value = float(result)
+        except Exception:
+            return 0
+        for row in group:
+            try:
+                if float(row["result_min"]) <= value <= float(row["result_max"]):
+                    return row["points"]
+            except Exception:
+                continue
+        return 0
+
+
+def get_points(discipline_id, result, category, sex):
+    """Scoretable points of one piste result (0 without a matching range)."""
+    if not discipline_id:
+        return 0
+    try:
+        rows = db.table_select("scoretables", discipline_id=discipline_id)
+    except Exception:
+        return 0
+    return ScoreTables(rows).points(discipline_id, result, category, sex)
+
+
+def _first_range_match(rows, value):
+    for row in rows:
+        try:
+            if float(row["result_min"]) <= value <= float(row["result_max"]):
+                return row["points"]
+        except Exception:
+            continue
+    return None
+
+
+def run_punkte_neuberechnen(selected_year, progress=None, ws=None):
+    """Re-score all pisteresults of one TestYear.
+
+    Returns the number of re-scored results, or None if the year has no
+    pisteresults. Without ``ws`` the changes are committed at the end.
+    """
+    own_ws = ws is None
+    ws = ws or Workspace()
+    loaded = ws.load_many({
+        f"pisteresults:{selected_year}": lambda: load_pisteresults_for_year(selected_year),
+        "pistedisciplines": lambda: db.table_select("pistedisciplines", "id, name"),
+        "athletes": lambda: db.table_select("athletes"),
+        "scoretables": lambda: db.table_select("scoretables"),
+    })
+    year_results = loaded[f"pisteresults:{selected_year}"]
+    if not year_results:
+        return None
+
+    pistedisciplines = loaded["pistedisciplines"]
+    athlete_lookup = {a["id"]: a for a in loaded["athletes"]}
+    scoretables = ScoreTables(loaded["scoretables"])
+    age_resolver = refdata.age_categories()
+
+    # IDs für Spezialdisziplinen holen
+    pistetotalpoints_id = next((d["id"] for d in pistedisciplines if d["name"] == "PisteTotalPoints"), None)
+    pistepointsdurchschnitt_id = next((d["id"] for d in pistedisciplines if d["name"].strip().lower() == "pistepointsdurchschnitt"), None)
+    pistetotalinpoints_id = next((d["id"] for d in pistedisciplines if d["name"] == "PisteTotalinPoints"), None)
+
+    athlete_ids = list(dict.fromkeys(r["athlete_id"] for r in year_results))
+    total_steps = len(year_results) + len(athlete_ids)
+
+    def category_for(athlete):
+        return age_resolver.category_for_vintage(athlete.get("vintage"), selected_year, "Unbekannt")
+
+    updated_count = 0
+    # 1. Alle Einzelpunkte neu berechnen
+    for step, entry in enumerate(list(year_results), start=1):
+        if progress:
+            progress(step, total_steps, f"Einzelpunkte {selected_year}")
+        athlete = athlete_lookup.get(entry["athlete_id"])
+        if not athlete:
+            continue
+        category = category_for(athlete)
+        discipline_id = entry["discipline_id"]
+        if discipline_id in EXCLUDED_DISCIPLINE_IDS:
+            new_points = 0
+        else:
+            new_points = scoretables.points(discipline_id, entry["raw_result"], category.strip(), athlete.get("sex"))
+        ws.update("pisteresults", entry, {"points": new_points, "category": category})
+        updated_count += 1
+
+    by_athlete = {}
+    for r in year_results:
+        by_athlete.setdefault(r["athlete_id"], []).append(r)
+
+    def save_special(athlete_id, discipline_id, values):
+        existing = next((r for r in by_athlete.get(athlete_id, []) if r["discipline_id"] == discipline_id), None)
+        if existing is not None:
+            ws.update("pisteresults", existing, values)
+        else:
+            row = {"athlete_id": athlete_id, "discipline_id": discipline_id, **values, "TestYear": int(selected_year)}
+            ws.insert("pisteresults", row, into=year_results)
+            by_athlete.setdefault(athlete_id, []).append(row)
+
+    avg_scoretable = scoretables.for_discipline(pistepointsdurchschnitt_id) if pistepointsdurchschnitt_id else []
+    totalin_scoretable = scoretables.for_discipline(pistetotalinpoints_id) if pistetotalinpoints_id else []
+
+    # 2. Für jeden Athleten im Jahr: Spezialdisziplinen berechnen und speichern
+    for step, athlete_id in enumerate(athlete_ids, start=len(year_results) + 1):
+        if progress:
+            progress(step, total_steps, f"Spezialdisziplinen {selected_year}")
+        athlete = athlete_lookup.get(athlete_id)
+        if not athlete:
+            continue
+        sex = athlete.get("sex")
+        category = category_for(athlete)
+
+        single_points = [
+            p for p in (
+                safe_numeric_value(r.get("points")) for r in by_athlete.get(athlete_id, [])
+                if r["discipline_id"] not in EXCLUDED_DISCIPLINE_IDS
+            )
+            if p not in (None, 0)
+        ]
+        total_points = round(sum(single_points), 2) if single_points else 0
+        avg_points = round(total_points / len(single_points), 2) if single_points else 0
+
+        if pistetotalpoints_id:
+            save_special(athlete_id, pistetotalpoints_id, {
+                "raw_result": total_points, "points": total_points, "category": category, "sex": sex,
+            })
+        if pistepointsdurchschnitt_id:
+            save_special(athlete_id, pistepointsdurchschnitt_id, {
+                "raw_result": avg_points,
+                "points": _first_range_match(avg_scoretable, avg_points),
+                "category": category,
+                "sex": sex,
+            })
+        if pistetotalinpoints_id:
+            save_special(athlete_id, pistetotalinpoints_id, {
+                "raw_result": avg_points,
+                "points": get_points_with_next_higher(totalin_scoretable, avg_points),
+                "category": category,
+                "sex": sex,
+            })
+
+    if own_ws:
+        ws.commit()
+    return updated_count
@@ -0,0 +1,328 @@
+"""SOC Full Calculation: rebuild socadditionalvalues of one PisteYear."""
+import pandas as pd
+
+import db
+import identity
+import refdata
+
+from divingeval.common import (
+    get_points_with_next_higher,
+    load_athleteyearstatus_map,
+    load_compresults_for_year,
+    load_pisteresults_for_year,
+    norm_str,
+)
+from divingeval.refpoints import load_refcompresults_for_year
+from divingeval.workspace import Workspace
+
+TOTALPOINTS_FIELDS = [
+    "competitions", "trainingperf", "piste", "compenhancement",
+    "resilience", "trainingtime", "trainingsince", "toolenvironment", "quality", "bioagevalue", "mirwaldvalue"
+]
+
+
+def get_trainingsince_value(pisteyear, trainingsince, vintage):
+    try:
+        age = int(pisteyear) - int(vintage)
+        trainingsjahre = int(pisteyear) - int(trainingsince)
+    except Exception:
+        return None
+    return refdata.trainingsince_matrix().value(age, trainingsjahre)
+
+
+def get_trainingstime_value(pisteyear, trainingstime, vintage):
+    try:
+        age = int(pisteyear) - int(vintage)
+        stunden = int(trainingstime)
+    except Exception:
+        return None
+    return refdata.trainingtime_matrix().value(age, stunden)
+
+
+def get_training_values(frame, pisteyear):
+    """Vectorized trainingsince/trainingtime reference points.
+
+    ``frame`` has vintage, trainingsince and trainingtime per row; returns a
+    frame with the trainingsince/trainingtime points (NaN if none).
+    """
+    def _numbers(col):
+        values = frame[col] if col in frame.columns else pd.Series(None, index=frame.index, dtype=object)
+        return pd.to_numeric(values.astype(str).str.strip(), errors="coerce")
+
+    ages = int(pisteyear) - _numbers("vintage")
+    return pd.DataFrame({
+        "trainingsince": refdata.trainingsince_matrix().values(ages, int(pisteyear) - _numbers("trainingsince")),
+        "trainingtime": refdata.trainingtime_matrix().values(ages, _numbers("trainingtime")),
+    }, index=frame.index)
+
+
+def _first_range_match(rows, value):
+    for s in rows:
+        rmin = float(s['result_min'])
+        rmax = float(s['result_max'])
+        if rmin <= value <= rmax:
+            return s['points']
+    return None
+
+
+def _range_points(rows, value):
+    """Scoretable points of ``value``; None if it is empty or a row is unparsable."""
+    if value in (None, "", "nan"):
+        return None
+    try:
+        return _first_range_match(rows, float(value))
+    except Exception:
+        return None
+
+
+def _kader_minimums(data, refminpoints_df):
+    """``(pisteminregio, pisteminnational)`` as "Yes"/"No", or None without a usable reference."""
+    totalpoints = data.get("totalpoints")
+    birthdate = data.get("birthdate")
+    if totalpoints in (None, "", "nan") or not birthdate:
+        return None
+    age = int(data["PisteYear"]) - int(str(birthdate)[:4])
+    if refminpoints_df.empty or "age" not in refminpoints_df.columns:
+        return None
+    ref_row = refminpoints_df[refminpoints_df["age"].astype(str) == str(age)]
+    if ref_row.empty:
+        return None
+    ref_row = ref_row.iloc[0]
+    regio_min = ref_row.get("regio_min")
+    national_min = ref_row.get("national_min")
+    if regio_min in (None, "", "nan") or national_min in (None, "", "nan"):
+        return None
+    try:
+        regio_min = float(regio_min)
+        national_min = float(national_min)
+    except Exception:
+        return None
+    totalpoints = float(totalpoints)
+    return ("Yes" if totalpoints >= regio_min else "No", "Yes" if totalpoints >= national_min else "No")
+
+
+def run_soc_full_calculation(selected_year, progress=None, ws=None):
+    """Rebuild socadditionalvalues for one PisteYear.
+
+    Returns the number of athletes written. Raises ValueError if required
+    pistedisciplines are missing. Without ``ws`` the changes are committed
+    at the end.
+    """
+    own_ws = ws is None
+    ws = ws or Workspace()
+    pisteyear = str(selected_year)
+    pisteyear_int = int(selected_year)
+    loaded = ws.load_many({
+        "injured_map": load_athleteyearstatus_map,
+        "athletes": lambda: db.table_select('athletes'),
+        f"pisterefcompresults:{pisteyear}": lambda: load_refcompresults_for_year(pisteyear),
+        "pistedisciplines": lambda: db.table_select('pistedisciplines', 'id, name'),
+        f"pisteresults:{pisteyear}": lambda: load_pisteresults_for_year(pisteyear),
+        f"compresults:{pisteyear}": lambda: load_compresults_for_year(pisteyear),
+        "refminpoints": lambda: db.table_select("pisterefminpoints", '*'),
+        "scoretables": lambda: db.table_select('scoretables'),
+        f"mirwald:{pisteyear}": lambda: db.table_select("pistemirwald", '*', PisteYear=pisteyear),
+        f"environment:{pisteyear}": lambda: db.table_select("pisteenvironment", '*', PisteYear=pisteyear),
+        f"trainings:{pisteyear}": lambda: db.table_select("trainingsperformance", '*', PisteYear=pisteyear),
+    })
+    age_resolver = refdata.age_categories()
+    injured_map = loaded["injured_map"]
+
+    # Alle Verknüpfungen laufen über athlete_id (bzw. einmal aufgelöste Namen), nicht mehr über Namensvergleiche pro Zeile.
+    athlete_index = identity.AthleteIndex(loaded["athletes"])
+
+    def _first_row_by_athlete(rows):
+        by_athlete = {}
+        for r in rows or []:
+            athlete_id = athlete_index.id_for_row(r)
+            if athlete_id and athlete_id not in by_athlete:
+                by_athlete[athlete_id] = r
+        return by_athlete
+
+    mirwald_by_athlete = _first_row_by_athlete(loaded[f"mirwald:{pisteyear}"])
+    environment_by_athlete = _first_row_by_athlete(loaded[f"environment:{pisteyear}"])
+    trainings_by_athlete = _first_row_by_athlete(loaded[f"trainings:{pisteyear}"])
+
+    # Trainings-Referenzpunkte für alle Athleten auf einmal aus den gecachten Matrizen
+    training_frame = pd.DataFrame.from_dict({
+        athlete_id: {
+            "vintage": (athlete_index.get(athlete_id) or {}).get("vintage"),
+            "trainingsince": t.get("trainingsince"),
+            "trainingtime": t.get("trainingtime"),
+        }
+        for athlete_id, t in trainings_by_athlete.items()
+    }, orient="index")
+    training_values = {}
+    if not training_frame.empty:
+        values = get_training_values(training_frame, pisteyear_int)
+        training_values = values.astype(object).where(values.notna(), None).to_dict("index")
+
+    refcompresults_df = pd.DataFrame(loaded[f"pisterefcompresults:{pisteyear}"])
+
+    pistedisciplines = loaded["pistedisciplines"]
+    comp_perf_id = next((d['id'] for d in pistedisciplines if d['name'] == "CompPerfPointsCalc"), None)
+    comp_quality_id = next((d['id'] for d in pistedisciplines if d['name'] == "CompPerfQualityCalc"), None)
+    comp_enhance_id = next((d['id'] for d in pistedisciplines if d['name'] == "CompPerfEnhance"), None)
+    pistetotalinpoints_id = next((d['id'] for d in pistedisciplines if d['name'] == "PisteTotalinPoints"), None)
+    if not (comp_perf_id and comp_quality_id and comp_enhance_id and pistetotalinpoints_id):
+        raise ValueError("Eine oder mehrere Disziplinen fehlen!")
+
+    def _scoretable_rows(discipline_id):
+        key = str(discipline_id).strip().lower()
+        return [s for s in loaded["scoretables"] if str(s.get('discipline_id') or '').strip().lower() == key]
+
+    scoretables = _scoretable_rows(comp_perf_id)
+    scoretables_quality = _scoretable_rows(comp_quality_id)
+    scoretables_enhance = _scoretable_rows(comp_enhance_id)
+    scoretable_rows = _scoretable_rows(pistetotalinpoints_id)
+
+    pistepointsdurchschnitt_id = next((d['id'] for d in pistedisciplines if d['name'].strip().lower() == "pistepointsdurchschnitt"), None)
+    average_rows_by_athlete = {}
+    for r in loaded[f"pisteresults:{pisteyear}"]:
+        if str(r.get('discipline_id')) == str(pistepointsdurchschnitt_id):
+            average_rows_by_athlete.setdefault(str(r.get('athlete_id')), []).append(r)
+
+    # Bestehende Einträge für dieses Jahr löschen → danach immer frisch inserieren (kein Duplikat-Risiko)
+    # Cast on both sides avoids int/nvarchar coercion issues when legacy values like 'global' exist.
+    ws.delete_where(
+        "socadditionalvalues",
+        "CAST([PisteYear] AS NVARCHAR(10)) = CAST(%s AS NVARCHAR(10)) AND ISNULL([toolenvironment], '') <> 'injuryflags'",
+        [pisteyear],
+    )
+
+    athlete_data_map = {}
+
+    for step, (_, row) in enumerate(refcompresults_df.iterrows(), start=1):
+        if progress:
+            progress(step, len(refcompresults_df), f"SOC {selected_year}")
+        athlete_id = athlete_index.id_for_row(row)
+        athlete = athlete_index.get(athlete_id)
+        if not athlete:
+            continue
+
+        key = (athlete['first_name'], athlete['last_name'], pisteyear)
+        if key not in athlete_data_map:
+            athlete_data_map[key] = {
+                "athlete_id": athlete_id,
+                "first_name": athlete['first_name'],
+                "last_name": athlete['last_name'],
+                "birthdate": athlete['birthdate'],
+                "sex": athlete['sex'],
+                "PisteYear": pisteyear,
+                "Category": age_resolver.category_for_vintage(athlete.get('vintage'), pisteyear_int)
+            }
+        data = athlete_data_map[key]
+        data["injured"] = "yes" if injured_map.get((norm_str(athlete['first_name']), norm_str(athlete['last_name']), norm_str(pisteyear)), False) else "no"
+
+        bioage = athlete.get("bioage")
+        bioage_map = {"q1": -1, "q2": -0.5, "q3": 0.5, "q4": 1}
+        data["bioagevalue"] = bioage_map.get(str(bioage).lower(), 0) if bioage else 0
+
+        mirwald_row = mirwald_by_athlete.get(athlete_id)
+        mirwald_map = {3: 1, 2: 0, 1: -1}
+        mirwaldvalue = 0
+        if mirwald_row and "bioentwstand" in mirwald_row:
+            try:
+                mirwaldvalue = mirwald_map.get(int(mirwald_row["bioentwstand"]), 0)
+            except Exception:
+                mirwaldvalue = 0
+        data["mirwaldvalue"] = mirwaldvalue
+
+        env_row = environment_by_athlete.get(athlete_id)
+        if env_row:
+            data["toolenvironment"] = env_row.get("toolenvvalue")
+
+        t = trainings_by_athlete.get(athlete_id)
+        if t:
+            data["trainingperf"] = sum([t.get("q2", 0), t.get("q3", 0), t.get("q4", 0), t.get("q5", 0), t.get("q7", 0), t.get("q8", 0), t.get("q9", 0), t.get("q10", 0)])
+            data["resilience"] = t.get("q1", 0) + t.get("q6", 0)
+            data["trainingsince"] = training_values.get(athlete_id, {}).get("trainingsince")
+            data["trainingtime"] = training_values.get(athlete_id, {}).get("trainingtime")
+
+        refaverage = row.get('refaverage')
+        if refaverage not in (None, "", "nan"):
+            data["competitions"] = _range_points(scoretables, refaverage)
+
+        # PistePointsDurchschnitt: Punkte = Rohwert (Durchschnitt), danach über PisteTotalinPoints bewerten
+        average_rows = average_rows_by_athlete.get(str(athlete['id']), [])
+        if average_rows:
+            raw_val = average_rows[0]['raw_result']
+            if raw_val is not None:
+                for average_row in average_rows:
+                    ws.update("pisteresults", average_row, {"points": raw_val})
+        piste_value = None
+        if average_rows:
+            avg_points_rounded = round(float(average_rows[0]['points']), 1)
+            piste_value = get_points_with_next_higher(scoretable_rows, avg_points_rounded)
+        data["piste"] = piste_value
+
+        performance = row.get('performance')
+        if performance not in (None, "", "nan"):
+            data["compenhancement"] = _range_points(scoretables_enhance, performance)
+
+        pointsaverageref = row.get('pointsaverageref%')
+        if pointsaverageref not in (None, "", "nan"):
+            data["quality"] = _range_points(scoretables_quality, pointsaverageref)
+
+    # Ein Durchlauf über compresults des Jahres: welche Athleten haben National-/Regionalteam-Resultate?
+    national_ids = set()
+    regional_ids = set()
+    for r in loaded[f"compresults:{pisteyear}"]:
+        if not isinstance(r, dict):
+            continue
+        is_national = str(r.get('NationalTeam') or '').strip().lower() == 'yes'
+        is_regional = str(r.get('RegionalTeam') or '').strip().lower() == 'yes'
+        if not (is_national or is_regional):
+            continue
+        result_athlete_id = athlete_index.id_for_row(r)
+        if is_national:
+            national_ids.add(result_athlete_id)
+        if is_regional:
+            regional_ids.add(result_athlete_id)
+
+    refminpoints_df = pd.DataFrame(loaded["refminpoints"])
+    for data in athlete_data_map.values():
+        injured = data.get("injured") == "yes"
+        data["CompPointsNationalTeam"] = "no" if injured else ("yes" if data["athlete_id"] in national_ids else "no")
+        data["CompPointsRegionalTeam"] = "no" if injured else ("yes" if data["athlete_id"] in regional_ids else "no")
+
+        # --- totalpoints ---
+        total = 0
+        for f in TOTALPOINTS_FIELDS:
+            try:
+                val = data.get(f)
+                if val not in (None, "", "nan"):
+                    total += float(val)
+            except Exception:
+                continue
+        data["totalpoints"] = total
+
+        # --- pisterefminpoints-Check: pisteminregio und pisteminnational ---
+        minimums = _kader_minimums(data, refminpoints_df)
+        if minimums:
+            data["pisteminregio"], data["pisteminnational"] = minimums
+
+        # --- Talentcard ---
+        pisteminregio = str(data.get("pisteminregio", "")).lower()
+        pisteminnational = str(data.get("pisteminnational", "")).lower()
+        if injured:
+            data["talentcard"] = "noCard"
+        elif pisteminnational == "yes" and data["CompPointsNationalTeam"] == "yes":
+            data["talentcard"] = "National"
+            data["CompPointsRegionalTeam"] = "no"
+        elif pisteminregio == "yes" and data["CompPointsRegionalTeam"] == "yes":
+            data["talentcard"] = "Regional"
+        else:
+            data["talentcard"] = "noCard"
+
+    # --- Alle berechneten Daten frisch einfügen ---
+    soc_has_athlete_id = identity.has_athlete_id("socadditionalvalues")
+    for data in athlete_data_map.values():
+        ws.insert("socadditionalvalues", {
+            k: v for k, v in data.items()
+            if k != "injured" and (k != "athlete_id" or soc_has_athlete_id)
+        })
+
+    if own_ws:
+        ws.commit()
+    return len(athlete_data_map)
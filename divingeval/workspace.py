@@ -0,0 +1,170 @@
+"""In-memory working set of one recompute run.
+
+Engines read their tables once through :class:`Workspace`, change the loaded
+rows in place and record every change. ``commit()`` then writes only the
+deltas in a single transaction, so chained stages see each other's results
+without a round trip to the database.
+"""
+import decimal
+import math
+
+import db
+
+
+def _is_number(value):
+    return isinstance(value, (int, float, decimal.Decimal)) and not isinstance(value, bool)
+
+
+def _same(a, b):
+    """Value comparison that treats None/NaN as equal and numbers with a tolerance."""
+    a_missing = a is None or (isinstance(a, float) and math.isnan(a))
+    b_missing = b is None or (isinstance(b, float) and math.isnan(b))
+    if a_missing or b_missing:
+        return a_missing and b_missing
+    if _is_number(a) and _is_number(b):
+        return math.isclose(float(a), float(b), rel_tol=1e-9, abs_tol=1e-9)
+    return a == b
+
+
+# Skala der DECIMAL(10,4)-Spalten aus Migration 001
+_DECIMAL_STEP = decimal.Decimal("0.0001")
+
+
+def _round_decimal(value):
+    # SQL Server rundet kaufmännisch (half up), nicht wie round() auf dem float
+    return float(decimal.Decimal(str(value)).quantize(_DECIMAL_STEP, rounding=decimal.ROUND_HALF_UP))
+
+
+def _as_stored(table, values):
+    """``values`` rounded like the typed DECIMAL columns of ``table`` store them.
+
+    Later stages read the loaded rows instead of the database, so they must
+    see the same precision a re-read would return.
+    """
+    typed = db._TYPED_COLUMNS.get(str(table).strip().lower())
+    if not typed:
+        return values
+    return {
+        col: _round_decimal(v) if typed.get(col) == "decimal" and isinstance(v, float) and math.isfinite(v) else v
+        for col, v in values.items()
+    }
+
+
+class _TableChanges:
+    def __init__(self, key):
+        self.key = key
+        self.delete_where = []  # [(sql, params)]
+        self.deleted = []  # key values
+        self.updated = {}  # id(row) -> (row, {column: original value})
+        self.inserted = []  # rows
+        self.inserted_ids = set()  # id(row) of the pending inserts
+        self.upserts = []  # (rows, keys)
+
+
+class Workspace:
+    """Shared rows and recorded changes of one recompute run."""
+
+    def __init__(self):
+        self._values = {}
+        self._tables = {}
+
+    # --- Laden ---
+    def load(self, key, loader):
+        """Value of ``key``; ``loader()`` runs only the first time."""
+        if key not in self._values:
+            self._values[key] = loader()
+        return self._values[key]
+
+    def load_many(self, specs):
+        """``{key: loader}`` → ``{key: value}``; missing keys are fetched in parallel."""
+        missing = {k: loader for k, loader in specs.items() if k not in self._values}
+        if missing:
+            self._values.update(db.fetch_many(missing))
+        return {k: self._values[k] for k in specs}
+
+    # --- Änderungen ---
+    def _table(self, table, key="id"):
+        changes = self._tables.get(table)
+        if changes is None:
+            changes = self._tables[table] = _TableChanges(key)
+        return changes
+
+    def update(self, table, row, changes, key="id"):
+        """Set ``changes`` on the loaded ``row`` and remember the original values."""
+        tc = self._table(table, key)
+        changes = _as_stored(table, changes)
+        if id(row) not in tc.inserted_ids:
+            _, originals = tc.updated.setdefault(id(row), (row, {}))
+            for col in changes:
+                originals.setdefault(col, row.get(col))
+        row.update(changes)
+
+    def insert(self, table, row, into=None):
+        """Queue ``row`` for INSERT; it is also appended to the loaded list ``into``."""
+        tc = self._table(table)
+        row.update(_as_stored(table, row))
+        tc.inserted.append(row)
+        tc.inserted_ids.add(id(row))
+        if into is not None:
+            into.append(row)
+        return row
+
+    def delete(self, table, row, key="id", into=None):
+        """Queue ``row`` for DELETE and drop it from the loaded list ``into``."""
+        tc = self._table(table, key)
+        if id(row) in tc.inserted_ids:
+            tc.inserted = [r for r in tc.inserted if r is not row]
+            tc.inserted_ids.discard(id(row))
+        else:
+            tc.updated.pop(id(row), None)
+            tc.deleted.append(row[key])
+        if into is not None:
+            into[:] = [r for r in into if r is not row]
+
+    def delete_where(self, table, where_sql, params=None):
+        """Queue ``DELETE FROM [table] WHERE <where_sql>``; runs before the other changes of ``table``."""
+        self._table(table).delete_where.append((where_sql, list(params or [])))
+
+    def upsert(self, table, rows, keys):
+        """Queue ``db.upsert_many(table, rows, keys)``."""
+        rows = list(rows or [])
+        if rows:
+            self._table(table).upserts.append((rows, list(keys)))
+
+    def _row_updates(self, tc):
+        updates = []
+        for row, originals in tc.updated.values():
+            changed = {col: row.get(col) for col, orig in originals.items() if not _same(row.get(col), orig)}
+            if changed:
+                updates.append((row[tc.key], changed))
+        return updates
+
+    def pending(self):
+        """``{table: {"deleted"|"updated"|"inserted"|"upserted": n}}`` of what ``commit()`` would write."""
+        summary = {}
+        for table, tc in self._tables.items():
+            summary[table] = {
+                "deleted": len(tc.deleted) + len(tc.delete_where),
+                "updated": len(self._row_updates(tc)),
+                "inserted": len(tc.inserted),
+                "upserted": sum(len(rows) for rows, _ in tc.upserts),
+            }
+        return summary
+
+    def commit(self):
+        """Write all recorded changes in one transaction; returns counts per table."""
+        counts = {}
+        with db.transaction() as tx:
+            for table, tc in self._tables.items():
+                table_counts = {"deleted": 0, "updated": 0, "inserted": 0, "upserted": 0}
+                for where_sql, params in tc.delete_where:
+                    table_counts["deleted"] += tx.execute(f"DELETE FROM [{table}] WHERE {where_sql}", params) or 0
+                table_counts["deleted"] += db.delete_many(table, tc.deleted, key=tc.key, tx=tx)
+                table_counts["updated"] = db.update_many(table, self._row_updates(tc), key=tc.key, tx=tx)
+                table_counts["inserted"] = db.insert_many(table, tc.inserted, tx=tx)
+                for rows, keys in tc.upserts:
+                    result = db.upsert_many(table, rows, keys, tx=tx)
+                    table_counts["upserted"] += result["inserted"] + result["updated"]
+                counts[table] = table_counts
+        self._tables = {}
+        return counts
@@ -0,0 +1,199 @@
+"""Athlete identity resolution.
+
+Result tables (compresults, socadditionalvalues, pisterefcompresults,
+pistemirwald, pisteenvironment, trainingsperformance) reference athletes by
+first_name/last_name. This module maps a name to ``athletes.id`` with the
+app's matching rules (exact name, first/last token, full_name tokens) and
+stores it in the ``athlete_id`` column added by migration 003, so joins use
+the id instead of normalizing names in every loop.
+
+    python identity.py --backfill [--all]   # fill athlete_id (default: only NULLs)
+"""
+import argparse
+import threading
+import time
+
+import db
+
+IDENTITY_TABLES = (
+    "compresults",
+    "socadditionalvalues",
+    "pisterefcompresults",
+    "pistemirwald",
+    "pisteenvironment",
+    "trainingsperformance",
+)
+
+_CACHE_TTL_SECONDS = 300
+_BACKFILL_CHUNK = 500
+
+_LOCK = threading.Lock()
+_INDEX = None
+_INDEX_LOADED_AT = 0.0
+
+
+def _norm(val):
+    if val is None:
+        return ""
+    text = str(val).strip().lower()
+    return "" if text == "nan" else text
+
+
+def name_tokens(first_name, last_name):
+    """First token of the first name, last token of the last name (as app._name_tokens)."""
+    first = _norm(first_name)
+    last = _norm(last_name)
+    return (first.split()[0] if first else ""), (last.split()[-1] if last else "")
+
+
+def normalize_id(value):
+    text = _norm(value)
+    return text or None
+
+
+class AthleteIndex:
+    """Name -> athlete id lookups built once from the athletes table.
+
+    A key that points to more than one athlete is treated as ambiguous and
+    resolves to None instead of picking one of them.
+    """
+
+    def __init__(self, athletes):
+        self.by_id = {}
+        self._exact = {}
+        self._tokens = {}
+        for a in athletes or []:
+            athlete_id = normalize_id(a.get("id"))
+            if not athlete_id:
+                continue
+            self.by_id[athlete_id] = a
+            first, last = _norm(a.get("first_name")), _norm(a.get("last_name"))
+            if first or last:
+                self._add(self._exact, (first, last), athlete_id)
+                self._add(self._tokens, name_tokens(first, last), athlete_id)
+            parts = _norm(a.get("full_name")).split()
+            if len(parts) >= 2 and (parts[0], parts[-1]) not in self._tokens:
+                self._tokens[(parts[0], parts[-1])] = athlete_id
+
+    @staticmethod
+    def _add(mapping, key, athlete_id):
+        if key == ("", ""):
+            return
+        if key in mapping and mapping[key] != athlete_id:
+            mapping[key] = None
+        else:
+            mapping[key] = athlete_id
+
+    def resolve(self, first_name, last_name):
+        """Return the athlete id for a name, or None if unknown or ambiguous."""
+        key = (_norm(first_name), _norm(last_name))
+        if key in self._exact:
+            return self._exact[key]
+        return self._tokens.get(name_tokens(*key))
+
+    def id_for_row(self, row):
+        """Stored ``athlete_id`` of a row, falling back to its name."""
+        return normalize_id(row.get("athlete_id")) or self.resolve(row.get("first_name"), row.get("last_name"))
+
+    def get(self, athlete_id):
+        return self.by_id.get(normalize_id(athlete_id))
+
+
+def get_index(refresh=False):
+    """Process-wide AthleteIndex; reloaded after athlete writes or the TTL."""
+    global _INDEX, _INDEX_LOADED_AT
+    with _LOCK:
+        if refresh or _INDEX is None or time.time() - _INDEX_LOADED_AT > _CACHE_TTL_SECONDS:
+            _INDEX = AthleteIndex(db.table_select("athletes", "id, first_name, last_name, full_name"))
+            _INDEX_LOADED_AT = time.time()
+        return _INDEX
+
+
+def invalidate():
+    global _INDEX
+    with _LOCK:
+        _INDEX = None
+
+
+def has_athlete_id(table):
+    """True once migration 003 added athlete_id to ``table`` (via the db.has_column cache)."""
+    return db.has_column(table, "athlete_id")
+
+
+def _write_hook(op, table, data):
+    table_key = str(table).strip().lower()
+    if table_key == "athletes":
+        invalidate()
+        return data
+    if op == "delete" or table_key not in IDENTITY_TABLES or "athlete_id" in data:
+        return data
+    if "first_name" not in data or "last_name" not in data:
+        return data
+    try:
+        if not has_athlete_id(table_key):
+            return data
+        athlete_id = get_index().resolve(data.get("first_name"), data.get("last_name"))
+    except Exception:
+        return data
+    return {**data, "athlete_id": athlete_id} if athlete_id else data
+
+
+def install():
+    """Stamp athlete_id on inserts/renames and drop the cache on athlete edits."""
+    db.add_write_hook(_write_hook)
+
+
+def _apply_ids(table, pairs):
+    for start in range(0, len(pairs), _BACKFILL_CHUNK):
+        chunk = pairs[start:start + _BACKFILL_CHUNK]
+        values = ", ".join("(%s, %s)" for _ in chunk)
+        params = [p for pair in chunk for p in pair]
+        db.execute(
+            f"UPDATE t SET athlete_id = TRY_CONVERT(UNIQUEIDENTIFIER, v.athlete_id) "
+            f"FROM [{table}] t JOIN (VALUES {values}) AS v(id, athlete_id) ON t.id = v.id",
+            params,
+        )
+
+
+def backfill(tables=None, only_missing=True, progress=None):
+    """Fill athlete_id by name matching. Returns ``{table: {"matched", "unmatched"}}``."""
+    index = get_index(refresh=True)
+    tables = list(tables or IDENTITY_TABLES)
+    summary = {}
+    for step, table in enumerate(tables, start=1):
+        if progress:
+            progress(step - 1, len(tables), f"athlete_id: {table}")
+        if not has_athlete_id(table):
+            summary[table] = {"matched": 0, "unmatched": 0, "skipped": "keine athlete_id-Spalte"}
+            continue
+        where = " WHERE athlete_id IS NULL" if only_missing else ""
+        rows = db.query(f"SELECT id, first_name, last_name, athlete_id FROM [{table}]{where}")
+        pairs = []
+        unmatched = 0
+        for row in rows:
+            athlete_id = index.resolve(row.get("first_name"), row.get("last_name"))
+            if not athlete_id:
+                unmatched += 1
+            elif athlete_id != normalize_id(row.get("athlete_id")):
+                pairs.append((row["id"], athlete_id))
+        _apply_ids(table, pairs)
+        summary[table] = {"matched": len(pairs), "unmatched": unmatched}
+    if progress:
+        progress(len(tables), len(tables), "athlete_id: fertig")
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Athlete identity maintenance")
+    parser.add_argument("--backfill", action="store_true", help="fill athlete_id in the result tables")
+    parser.add_argument("--all", action="store_true", help="re-resolve rows that already have an athlete_id")
+    args = parser.parse_args()
+    if not args.backfill:
+        parser.print_help()
+        return
+    for table, counts in backfill(only_missing=not args.all).items():
+        print(f"{table}: {counts}")
+
+
+if __name__ == "__main__":
+    main()
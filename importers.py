@@ -0,0 +1,550 @@
+"""Bulk file imports.
+
+Turns uploaded sheets into rows ready for ``db.upsert_many`` /
+``db.insert_many`` with vectorized pandas steps instead of per-cell DB
+lookups. Lookups (athletes, disciplines, age categories, scoretables) are
+loaded once per import; rows that cannot be imported come back as rejects
+with the source line and a reason.
+"""
+import csv
+import io
+
+import numpy as np
+import pandas as pd
+
+import db
+import identity
+import refdata
+
+PISTE_BASE_COLUMNS = ["Testjahr", "first_name", "last_name"]
+PISTE_KEY_COLUMNS = ["athlete_id", "discipline_id", "TestYear"]
+
+# Körpermasse: werden gespeichert, geben aber keine Punkte
+POINTLESS_DISCIPLINE_IDS = {
+    "640260ec-a094-462d-a69e-d91bbe35d94c",  # BodyWeight
+    "5906836a-24aa-40e1-a71f-614a7ea4a825",  # BodySize
+    "7eb062f7-3329-4cde-8875-bd6fd362137b",  # UpperBodySize
+}
+
+NO_RESULT_VALUE = 9999
+
+REJECT_COLUMNS = ["row", "first_name", "last_name", "column", "value", "reason"]
+
+
+def _text_key(series):
+    return series.fillna("").astype(str).str.strip().str.lower()
+
+
+def _discipline_key(name):
+    return str(name or "").replace(" ", "").lower()
+
+
+def reject_frame(frame, reason, column=None, value_col=None):
+    """Reject rows; ``column`` names the offending sheet column (default: the melted one)."""
+    out = pd.DataFrame({
+        "row": frame["_row"].values,
+        "first_name": frame["first_name"].values,
+        "last_name": frame["last_name"].values,
+    })
+    if column is None and "column" in frame.columns:
+        out["column"] = frame["column"].values
+    else:
+        out["column"] = column
+    out["value"] = frame[value_col].values if value_col else None
+    out["reason"] = reason
+    return out[REJECT_COLUMNS]
+
+
+class ScoreIndex:
+    """In-memory scoretables lookup with the rules of ``app.get_points``.
+
+    Ranges are grouped by (discipline, category, sex) and sorted by
+    ``result_min``; a value gets the points of the first range containing
+    it, otherwise 0. Category and sex match case-insensitively like the
+    database collation does.
+    """
+
+    def __init__(self, scoretable_rows):
+        frame = pd.DataFrame(list(scoretable_rows or []))
+        self._ranges = {}
+        if frame.empty:
+            return
+        frame["rmin"] = pd.to_numeric(frame.get("result_min"), errors="coerce")
+        frame["rmax"] = pd.to_numeric(frame.get("result_max"), errors="coerce")
+        frame["pts"] = pd.to_numeric(frame.get("points"), errors="coerce").fillna(0.0)
+        frame = frame.dropna(subset=["rmin", "rmax"]).sort_values("rmin", kind="stable")
+        frame["d"] = frame["discipline_id"].map(identity.normalize_id)
+        frame["c"] = _text_key(frame["category"])
+        frame["s"] = _text_key(frame["sex"])
+        for key, grp in frame.groupby(["d", "c", "s"], sort=False):
+            self._ranges[key] = (grp["rmin"].to_numpy(), grp["rmax"].to_numpy(), grp["pts"].to_numpy())
+
+    def points(self, discipline_ids, categories, sexes, values):
+        """Vectorized lookup; all arguments are aligned Series. Returns a float Series."""
+        keys = pd.DataFrame({
+            "d": discipline_ids.map(identity.normalize_id).values,
+            "c": _text_key(categories).values,
+            "s": _text_key(sexes).values,
+            "v": pd.to_numeric(values, errors="coerce").values,
+        }, index=values.index)
+        result = pd.Series(0.0, index=values.index)
+        for key, grp in keys.groupby(["d", "c", "s"], sort=False):
+            ranges = self._ranges.get(key)
+            if ranges is None:
+                continue
+            rmin, rmax, pts = ranges
+            v = grp["v"].to_numpy()[:, None]
+            hit = (rmin <= v) & (v <= rmax)
+            found = hit.any(axis=1)
+            first = hit.argmax(axis=1)
+            result.loc[grp.index] = np.where(found, pts[first], 0.0)
+        return result
+
+
+def categories_for_ages(ages, agecategories, default="Unbekannt"):
+    """Vectorized ``get_category_from_testyear``: first age category containing the age.
+
+    ``agecategories`` is a ``refdata.AgeCategoryResolver`` or the raw table rows.
+    """
+    if not isinstance(agecategories, refdata.AgeCategoryResolver):
+        agecategories = refdata.AgeCategoryResolver(agecategories)
+    return agecategories.categories(ages, default)
+
+
+class PisteImport:
+    """Wide piste sheet (one column per discipline) -> pisteresults rows.
+
+    Build once per upload; ``prepare`` can then be called per chunk.
+    """
+
+    def __init__(self, athletes, disciplines, agecategories, scoretables):
+        ath = pd.DataFrame(list(athletes or []))
+        for col in ("id", "first_name", "last_name", "sex", "vintage"):
+            if col not in ath.columns:
+                ath[col] = None
+        ath = ath[ath["first_name"].notna() & ath["last_name"].notna()].copy()
+        ath["_first"] = _text_key(ath["first_name"])
+        ath["_last"] = _text_key(ath["last_name"])
+        # wie bisher im Dict: bei gleichem Namen gewinnt der letzte Eintrag
+        self.athletes = (
+            ath.drop_duplicates(["_first", "_last"], keep="last")
+            [["_first", "_last", "id", "sex", "vintage"]]
+            .rename(columns={"id": "athlete_id"})
+        )
+        self.discipline_ids = {_discipline_key(d.get("name")): d.get("id") for d in disciplines or [] if d.get("id")}
+        if not isinstance(agecategories, refdata.AgeCategoryResolver):
+            agecategories = refdata.AgeCategoryResolver(agecategories)
+        self.agecategories = agecategories
+        self.scores = ScoreIndex(scoretables)
+
+    def discipline_columns(self, columns):
+        return [c for c in columns if c not in PISTE_BASE_COLUMNS and _discipline_key(c) in self.discipline_ids]
+
+    def prepare(self, df, first_row=2):
+        """Return ``(rows, rejects)`` DataFrames for one sheet or chunk.
+
+        ``first_row`` is the file line of ``df``'s first record (header = 1),
+        used to point rejects back to the source.
+        """
+        rejects = []
+        df = df.reset_index(drop=True).copy()
+        df["_row"] = np.arange(first_row, first_row + len(df))
+        value_cols = self.discipline_columns(df.columns)
+        df = df[["_row"] + PISTE_BASE_COLUMNS + value_cols]
+
+        df["_first"] = _text_key(df["first_name"])
+        df["_last"] = _text_key(df["last_name"])
+        df["TestYear"] = pd.to_numeric(df["Testjahr"], errors="coerce")
+        bad_year = df["TestYear"].isna() | (df["TestYear"] % 1 != 0)
+        if bad_year.any():
+            rejects.append(reject_frame(df[bad_year], "Ungültiges Testjahr", "Testjahr", "Testjahr"))
+            df = df[~bad_year]
+
+        df = df.merge(self.athletes, on=["_first", "_last"], how="left")
+        unknown = df["athlete_id"].isna()
+        if unknown.any():
+            rejects.append(reject_frame(df[unknown], "Athlet nicht gefunden"))
+            df = df[~unknown]
+
+        df["_vintage"] = pd.to_numeric(df["vintage"], errors="coerce")
+        no_vintage = df["_vintage"].isna()
+        if no_vintage.any():
+            rejects.append(reject_frame(df[no_vintage], "Jahrgang des Athleten fehlt"))
+            df = df[~no_vintage]
+
+        df["category"] = categories_for_ages(df["TestYear"] - df["_vintage"], self.agecategories)
+
+        long = df.melt(
+            id_vars=["_row", "first_name", "last_name", "athlete_id", "sex", "category", "TestYear"],
+            value_vars=value_cols,
+            var_name="column",
+            value_name="value",
+        )
+        long = long[long["value"].notna() & (long["value"].astype(str).str.strip() != "")]
+        long["raw_result"] = pd.to_numeric(long["value"], errors="coerce")
+        not_numeric = long["raw_result"].isna()
+        if not_numeric.any():
+            rejects.append(reject_frame(long[not_numeric], "Kein numerischer Wert", value_col="value"))
+            long = long[~not_numeric]
+
+        long["discipline_id"] = long["column"].map(lambda c: self.discipline_ids[_discipline_key(c)])
+        long["points"] = self.scores.points(long["discipline_id"], long["category"], long["sex"], long["raw_result"])
+        zero = (long["raw_result"] == NO_RESULT_VALUE) | long["discipline_id"].map(
+            lambda d: identity.normalize_id(d) in POINTLESS_DISCIPLINE_IDS
+        )
+        long.loc[zero, "points"] = 0.0
+        long["TestYear"] = long["TestYear"].astype(int)
+
+        rows = long[["_row", "athlete_id", "discipline_id", "raw_result", "points", "category", "sex", "TestYear"]]
+        # mehrfach im File -> letzter Wert gilt (wie das frühere Update pro Zeile)
+        dup = pd.DataFrame({
+            "a": rows["athlete_id"].map(identity.normalize_id),
+            "d": rows["discipline_id"].map(identity.normalize_id),
+            "y": rows["TestYear"],
+        }).duplicated(keep="last")
+        rows = rows.loc[~dup]
+        rejects_df = pd.concat(rejects, ignore_index=True) if rejects else pd.DataFrame(columns=REJECT_COLUMNS)
+        return rows.reset_index(drop=True), rejects_df
+
+
+def records(rows, columns):
+    """DataFrame -> list of dicts with NaN as None and NumPy scalars unwrapped."""
+    frame = rows[columns].astype(object).where(rows[columns].notna(), None)
+    return frame.to_dict("records")
+
+
+# --- Upload-Streaming ---
+
+UPLOAD_ENCODINGS = ["utf-8-sig", "utf-8", "cp1252", "latin-1"]
+SNIFF_BYTES = 64 * 1024
+CHUNK_ROWS = 5000
+
+
+def _rewind(fileobj):
+    try:
+        fileobj.seek(0)
+    except Exception:
+        pass
+
+
+def _upload_size(fileobj):
+    size = getattr(fileobj, "size", None)
+    if size:
+        return int(size)
+    try:
+        pos = fileobj.tell()
+        fileobj.seek(0, io.SEEK_END)
+        size = fileobj.tell()
+        fileobj.seek(pos)
+        return size
+    except Exception:
+        return None
+
+
+def sniff_upload(fileobj, sample_bytes=SNIFF_BYTES):
+    """Detect encoding and delimiter from the first ``sample_bytes`` of a CSV upload.
+
+    Reads the prefix once and rewinds; returns ``{"encoding", "sep"}``.
+    """
+    _rewind(fileobj)
+    sample = fileobj.read(sample_bytes) or b""
+    _rewind(fileobj)
+    if isinstance(sample, str):
+        text, encoding = sample, "utf-8"
+    else:
+        text, encoding = None, UPLOAD_ENCODINGS[-1]
+        for enc in UPLOAD_ENCODINGS:
+            # am Ende des Prefix kann ein Multibyte-Zeichen abgeschnitten sein
+            for cut in range(4):
+                try:
+                    text = sample[:len(sample) - cut].decode(enc)
+                    break
+                except UnicodeDecodeError:
+                    continue
+            if text is not None:
+                encoding = enc
+                break
+        if text is None:
+            text = sample.decode(encoding, errors="replace")
+    lines = text.splitlines()
+    head = "\n".join(lines[:-1] if len(lines) > 1 else lines)
+    try:
+        sep = csv.Sniffer().sniff(head, delimiters=",;\t|").delimiter
+    except csv.Error:
+        sep = ","
+    return {"encoding": encoding, "sep": sep}
+
+
+def _iter_csv_chunks(fileobj, chunksize, fmt, **read_kwargs):
+    reader = pd.read_csv(fileobj, encoding=fmt["encoding"], sep=fmt["sep"], chunksize=chunksize, **read_kwargs)
+    try:
+        for chunk in reader:
+            yield chunk
+    except UnicodeDecodeError as exc:
+        raise ValueError(
+            f"Datei ist nicht durchgehend {fmt['encoding']}-kodiert (Position {exc.start}); "
+            "bitte als UTF-8 speichern."
+        ) from exc
+    finally:
+        reader.close()
+
+
+def _iter_excel_chunks(fileobj, chunksize):
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(fileobj, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = [str(c).strip() if c is not None else f"Unnamed: {i}" for i, c in enumerate(header)]
+        batch = []
+        for values in rows:
+            if values is None or all(v is None for v in values):
+                continue
+            batch.append(values)
+            if len(batch) >= chunksize:
+                yield pd.DataFrame(batch, columns=columns)
+                batch = []
+        if batch:
+            yield pd.DataFrame(batch, columns=columns)
+    finally:
+        workbook.close()
+
+
+def stream_upload(fileobj, consume, required_columns=(), chunksize=CHUNK_ROWS, progress=None, **read_kwargs):
+    """Read a CSV/XLSX upload chunk by chunk and hand each chunk to ``consume(chunk, first_row)``.
+
+    Only one chunk is held in memory. ``first_row`` is the file line of the
+    chunk's first record (header = 1). Missing ``required_columns`` raise
+    ValueError before anything is consumed. ``progress(done, total, text)``
+    is called per chunk with bytes read (CSV) or rows (XLSX).
+    Returns ``{"rows", "chunks", "encoding", "sep"}``.
+    """
+    name = str(getattr(fileobj, "name", "") or "").lower()
+    is_excel = name.endswith((".xlsx", ".xlsm"))
+    _rewind(fileobj)
+    if is_excel:
+        fmt = {"encoding": None, "sep": None}
+        chunks = _iter_excel_chunks(fileobj, chunksize)
+        total = None
+    else:
+        fmt = sniff_upload(fileobj)
+        chunks = _iter_csv_chunks(fileobj, chunksize, fmt, **read_kwargs)
+        total = _upload_size(fileobj)
+
+    stats = {"rows": 0, "chunks": 0, **fmt}
+    for chunk in chunks:
+        if stats["chunks"] == 0:
+            missing = [c for c in required_columns if c not in chunk.columns]
+            if missing:
+                raise ValueError(f"Fehlende Spalten: {', '.join(missing)}")
+        chunk.index = range(stats["rows"], stats["rows"] + len(chunk))
+        consume(chunk, stats["rows"] + 2)
+        stats["rows"] += len(chunk)
+        stats["chunks"] += 1
+        if progress:
+            if total:
+                try:
+                    done = min(fileobj.tell(), total)
+                except Exception:
+                    done = total
+                progress(done, total, f"{stats['rows']} Zeilen gelesen")
+            else:
+                progress(stats["rows"], stats["rows"], f"{stats['rows']} Zeilen gelesen")
+    return stats
+
+
+# --- Wettkampfresultate (compresults) ---
+
+COMPRESULT_KEY_COLUMNS = ["Competition", "first_name", "last_name", "Discipline", "PreFin"]
+
+
+def normalize_divelive_disciplines(values):
+    """Vectorized DiveLive ``event_height`` -> Discipline (1m, 3m, platform, high diving ...)."""
+    raw = values.fillna("").astype(str).str.strip()
+    s = raw.str.lower()
+    high = s.str.contains("high") | s.str.contains("20m") | s.str.contains("27m")
+    return pd.Series(
+        np.select(
+            [
+                s == "",
+                high & s.str.contains("27"),
+                high & s.str.contains("20"),
+                high,
+                s.str.contains("platform") | s.str.contains("tower") | s.str.contains("turm"),
+                s.str.startswith("1"),
+                s.str.startswith("3"),
+            ],
+            ["", "high diving 27m", "high diving 20m", "high diving", "platform", "1m", "3m"],
+            default=raw,
+        ),
+        index=values.index,
+    )
+
+
+def parse_number_series(values):
+    """Numbers from text cells: '%' dropped, decimal comma accepted; invalid -> NaN."""
+    if pd.api.types.is_numeric_dtype(values):
+        return pd.to_numeric(values, errors="coerce")
+    text = values.astype(str).str.replace("%", "", regex=False).str.replace(",", ".", regex=False).str.strip()
+    return pd.to_numeric(text, errors="coerce")
+
+
+def attach_athletes(df, athletes, columns=("sex",)):
+    """Left-join athletes on the normalized (first_name, last_name).
+
+    Adds ``athlete_<col>`` for each of ``columns`` and a boolean ``_known``.
+    """
+    ath = pd.DataFrame(list(athletes or []))
+    for col in ("first_name", "last_name", *columns):
+        if col not in ath.columns:
+            ath[col] = None
+    ath = pd.DataFrame({
+        "_first": _text_key(ath["first_name"]),
+        "_last": _text_key(ath["last_name"]),
+        **{f"athlete_{col}": ath[col] for col in columns},
+        "_known": True,
+    }).drop_duplicates(["_first", "_last"], keep="last")
+    df = df.copy()
+    df["_first"] = _text_key(df["first_name"])
+    df["_last"] = _text_key(df["last_name"])
+    merged = df.merge(ath, on=["_first", "_last"], how="left")
+    merged["_known"] = merged["_known"].eq(True)
+    merged.index = df.index
+    return merged
+
+
+def compresult_keys(frame):
+    """Normalized duplicate keys (see COMPRESULT_KEY_COLUMNS) as a Series of tuples."""
+    parts = [_text_key(frame[c]) if c in frame.columns else pd.Series("", index=frame.index) for c in COMPRESULT_KEY_COLUMNS]
+    return pd.Series(list(zip(*parts)), index=frame.index)
+
+
+def existing_compresult_keys(competitions):
+    """Keys already stored for ``competitions``, fetched with one query."""
+    competitions = sorted({str(c).strip() for c in competitions if str(c).strip()})
+    if not competitions:
+        return set()
+    placeholders = ", ".join("%s" for _ in competitions)
+    cols = ", ".join(f"[{c}]" for c in COMPRESULT_KEY_COLUMNS)
+    existing = db.query_df(f"SELECT {cols} FROM [compresults] WHERE [Competition] IN ({placeholders})", competitions)
+    if existing.empty:
+        return set()
+    return set(compresult_keys(existing))
+
+
+def split_duplicates(rows, existing_keys):
+    """``(new_rows, duplicate_rows)``: duplicates are already stored or repeat within the file."""
+    keys = compresult_keys(rows)
+    dup = keys.map(lambda k: k in existing_keys) | keys.duplicated(keep="first")
+    return rows[~dup], rows[dup]
+
+
+# --- Athleten ---
+
+ATHLETE_REQUIRED_COLUMNS = ["first_name", "last_name", "birthdate", "sex", "club", "nationalteam"]
+ATHLETE_KEY_COLUMNS = ["first_name", "last_name", "birthdate"]
+
+
+def parse_dates(values):
+    """Parse mixed date text per value (like ``pd.to_datetime`` on each cell); invalid -> NaT."""
+    try:
+        return pd.to_datetime(values, errors="coerce", format="mixed")
+    except (TypeError, ValueError):
+        return values.map(lambda v: pd.to_datetime(v, errors="coerce"))
+
+
+def birth_quarters(dates):
+    """Vectorized ``get_birth_quarter``: q1..q4 from the month, None without a date."""
+    quarter = (dates.dt.month - 1) // 3 + 1
+    return ("q" + quarter.astype("Int64").astype(str)).where(dates.notna(), None)
+
+
+def prepare_athletes(df, agecategories, reference_year, first_row=2):
+    """Athletes CSV -> ``(rows, rejects)`` with birthdate, vintage, category, full_name and bioage.
+
+    Rows repeating an earlier (first_name, last_name, birthdate) of the same
+    file are rejected as duplicates.
+    """
+    df = df[ATHLETE_REQUIRED_COLUMNS].copy()
+    df["_row"] = range(first_row, first_row + len(df))
+    df["first_name"] = df["first_name"].astype(str).str.strip()
+    df["last_name"] = df["last_name"].astype(str).str.strip()
+    dates = parse_dates(df["birthdate"])
+
+    bad_date = dates.isna()
+    rejects = [reject_frame(df[bad_date], "Ungültiges Geburtsdatum", "birthdate", "birthdate")] if bad_date.any() else []
+    df, dates = df[~bad_date].copy(), dates[~bad_date]
+
+    df["birthdate"] = dates.dt.strftime("%Y-%m-%d")
+    vintage = dates.dt.year.astype(int)
+    df["vintage"] = vintage
+    df["full_name"] = df["first_name"] + " " + df["last_name"]
+    df["category"] = categories_for_ages(reference_year - vintage, agecategories)
+    df["bioage"] = birth_quarters(dates)
+
+    keys = pd.DataFrame({
+        "f": _text_key(df["first_name"]),
+        "l": _text_key(df["last_name"]),
+        "b": df["birthdate"],
+    })
+    repeated = keys.duplicated(keep="first")
+    if repeated.any():
+        rejects.append(reject_frame(df[repeated], "Doppelt in der Datei", "birthdate", "birthdate"))
+        df = df[~repeated]
+    reject_frame_all = pd.concat(rejects, ignore_index=True) if rejects else pd.DataFrame(columns=REJECT_COLUMNS)
+    return df.reset_index(drop=True), reject_frame_all
+
+
+# --- Jahreswerte pro Athlet (Tool Environment, Mirwald, Trainingsperformance) ---
+
+YEARLY_KEY_COLUMNS = ["first_name", "last_name", "PisteYear"]
+
+
+def _birthdate_key(values):
+    return values.fillna("").astype(str).str.strip().str.split(" ").str[0].replace("nan", "")
+
+
+def prepare_yearly_values(df, athletes, value_columns, first_row=2):
+    """CSV with one value set per athlete and PisteYear -> ``(rows, rejects)``.
+
+    ``value_columns`` maps column -> "int", "float" or "text". Rows must name a
+    known athlete; if the file has a ``birthdate`` column, a filled-in date
+    must match the athlete's. Rows are keyed by YEARLY_KEY_COLUMNS for
+    ``db.upsert_many``; a later row of the same key wins.
+    """
+    df = df.copy()
+    df["_row"] = range(first_row, first_row + len(df))
+    merged = attach_athletes(df, athletes, columns=("birthdate",))
+    df["first_name"] = df["first_name"].astype(str).str.strip()
+    df["last_name"] = df["last_name"].astype(str).str.strip()
+
+    rejects = []
+    known = merged["_known"]
+    if "birthdate" in df.columns and "athlete_birthdate" in merged.columns:
+        csv_date = _birthdate_key(df["birthdate"])
+        known = known & (csv_date.eq("") | csv_date.eq(_birthdate_key(merged["athlete_birthdate"])))
+    if (~known).any():
+        value_col = "birthdate" if "birthdate" in df.columns else None
+        rejects.append(reject_frame(df[~known], "Athlet nicht gefunden", value_col, value_col))
+    df = df[known]
+
+    columns = {"PisteYear": "int", **value_columns}
+    for col, kind in columns.items():
+        if kind == "text":
+            df[col] = df[col].where(df[col].notna(), None).map(lambda v: None if v is None else str(v).strip())
+            continue
+        numbers = parse_number_series(df[col])
+        bad = numbers.isna() & (df[col].notna() | (col == "PisteYear"))
+        if kind == "int":
+            bad |= numbers.notna() & (numbers % 1 != 0)
+        if bad.any():
+            rejects.append(reject_frame(df[bad], "Ungültiger Wert", col, col))
+        df = df[~bad].copy()
+        numbers = numbers[~bad]
+        df[col] = numbers.astype("Int64") if kind == "int" else numbers
+
+    reject_all = pd.concat(rejects, ignore_index=True) if rejects else pd.DataFrame(columns=REJECT_COLUMNS)
+    return df[YEARLY_KEY_COLUMNS + [c for c in value_columns]].reset_index(drop=True), reject_all
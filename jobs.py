@@ -0,0 +1,412 @@
+"""Background job runner for long recalculations.
+
+Jobs are persisted in a small local SQLite file so that status, progress,
+checkpoints and errors survive Streamlit reruns and browser disconnects.
+One worker thread per process picks up queued jobs and runs the handler
+registered under the job name. Handlers receive a ``JobContext`` and report
+progress through it; ``JobContext.steps()`` checkpoints every finished step
+(e.g. one PisteYear), so a job that was interrupted by a restart resumes
+with the first unfinished step instead of starting over.
+
+Several processes (replicas) may share the job file. A claimed job records
+its owner (host, PID) and the owner's worker refreshes ``heartbeat_at``
+while the job runs; a running job is only requeued once its heartbeat is
+older than ``_HEARTBEAT_TIMEOUT_SECONDS``, i.e. its process is gone.
+"""
+import datetime
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+STATUS_CANCELLED = "cancelled"
+
+_POLL_SECONDS = 2.0
+_MAX_LOG_LINES = 200
+_HEARTBEAT_SECONDS = 15.0
+_HEARTBEAT_TIMEOUT_SECONDS = 120.0
+# PID allein reicht nicht: nach einem Container-Neustart bekommt der Prozess oft dieselbe
+_OWNER = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+_HANDLERS = {}
+_LABELS = {}
+_WORKER = None
+_WORKER_LOCK = threading.Lock()
+_WAKEUP = threading.Event()
+
+
+class JobCancelled(Exception):
+    """Raised inside a handler when the job was cancelled from the Jobs page."""
+
+
+def _default_db_path():
+    env_path = os.environ.get("JOBS_DB_PATH")
+    if env_path:
+        return env_path
+    # Azure App Service: /home is persistent across restarts, wwwroot is replaced on deploy.
+    if os.path.isdir("/home/site"):
+        return "/home/site/diving_eval_jobs.sqlite3"
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), ".jobs.sqlite3")
+
+
+_DB_PATH = _default_db_path()
+
+
+def _connect():
+    conn = sqlite3.connect(_DB_PATH, timeout=30)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def _ensure_schema():
+    conn = _connect()
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id           TEXT PRIMARY KEY,
+                name         TEXT NOT NULL,
+                label        TEXT,
+                params       TEXT,
+                status       TEXT NOT NULL,
+                done         INTEGER DEFAULT 0,
+                total        INTEGER DEFAULT 0,
+                message      TEXT,
+                checkpoints  TEXT,
+                log          TEXT,
+                error        TEXT,
+                submitted_by TEXT,
+                attempts     INTEGER DEFAULT 0,
+                cancel       INTEGER DEFAULT 0,
+                created_at   REAL,
+                started_at   REAL,
+                finished_at  REAL,
+                updated_at   REAL,
+                owner        TEXT,
+                heartbeat_at REAL
+            )
+            """
+        )
+        # Job-Dateien von vor owner/heartbeat nachrüsten
+        columns = {r["name"] for r in conn.execute("PRAGMA table_info(jobs)")}
+        for column, sql_type in (("owner", "TEXT"), ("heartbeat_at", "REAL")):
+            if column not in columns:
+                conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {sql_type}")
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def _update(job_id, **fields):
+    if not fields:
+        return
+    fields["updated_at"] = time.time()
+    cols = ", ".join(f"{k} = ?" for k in fields)
+    conn = _connect()
+    try:
+        conn.execute(f"UPDATE jobs SET {cols} WHERE id = ?", list(fields.values()) + [job_id])
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def _row_to_job(row):
+    job = dict(row)
+    for key, default in (("params", {}), ("checkpoints", []), ("log", [])):
+        try:
+            job[key] = json.loads(job.get(key) or "null") or default
+        except Exception:
+            job[key] = default
+    return job
+
+
+def register(name, handler, label=None):
+    """Register ``handler(ctx, **params)`` under ``name``.
+
+    Safe to call on every Streamlit rerun; the latest handler wins.
+    """
+    _HANDLERS[name] = handler
+    _LABELS[name] = label or name
+
+
+def registered_jobs():
+    return dict(_LABELS)
+
+
+def submit(name, params=None, label=None, submitted_by=None):
+    """Queue a job and return its id. The worker is started if needed."""
+    if name not in _HANDLERS:
+        raise KeyError(f"Unbekannter Job: {name}")
+    _ensure_schema()
+    job_id = uuid.uuid4().hex
+    now = time.time()
+    conn = _connect()
+    try:
+        conn.execute(
+            "INSERT INTO jobs (id, name, label, params, status, checkpoints, log, submitted_by, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                job_id,
+                name,
+                label or _LABELS.get(name, name),
+                json.dumps(params or {}, default=str),
+                STATUS_QUEUED,
+                "[]",
+                "[]",
+                submitted_by,
+                now,
+                now,
+            ),
+        )
+        conn.commit()
+    finally:
+        conn.close()
+    start_worker()
+    _WAKEUP.set()
+    return job_id
+
+
+def get_job(job_id):
+    _ensure_schema()
+    conn = _connect()
+    try:
+        row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    finally:
+        conn.close()
+    return _row_to_job(row) if row else None
+
+
+def list_jobs(limit=50):
+    _ensure_schema()
+    conn = _connect()
+    try:
+        rows = conn.execute("SELECT * FROM jobs ORDER BY created_at DESC LIMIT ?", (int(limit),)).fetchall()
+    finally:
+        conn.close()
+    return [_row_to_job(r) for r in rows]
+
+
+def cancel(job_id):
+    """Cancel a queued job immediately; a running job stops at its next progress report."""
+    job = get_job(job_id)
+    if not job:
+        return False
+    if job["status"] == STATUS_QUEUED:
+        _update(job_id, status=STATUS_CANCELLED, cancel=1, finished_at=time.time())
+        return True
+    if job["status"] == STATUS_RUNNING:
+        _update(job_id, cancel=1)
+        return True
+    return False
+
+
+def retry(job_id):
+    """Re-queue a failed or cancelled job. Finished checkpoints are kept and skipped."""
+    job = get_job(job_id)
+    if not job or job["status"] not in (STATUS_FAILED, STATUS_CANCELLED):
+        return False
+    _update(job_id, status=STATUS_QUEUED, cancel=0, error=None, finished_at=None)
+    start_worker()
+    _WAKEUP.set()
+    return True
+
+
+def delete_finished():
+    _ensure_schema()
+    conn = _connect()
+    try:
+        cur = conn.execute(
+            "DELETE FROM jobs WHERE status IN (?, ?, ?)",
+            (STATUS_DONE, STATUS_FAILED, STATUS_CANCELLED),
+        )
+        conn.commit()
+        return cur.rowcount
+    finally:
+        conn.close()
+
+
+class JobContext:
+    """Handed to job handlers for progress reporting and checkpointing."""
+
+    def __init__(self, job):
+        self.job_id = job["id"]
+        self.params = job.get("params") or {}
+        self._checkpoints = list(job.get("checkpoints") or [])
+        self._log = list(job.get("log") or [])
+        self._last_flush = 0.0
+
+    def _check_cancel(self):
+        conn = _connect()
+        try:
+            row = conn.execute("SELECT cancel FROM jobs WHERE id = ?", (self.job_id,)).fetchone()
+        finally:
+            conn.close()
+        if row and row["cancel"]:
+            raise JobCancelled()
+
+    def progress(self, done, total, message=None):
+        """Report progress. Writes are throttled to about one per second."""
+        now = time.time()
+        if now - self._last_flush < 1.0 and done < total:
+            return
+        self._last_flush = now
+        fields = {"done": int(done or 0), "total": int(total or 0)}
+        if message is not None:
+            fields["message"] = str(message)
+        _update(self.job_id, **fields)
+        self._check_cancel()
+
+    def log(self, message):
+        stamp = datetime.datetime.now().strftime("%H:%M:%S")
+        self._log.append(f"{stamp} {message}")
+        self._log = self._log[-_MAX_LOG_LINES:]
+        _update(self.job_id, log=json.dumps(self._log), message=str(message))
+
+    def is_done(self, step):
+        return str(step) in self._checkpoints
+
+    def checkpoint(self, step):
+        step = str(step)
+        if step not in self._checkpoints:
+            self._checkpoints.append(step)
+        _update(self.job_id, checkpoints=json.dumps(self._checkpoints))
+
+    def steps(self, items):
+        """Iterate ``items`` and skip/checkpoint each one (resumable loop)."""
+        items = list(items)
+        for item in items:
+            if self.is_done(item):
+                self.log(f"{item}: bereits erledigt, übersprungen")
+                continue
+            self._check_cancel()
+            yield item
+            self.checkpoint(item)
+
+
+def _claim_next():
+    conn = _connect()
+    try:
+        row = conn.execute(
+            "SELECT * FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1",
+            (STATUS_QUEUED,),
+        ).fetchone()
+        if not row:
+            return None
+        now = time.time()
+        cur = conn.execute(
+            "UPDATE jobs SET status = ?, started_at = ?, updated_at = ?, owner = ?, heartbeat_at = ?, "
+            "attempts = attempts + 1 WHERE id = ? AND status = ?",
+            (STATUS_RUNNING, now, now, _OWNER, now, row["id"], STATUS_QUEUED),
+        )
+        conn.commit()
+        if cur.rowcount != 1:
+            return None
+    finally:
+        conn.close()
+    return get_job(row["id"])
+
+
+def _heartbeat(job_id, stop):
+    """Refresh ``heartbeat_at`` of a job this process owns until ``stop`` is set."""
+    while not stop.wait(_HEARTBEAT_SECONDS):
+        conn = _connect()
+        try:
+            conn.execute(
+                "UPDATE jobs SET heartbeat_at = ? WHERE id = ? AND owner = ? AND status = ?",
+                (time.time(), job_id, _OWNER, STATUS_RUNNING),
+            )
+            conn.commit()
+        except sqlite3.Error:
+            pass
+        finally:
+            conn.close()
+
+
+def requeue_stale():
+    """Requeue running jobs whose owner stopped sending heartbeats; returns how many."""
+    cutoff = time.time() - _HEARTBEAT_TIMEOUT_SECONDS
+    conn = _connect()
+    try:
+        # ohne heartbeat_at: Job aus einer älteren Version, dann zählt updated_at
+        cur = conn.execute(
+            "UPDATE jobs SET status = ?, message = ?, owner = NULL, heartbeat_at = NULL "
+            "WHERE status = ? AND COALESCE(heartbeat_at, updated_at, 0) < ?",
+            (STATUS_QUEUED, "Nach Neustart fortgesetzt", STATUS_RUNNING, cutoff),
+        )
+        conn.commit()
+        return cur.rowcount
+    finally:
+        conn.close()
+
+
+def _run_job(job):
+    handler = _HANDLERS.get(job["name"])
+    ctx = JobContext(job)
+    if handler is None:
+        # Handlers are registered by app.py; requeue until the app has loaded them.
+        _update(job["id"], status=STATUS_QUEUED, owner=None, heartbeat_at=None, message="Warte auf Registrierung des Jobs ...")
+        return False
+    stop = threading.Event()
+    threading.Thread(target=_heartbeat, args=(job["id"], stop), name="diving-eval-jobs-heartbeat", daemon=True).start()
+    try:
+        ctx.log("Gestartet")
+        result = handler(ctx, **ctx.params)
+        message = str(result) if result not in (None, "") else "Fertig"
+        ctx.log(message)
+        _update(job["id"], status=STATUS_DONE, finished_at=time.time(), message=message)
+    except JobCancelled:
+        ctx.log("Abgebrochen")
+        _update(job["id"], status=STATUS_CANCELLED, finished_at=time.time())
+    except Exception as e:
+        ctx.log(f"Fehler: {e}")
+        _update(
+            job["id"],
+            status=STATUS_FAILED,
+            finished_at=time.time(),
+            error="".join(traceback.format_exception(type(e), e, e.__traceback__))[-4000:],
+        )
+    finally:
+        stop.set()
+    return True
+
+
+def _worker_loop():
+    last_sweep = 0.0
+    while True:
+        try:
+            # Jobs toter Prozesse (auch anderer Replikate) übernehmen
+            if time.time() - last_sweep >= _HEARTBEAT_SECONDS:
+                last_sweep = time.time()
+                requeue_stale()
+            job = _claim_next()
+        except Exception:
+            job = None
+        if job is None:
+            _WAKEUP.wait(_POLL_SECONDS)
+            _WAKEUP.clear()
+            continue
+        if not _run_job(job):
+            time.sleep(_POLL_SECONDS)
+
+
+def start_worker():
+    """Start the worker thread once per process and resume jobs of dead workers."""
+    global _WORKER
+    with _WORKER_LOCK:
+        if _WORKER is not None and _WORKER.is_alive():
+            return
+        _ensure_schema()
+        # Running jobs with an expired heartbeat belong to a dead process: requeue,
+        # checkpoints are kept. Jobs of live workers (other replicas) stay untouched.
+        requeue_stale()
+        _WORKER = threading.Thread(target=_worker_loop, name="diving-eval-jobs", daemon=True)
+        _WORKER.start()
@@ -0,0 +1,523 @@
+"""Process-wide cache for the reference tables.
+
+Reference data (age categories, ...) changes rarely but was re-queried in
+every helper call and row loop. Each entry here is loaded once, compiled
+into a lookup structure and kept until a write to one of its source tables
+(seen through ``db.add_write_hook``) or the TTL drops it.
+"""
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+import db
+
+_CACHE_TTL_SECONDS = 300
+
+_LOCK = threading.Lock()
+_CACHE = {}
+_VERSIONS = {}
+
+# Cache-Eintrag -> Quelltabellen; ein Schreibzugriff auf eine davon verwirft den Eintrag
+_SOURCES = {
+    "age_categories": ("agecategories", "agecategorieshd"),
+    "trainingsince": ("pistereftrainingsince", "pistereftrainingsincepoints"),
+    "trainingtime": ("pistereftrainingtime", "pistereftrainingtimepoints"),
+    "competitions": ("competitions",),
+    "refcomppoints": ("pisterefcomppoints", "pisterefcomppointsage"),
+}
+
+
+def _cached(name, loader, refresh=False, ttl=_CACHE_TTL_SECONDS):
+    with _LOCK:
+        entry = _CACHE.get(name)
+        expired = entry is not None and ttl is not None and time.time() - entry[1] > ttl
+        if refresh or entry is None or expired:
+            entry = (loader(), time.time())
+            _CACHE[name] = entry
+        return entry[0]
+
+
+def invalidate(*names):
+    """Drop the named cache entries (all entries without arguments)."""
+    with _LOCK:
+        for name in names or list(_CACHE):
+            _CACHE.pop(name, None)
+
+
+def invalidate_table(table):
+    """Drop every cache entry built from ``table``."""
+    table = str(table).strip().lower()
+    invalidate(*[name for name, tables in _SOURCES.items() if table in tables])
+
+
+def table_version(*tables):
+    """Write counter of ``tables`` in this process; it changes with every write to one of them.
+
+    Pages that keep a loaded frame in the session compare it to reload
+    after a change.
+    """
+    with _LOCK:
+        return tuple(_VERSIONS.get(str(t).strip().lower(), 0) for t in tables)
+
+
+def _write_hook(op, table, data):
+    with _LOCK:
+        key = str(table).strip().lower()
+        _VERSIONS[key] = _VERSIONS.get(key, 0) + 1
+    invalidate_table(table)
+    if op != "delete" and str(table).strip().lower() == "compresults":
+        return _stamp_competition(data)
+    return data
+
+
+def install():
+    """Drop cached reference data whenever one of its tables is written.
+
+    Also stamps competition_id/PisteYear on compresults rows that set a
+    Competition (see ``competition_index``).
+    """
+    db.add_write_hook(_write_hook)
+
+
+def _select_optional(table, select="*"):
+    try:
+        return db.table_select(table, select)
+    except Exception:
+        return []
+
+
+# --- Alterskategorien ---
+
+MAX_AGE = 120
+
+# Synchro-Disziplinen zählen in Jugend C/D nicht für Referenzpunkte
+SYNCHRO_EXCLUDED_DISCIPLINES = {"1m synchro", "3m synchro"}
+SYNCHRO_EXCLUDED_CATEGORIES = {"Jugend C", "Jugend D"}
+
+
+def _age_table(rows, max_col):
+    table = np.full(MAX_AGE + 1, None, dtype=object)
+    # rückwärts füllen, damit wie in den alten Schleifen die erste passende Zeile gewinnt
+    for cat in reversed(list(rows or [])):
+        hi = cat.get(max_col) if cat.get(max_col) is not None else cat.get("max_age")
+        try:
+            lo, hi = int(cat.get("min_age")), int(hi)
+        except (TypeError, ValueError):
+            continue
+        lo, hi = max(lo, 0), min(hi, MAX_AGE)
+        if lo <= hi:
+            table[lo:hi + 1] = cat.get("category")
+    return table
+
+
+def _scalar_age(age):
+    try:
+        age = int(float(age))
+    except (TypeError, ValueError, OverflowError):
+        return None
+    return age if 0 <= age <= MAX_AGE else None
+
+
+def _lookup(table, ages, default):
+    ages = pd.to_numeric(pd.Series(ages), errors="coerce")
+    values = ages.to_numpy(dtype=float, na_value=np.nan)
+    valid = ~np.isnan(values) & (values >= 0) & (values <= MAX_AGE)
+    result = np.full(len(values), default, dtype=object)
+    found = table[values[valid].astype(int)]
+    result[valid] = np.where(pd.isna(found), default, found)
+    return pd.Series(result, index=ages.index, dtype=object)
+
+
+class AgeCategoryResolver:
+    """Age -> category from agecategories, and agecategorieshd for high diving.
+
+    Both tables are compiled into arrays indexed by age, so lookups are an
+    index access; the ``*_categories`` methods take and return a Series.
+    """
+
+    def __init__(self, agecategories, agecategorieshd=()):
+        self._table = _age_table(agecategories, "max_age")
+        # agecategorieshd heisst die Obergrenze im Quellschema "mag_age"
+        self._hd_table = _age_table(agecategorieshd, "mag_age")
+        self.names = list(dict.fromkeys(c.get("category") for c in agecategories or [] if c.get("category")))
+
+    def category(self, age, default=None):
+        age = _scalar_age(age)
+        if age is None or self._table[age] is None:
+            return default
+        return self._table[age]
+
+    def category_for_vintage(self, vintage, year, default=None):
+        try:
+            return self.category(int(year) - int(vintage), default)
+        except (TypeError, ValueError):
+            return default
+
+    def categories(self, ages, default=None):
+        return _lookup(self._table, ages, default)
+
+    def hd_category(self, age, default=None):
+        age = _scalar_age(age)
+        if age is None or self._hd_table[age] is None:
+            return default
+        return self._hd_table[age]
+
+    def hd_categories(self, ages, default=None):
+        return _lookup(self._hd_table, ages, default)
+
+    def is_excluded_discipline(self, discipline, age):
+        return (
+            str(discipline).strip().lower() in SYNCHRO_EXCLUDED_DISCIPLINES
+            and self.category(age) in SYNCHRO_EXCLUDED_CATEGORIES
+        )
+
+    def excluded_disciplines(self, disciplines, ages):
+        disciplines = pd.Series(disciplines)
+        in_synchro = disciplines.fillna("").astype(str).str.strip().str.lower().isin(SYNCHRO_EXCLUDED_DISCIPLINES)
+        young = self.categories(ages).isin(SYNCHRO_EXCLUDED_CATEGORIES).to_numpy()
+        return in_synchro & young
+
+
+def age_categories(refresh=False):
+    """Shared AgeCategoryResolver, loaded once per TTL."""
+    return _cached(
+        "age_categories",
+        lambda: AgeCategoryResolver(db.table_select("agecategories"), _select_optional("agecategorieshd")),
+        refresh,
+    )
+
+
+# --- Trainings-Referenzpunkte ---
+
+
+class TrainingMatrix:
+    """pistereftrainingsince / pistereftrainingtime as a dense [age, column] matrix.
+
+    The numbered columns (training years or weekly hours) become the second
+    axis; missing ages, columns and NULL cells are NaN. For an age listed
+    twice the first row wins, like the old ``table_select(..., age=age)[0]``.
+    """
+
+    def __init__(self, rows):
+        cells = {}
+        seen = set()
+        for row in rows or []:
+            try:
+                age = int(row.get("age"))
+            except (TypeError, ValueError):
+                continue
+            if age < 0 or age in seen:
+                continue
+            seen.add(age)
+            for col, value in row.items():
+                col = str(col).strip()
+                if col.isdigit():
+                    cells[(age, int(col))] = value
+        n_ages = max((a for a, _ in cells), default=-1) + 1
+        n_cols = max((c for _, c in cells), default=-1) + 1
+        self.matrix = np.full((n_ages, n_cols), np.nan)
+        for (age, col), value in cells.items():
+            try:
+                self.matrix[age, col] = float(value)
+            except (TypeError, ValueError):
+                pass
+
+    @classmethod
+    def from_long(cls, rows, column):
+        """Build from long rows ``(age, <column>, points)`` (migration 006)."""
+        wide = {}
+        for row in rows or []:
+            try:
+                age, col = int(row.get("age")), int(row.get(column))
+            except (TypeError, ValueError):
+                continue
+            wide.setdefault(age, {"age": age})[str(col)] = row.get("points")
+        return cls(list(wide.values()))
+
+    def value(self, age, col):
+        """Points for one (age, column), or None."""
+        try:
+            age, col = int(age), int(col)
+        except (TypeError, ValueError):
+            return None
+        if not (0 <= age < self.matrix.shape[0] and 0 <= col < self.matrix.shape[1]):
+            return None
+        value = self.matrix[age, col]
+        return None if np.isnan(value) else float(value)
+
+    def values(self, ages, cols):
+        """Vectorized ``value``: two aligned Series in, float Series (NaN = none) out."""
+        ages = pd.to_numeric(pd.Series(ages), errors="coerce")
+        a = np.trunc(ages.to_numpy(dtype=float, na_value=np.nan))
+        c = np.trunc(pd.to_numeric(pd.Series(cols), errors="coerce").to_numpy(dtype=float, na_value=np.nan))
+        valid = (
+            ~np.isnan(a) & ~np.isnan(c)
+            & (a >= 0) & (a < self.matrix.shape[0])
+            & (c >= 0) & (c < self.matrix.shape[1])
+        )
+        result = np.full(len(a), np.nan)
+        result[valid] = self.matrix[a[valid].astype(int), c[valid].astype(int)]
+        return pd.Series(result, index=ages.index)
+
+
+# Langtabellen aus Migration 006 -> Spalte, an der has_column sie erkennt
+LONG_TABLE_PROBES = {
+    "pisterefcomppointsage": "ref",
+    "pistereftrainingsincepoints": "years",
+    "pistereftrainingtimepoints": "hours",
+    "compresultsrefpercent": "refpercent",
+}
+MIGRATION_006_PENDING = (
+    "Migration 006 ausstehend: die Referenz-Langtabellen fehlen noch. "
+    "Bitte `python sqltables/migrate.py` ausführen (Log: /home/site/migrate.log)."
+)
+
+
+def has_long_table(table):
+    """True once migration 006 created ``table`` (one of LONG_TABLE_PROBES)."""
+    return db.has_column(table, LONG_TABLE_PROBES[table])
+
+
+def _training_matrix(long_table, column, wide_table):
+    # Vor Migration 006 gibt es nur die breite Tabelle
+    if db.has_column(long_table, column):
+        return TrainingMatrix.from_long(db.table_select(long_table, f"age, [{column}], points"), column)
+    return TrainingMatrix(db.table_select(wide_table))
+
+
+def trainingsince_matrix(refresh=False):
+    """Cached TrainingMatrix of pistereftrainingsincepoints ([age, training years])."""
+    return _cached(
+        "trainingsince",
+        lambda: _training_matrix("pistereftrainingsincepoints", "years", "pistereftrainingsince"),
+        refresh,
+    )
+
+
+def trainingtime_matrix(refresh=False):
+    """Cached TrainingMatrix of pistereftrainingtimepoints ([age, weekly hours])."""
+    return _cached(
+        "trainingtime",
+        lambda: _training_matrix("pistereftrainingtimepoints", "hours", "pistereftrainingtime"),
+        refresh,
+    )
+
+
+# --- Kader-Schwellen ---
+
+NATIONAL_TEAM_MIN_PERCENT = 90
+REGIONAL_TEAM_MIN_PERCENT = 70
+# Schwellen liegen als markierte Zeilen in socadditionalvalues (first_name = Disziplin, last_name = Gruppe)
+KADER_THRESHOLD_MARKER = "kaderthresholds"
+
+
+def _norm(val):
+    return "" if val is None else str(val).strip().lower()
+
+
+def _percent(val):
+    try:
+        if val in (None, "", "nan"):
+            return None
+        if isinstance(val, str):
+            val = val.replace("%", "").replace(",", ".").strip()
+            if val == "":
+                return None
+        return float(val)
+    except Exception:
+        return None
+
+
+def category_group(category_start):
+    """CategoryStart -> threshold group: "jugend", "elite" or "all"."""
+    c = _norm(category_start)
+    if c.startswith("jugend"):
+        return "jugend"
+    if c == "elite":
+        return "elite"
+    return "all"
+
+
+class KaderThresholds:
+    """Compiled kader %-thresholds.
+
+    ``resolve`` tries (discipline, group), (discipline, "all"),
+    ("default", group) and ("default", "all"); empty percentages fall back
+    to NATIONAL/REGIONAL_TEAM_MIN_PERCENT. Results are memoized per pair.
+    """
+
+    def __init__(self, rows):
+        self.rules = {}
+        for r in rows or []:
+            key = (_norm(r.get("first_name")), _norm(r.get("last_name")) or "all")
+            national = _percent(r.get("CompPointsNationalTeam"))
+            regional = _percent(r.get("CompPointsRegionalTeam"))
+            self.rules[key] = (
+                float(NATIONAL_TEAM_MIN_PERCENT) if national is None else national,
+                float(REGIONAL_TEAM_MIN_PERCENT) if regional is None else regional,
+            )
+        self._resolved = {}
+
+    def resolve(self, discipline, category_start):
+        """``(national_percent, regional_percent)`` for a result."""
+        d, group = _norm(discipline), category_group(category_start)
+        pair = (d, group)
+        if pair not in self._resolved:
+            found = (float(NATIONAL_TEAM_MIN_PERCENT), float(REGIONAL_TEAM_MIN_PERCENT))
+            for key in [(d, group), (d, "all"), ("default", group), ("default", "all")]:
+                if key in self.rules:
+                    found = self.rules[key]
+                    break
+            self._resolved[pair] = found
+        return self._resolved[pair]
+
+
+def kader_thresholds(refresh=False):
+    """Shared KaderThresholds; kept until the thresholds grid calls ``invalidate("kader_thresholds")``.
+
+    The default rows are seeded by migration 004, reading never writes.
+    """
+    try:
+        return _cached(
+            "kader_thresholds",
+            lambda: KaderThresholds(db.table_select(
+                "socadditionalvalues",
+                "first_name, last_name, CompPointsNationalTeam, CompPointsRegionalTeam",
+                toolenvironment=KADER_THRESHOLD_MARKER,
+            )),
+            refresh,
+            ttl=None,
+        )
+    except Exception:
+        return KaderThresholds([])
+
+
+# --- Wettkämpfe ---
+
+
+def _int_or_none(value):
+    try:
+        return int(float(str(value).strip()))
+    except (TypeError, ValueError):
+        return None
+
+
+class CompetitionIndex:
+    """Competition name -> ``{"id", "PisteYear"}``, matched trimmed and case-insensitive.
+
+    For duplicate names the lowest id wins, like the migration 005 backfill.
+    """
+
+    def __init__(self, competitions):
+        self.by_name = {}
+        for c in sorted(competitions or [], key=lambda c: _int_or_none(c.get("id")) or 0):
+            key = _norm(c.get("Name"))
+            if key and key not in self.by_name:
+                self.by_name[key] = {"id": _int_or_none(c.get("id")), "PisteYear": _int_or_none(c.get("PisteYear"))}
+
+    def get(self, name):
+        return self.by_name.get(_norm(name))
+
+    def years(self, names):
+        """Vectorized PisteYear for a Series of competition names (None if unknown)."""
+        names = pd.Series(names)
+        years = {k: v["PisteYear"] for k, v in self.by_name.items()}
+        return pd.Series([years.get(_norm(n)) for n in names], index=names.index, dtype=object)
+
+
+def competition_index(refresh=False):
+    """Shared CompetitionIndex, dropped on every competitions write."""
+    return _cached("competitions", lambda: CompetitionIndex(db.table_select("competitions", "id, Name, PisteYear")), refresh)
+
+
+def _stamp_competition(data):
+    if "Competition" not in data or "competition_id" in data:
+        return data
+    try:
+        if not db.has_column("compresults", "competition_id"):
+            return data
+        comp = competition_index().get(data.get("Competition")) or {}
+    except Exception:
+        return data
+    return {**data, "competition_id": comp.get("id"), "PisteYear": comp.get("PisteYear")}
+
+
+# --- Wettkampf-Referenzpunkte ---
+
+
+class RefCompPoints:
+    """pisterefcomppointsage as a lookup on (Discipline, sex, age).
+
+    Discipline and sex match trimmed and case-insensitive. ``lookup``
+    resolves whole columns with one merge; ``kind`` is "ref" (RefPoints
+    basis) or "quality" (DiveQuality basis).
+    """
+
+    KEYS = ["_discipline", "_sex", "_age"]
+
+    def __init__(self, rows):
+        df = pd.DataFrame(list(rows or []), columns=["Discipline", "sex", "age", "ref", "quality"])
+        frame = pd.DataFrame({
+            "_discipline": df["Discipline"].map(_norm),
+            "_sex": df["sex"].map(_norm),
+            "_age": pd.to_numeric(df["age"], errors="coerce"),
+            "ref": pd.to_numeric(df["ref"], errors="coerce"),
+            "quality": pd.to_numeric(df["quality"], errors="coerce"),
+        }).dropna(subset=["_age"])
+        self.frame = frame.drop_duplicates(subset=self.KEYS, keep="first").reset_index(drop=True)
+        self._index = {
+            (d, s, int(age)): {"ref": ref, "quality": quality}
+            for d, s, age, ref, quality in self.frame.itertuples(index=False)
+        }
+
+    @classmethod
+    def from_wide(cls, rows):
+        """Build from the pre-006 table with one ``[age]`` / ``quality{age}`` column pair per age."""
+        rows = sorted(rows or [], key=lambda r: _int_or_none(r.get("id")) or 0)
+        return cls([
+            {
+                "Discipline": r.get("Discipline"),
+                "sex": r.get("sex"),
+                "age": int(col),
+                "ref": value,
+                "quality": r.get(f"quality{col}"),
+            }
+            for r in rows
+            for col, value in r.items()
+            if str(col).strip().isdigit()
+        ])
+
+    @property
+    def empty(self):
+        return self.frame.empty
+
+    def value(self, discipline, sex, age, kind="ref"):
+        """Reference value for one result, or None."""
+        age = _int_or_none(age)
+        if age is None:
+            return None
+        value = self._index.get((_norm(discipline), _norm(sex), age), {}).get(kind)
+        return None if value is None or pd.isna(value) else float(value)
+
+    def lookup(self, disciplines, sexes, ages, kind="ref"):
+        """Vectorized ``value``: aligned Series in, float Series (NaN = none) out."""
+        disciplines = pd.Series(disciplines)
+        keys = pd.DataFrame({
+            "_discipline": disciplines.map(_norm).to_numpy(),
+            "_sex": pd.Series(sexes).map(_norm).to_numpy(),
+            "_age": np.trunc(pd.to_numeric(pd.Series(ages), errors="coerce").to_numpy(dtype=float, na_value=np.nan)),
+        })
+        merged = keys.merge(self.frame[self.KEYS + [kind]], on=self.KEYS, how="left")
+        return pd.Series(merged[kind].to_numpy(dtype=float), index=disciplines.index)
+
+
+def ref_comp_points(refresh=False):
+    """Shared RefCompPoints (pisterefcomppointsage; the wide table before migration 006)."""
+    def _load():
+        if db.has_column("pisterefcomppointsage", "ref"):
+            return RefCompPoints(db.table_select("pisterefcomppointsage", "Discipline, sex, age, ref, quality"))
+        return RefCompPoints.from_wide(db.table_select("pisterefcomppoints"))
+
+    return _cached("refcomppoints", _load, refresh)
@@ -0,0 +1,177 @@
+"""
+Benchmark the recalculation engines on synthetic data, without Azure SQL.
+Usage:
+    python sqltables/benchmark_engines.py --label before                  # 1x, 10x, 100x, alle Engines
+    python sqltables/benchmark_engines.py --label after --scale 1 --scale 10 --engine competitions
+    python sqltables/benchmark_engines.py --label wan --latency-ms 5      # mit Netzwerk-Roundtrip pro Query
+    python sqltables/benchmark_engines.py --compare before after
+
+The data is the sqltables/*_rows.sql dump scaled by synthetic_data.py; the
+engines run unchanged against memdb.MemoryDB. Per engine and scale it
+records wall time (median of --repeat runs), queries, statements, rows read
+and written, and the tracemalloc peak of one extra run (tracing slows the
+code down, so it is not timed). Every run is appended to the history file,
+--compare reads the latest run of two labels from it.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, SCRIPT_DIR)
+
+from memdb import MemoryDB, load_snapshot  # noqa: E402
+from synthetic_data import row_counts, scale_snapshot  # noqa: E402
+
+from divingeval.pipeline import STAGES, run_pipeline  # noqa: E402
+
+ENGINES = list(STAGES) + ["pipeline"]
+DEFAULT_SCALES = [1, 10, 100]
+DEFAULT_HISTORY = "benchmark_engines_history.json"
+
+
+def run_engine(snapshot, engine, year, latency_ms=0.0, trace_memory=False):
+    """One run of ``engine`` on a fresh copy of ``snapshot``; returns its measurements."""
+    mem = MemoryDB(snapshot, latency_ms=latency_ms)
+    stages = None if engine == "pipeline" else [engine]
+    peak = None
+    # db._log schreibt jede Query auf stdout
+    with mem.installed(), contextlib.redirect_stdout(io.StringIO()):
+        if trace_memory:
+            tracemalloc.start()
+        started = time.perf_counter()
+        try:
+            report = run_pipeline(year, stages=stages, with_dependencies=False)
+        finally:
+            seconds = time.perf_counter() - started
+            if trace_memory:
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+    written = sum(sum(counts.values()) for counts in report["counts"].values())
+    return {"seconds": seconds, "peak_bytes": peak, "written": written, **mem.stats}
+
+
+def benchmark_scale(snapshot, engines, year, repeat, latency_ms):
+    results = {}
+    for engine in engines:
+        try:
+            runs = [run_engine(snapshot, engine, year, latency_ms) for _ in range(repeat)]
+            traced = run_engine(snapshot, engine, year, latency_ms, trace_memory=True)
+        except Exception as e:
+            results[engine] = {"error": f"{type(e).__name__}: {e}"}
+            print(f"  {engine:<14} ⚠ {results[engine]['error']}")
+            continue
+        timings = [r["seconds"] for r in runs]
+        last = runs[-1]
+        results[engine] = {
+            "median_s": round(statistics.median(timings), 3),
+            "min_s": round(min(timings), 3),
+            "max_s": round(max(timings), 3),
+            "queries": last["queries"],
+            "statements": last["statements"],
+            "rows_read": last["rows_read"],
+            "rows_written": last["rows_written"],
+            "changes": last["written"],
+            "peak_mb": round(traced["peak_bytes"] / 1024 / 1024, 1),
+        }
+        r = results[engine]
+        print(
+            f"  {engine:<14} {r['median_s']:>9.3f}s  queries={r['queries']:<4} statements={r['statements']:<5} "
+            f"rows read={r['rows_read']:<8} written={r['rows_written']:<7} peak={r['peak_mb']:.1f} MB"
+        )
+    return results
+
+
+def _git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=SCRIPT_DIR, capture_output=True, text=True, timeout=10)
+        return out.stdout.strip() or None
+    except Exception:
+        return None
+
+
+def _load_history(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare(history_path, before_label, after_label):
+    history = _load_history(history_path)
+    runs = {}
+    for entry in history:
+        runs[entry["label"]] = entry  # der letzte Lauf pro Label zählt
+    missing = [label for label in (before_label, after_label) if label not in runs]
+    if missing:
+        print(f"No run labelled {', '.join(missing)} in {history_path}")
+        sys.exit(1)
+    before, after = runs[before_label], runs[after_label]
+    print(f"{'scale/engine':<22} {before_label:>10} {after_label:>10} {'factor':>8}  queries      peak MB")
+    for scale, b_scale in before["results"].items():
+        a_scale = after["results"].get(scale)
+        if not a_scale:
+            continue
+        for engine, b in b_scale["engines"].items():
+            a = a_scale["engines"].get(engine)
+            if not a or "error" in a or "error" in b:
+                continue
+            factor = (b["median_s"] / a["median_s"]) if a["median_s"] else float("inf")
+            print(
+                f"{scale + ' ' + engine:<22} {b['median_s']:>9.3f}s {a['median_s']:>9.3f}s {factor:>7.1f}x"
+                f"  {b['queries']:>4} -> {a['queries']:<4}  {b['peak_mb']:>6.1f} -> {a['peak_mb']:.1f}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the recalculation engines on synthetic data")
+    parser.add_argument("--label", default="run", help="name of this run, e.g. before / after")
+    parser.add_argument("--year", default="2026", help="PisteYear to recompute")
+    parser.add_argument("--scale", type=int, action="append", help="data scale factor, repeatable (default: 1, 10, 100)")
+    parser.add_argument("--engine", action="append", choices=ENGINES, help="repeatable (default: all)")
+    parser.add_argument("--repeat", type=int, default=1, help="timed runs per engine and scale")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="added per query / statement")
+    parser.add_argument("--history", default=DEFAULT_HISTORY, help=f"JSON history file (default: {DEFAULT_HISTORY})")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"))
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(args.history, *args.compare)
+        return
+
+    scales = args.scale or DEFAULT_SCALES
+    engines = args.engine or ENGINES
+    print(f"Benchmark '{args.label}', PisteYear {args.year}, scales {scales}, {args.repeat}x, latency {args.latency_ms} ms\n")
+    base = load_snapshot()
+    results = {}
+    for scale in scales:
+        snapshot = scale_snapshot(base, scale)
+        counts = row_counts(snapshot)
+        print(f"{scale}x  " + ", ".join(f"{k}={v}" for k, v in counts.items()))
+        results[f"{scale}x"] = {"rows": counts, "engines": benchmark_scale(snapshot, engines, args.year, args.repeat, args.latency_ms)}
+        del snapshot
+
+    history = _load_history(args.history)
+    history.append({
+        "label": args.label,
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "params": {"year": args.year, "repeat": args.repeat, "latency_ms": args.latency_ms},
+        "results": results,
+    })
+    with open(args.history, "w", encoding="utf-8") as f:
+        json.dump(history, f, indent=2, default=str)
+    print(f"\nAppended to {args.history}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Import-time cost of the app shell and of each page module.
+Usage:
+    python sqltables/benchmark_imports.py                       # Shell + alle Seiten, je 3 Läufe
+    python sqltables/benchmark_imports.py --page "Full PISTE Results SOC" --runs 5
+    python sqltables/benchmark_imports.py --max-shell-ms 1500 --report imports.json
+
+Every measurement runs in a fresh interpreter with -X importtime, as after
+a restart of the App Service. "shell" is what app.py imports before the
+first page renders (ui.auth, ui.common, ui.engine, ui.pages) on top of
+streamlit; each page is the extra cost of importing its module on top of
+the shell, i.e. the one-off delay of its first visit. Reported are the
+median over --runs and the heaviest new top-level imports. Reruns do not
+import anything: the modules stay in sys.modules.
+
+Exit code 1 if the shell median exceeds --max-shell-ms.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from datetime import datetime
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(SCRIPT_DIR)
+sys.path.insert(0, ROOT_DIR)
+
+from ui.pages import PAGES, module_name  # noqa: E402
+
+SHELL_MODULES = ["ui.auth", "ui.common", "ui.engine", "ui.pages"]
+MARKER = "-- measure --"
+
+_PROBE = """
+import sys, time
+sys.path.insert(0, {root!r})
+for name in {before!r}:
+    __import__(name)
+sys.stderr.write({marker!r} + "\\n")
+sys.stderr.flush()
+started = time.perf_counter()
+for name in {measured!r}:
+    __import__(name)
+print(time.perf_counter() - started)
+"""
+
+
+def _parse_importtime(stderr):
+    """``[(depth, name, cumulative_us)]`` of the -X importtime lines after the marker."""
+    lines = stderr.split(MARKER, 1)[-1].splitlines()
+    entries = []
+    for line in lines:
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|", 2)
+        if not cumulative.strip().isdigit():
+            continue
+        depth = (len(name) - len(name.lstrip(" "))) // 2
+        entries.append((depth, name.strip(), int(cumulative)))
+    return entries
+
+
+def measure(before, measured):
+    """Seconds to import ``measured`` once ``before`` is loaded, and the heaviest new imports."""
+    code = _PROBE.format(root=ROOT_DIR, before=before, measured=measured, marker=MARKER)
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True, cwd=ROOT_DIR)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    entries = _parse_importtime(result.stderr)
+    # schwerste Importe ausserhalb des eigenen Codes, auf der obersten neuen Ebene
+    external = [(d, n, us) for d, n, us in entries if not n.startswith(("ui", "divingeval"))]
+    top_depth = min((d for d, _, _ in external), default=0)
+    heaviest = sorted(((n, us) for d, n, us in external if d == top_depth), key=lambda e: -e[1])[:3]
+    return float(result.stdout.strip().splitlines()[-1]), heaviest
+
+
+def run(label, before, measured, runs):
+    samples, heaviest = [], []
+    for _ in range(runs):
+        seconds, heaviest = measure(before, measured)
+        samples.append(seconds)
+    return {
+        "label": label,
+        "median_ms": round(statistics.median(samples) * 1000, 1),
+        "max_ms": round(max(samples) * 1000, 1),
+        "heaviest": [{"module": n, "ms": round(us / 1000, 1)} for n, us in heaviest],
+    }
+
+
+def _print(result):
+    heavy = ", ".join(f"{h['module']} {h['ms']:.0f} ms" for h in result["heaviest"] if h["ms"] >= 1)
+    print(f"  {result['label']:<36} {result['median_ms']:>8.1f} ms  (max {result['max_ms']:>7.1f}){'  ' + heavy if heavy else ''}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time cost of the Streamlit app shell and its page modules")
+    parser.add_argument("--page", action="append", help="page label, repeatable (default: all pages)")
+    parser.add_argument("--runs", type=int, default=3, help="fresh interpreters per measurement (median)")
+    parser.add_argument("--max-shell-ms", type=float, help="fail if the shell median is above this")
+    parser.add_argument("--report", help="write the results to this JSON file")
+    args = parser.parse_args()
+
+    labels = args.page or list(PAGES)
+    unknown = [label for label in labels if label not in PAGES]
+    if unknown:
+        parser.error(f"unknown page(s): {', '.join(unknown)}")
+
+    print(f"Import times, median of {args.runs} fresh interpreter(s)")
+    streamlit = run("streamlit", [], ["streamlit"], args.runs)
+    shell = run("app shell (without streamlit)", ["streamlit"], SHELL_MODULES, args.runs)
+    _print(streamlit)
+    _print(shell)
+    print("\nFirst visit of a page (on top of the shell):")
+    page_results = []
+    for label in labels:
+        result = run(label, ["streamlit", *SHELL_MODULES], [module_name(label)], args.runs)
+        page_results.append(result)
+        _print(result)
+
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump({
+                "timestamp": datetime.now().isoformat(timespec="seconds"),
+                "runs": args.runs,
+                "streamlit": streamlit,
+                "shell": shell,
+                "pages": page_results,
+            }, f, indent=2)
+        print(f"\nSaved to {args.report}")
+    if args.max_shell_ms is not None and shell["median_ms"] > args.max_shell_ms:
+        print(f"\n⚠ Shell import {shell['median_ms']:.0f} ms > {args.max_shell_ms:.0f} ms", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
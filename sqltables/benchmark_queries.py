@@ -0,0 +1,183 @@
+"""
+Time the app's main read paths against Azure SQL, before and after a migration.
+Usage:
+    python sqltables/benchmark_queries.py --label before
+    python sqltables/migrate.py
+    python sqltables/benchmark_queries.py --label after
+    python sqltables/benchmark_queries.py --compare benchmark_before.json benchmark_after.json
+
+The queries only use expressions that work on both the NVARCHAR and the typed
+schema, and the sample parameters are picked deterministically, so both runs
+measure the same work.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, SCRIPT_DIR)
+
+from import_data import load_connection  # noqa: E402
+
+# name -> (sql, param keys)
+QUERIES = {
+    "compresults_by_competition": (
+        "SELECT * FROM dbo.compresults WHERE Competition = %s",
+        ["competition"],
+    ),
+    "compresults_by_name": (
+        "SELECT * FROM dbo.compresults WHERE last_name = %s AND first_name = %s",
+        ["last_name", "first_name"],
+    ),
+    "scoretables_lookup": (
+        "SELECT result_min, result_max, points FROM dbo.scoretables "
+        "WHERE discipline_id = %s AND category = %s AND sex = %s ORDER BY result_min",
+        ["discipline_id", "category", "sex"],
+    ),
+    "socadditionalvalues_year": (
+        "SELECT * FROM dbo.socadditionalvalues "
+        "WHERE PisteYear = %s AND ISNULL(toolenvironment, '') <> 'injuryflags'",
+        ["year"],
+    ),
+    "socadditionalvalues_year_name": (
+        "SELECT * FROM dbo.socadditionalvalues WHERE PisteYear = %s AND last_name = %s AND first_name = %s",
+        ["year", "last_name", "first_name"],
+    ),
+    "pisterefcompresults_year": (
+        "SELECT * FROM dbo.pisterefcompresults WHERE PisteYear = %s",
+        ["year"],
+    ),
+    "pisterefcompresults_year_name": (
+        "SELECT * FROM dbo.pisterefcompresults WHERE PisteYear = %s AND last_name = %s AND first_name = %s",
+        ["year", "last_name", "first_name"],
+    ),
+    "pisteresults_year": (
+        "SELECT athlete_id, discipline_id, points, raw_result FROM dbo.pisteresults WHERE TestYear = %s",
+        ["year"],
+    ),
+    "competition_points_avg": (
+        "SELECT Competition, AVG(TRY_CONVERT(DECIMAL(10,4), Points)) AS avg_points, COUNT(*) AS n "
+        "FROM dbo.compresults GROUP BY Competition",
+        [],
+    ),
+}
+
+
+def _connect():
+    import pymssql
+
+    cfg = load_connection()
+    return pymssql.connect(
+        server=cfg["server"],
+        port=cfg["port"],
+        database=cfg["database"],
+        user=cfg["user"],
+        password=cfg["password"],
+        tds_version="7.4",
+        autocommit=True,
+    )
+
+
+def sample_params(conn) -> dict:
+    """Pick representative, deterministic parameter values from the data."""
+    cur = conn.cursor(as_dict=True)
+    params = {}
+    cur.execute(
+        "SELECT TOP 1 Competition, COUNT(*) AS n FROM dbo.compresults "
+        "WHERE Competition IS NOT NULL GROUP BY Competition ORDER BY COUNT(*) DESC, Competition"
+    )
+    row = cur.fetchone() or {}
+    params["competition"] = row.get("Competition")
+    cur.execute(
+        "SELECT TOP 1 last_name, first_name, COUNT(*) AS n FROM dbo.compresults "
+        "WHERE last_name IS NOT NULL GROUP BY last_name, first_name ORDER BY COUNT(*) DESC, last_name, first_name"
+    )
+    row = cur.fetchone() or {}
+    params["last_name"] = row.get("last_name")
+    params["first_name"] = row.get("first_name")
+    cur.execute(
+        "SELECT TOP 1 discipline_id, category, sex, COUNT(*) AS n FROM dbo.scoretables "
+        "GROUP BY discipline_id, category, sex ORDER BY COUNT(*) DESC, category, sex"
+    )
+    row = cur.fetchone() or {}
+    params["discipline_id"] = row.get("discipline_id")
+    params["category"] = row.get("category")
+    params["sex"] = row.get("sex")
+    cur.execute("SELECT MAX(TRY_CONVERT(INT, TestYear)) AS y FROM dbo.pisteresults")
+    row = cur.fetchone() or {}
+    params["year"] = str(row.get("y") or "")
+    return params
+
+
+def run_benchmark(conn, params: dict, repeat: int) -> dict:
+    cur = conn.cursor()
+    results = {}
+    for name, (sql, keys) in QUERIES.items():
+        args = tuple(params.get(k) for k in keys)
+        timings = []
+        rows = 0
+        for _ in range(repeat):
+            started = time.perf_counter()
+            cur.execute(sql, args or None)
+            rows = len(cur.fetchall())
+            timings.append((time.perf_counter() - started) * 1000)
+        results[name] = {
+            "rows": rows,
+            "median_ms": round(statistics.median(timings), 2),
+            "min_ms": round(min(timings), 2),
+            "max_ms": round(max(timings), 2),
+        }
+        print(f"  {name:<32} {results[name]['median_ms']:>9.2f} ms  ({rows} rows)")
+    return results
+
+
+def compare(before_path: str, after_path: str):
+    with open(before_path, encoding="utf-8") as f:
+        before = json.load(f)
+    with open(after_path, encoding="utf-8") as f:
+        after = json.load(f)
+    print(f"{'query':<32} {before['label']:>10} {after['label']:>10} {'factor':>8}")
+    for name, b in before["results"].items():
+        a = after["results"].get(name)
+        if not a:
+            continue
+        factor = (b["median_ms"] / a["median_ms"]) if a["median_ms"] else float("inf")
+        rows_note = "" if a["rows"] == b["rows"] else f"  ⚠ rows {b['rows']} -> {a['rows']}"
+        print(f"{name:<32} {b['median_ms']:>8.2f}ms {a['median_ms']:>8.2f}ms {factor:>7.1f}x{rows_note}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the main read queries")
+    parser.add_argument("--label", default="run", help="name of this run, e.g. before / after")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", default=None, help="JSON file (default: benchmark_<label>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"))
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    try:
+        conn = _connect()
+    except ImportError:
+        print("pymssql not installed. Run: pip install pymssql")
+        sys.exit(1)
+
+    params = sample_params(conn)
+    print(f"Benchmark '{args.label}' ({args.repeat}x), params: {params}\n")
+    results = run_benchmark(conn, params, args.repeat)
+    conn.close()
+
+    output = args.output or f"benchmark_{args.label}.json"
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump({"label": args.label, "params": params, "results": results}, f, indent=2, default=str)
+    print(f"\nSaved to {output}")
+
+
+if __name__ == "__main__":
+    main()
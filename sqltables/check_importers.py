@@ -0,0 +1,124 @@
+"""
+Regression check of importers.PisteImport.prepare without a database.
+Usage:
+    python sqltables/check_importers.py
+
+Runs prepare on a small piste sheet with one valid row and one row per
+reject reason (bad Testjahr, unknown athlete, missing Jahrgang, non-numeric
+value) and checks rows and rejects. Also re-imports a yearly-values row
+with an empty key part through db.upsert_many (on memdb, and the MERGE it
+sends) and checks that it is updated, not added again. Exit code 1 on a
+failure, so it works as a gate before a merge that touches importers.py
+or db.upsert_many.
+"""
+
+import os
+import sys
+
+import pandas as pd
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(SCRIPT_DIR))
+
+import db  # noqa: E402
+import importers  # noqa: E402
+from memdb import MemoryDB, load_snapshot  # noqa: E402
+
+ATHLETES = [
+    {"id": "a1", "first_name": "Anna", "last_name": "Muster", "sex": "female", "vintage": 2010},
+    {"id": "a2", "first_name": "Ben", "last_name": "Ohnejahr", "sex": "male", "vintage": None},
+]
+DISCIPLINES = [{"id": "d1", "name": "Sprint 20m"}]
+AGECATEGORIES = [{"category": "Jugend B", "min_age": 10, "max_age": 20}]
+SCORETABLES = [
+    {"discipline_id": "d1", "category": "Jugend B", "sex": "female", "result_min": 0, "result_max": 10, "points": 7},
+]
+SHEET = pd.DataFrame([
+    {"Testjahr": 2026, "first_name": "Anna", "last_name": "Muster", "Sprint 20m": "5.5"},
+    {"Testjahr": "2O26", "first_name": "Anna", "last_name": "Muster", "Sprint 20m": "5.5"},
+    {"Testjahr": 2026, "first_name": "Nie", "last_name": "Gesehen", "Sprint 20m": "5.5"},
+    {"Testjahr": 2026, "first_name": "Ben", "last_name": "Ohnejahr", "Sprint 20m": "5.5"},
+    {"Testjahr": 2025, "first_name": "Anna", "last_name": "Muster", "Sprint 20m": "DNS"},
+])
+EXPECTED_REJECTS = {
+    3: "Ungültiges Testjahr",
+    4: "Athlet nicht gefunden",
+    5: "Jahrgang des Athleten fehlt",
+    6: "Kein numerischer Wert",
+}
+
+
+def check_piste_prepare():
+    """List of failure messages; empty if prepare behaves."""
+    piste = importers.PisteImport(ATHLETES, DISCIPLINES, AGECATEGORIES, SCORETABLES)
+    rows, rejects = piste.prepare(SHEET, first_row=2)
+    failures = []
+    if list(rows["_row"]) != [2]:
+        failures.append(f"expected only file row 2 as valid, got {list(rows['_row'])}")
+    elif float(rows.iloc[0]["points"]) != 7.0:
+        failures.append(f"row 2: expected 7 points, got {rows.iloc[0]['points']}")
+    got = dict(zip(rejects["row"], rejects["reason"]))
+    if got != EXPECTED_REJECTS:
+        failures.append(f"rejects: expected {EXPECTED_REJECTS}, got {got}")
+    if list(rejects.columns) != importers.REJECT_COLUMNS:
+        failures.append(f"reject columns: {list(rejects.columns)}")
+    return failures
+
+
+class _RecordingTx:
+    """Collects the SQL db.upsert_many sends; every query answers with no rows."""
+
+    def __init__(self):
+        self.statements = []
+
+    def execute(self, sql, params=None):
+        self.statements.append(sql)
+        return 0
+
+    def query(self, sql, params=None):
+        self.statements.append(sql)
+        return []
+
+
+def check_reimport_null_key():
+    """List of failure messages; empty if a NULL key part re-imports idempotently."""
+    failures = []
+    row = {"first_name": "Anna", "last_name": "Muster", "PisteYear": None, "q1": 3}
+    mem = MemoryDB(load_snapshot(tables=["trainingsperformance"]))
+    with mem.installed():
+        before = len(mem.table("trainingsperformance").rows)
+        first = db.upsert_many("trainingsperformance", [row], importers.YEARLY_KEY_COLUMNS)
+        second = db.upsert_many("trainingsperformance", [dict(row, q1=4)], importers.YEARLY_KEY_COLUMNS)
+        after = len(mem.table("trainingsperformance").rows)
+    if after != before + 1:
+        failures.append(f"expected {before + 1} rows after two imports, got {after}")
+    if (first, second) != ({"inserted": 1, "updated": 0}, {"inserted": 0, "updated": 1}):
+        failures.append(f"counts: first {first}, second {second}")
+
+    tx = _RecordingTx()
+    db.upsert_many("trainingsperformance", [row, dict(row, PisteYear=float("nan"))], importers.YEARLY_KEY_COLUMNS, tx=tx)
+    merges = [sql for sql in tx.statements if sql.startswith("MERGE")]
+    stage_rows = sum(sql.count("(%s") for sql in tx.statements if sql.startswith("INSERT INTO #upsert_stage"))
+    if len(merges) != 1 or "t.[PisteYear] IS NULL AND s.[PisteYear] IS NULL" not in merges[0]:
+        failures.append(f"MERGE does not match NULL keys: {merges}")
+    if stage_rows != 1:
+        failures.append(f"None and NaN key should collapse to one staged row, got {stage_rows}")
+    return failures
+
+
+def main():
+    failures = check_piste_prepare()
+    for failure in failures:
+        print(f"⚠ PisteImport.prepare: {failure}")
+    if not failures:
+        print("✅ PisteImport.prepare: valid row and all four reject reasons")
+    upsert_failures = check_reimport_null_key()
+    for failure in upsert_failures:
+        print(f"⚠ upsert_many: {failure}")
+    if not upsert_failures:
+        print("✅ upsert_many: re-import with a NULL key part updates instead of inserting")
+    sys.exit(1 if failures or upsert_failures else 0)
+
+
+if __name__ == "__main__":
+    main()
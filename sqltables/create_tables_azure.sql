@@ -17,6 +17,16 @@
 --   Column names with %, -, or numbers -> [bracket-escaped]
 -- ============================================================
 
+-- Objects of later migrations (006: long-format tables + compatibility views)
+IF OBJECT_ID('dbo.compresultswide','V')             IS NOT NULL DROP VIEW dbo.compresultswide;
+IF OBJECT_ID('dbo.pisterefcomppoints','V')          IS NOT NULL DROP VIEW dbo.pisterefcomppoints;
+IF OBJECT_ID('dbo.pistereftrainingsince','V')       IS NOT NULL DROP VIEW dbo.pistereftrainingsince;
+IF OBJECT_ID('dbo.pistereftrainingtime','V')        IS NOT NULL DROP VIEW dbo.pistereftrainingtime;
+IF OBJECT_ID('dbo.compresultsrefpercent','U')       IS NOT NULL DROP TABLE dbo.compresultsrefpercent;
+IF OBJECT_ID('dbo.pisterefcomppointsage','U')       IS NOT NULL DROP TABLE dbo.pisterefcomppointsage;
+IF OBJECT_ID('dbo.pistereftrainingsincepoints','U') IS NOT NULL DROP TABLE dbo.pistereftrainingsincepoints;
+IF OBJECT_ID('dbo.pistereftrainingtimepoints','U')  IS NOT NULL DROP TABLE dbo.pistereftrainingtimepoints;
+
 -- Drop tables in dependency order (FKs: pisteresults -> athletes, pistedisciplines)
 IF OBJECT_ID('dbo.pisteresults','U')          IS NOT NULL DROP TABLE dbo.pisteresults;
 IF OBJECT_ID('dbo.athletes','U')              IS NOT NULL DROP TABLE dbo.athletes;
@@ -40,6 +50,8 @@ IF OBJECT_ID('dbo.athleteyearstatus','U')     IS NOT NULL DROP TABLE dbo.athlete
 IF OBJECT_ID('dbo.socadditionalvalues','U')   IS NOT NULL DROP TABLE dbo.socadditionalvalues;
 IF OBJECT_ID('dbo.team','U')                  IS NOT NULL DROP TABLE dbo.team;
 IF OBJECT_ID('dbo.trainingsperformance','U')  IS NOT NULL DROP TABLE dbo.trainingsperformance;
+-- Fresh base schema: migrations in sqltables/migrations/ must run again (python sqltables/migrate.py)
+IF OBJECT_ID('dbo.schema_migrations','U')     IS NOT NULL DROP TABLE dbo.schema_migrations;
 GO
 
 -- ============================================================
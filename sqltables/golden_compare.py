@@ -0,0 +1,383 @@
+"""
+Golden-output check: two versions of the recalculation engines must write the same data.
+Usage:
+    python sqltables/golden_compare.py --year 2026                    # Baseline (erster Commit) gegen Arbeitsverzeichnis
+    python sqltables/golden_compare.py --year 2025 --year 2026 --reference HEAD~3 --candidate HEAD
+    python sqltables/golden_compare.py --year 2026 --scale 3 --report golden_diff.json
+
+Both sides recompute the same snapshot (sqltables/*_rows.sql, optionally
+scaled by synthetic_data.py) on memdb.MemoryDB, each in its own process with
+its own checkout (git archive of the ref; "." is the working tree). The
+snapshot is rolled back to the migrations the checkout ships
+(memdb.unmigrate). A side runs divingeval.pipeline if it has one, else the
+app.run_* functions of the row-by-row version, else - the baseline - it
+clicks through the Streamlit pages with AppTest, always in pipeline order.
+Afterwards every table is compared cell by cell:
+
+- RefPoint % are compared as (compresult_id, PisteYear) rows whether a side
+  keeps them in compresultsrefpercent (006) or in compresults.[PisteRefPoints{Y}%],
+- only tables and columns both schemas have are compared (the others are listed),
+- rows are matched on a natural key (generated ids differ between runs),
+- the run's own timestamps are skipped,
+- numbers (also numeric text) compare with --atol / --rtol,
+- yes/ja/true and no/nein/false compare equal, text ignores case and
+  surrounding blanks, and None / NaN / "" are the same empty value.
+
+Exit code 1 if anything differs, so the script works as a regression gate.
+
+Known differences against the baseline: it sorted the RefPoint % text
+column lexicographically for the top 3 ("98.9" before "112.2"), so
+pisterefcompresults and the SOC values derived from it differ since 006
+sorts numerically; and 001 stores averages as DECIMAL(10,4), which moves a
+few 1-2 decimal roundings by one step. For engine refactorings use
+--reference 7bba353^ (last row-by-row app.py), where everything must match.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import pickle
+import re
+import subprocess
+import sys
+import tarfile
+import tempfile
+from decimal import Decimal
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(SCRIPT_DIR)
+
+# Natürlicher Schlüssel pro Tabelle (Default: id); diese ids vergibt erst der Lauf selbst.
+TABLE_KEYS = {
+    "pisteresults": ("athlete_id", "discipline_id", "TestYear"),
+    "compresultsrefpercent": ("compresult_id", "PisteYear"),
+    "pisterefcompresults": ("first_name", "last_name", "PisteYear"),
+    "socadditionalvalues": ("toolenvironment", "first_name", "last_name", "PisteYear"),
+}
+# Zeitstempel des Laufs, nicht Teil des Resultats
+IGNORED_COLUMNS = {"compresults": {"timestamp"}}
+_REFPOINT_COLUMN = re.compile(r"^PisteRefPoints(\d{4})%$")
+_YES = {"yes", "ja", "true", "y"}
+_NO = {"no", "nein", "false", "n"}
+
+
+# ── Side run (subprocess) ─────────────────────────────────────────────────────
+
+# Baseline ohne run_*: (Seite, Auswahlfeld, Button) in Pipeline-Reihenfolge
+_PAGE_STEPS = [
+    ("Piste Punkte neu berechnen", "📅 Testjahr für Neuberechnung wählen", "🔄 Neuberechnung starten"),
+    ("Wettkampf-Bewertung", "PisteYear gezielt neu berechnen", "🔄 Nur PisteYear {year} neu berechnen"),
+    ("Piste RefPoint Competition Analyse", "Jahr für Analyse wählen", "Full Analyse"),
+    ("SOC Full Calculation", "PisteYear wählen", "SOC Full Calculation starten"),
+]
+
+
+def _page_engine(tree):
+    """Recompute one PisteYear by clicking through the Streamlit pages of ``tree``/app.py."""
+    import streamlit as st
+    from streamlit.testing.v1 import AppTest
+
+    script = os.path.join(tree, "app.py")
+
+    def check(at, page):
+        if at.exception:
+            raise RuntimeError(f"{page}: {at.exception[0].message}")
+
+    def run(year):
+        for page, select_label, button_label in _PAGE_STEPS:
+            st.cache_data.clear()  # die Seiten cachen Tabellen, die der vorige Schritt geschrieben hat
+            at = AppTest.from_file(script, default_timeout=3600)
+            at.session_state["user"] = {"email": "golden_compare"}
+            at.session_state["page"] = page
+            at.run()
+            check(at, page)
+            box = next((b for b in at.selectbox if b.label == select_label), None)
+            if box is None or str(year) not in [str(o) for o in box.options]:
+                raise RuntimeError(f"{page}: PisteYear {year} not selectable")
+            box.select_index([str(o) for o in box.options].index(str(year))).run()
+            check(at, page)
+            label = button_label.format(year=year)
+            button = next((b for b in at.button if b.label == label), None)
+            if button is None:
+                raise RuntimeError(f"{page}: button {label!r} missing")
+            button.click().run()
+            check(at, page)
+    return run
+
+
+def _engine(tree):
+    """Callable that recomputes one PisteYear with the engine of the checkout in ``tree``."""
+    if os.path.exists(os.path.join(tree, "divingeval", "pipeline.py")):
+        from divingeval.pipeline import run_pipeline
+        return lambda year: run_pipeline(year)
+    import app
+
+    missing = [name for name in ("run_punkte_neuberechnen", "run_wettkampf_bewertung", "run_refpoint_full_analyse", "run_soc_full_calculation") if not hasattr(app, name)]
+    if len(missing) == 4:
+        return _page_engine(tree)
+    if missing:
+        raise RuntimeError(f"checkout has no headless engine ({', '.join(missing)} missing)")
+
+    def run(year):
+        # die alte Seite reichte das TestYear als int aus pisteresults durch, die übrigen als Text
+        app.run_punkte_neuberechnen(int(year))
+        app.run_wettkampf_bewertung("year", pisteyear=year)
+        errors = [text for level, text in app.run_refpoint_full_analyse(year) or [] if level == "error"]
+        if errors:
+            raise RuntimeError(errors[0])
+        app.run_soc_full_calculation(year)
+    return run
+
+
+def _run_side(tree, snapshot_path, output_path, years):
+    sys.path.insert(0, tree)
+    os.chdir(tree)
+    from memdb import MemoryDB
+
+    if tree != ROOT_DIR:
+        # memdb hängt das eigene Repo an sys.path; nur der Checkout darf Module liefern
+        sys.path[:] = [p for p in sys.path if os.path.abspath(p or ".") != ROOT_DIR]
+
+    with open(snapshot_path, "rb") as f:
+        snapshot = pickle.load(f)
+    mem = MemoryDB(snapshot)
+    log = io.StringIO()
+    with mem.installed(), contextlib.redirect_stdout(log):
+        # Schreib-Hooks gibt es erst mit identity.py / refdata.py
+        for module in ("identity", "refdata"):
+            if os.path.exists(os.path.join(tree, f"{module}.py")):
+                __import__(module).install()
+        run = _engine(tree)
+        for year in years:
+            run(year)
+    with open(output_path, "wb") as f:
+        pickle.dump({name: (list(table.columns), table.rows) for name, table in mem.tables.items()}, f)
+    if "divingeval" in sys.modules:
+        engine = "divingeval"
+    else:
+        engine = "app.run_*" if hasattr(sys.modules["app"], "run_soc_full_calculation") else "AppTest pages"
+    print(f"{engine}, {len(years)} PisteYear(s), {mem.stats['queries']} queries, {mem.stats['statements']} statements")
+
+
+# ── Checkouts ─────────────────────────────────────────────────────────────────
+
+def _git(*args):
+    return subprocess.run(["git", *args], cwd=ROOT_DIR, capture_output=True, check=True)
+
+
+def default_reference():
+    """Root commit of the history: the baseline before any of the engine rewrites."""
+    roots = _git("rev-list", "--max-parents=0", "HEAD").stdout.decode().split()
+    return roots[-1][:12]
+
+
+def shipped_migrations(tree):
+    """Migration versions in ``tree``/sqltables/migrations that memdb models."""
+    from memdb import MIGRATIONS
+
+    directory = os.path.join(tree, "sqltables", "migrations")
+    names = os.listdir(directory) if os.path.isdir(directory) else []
+    versions = {int(m.group(1)) for m in (re.match(r"^(\d{3})_.*\.sql$", n) for n in names) if m}
+    return versions & set(MIGRATIONS)
+
+
+def checkout(ref, target):
+    """Tree of ``ref`` in ``target``; "." is the working tree itself."""
+    if ref == ".":
+        return ROOT_DIR
+    archive = _git("archive", "--format=tar", ref).stdout
+    with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+        tar.extractall(target)
+    return target
+
+
+def run_side(label, ref, snapshot, years, workdir):
+    from memdb import MIGRATIONS, unmigrate
+
+    tree = checkout(ref, os.path.join(workdir, label))
+    applied = shipped_migrations(tree)
+    if applied != set(MIGRATIONS):
+        snapshot = unmigrate(snapshot, applied)
+    snapshot_path = os.path.join(workdir, f"{label}_snapshot.pkl")
+    with open(snapshot_path, "wb") as f:
+        pickle.dump(snapshot, f)
+    output = os.path.join(workdir, f"{label}.pkl")
+    cmd = [sys.executable, os.path.abspath(__file__), "--run-side", tree, snapshot_path, output, *years]
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"{label} ({ref}) failed:\n{result.stderr.strip()[-3000:]}")
+    migrations = ", ".join(f"{v:03d}" for v in sorted(applied)) or "-"
+    print(f"  {label:<10} {ref:<14} migrations {migrations}, {result.stdout.strip()}")
+    with open(output, "rb") as f:
+        return canonical(pickle.load(f))
+
+
+# ── Diff ──────────────────────────────────────────────────────────────────────
+
+def canonical(tables):
+    """``{table: (columns, rows)}`` with RefPoint % as compresultsrefpercent rows.
+
+    After 006 the PisteRefPoints{Y}% columns are gone (memdb keeps them
+    unread); before 006 they are the data and become (compresult_id,
+    PisteYear, refpercent) rows as the 006 backfill would write them.
+    """
+    from memdb import _refpercent
+
+    tables = dict(tables)
+    if "compresults" not in tables:
+        return tables
+    columns, rows = tables["compresults"]
+    wide = [c for c in columns if _REFPOINT_COLUMN.match(c)]
+    if "compresultsrefpercent" not in tables:
+        long_rows = []
+        for row in rows:
+            for col in wide:
+                percent = _refpercent(row.get(col))
+                if percent is not None:
+                    long_rows.append({"compresult_id": row["id"], "PisteYear": int(_REFPOINT_COLUMN.match(col).group(1)), "refpercent": percent})
+        tables["compresultsrefpercent"] = (["compresult_id", "PisteYear", "refpercent"], long_rows)
+    tables["compresults"] = ([c for c in columns if c not in wide], rows)
+    return tables
+
+def normalize(value):
+    """Comparable form of a cell: None, float or casefolded text (yes/no unified)."""
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return "yes" if value else "no"
+    if isinstance(value, (int, float, Decimal)):
+        number = float(value)
+        return None if math.isnan(number) else number
+    text = str(value).strip()
+    lower = text.casefold()
+    if lower in ("", "nan", "none", "null"):
+        return None
+    if lower in _YES:
+        return "yes"
+    if lower in _NO:
+        return "no"
+    try:
+        number = float(text.replace(",", "."))
+        if math.isfinite(number):
+            return number
+    except ValueError:
+        pass
+    return lower
+
+
+def cells_equal(a, b, atol, rtol):
+    a, b = normalize(a), normalize(b)
+    if isinstance(a, float) and isinstance(b, float):
+        return math.isclose(a, b, rel_tol=rtol, abs_tol=atol)
+    return a == b
+
+
+def _row_key(row, keys):
+    return tuple(normalize(row.get(k)) for k in keys)
+
+
+def _sort_key(row):
+    return tuple(str(normalize(v)) for _, v in sorted(row.items()))
+
+
+def diff_table(name, reference, candidate, atol, rtol, columns=None):
+    """Cell differences of one table; ``columns`` limits the compared columns."""
+    keys = TABLE_KEYS.get(name, ("id",))
+    ignored = ({"id"} if name in TABLE_KEYS else set()) | IGNORED_COLUMNS.get(name, set())
+    groups = {}
+    for side, rows in (("reference", reference), ("candidate", candidate)):
+        for row in rows:
+            groups.setdefault(_row_key(row, keys), {"reference": [], "candidate": []})[side].append(row)
+
+    result = {"rows": max(len(reference), len(candidate)), "only_reference": [], "only_candidate": [], "cells": []}
+    for key, sides in groups.items():
+        ref_rows = sorted(sides["reference"], key=_sort_key)
+        cand_rows = sorted(sides["candidate"], key=_sort_key)
+        for ref_row, cand_row in zip(ref_rows, cand_rows):
+            for col in sorted((columns or set(ref_row) | set(cand_row)) - ignored):
+                if not cells_equal(ref_row.get(col), cand_row.get(col), atol, rtol):
+                    result["cells"].append({"key": key, "column": col, "reference": ref_row.get(col), "candidate": cand_row.get(col)})
+        result["only_reference"].extend([key] * max(0, len(ref_rows) - len(cand_rows)))
+        result["only_candidate"].extend([key] * max(0, len(cand_rows) - len(ref_rows)))
+    return result
+
+
+def print_diff(name, result, limit):
+    problems = len(result["cells"]) + len(result["only_reference"]) + len(result["only_candidate"])
+    if not problems:
+        print(f"  {name:<24} {result['rows']:>7} rows  ✅ identical")
+        return
+    print(
+        f"  {name:<24} {result['rows']:>7} rows  ⚠ {len(result['cells'])} cells differ, "
+        f"{len(result['only_reference'])} rows only in reference, {len(result['only_candidate'])} only in candidate"
+    )
+    for key in result["only_reference"][:limit]:
+        print(f"      - {key}")
+    for key in result["only_candidate"][:limit]:
+        print(f"      + {key}")
+    for cell in result["cells"][:limit]:
+        print(f"      {cell['key']} {cell['column']}: {cell['reference']!r} -> {cell['candidate']!r}")
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--run-side":
+        tree, snapshot_path, output_path, *years = sys.argv[2:]
+        _run_side(tree, snapshot_path, output_path, years)
+        return
+
+    parser = argparse.ArgumentParser(description="Compare the data written by two versions of the recalculation engines")
+    parser.add_argument("--year", action="append", required=True, help="PisteYear, repeatable")
+    parser.add_argument("--reference", default=None, help="git ref (default: the baseline, i.e. the root commit)")
+    parser.add_argument("--candidate", default=".", help='git ref or "." for the working tree (default)')
+    parser.add_argument("--scale", type=int, default=1, help="synthetic data scale factor")
+    parser.add_argument("--table", action="append", help="only compare these tables, repeatable")
+    parser.add_argument("--atol", type=float, default=1e-4, help="absolute tolerance for numbers (DECIMAL(10,4) = 1e-4)")
+    parser.add_argument("--rtol", type=float, default=1e-6, help="relative tolerance for numbers")
+    parser.add_argument("--limit", type=int, default=10, help="differences printed per table")
+    parser.add_argument("--report", help="write all differences to this JSON file")
+    args = parser.parse_args()
+
+    sys.path.insert(0, SCRIPT_DIR)
+    from memdb import load_snapshot
+    from synthetic_data import scale_snapshot
+
+    reference = args.reference or default_reference()
+    with tempfile.TemporaryDirectory(prefix="golden_") as workdir:
+        snapshot = scale_snapshot(load_snapshot(), args.scale)
+        print(f"Golden compare, PisteYear {', '.join(args.year)}, scale {args.scale}x")
+        try:
+            before = run_side("reference", reference, snapshot, args.year, workdir)
+            after = run_side("candidate", args.candidate, snapshot, args.year, workdir)
+        except RuntimeError as e:
+            print(e, file=sys.stderr)
+            sys.exit(2)
+
+    print()
+    report = {}
+    for name in sorted(set(before) | set(after)):
+        if args.table and name not in args.table:
+            continue
+        if name not in before or name not in after:
+            print(f"  {name:<24} only in the {'reference' if name in before else 'candidate'} schema, skipped")
+            continue
+        (ref_columns, ref_rows), (cand_columns, cand_rows) = before[name], after[name]
+        shared = set(ref_columns) & set(cand_columns)
+        report[name] = diff_table(name, ref_rows, cand_rows, args.atol, args.rtol, shared)
+        print_diff(name, report[name], args.limit)
+        skipped = sorted(set(ref_columns) ^ set(cand_columns))
+        if skipped:
+            print(f"      columns only on one side, not compared: {', '.join(skipped)}")
+
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump({"reference": reference, "candidate": args.candidate, "years": args.year, "tables": report}, f, indent=2, default=str)
+        print(f"\nSaved to {args.report}")
+    failed = any(r["cells"] or r["only_reference"] or r["only_candidate"] for r in report.values())
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
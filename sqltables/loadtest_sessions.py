@@ -0,0 +1,272 @@
+"""
+Load test: concurrent app sessions against the in-memory DB, without Azure SQL.
+Usage:
+    python sqltables/loadtest_sessions.py                                  # 1, 5, 10, 20 Sessions
+    python sqltables/loadtest_sessions.py --sessions 10 --latency-ms 20 --page "Athleten anzeigen"
+    python sqltables/loadtest_sessions.py --scale 10 --rounds 3 --report loadtest.json
+
+Every session is a streamlit.testing.v1.AppTest of app.py with the login
+stubbed (session_state["user"]), clicking through the viewer pages with the
+sidebar radio. db.py is pointed at memdb.MemoryDB with --latency-ms per round
+trip, so the pages run unchanged on the sqltables/*_rows.sql snapshot
+(optionally scaled by synthetic_data.py).
+
+First a single session opens every page with cleared caches (st.cache_data,
+refdata, identity): its queries per rerun are exact, as on a fresh instance
+after a deploy. Then each session count runs concurrently in threads, like
+one App Service instance, and reports per page p50 / p95 render time and
+queries per rerun (all sessions share the DB counter, so total queries /
+reruns), plus the process RSS after the run.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_PATH = os.path.join(os.path.dirname(SCRIPT_DIR), "app.py")
+sys.path.insert(0, SCRIPT_DIR)
+
+import streamlit as st  # noqa: E402
+import streamlit.logger  # noqa: E402
+from streamlit.runtime.runtime import Runtime  # noqa: E402
+from streamlit.runtime.scriptrunner.script_cache import ScriptCache  # noqa: E402
+from streamlit.testing.v1 import AppTest, app_test  # noqa: E402
+from streamlit.testing.v1.util import patch_config_options  # noqa: E402
+
+from memdb import MemoryDB, load_snapshot  # noqa: E402
+from synthetic_data import row_counts, scale_snapshot  # noqa: E402
+
+import identity  # noqa: E402
+import refdata  # noqa: E402
+
+# Seiten, die der Verband nach einem Wettkampfwochenende anschaut (nur lesend)
+DEFAULT_PAGES = [
+    "Startseite",
+    "Athleten anzeigen",
+    "Piste Resultate anzeigen",
+    "Wettkampfauswertungen",
+    "Wettkaempfe Top 3",
+    "Wettkampf-Performance pro Athlet",
+    "Full PISTE Results SOC",
+    "Kaderzugehörigkeiten",
+    "Full PISTE Results for Clubs",
+    "Referenz- und Bewertungstabellen",
+]
+DEFAULT_SESSIONS = [1, 5, 10, 20]
+LOGIN = {"email": "loadtest@swiss-aquatics.ch", "auth_source": "loadtest", "is_admin": True}
+
+
+def rss_mb():
+    """Resident set size of this process in MB (peak RSS where /proc is missing)."""
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def percentile(values, p):
+    """Nearest-rank percentile (p in 0..100) of ``values``."""
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    rank = max(1, -(-len(ordered) * p // 100))
+    return ordered[int(rank) - 1]
+
+
+@contextlib.contextmanager
+def concurrent_apptest():
+    """Let AppTests run in parallel threads, as sessions do on one server.
+
+    AppTest sets Runtime._instance before each run and clears it afterwards,
+    so one finishing session would pull the runtime from under the others:
+    inside this block Runtime.instance()/exists() fall back to the last one.
+    Each run also patches the global config option global.appTest on and
+    off, which switches it off for the sessions still running; here it stays
+    on for the whole block. And each run compiles the script, but parallel
+    ast.parse calls are not thread-safe: like the real server, the bytecode
+    is compiled once and shared.
+    """
+    original_instance, original_exists = Runtime.__dict__["instance"], Runtime.__dict__["exists"]
+    original_bytecode, original_patch = ScriptCache.get_bytecode, app_test.patch_config_options
+    last, bytecode, compile_lock = {}, {}, threading.Lock()
+
+    def instance(cls):
+        if cls._instance is not None:
+            last["runtime"] = cls._instance
+        if "runtime" not in last:
+            raise RuntimeError("Runtime hasn't been created!")
+        return last["runtime"]
+
+    def exists(cls):
+        return cls._instance is not None or "runtime" in last
+
+    def get_bytecode(self, script_path):
+        with compile_lock:
+            if script_path not in bytecode:
+                bytecode[script_path] = original_bytecode(self, script_path)
+            return bytecode[script_path]
+
+    Runtime.instance, Runtime.exists = classmethod(instance), classmethod(exists)
+    ScriptCache.get_bytecode = get_bytecode
+    app_test.patch_config_options = lambda overrides: contextlib.nullcontext()
+    try:
+        with patch_config_options({"global.appTest": True}):
+            yield
+    finally:
+        Runtime.instance, Runtime.exists = original_instance, original_exists
+        ScriptCache.get_bytecode = original_bytecode
+        app_test.patch_config_options = original_patch
+
+
+def _errors(at):
+    return [str(e.value)[:200] for e in at.exception]
+
+
+def open_session(timeout):
+    """Logged-in AppTest on the start page."""
+    at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+    at.session_state["user"] = dict(LOGIN)
+    at.run()
+    return at
+
+
+def visit(at, page):
+    """Click ``page`` in the sidebar; returns (seconds, errors)."""
+    started = time.perf_counter()
+    at.sidebar.radio[0].set_value(page).run()
+    return time.perf_counter() - started, _errors(at)
+
+
+def cold_pass(mem, pages, timeout):
+    """Queries of one rerun per page with empty caches (single session)."""
+    result = {}
+    at = open_session(timeout)
+    for page in pages:
+        st.cache_data.clear()
+        st.cache_resource.clear()
+        refdata.invalidate()
+        identity.invalidate()
+        mem.reset_stats()
+        seconds, errors = visit(at, page)
+        result[page] = {"seconds": round(seconds, 3), "queries": mem.stats["queries"], "rows_read": mem.stats["rows_read"], "errors": errors}
+    return result
+
+
+def _session(index, pages, rounds, timeout, samples, lock):
+    at = open_session(timeout)
+    # jede Session beginnt auf einer anderen Seite, sonst laufen alle im Gleichschritt
+    order = pages[index % len(pages):] + pages[:index % len(pages)]
+    for _ in range(rounds):
+        for page in order:
+            seconds, errors = visit(at, page)
+            with lock:
+                samples.append((page, seconds, errors))
+
+
+def run_level(mem, sessions, pages, rounds, timeout):
+    """``sessions`` concurrent sessions, each clicking ``rounds`` times through ``pages``."""
+    samples, lock = [], threading.Lock()
+    mem.reset_stats()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=sessions) as pool:
+        futures = [pool.submit(_session, i, pages, rounds, timeout, samples, lock) for i in range(sessions)]
+        for future in futures:
+            future.result()
+    wall = time.perf_counter() - started
+
+    reruns = len(samples)
+    per_page = {}
+    for page in pages:
+        timings = [s for p, s, _ in samples if p == page]
+        errors = sorted({e for p, _, errs in samples if p == page for e in errs})
+        per_page[page] = {
+            "p50_s": round(percentile(timings, 50), 3) if timings else None,
+            "p95_s": round(percentile(timings, 95), 3) if timings else None,
+            "reruns": len(timings),
+            "errors": errors,
+        }
+    return {
+        "wall_s": round(wall, 3),
+        "reruns": reruns,
+        "queries": mem.stats["queries"],
+        "queries_per_rerun": round(mem.stats["queries"] / reruns, 2) if reruns else None,
+        "rows_read": mem.stats["rows_read"],
+        "rss_mb": round(rss_mb(), 1),
+        "pages": per_page,
+    }
+
+
+def _print_level(sessions, level):
+    print(
+        f"{sessions} session(s): {level['reruns']} reruns in {level['wall_s']:.1f}s, "
+        f"{level['queries_per_rerun']} queries/rerun, RSS {level['rss_mb']:.0f} MB"
+    )
+    for page, r in level["pages"].items():
+        flag = f"  ⚠ {r['errors'][0]}" if r["errors"] else ""
+        print(f"    {page:<36} p50 {r['p50_s']:>7.3f}s  p95 {r['p95_s']:>7.3f}s{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent-session load test of the Streamlit app on the in-memory DB")
+    parser.add_argument("--sessions", type=int, action="append", help="concurrent sessions, repeatable (default: 1, 5, 10, 20)")
+    parser.add_argument("--page", action="append", help="page to visit, repeatable (default: the viewer pages)")
+    parser.add_argument("--rounds", type=int, default=2, help="times each session clicks through all pages")
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="added per query / statement")
+    parser.add_argument("--scale", type=int, default=1, help="synthetic data scale factor")
+    parser.add_argument("--timeout", type=float, default=300.0, help="seconds one rerun may take")
+    parser.add_argument("--report", help="write the results to this JSON file")
+    args = parser.parse_args()
+
+    pages = args.page or DEFAULT_PAGES
+    levels = args.sessions or DEFAULT_SESSIONS
+    # AppTest läuft ohne Server: "missing ScriptRunContext" u.ä. sind hier Rauschen
+    streamlit.logger.set_log_level("error")
+
+    snapshot = scale_snapshot(load_snapshot(), args.scale)
+    print(f"Load test, scale {args.scale}x ({', '.join(f'{k}={v}' for k, v in row_counts(snapshot).items())}), latency {args.latency_ms} ms")
+    mem = MemoryDB(snapshot, latency_ms=args.latency_ms)
+    results = {"cold": None, "levels": {}}
+    out = sys.stdout
+    # db._log schreibt jede Query auf stdout
+    with mem.installed(), concurrent_apptest(), contextlib.redirect_stdout(io.StringIO()):
+        results["cold"] = cold_pass(mem, pages, args.timeout)
+        print("\nCold rerun (1 session, empty caches):", file=out)
+        for page, r in results["cold"].items():
+            flag = f"  ⚠ {r['errors'][0]}" if r["errors"] else ""
+            print(f"    {page:<36} {r['seconds']:>7.3f}s  {r['queries']:>4} queries  {r['rows_read']:>7} rows{flag}", file=out)
+        for sessions in levels:
+            level = run_level(mem, sessions, pages, args.rounds, args.timeout)
+            results["levels"][str(sessions)] = level
+            print(file=out)
+            with contextlib.redirect_stdout(out):
+                _print_level(sessions, level)
+
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump({
+                "timestamp": datetime.now().isoformat(timespec="seconds"),
+                "params": {"scale": args.scale, "latency_ms": args.latency_ms, "rounds": args.rounds, "pages": pages},
+                **results,
+            }, f, indent=2)
+        print(f"\nSaved to {args.report}")
+    failed = any(r["errors"] for r in results["cold"].values()) or any(
+        r["errors"] for level in results["levels"].values() for r in level["pages"].values()
+    )
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
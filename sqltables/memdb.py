@@ -0,0 +1,774 @@
+"""
+In-memory stand-in for db.py, seeded from the sqltables/*_rows.sql dumps.
+
+The recalculation engines (divingeval) and the viewer pages only talk to
+Azure SQL through db.py.
+``MemoryDB.installed()`` swaps db's connection-level functions for in-memory
+versions, so the engines run unchanged against a snapshot: db.table_select,
+has_column, fetch_many and the write hooks stay the real code. Only the SQL
+shapes db.py and the engines generate are understood; anything else raises
+NotImplementedError instead of guessing.
+
+Every read and every statement is counted (``stats``), and ``latency_ms``
+adds a fixed round-trip per call to model the network.
+
+Usage:
+    snapshot = load_snapshot()            # dumps + migrations 001/003/004/005/006
+    mem = MemoryDB(snapshot, latency_ms=2)
+    with mem.installed():
+        run_pipeline(2026)
+
+``unmigrate(snapshot, applied)`` turns a snapshot back into the schema of
+an older checkout (golden_compare against the baseline), and ``installed``
+only patches what that checkout's db.py has.
+"""
+
+import decimal
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+import pandas as pd
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(SCRIPT_DIR)
+if SCRIPT_DIR not in sys.path:
+    sys.path.insert(0, SCRIPT_DIR)
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)  # hinten: ein Checkout davor (golden_compare) gewinnt
+
+import db  # noqa: E402
+import identity  # noqa: E402
+import refdata  # noqa: E402
+from import_data import parse_insert  # noqa: E402
+
+# db functions replaced while installed; everything above them stays real.
+_PATCHED = ("query", "query_df", "execute", "transaction", "insert_many", "update_many", "upsert_many", "delete_many")
+# Migrationen, die load_snapshot nachbildet (002 legt nur Indizes an)
+MIGRATIONS = (1, 3, 4, 5, 6)
+# 003: athlete_id nachgerüstet (pisteresults hatte die Spalte schon)
+_ATHLETE_ID_TABLES = ("compresults", "socadditionalvalues", "pisterefcompresults", "pistemirwald", "pisteenvironment", "trainingsperformance")
+# 004: Default-Schwellen (toolenvironment, PisteYear, first_name, last_name, national, regional, quality)
+_KADER_DEFAULTS = [
+    ("kaderthresholds", "global", "default", "all", "90", "70", "Fallback für alle Disziplinen"),
+    ("kaderthresholds", "global", "high diving", "all", "90", "70", "High Diving gesamt"),
+    ("kaderthresholds", "global", "high diving", "jugend", "90", "70", "High Diving Jugend"),
+    ("kaderthresholds", "global", "high diving", "elite", "90", "70", "High Diving Elite"),
+    ("kaderthresholds", "global", "high diving 20m", "all", "90", "70", "High Diving 20m"),
+    ("kaderthresholds", "global", "high diving 27m", "all", "90", "70", "High Diving 27m"),
+]
+
+_INT_TYPES = {"int", "bigint", "smallint", "tinyint"}
+_DECIMAL_TYPES = {"decimal", "numeric"}
+_FLOAT_TYPES = {"float", "real"}
+
+
+# ── Schema ────────────────────────────────────────────────────────────────────
+
+def _parse_create_tables(path):
+    """``{table: {column: (type, scale)}}`` from create_tables_azure.sql."""
+    with open(path, encoding="utf-8") as f:
+        sql = f.read()
+    tables = {}
+    for match in re.finditer(r"CREATE TABLE dbo\.(\w+)\s*\((.*?)\n\);", sql, re.DOTALL):
+        columns = {}
+        for line in match.group(2).splitlines():
+            line = line.strip()
+            if not line or line.startswith("--") or line.split()[0].upper() in ("CONSTRAINT", "PRIMARY", "FOREIGN", "UNIQUE"):
+                continue
+            col = re.match(r"\[?([^\]\s]+)\]?\s+([A-Za-z]+)(?:\((\d+)(?:\s*,\s*(\d+))?\))?", line)
+            if col:
+                columns[col.group(1)] = (col.group(2).lower(), int(col.group(4) or 0))
+        tables[match.group(1).lower()] = columns
+    return tables
+
+
+def _convert(value, column_type):
+    """Python value as pymssql returns it for ``column_type``."""
+    if value is None:
+        return None
+    kind, scale = column_type
+    try:
+        if kind in _INT_TYPES:
+            return int(float(str(value).strip()))
+        if kind in _DECIMAL_TYPES:
+            return decimal.Decimal(str(value).strip()).quantize(decimal.Decimal(1).scaleb(-scale), rounding=decimal.ROUND_HALF_UP)
+        if kind in _FLOAT_TYPES:
+            return float(value)
+        if kind == "bit":
+            return str(value).strip().lower() in ("1", "true")
+    except (ValueError, ArithmeticError):
+        return None
+    if isinstance(value, bool):
+        return str(int(value))
+    return value if isinstance(value, str) else str(value)
+
+
+class Table:
+    def __init__(self, name, columns, rows=None):
+        self.name = name
+        self.columns = dict(columns)  # column -> (type, scale)
+        self.rows = list(rows or [])
+
+    def has_column(self, column):
+        return self._column(column) is not None
+
+    def _column(self, column):
+        lower = str(column).strip().lower()
+        return next((c for c in self.columns if c.lower() == lower), None)
+
+    def typed(self, data):
+        """``data`` converted to the column types; unknown columns raise like SQL Server."""
+        row = {}
+        for key, value in data.items():
+            col = self._column(key)
+            if col is None:
+                raise ValueError(f"Invalid column name '{key}' in [{self.name}]")
+            row[col] = _convert(db._normalize_sql_param(value), self.columns[col])
+        return row
+
+    def copy(self):
+        return Table(self.name, self.columns, [dict(r) for r in self.rows])
+
+
+# 006: Langtabelle -> (breite Tabelle, Spalte der Stufe, Stufen)
+_LONG_TABLES = {
+    "pistereftrainingsincepoints": ("pistereftrainingsince", "years", range(0, 15)),
+    "pistereftrainingtimepoints": ("pistereftrainingtime", "hours", range(4, 31)),
+}
+
+
+def load_snapshot(directory=SCRIPT_DIR, tables=None):
+    """``{table: Table}`` from the dumps, migrated like production.
+
+    001 typed numeric columns, 003 athlete_id, 004 default kader thresholds,
+    005 competition_id/PisteYear on compresults and the 006 long tables
+    (backfilled from the wide dumps, which stay as the views; the
+    PisteRefPoints% columns stay on compresults but are no longer read).
+    """
+    schema = _parse_create_tables(os.path.join(directory, "create_tables_azure.sql"))
+    for table, typed in db._TYPED_COLUMNS.items():
+        for col, kind in typed.items():
+            if table in schema:
+                schema[table][col] = ("int", 0) if kind == "int" else ("decimal", 4)
+    for table in _ATHLETE_ID_TABLES:
+        schema.get(table, {}).setdefault("athlete_id", ("uniqueidentifier", 0))
+    schema["compresults"].update({"competition_id": ("int", 0), "PisteYear": ("int", 0)})
+    schema["compresultsrefpercent"] = {"compresult_id": ("int", 0), "PisteYear": ("int", 0), "refpercent": ("decimal", 2)}
+    for name, (_, level, _) in _LONG_TABLES.items():
+        schema[name] = {"id": ("int", 0), "age": ("int", 0), level: ("int", 0), "points": ("decimal", 4)}
+    schema["pisterefcomppointsage"] = {
+        "id": ("int", 0), "Discipline": ("nvarchar", 0), "sex": ("nvarchar", 0),
+        "age": ("int", 0), "ref": ("decimal", 4), "quality": ("decimal", 4),
+    }
+
+    snapshot = {}
+    for name, columns in schema.items():
+        if tables and name not in tables:
+            continue
+        table = Table(name, columns)
+        path = os.path.join(directory, f"{name}_rows.sql")
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                _, dump_columns, values = parse_insert(f.read())
+            for col in dump_columns:
+                table.columns.setdefault(col, ("nvarchar", 0))
+            table.rows = [table.typed(dict(zip(dump_columns, v))) for v in values]
+        snapshot[name] = table
+
+    if "athletes" in snapshot:
+        index = identity.AthleteIndex(snapshot["athletes"].rows)
+        for name, table in snapshot.items():
+            if name != "athletes" and table.has_column("athlete_id"):
+                for row in table.rows:
+                    row["athlete_id"] = row.get("athlete_id") or index.id_for_row(row)
+    if "competitions" in snapshot and "compresults" in snapshot:
+        competitions = refdata.CompetitionIndex(snapshot["competitions"].rows)
+        for row in snapshot["compresults"].rows:
+            comp = competitions.get(row.get("Competition")) or {}
+            row["competition_id"], row["PisteYear"] = comp.get("id"), comp.get("PisteYear")
+    if "socadditionalvalues" in snapshot:
+        table = snapshot["socadditionalvalues"]
+        next_id = max((r["id"] for r in table.rows if r.get("id") is not None), default=0)
+        columns = ("toolenvironment", "PisteYear", "first_name", "last_name", "CompPointsNationalTeam", "CompPointsRegionalTeam", "quality")
+        present = {
+            (str(r.get("first_name") or "").strip(), str(r.get("last_name") or "").strip())
+            for r in table.rows
+            if r.get("toolenvironment") == "kaderthresholds"
+        }
+        for values in _KADER_DEFAULTS:
+            if values[2:4] in present:
+                continue
+            next_id += 1
+            table.rows.append(table.typed({"id": next_id, **dict(zip(columns, values))}))
+    _backfill_long_tables(snapshot)
+    return snapshot
+
+
+def _as_text(value):
+    """NVARCHAR form of a typed value, as the Supabase dumps stored numbers."""
+    if value is None:
+        return None
+    if isinstance(value, decimal.Decimal):
+        return format(value.normalize(), "f")
+    return str(value)
+
+
+def unmigrate(snapshot, applied):
+    """Copy of a load_snapshot() snapshot with only the ``applied`` migrations.
+
+    For checkouts older than a migration: 006 long tables and 005 compresults
+    columns disappear, 004 seed rows are removed, 003 athlete_id columns are
+    dropped and 001 columns go back to NVARCHAR text.
+    """
+    applied = set(applied)
+    result = clone_snapshot(snapshot)
+    if 6 not in applied:
+        for name in [*_LONG_TABLES, "pisterefcomppointsage", "compresultsrefpercent"]:
+            result.pop(name, None)
+    if 5 not in applied and "compresults" in result:
+        _drop_columns(result["compresults"], ("competition_id", "PisteYear"))
+    if 4 not in applied and "socadditionalvalues" in result:
+        table = result["socadditionalvalues"]
+        table.rows = [r for r in table.rows if str(r.get("toolenvironment") or "").strip().lower() != "kaderthresholds"]
+    if 3 not in applied:
+        for name in _ATHLETE_ID_TABLES:
+            if name in result:
+                _drop_columns(result[name], ("athlete_id",))
+    if 1 not in applied:
+        for name, typed in db._TYPED_COLUMNS.items():
+            table = result.get(name)
+            if table is None:
+                continue
+            for col in typed:
+                col = table._column(col)
+                if col is None:
+                    continue
+                table.columns[col] = ("nvarchar", 0)
+                for row in table.rows:
+                    if col in row:
+                        row[col] = _as_text(row[col])
+    return result
+
+
+def _drop_columns(table, columns):
+    for col in columns:
+        col = table._column(col)
+        if col is None:
+            continue
+        del table.columns[col]
+        for row in table.rows:
+            row.pop(col, None)
+
+
+def _first_per(rows, key):
+    """First row (lowest id) per ``key(row)``, ordered by key, like the 006 backfill."""
+    first = {}
+    for row in sorted(rows, key=lambda r: r["id"]):
+        k = key(row)
+        if k is not None:
+            first.setdefault(k, row)
+    return first
+
+
+def _backfill_long_tables(snapshot):
+    for name, (wide, level, steps) in _LONG_TABLES.items():
+        if name not in snapshot or wide not in snapshot:
+            continue
+        rows = []
+        for age, row in sorted(_first_per(snapshot[wide].rows, lambda r: r.get("age")).items()):
+            for step in steps:
+                if row.get(str(step)) is not None:
+                    rows.append({"id": len(rows) + 1, "age": age, level: step, "points": row[str(step)]})
+        snapshot[name].rows = rows
+
+    if "pisterefcomppointsage" in snapshot and "pisterefcomppoints" in snapshot:
+        def key(r):
+            discipline, sex = str(r.get("Discipline") or "").strip(), str(r.get("sex") or "").strip()
+            return (discipline, sex) if discipline and sex else None
+
+        firsts = sorted(_first_per(snapshot["pisterefcomppoints"].rows, key).items(), key=lambda kv: kv[1]["id"])
+        rows = []
+        for (discipline, sex), row in firsts:
+            for age in range(8, 20):
+                ref, quality = row.get(str(age)), row.get(f"quality{age}")
+                if ref is not None or quality is not None:
+                    rows.append({"id": len(rows) + 1, "Discipline": discipline, "sex": sex, "age": age, "ref": ref, "quality": quality})
+        snapshot["pisterefcomppointsage"].rows = rows
+
+    if "compresultsrefpercent" in snapshot and "compresults" in snapshot:
+        table = snapshot["compresultsrefpercent"]
+        table.rows = []
+        for row in snapshot["compresults"].rows:
+            for year in range(2024, 2031):
+                percent = _refpercent(row.get(f"PisteRefPoints{year}%"))
+                if percent is not None:
+                    table.rows.append(table.typed({"compresult_id": row["id"], "PisteYear": year, "refpercent": percent}))
+
+
+def _refpercent(raw):
+    """TRY_CONVERT(DECIMAL(10,2), ...) of a PisteRefPoints% cell as in the 006 backfill."""
+    if raw is None:
+        return None
+    try:
+        return decimal.Decimal(str(raw).strip().replace("%", "").replace(",", ".")).quantize(decimal.Decimal("0.01"))
+    except decimal.InvalidOperation:
+        return None
+
+
+# ── Minimal SQL ───────────────────────────────────────────────────────────────
+
+def _number(value):
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float, decimal.Decimal)):
+        return float(value)
+    try:
+        return float(str(value).strip())
+    except (TypeError, ValueError):
+        return None
+
+
+def _sql_equal(a, b, as_text=False):
+    """``a = b`` as SQL Server compares a column to a parameter (NULL never matches)."""
+    if a is None or b is None:
+        return False
+    if not as_text and (isinstance(a, (int, float, decimal.Decimal)) or isinstance(b, (int, float, decimal.Decimal))):
+        na, nb = _number(a), _number(b)
+        if na is not None and nb is not None:
+            return na == nb
+    return str(a).rstrip().casefold() == str(b).rstrip().casefold()
+
+
+_COL = r"(?:t\.)?\[([^\]]+)\]"
+_CAST = r"CAST\({} AS NVARCHAR\(\d+\)\)"
+_CONDITIONS = [
+    (re.compile(rf"^{_COL} = %s$"), "eq"),
+    (re.compile(rf"^{_CAST.format(_COL)} = {_CAST.format('%s')}$"), "eq_text"),
+    (re.compile(rf"^{_COL} = '([^']*)'$"), "eq_literal"),
+    (re.compile(rf"^ISNULL\({_COL}, ''\) <> '([^']*)'$"), "ne_literal"),
+    (re.compile(rf"^{_COL} IS NOT NULL$"), "not_null"),
+    (re.compile(rf"^{_COL} IS NULL$"), "null"),
+    (re.compile(rf"^{_COL} IN \(((?:%s, )*%s)\)$"), "in"),
+    (re.compile(r"^LTRIM\(RTRIM\(\[?(\w+)\]?\)\) ?= ?%s$"), "eq_trimmed"),
+]
+
+
+def _compile_where(where_sql, params):
+    """Predicate for an AND-list of the conditions db.py generates; returns (predicate, unused params)."""
+    params = list(params or [])
+    tests = []
+    for part in re.split(r"\s+AND\s+", where_sql.strip(), flags=re.IGNORECASE) if where_sql else []:
+        for pattern, kind in _CONDITIONS:
+            m = pattern.match(part.strip())
+            if m:
+                break
+        else:
+            raise NotImplementedError(f"memdb: unsupported condition {part!r}")
+        col = m.group(1)
+        if kind in ("eq", "eq_text"):
+            value = params.pop(0)
+            tests.append(lambda r, c=col, v=value, t=(kind == "eq_text"): _sql_equal(_get(r, c), v, as_text=t))
+        elif kind == "eq_trimmed":
+            value = params.pop(0)
+            tests.append(lambda r, c=col, v=value: _sql_equal(str(_get(r, c)).strip() if _get(r, c) is not None else None, v, as_text=True))
+        elif kind == "eq_literal":
+            tests.append(lambda r, c=col, v=m.group(2): _sql_equal(_get(r, c), v, as_text=True))
+        elif kind == "ne_literal":
+            tests.append(lambda r, c=col, v=m.group(2): not _sql_equal("" if _get(r, c) is None else _get(r, c), v, as_text=True))
+        elif kind == "not_null":
+            tests.append(lambda r, c=col: _get(r, c) is not None)
+        elif kind == "null":
+            tests.append(lambda r, c=col: _get(r, c) is None)
+        else:
+            values = [params.pop(0) for _ in range(m.group(2).count("%s"))]
+            tests.append(lambda r, c=col, vs=values: any(_sql_equal(_get(r, c), v) for v in vs))
+    return (lambda row: all(test(row) for test in tests)), params
+
+
+def _get(row, column):
+    if column in row:
+        return row[column]
+    lower = column.lower()
+    return next((v for k, v in row.items() if k.lower() == lower), None)
+
+
+def _order_rows(rows, order_by):
+    """``rows`` sorted by an ORDER BY list of columns (optionally TRY_CONVERT(int, ...)); NULLs first."""
+    for item in reversed(re.split(r",(?![^()]*\))", order_by)):
+        m = _ORDER_ITEM_RE.match(item.strip())
+        if not m:
+            raise NotImplementedError(f"memdb: unsupported order item {item!r}")
+        as_int, col, descending = m.group(1), m.group(2), (m.group(3) or "").upper() == "DESC"
+
+        def key(row, c=col, as_int=as_int):
+            value = _get(row, c)
+            if as_int:
+                number = _number(value)
+                value = int(number) if number is not None and number.is_integer() else None
+            if value is None:
+                return (0, 0, "")
+            number = _number(value)
+            return (1, number, "") if number is not None else (1, 0, str(value).casefold())
+
+        rows = sorted(rows, key=key, reverse=descending)
+    return rows
+
+
+def _select_list(select, table):
+    """``[(source column, output name)]``; ``*`` keeps the table's columns."""
+    if select.strip() == "*":
+        return [(c, c) for c in table.columns]
+    items = []
+    for item in select.split(","):
+        m = re.match(r"^\s*\[?([^\[\]()]+?)\]?(?:\s+AS\s+\[?(\w+)\]?)?\s*$", item, re.IGNORECASE)
+        if not m or m.group(1).strip().upper() == "DISTINCT":
+            raise NotImplementedError(f"memdb: unsupported select item {item!r}")
+        col = table._column(m.group(1).strip())
+        if col is None:
+            raise ValueError(f"Invalid column name '{m.group(1).strip()}' in [{table.name}]")
+        items.append((col, m.group(2) or col))
+    return items
+
+
+_SELECT_RE = re.compile(
+    r"^SELECT\s+(DISTINCT\s+)?(.+?)\s+FROM\s+(?:dbo\.)?\[?(\w+)\]?(?:\s+WHERE\s+(.+?))?(?:\s+ORDER\s+BY\s+(.+))?$",
+    re.IGNORECASE | re.DOTALL,
+)
+_ORDER_ITEM_RE = re.compile(r"^(TRY_CONVERT\(int, )?\[?(\w+)\]?\)?(?: (ASC|DESC))?$", re.IGNORECASE)
+_MAX_RE = re.compile(r"^SELECT ISNULL\(MAX\((\w+)\), 0\) AS (\w+) FROM \[(\w+)\]$", re.IGNORECASE)
+_COLUMNS_RE = re.compile(
+    r"^SELECT (COUNT\(\*\) AS n|DATA_TYPE) FROM INFORMATION_SCHEMA\.COLUMNS "
+    r"WHERE TABLE_NAME = %s AND COLUMN_NAME = (%s|'(\w+)')$",
+    re.IGNORECASE,
+)
+_DELETE_RE = re.compile(r"^DELETE FROM \[(\w+)\] WHERE (.+)$", re.IGNORECASE | re.DOTALL)
+_INSERT_RE = re.compile(r"^INSERT INTO \[(\w+)\] \((.+?)\) VALUES (.+)$", re.IGNORECASE | re.DOTALL)
+_UPDATE_RE = re.compile(r"^UPDATE \[(\w+)\] SET (.+?) WHERE (.+)$", re.IGNORECASE | re.DOTALL)
+_SET_RE = re.compile(r"^\[([^\]]+)\] = %s$")
+
+
+# ── Stand-in ──────────────────────────────────────────────────────────────────
+
+class _Transaction:
+    """What db.Transaction offers; writes are undone if the block raises."""
+
+    def __init__(self, mem):
+        self._mem = mem
+        self.undo = []
+
+    def query(self, sql, params=None):
+        return self._mem.query(sql, params)
+
+    def execute(self, sql, params=None):
+        return self._mem.execute(sql, params, tx=self)
+
+    def executemany(self, sql, seq_of_params):
+        return sum(self.execute(sql, p) or 0 for p in seq_of_params)
+
+
+class MemoryDB:
+    """In-memory tables that answer db.py's SQL; see the module docstring."""
+
+    def __init__(self, snapshot, latency_ms=0.0):
+        self.tables = {name.lower(): table.copy() for name, table in snapshot.items()}
+        self.latency = max(0.0, float(latency_ms)) / 1000.0
+        self.stats = {"queries": 0, "statements": 0, "rows_read": 0, "rows_written": 0}
+        self._lock = threading.RLock()
+
+    def table(self, name):
+        table = self.tables.get(str(name).strip().strip("[]").lower())
+        if table is None:
+            raise ValueError(f"Invalid object name '{name}'")
+        return table
+
+    def reset_stats(self):
+        with self._lock:
+            for key in self.stats:
+                self.stats[key] = 0
+
+    def _count(self, key, n=1):
+        with self._lock:
+            self.stats[key] += n
+
+    def _round_trip(self, key="queries"):
+        self._count(key)
+        if self.latency:
+            time.sleep(self.latency)
+
+    # -- reads --
+
+    def query(self, sql, params=None):
+        self._round_trip()
+        sql = " ".join(str(sql).split())
+        params = db._normalize_sql_params(params)
+        with self._lock:
+            rows = self._query(sql, params)
+        self._count("rows_read", len(rows))
+        return rows
+
+    def _query(self, sql, params):
+        m = _COLUMNS_RE.match(sql)
+        if m:
+            table = self.tables.get(str(params[0]).lower())
+            col = table._column(m.group(3) or params[1]) if table else None
+            if m.group(1).upper() == "DATA_TYPE":
+                return [{"DATA_TYPE": table.columns[col][0]}] if col else []
+            return [{"n": 1 if col else 0}]
+        m = _MAX_RE.match(sql)
+        if m:
+            table = self.table(m.group(3))
+            if table.columns.get(m.group(1), ("",))[0] not in _INT_TYPES:
+                raise ValueError(f"Operand data type is invalid for max operator ([{table.name}].{m.group(1)})")
+            values = [r.get(m.group(1)) for r in table.rows if r.get(m.group(1)) is not None]
+            return [{m.group(2): max(values) if values else 0}]
+        m = _SELECT_RE.match(sql)
+        if not m:
+            raise NotImplementedError(f"memdb: unsupported query {sql!r}")
+        table = self.table(m.group(3))
+        predicate, _ = _compile_where(m.group(4), params)
+        items = _select_list(m.group(2), table)
+        source = [row for row in table.rows if predicate(row)]
+        if m.group(5):
+            source = _order_rows(source, m.group(5))
+        rows = [{out: row.get(col) for col, out in items} for row in source]
+        if m.group(1):
+            seen, distinct = set(), []
+            for row in rows:
+                key = tuple(str(v).rstrip().casefold() if v is not None else None for v in row.values())
+                if key not in seen:
+                    seen.add(key)
+                    distinct.append(row)
+            rows = distinct
+        return rows
+
+    def query_df(self, sql, params=None, schema=None):
+        rows = self.query(sql, params)
+        return db.coerce_frame(pd.DataFrame.from_records(rows), schema)
+
+    # -- writes --
+
+    def execute(self, sql, params=None, tx=None):
+        if tx is None:
+            with self.transaction() as own_tx:
+                return self.execute(sql, params, tx=own_tx)
+        self._round_trip("statements")
+        sql = " ".join(str(sql).split())
+        params = list(db._normalize_sql_params(params))
+        m = _DELETE_RE.match(sql)
+        if m:
+            predicate, _ = _compile_where(m.group(2), params)
+            return self._delete_rows(self.table(m.group(1)), predicate, tx)
+        m = _INSERT_RE.match(sql)
+        if m:
+            # table_insert / ältere Aufrufer: Hooks und Typ-Normalisierung hat db.py schon gemacht
+            target = self.table(m.group(1))
+            columns = [c.strip().strip("[]") for c in m.group(2).split(",")]
+            rows = [dict(zip(columns, params[i:i + len(columns)])) for i in range(0, len(params), len(columns))]
+            return self._append_rows(target, [target.typed(r) for r in rows], tx)
+        m = _UPDATE_RE.match(sql)
+        if m:
+            target = self.table(m.group(1))
+            columns = []
+            for item in m.group(2).split(","):
+                set_match = _SET_RE.match(item.strip())
+                if not set_match:
+                    raise NotImplementedError(f"memdb: unsupported statement {sql!r}")
+                columns.append(set_match.group(1))
+            data = target.typed(dict(zip(columns, params[:len(columns)])))
+            predicate, _ = _compile_where(m.group(3), params[len(columns):])
+            with self._lock:
+                matches = [r for r in target.rows if predicate(r)]
+                self._update_rows(target, matches, data, tx)
+            self._count("rows_written", len(matches))
+            return len(matches)
+        raise NotImplementedError(f"memdb: unsupported statement {sql!r}")
+
+    @contextmanager
+    def transaction(self):
+        tx = _Transaction(self)
+        try:
+            yield tx
+        except Exception:
+            with self._lock:
+                for undo in reversed(tx.undo):
+                    undo()
+            raise
+
+    def _delete_rows(self, table, predicate, tx):
+        with self._lock:
+            kept, removed = [], []
+            for row in table.rows:
+                (removed if predicate(row) else kept).append(row)
+            if removed:
+                before = table.rows
+                table.rows = kept
+                tx.undo.append(lambda: setattr(table, "rows", before))
+        self._count("rows_written", len(removed))
+        return len(removed)
+
+    def _statements(self, rows, extra_columns=0):
+        """Statements db.py would send for ``rows``, for the counters and the latency."""
+        for columns, group in db._group_by_columns(rows).items():
+            n_columns = len(columns) + extra_columns
+            chunk = max(1, min(db._MAX_ROWS_PER_VALUES, db._MAX_PARAMS_PER_STATEMENT // max(n_columns, 1)))
+            for _ in range(-(-len(group) // chunk)):
+                self._round_trip("statements")
+
+    def _id_allocator(self, table):
+        """New ids like the server: MAX(id)+1 for INT ids, NEWID() otherwise."""
+        if table.columns.get("id", ("uniqueidentifier", 0))[0] not in _INT_TYPES:
+            return lambda: str(uuid.uuid4())
+        ids = [r["id"] for r in table.rows if r.get("id") is not None]
+        next_id = [max(ids) if ids else 0]
+
+        def allocate():
+            next_id[0] += 1
+            return next_id[0]
+        return allocate
+
+    def insert_many(self, table, rows, tx=None):
+        rows = [dict(r) for r in rows or []]
+        if not rows:
+            return 0
+        if tx is None:
+            with self.transaction() as own_tx:
+                return self.insert_many(table, rows, own_tx)
+        target = self.table(table)
+        prepared = [target.typed(db._normalize_typed_payload(table, db._apply_write_hooks("insert", table, r))) for r in rows]
+        self._statements(prepared)
+        return self._append_rows(target, prepared, tx)
+
+    def _append_rows(self, target, rows, tx):
+        with self._lock:
+            new_id = self._id_allocator(target)
+            for row in rows:
+                if row.get("id") is None and "id" in target.columns:
+                    row["id"] = new_id()
+                target.rows.append(row)
+            added = {id(r) for r in rows}
+            tx.undo.append(lambda: setattr(target, "rows", [r for r in target.rows if id(r) not in added]))
+        self._count("rows_written", len(rows))
+        return len(rows)
+
+    def _update_rows(self, target, matches, data, tx):
+        for row in matches:
+            old = {k: row.get(k) for k in data}
+            row.update(data)
+            tx.undo.append(lambda row=row, old=old: row.update(old))
+
+    def update_many(self, table, updates, key="id", tx=None):
+        updates = [(k, dict(data)) for k, data in updates or [] if data]
+        if not updates:
+            return 0
+        if tx is None:
+            with self.transaction() as own_tx:
+                return self.update_many(table, updates, key, own_tx)
+        target = self.table(table)
+        prepared = [(k, target.typed(db._normalize_typed_payload(table, db._apply_write_hooks("update", table, d)))) for k, d in updates]
+        self._statements([{"_key": k, **d} for k, d in prepared])
+        affected = 0
+        with self._lock:
+            by_key = {}
+            for row in target.rows:
+                by_key.setdefault(str(row.get(key)).rstrip().casefold(), []).append(row)
+            for key_value, data in prepared:
+                matches = by_key.get(str(key_value).rstrip().casefold(), [])
+                self._update_rows(target, matches, data, tx)
+                affected += len(matches)
+        self._count("rows_written", affected)
+        return affected
+
+    def upsert_many(self, table, rows, keys, tx=None):
+        keys = list(keys)
+        counts = {"inserted": 0, "updated": 0}
+        rows = list(rows or [])
+        if not rows:
+            return counts
+        if tx is None:
+            with self.transaction() as own_tx:
+                return self.upsert_many(table, rows, keys, own_tx)
+        # ältere Checkouts (golden_compare --reference) kennen den null-sicheren Schlüssel noch nicht
+        key_of = getattr(db, "_upsert_key", None) or (lambda row, keys: tuple(str(row.get(k)).strip().lower() for k in keys))
+        target = self.table(table)
+        deduped = {}
+        for row in rows:
+            prepared_row = target.typed(db._normalize_typed_payload(table, db._apply_write_hooks("insert", table, dict(row))))
+            deduped[key_of(prepared_row, keys)] = prepared_row
+        prepared = list(deduped.values())
+        for _ in db._group_by_columns(prepared):
+            for _ in range(4):  # DROP, SELECT INTO, MERGE, DROP
+                self._round_trip("statements")
+        self._statements(prepared)
+        with self._lock:
+            existing = {}
+            for row in target.rows:
+                existing.setdefault(key_of(row, keys), []).append(row)
+            inserted = []
+            new_id = self._id_allocator(target)
+            for row in prepared:
+                matches = existing.get(key_of(row, keys))
+                if matches:
+                    self._update_rows(target, matches, {k: v for k, v in row.items() if k not in keys}, tx)
+                    counts["updated"] += len(matches)
+                else:
+                    if row.get("id") is None and "id" in target.columns:
+                        row["id"] = new_id()
+                    target.rows.append(row)
+                    inserted.append(row)
+                    counts["inserted"] += 1
+            if inserted:
+                added = {id(r) for r in inserted}
+                tx.undo.append(lambda: setattr(target, "rows", [r for r in target.rows if id(r) not in added]))
+        self._count("rows_written", counts["inserted"] + counts["updated"])
+        return counts
+
+    def delete_many(self, table, key_values, key="id", tx=None):
+        key_values = [v for v in key_values or [] if v is not None]
+        if not key_values:
+            return 0
+        if tx is None:
+            with self.transaction() as own_tx:
+                return self.delete_many(table, key_values, key, own_tx)
+        db._apply_write_hooks("delete", table, {key: list(key_values)})
+        for _ in range(-(-len(key_values) // db._MAX_ROWS_PER_VALUES)):
+            self._round_trip("statements")
+        wanted = {str(v).rstrip().casefold() for v in key_values}
+        return self._delete_rows(self.table(table), lambda r: str(r.get(key)).rstrip().casefold() in wanted, tx)
+
+    # -- install --
+
+    @staticmethod
+    def _clear_caches():
+        # ältere Checkouts haben nicht alle Caches (Baseline: keinen)
+        for cache in ("_HAS_COLUMN_CACHE", "_ID_IS_INT_CACHE"):
+            getattr(db, cache, {}).clear()
+        # ältere Checkouts (golden_compare --reference) haben in identity einen eigenen Cache
+        getattr(identity, "_COLUMN_CACHE", {}).clear()
+        identity.invalidate()
+        refdata.invalidate()
+
+    @contextmanager
+    def installed(self):
+        """Route db.py to this instance inside the block (process-wide)."""
+        patched = [name for name in _PATCHED if hasattr(db, name)]
+        saved = {name: getattr(db, name) for name in patched}
+        self._clear_caches()
+        for name in patched:
+            setattr(db, name, getattr(self, name))
+        try:
+            yield self
+        finally:
+            for name, func in saved.items():
+                setattr(db, name, func)
+            self._clear_caches()
+
+
+def clone_snapshot(snapshot):
+    """Independent copy of a snapshot (rows are copied, values shared)."""
+    return {name: table.copy() for name, table in snapshot.items()}
+
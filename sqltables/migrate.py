@@ -0,0 +1,211 @@
+"""
+Apply versioned schema migrations (sqltables/migrations/NNN_name.sql) to Azure SQL.
+Usage: python sqltables/migrate.py [--status] [--dry-run] [--target NNN]
+
+Applied versions are recorded in dbo.schema_migrations; every migration runs
+in its own transaction, batches are separated by GO like in SSMS.
+"""
+
+import argparse
+import hashlib
+import os
+import re
+import sys
+import time
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+MIGRATIONS_DIR = os.path.join(SCRIPT_DIR, "migrations")
+# Laufende App-Prozesse verwerfen ihren db.has_column-Cache, sobald sich die mtime ändert
+SCHEMA_MARKER = os.path.join(SCRIPT_DIR, ".schema_applied")
+sys.path.insert(0, SCRIPT_DIR)
+
+from import_data import load_connection  # noqa: E402
+
+_FILE_RE = re.compile(r"^(\d{3,})_([\w\-]+)\.sql$")
+_GO_RE = re.compile(r"^\s*GO\s*;?\s*$", re.IGNORECASE | re.MULTILINE)
+# wie db._open_conn_with_driver: pausierte/serverless Azure SQL braucht beim Aufwachen bis ~2 min
+CONNECT_ATTEMPTS = 12
+
+
+# ── Migration files ───────────────────────────────────────────────────────────
+
+def discover_migrations() -> list[dict]:
+    """Return migrations sorted by version: [{version, name, path, checksum}]."""
+    migrations = []
+    if not os.path.isdir(MIGRATIONS_DIR):
+        return migrations
+    for filename in os.listdir(MIGRATIONS_DIR):
+        match = _FILE_RE.match(filename)
+        if not match:
+            continue
+        path = os.path.join(MIGRATIONS_DIR, filename)
+        with open(path, "rb") as f:
+            checksum = hashlib.sha256(f.read()).hexdigest()
+        migrations.append({
+            "version": int(match.group(1)),
+            "name": match.group(2),
+            "path": path,
+            "checksum": checksum,
+        })
+    migrations.sort(key=lambda m: m["version"])
+    versions = [m["version"] for m in migrations]
+    if len(versions) != len(set(versions)):
+        raise RuntimeError(f"Duplicate migration version in {MIGRATIONS_DIR}")
+    return migrations
+
+
+def split_batches(sql: str) -> list[str]:
+    """Split a script on GO separator lines; empty batches are dropped."""
+    return [b.strip() for b in _GO_RE.split(sql) if b.strip()]
+
+
+# ── Bookkeeping table ─────────────────────────────────────────────────────────
+
+def ensure_migrations_table(conn):
+    cur = conn.cursor()
+    cur.execute("""
+        IF OBJECT_ID('dbo.schema_migrations', 'U') IS NULL
+        CREATE TABLE dbo.schema_migrations (
+            version    INT           NOT NULL PRIMARY KEY,
+            name       NVARCHAR(255) NOT NULL,
+            checksum   CHAR(64)      NOT NULL,
+            applied_at DATETIME2     NOT NULL DEFAULT SYSUTCDATETIME()
+        )
+    """)
+    conn.commit()
+
+
+def applied_migrations(conn) -> dict:
+    cur = conn.cursor()
+    cur.execute("SELECT version, name, checksum, applied_at FROM dbo.schema_migrations ORDER BY version")
+    return {row[0]: {"name": row[1], "checksum": row[2], "applied_at": row[3]} for row in cur.fetchall()}
+
+
+def apply_migration(conn, migration: dict):
+    with open(migration["path"], encoding="utf-8") as f:
+        batches = split_batches(f.read())
+    cur = conn.cursor()
+    try:
+        for batch in batches:
+            cur.execute(batch)
+        cur.execute(
+            "INSERT INTO dbo.schema_migrations (version, name, checksum) VALUES (%s, %s, %s)",
+            (migration["version"], migration["name"], migration["checksum"]),
+        )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def report_rejects(conn, version: int):
+    """Print values a migration quarantined in dbo.migration_rejects (see 001)."""
+    cur = conn.cursor()
+    cur.execute(
+        "IF OBJECT_ID('dbo.migration_rejects', 'U') IS NOT NULL "
+        "SELECT table_name, column_name, COUNT(*) FROM dbo.migration_rejects WHERE version = %s "
+        "GROUP BY table_name, column_name ORDER BY table_name, column_name",
+        (version,),
+    )
+    rows = cur.fetchall() if cur.description else []
+    for table, column, count in rows:
+        print(f"  ⚠ {table}.{column}: {count} value(s) not convertible, originals kept in dbo.migration_rejects")
+
+
+def touch_schema_marker():
+    """Signal running app processes that the schema changed (see db.has_column)."""
+    with open(SCHEMA_MARKER, "a", encoding="utf-8"):
+        pass
+    os.utime(SCHEMA_MARKER, None)
+
+
+def connect(pymssql, cfg):
+    """pymssql connection with the retry/backoff of db._open_conn_with_driver (Azure SQL cold start)."""
+    for attempt in range(1, CONNECT_ATTEMPTS + 1):
+        try:
+            return pymssql.connect(
+                server=cfg["server"],
+                port=cfg["port"],
+                database=cfg["database"],
+                user=cfg["user"],
+                password=cfg["password"],
+                tds_version="7.4",
+                autocommit=False,
+            )
+        except Exception as exc:
+            if attempt == CONNECT_ATTEMPTS:
+                raise
+            wait = min(3 * attempt, 20)
+            print(f"  Connect attempt {attempt}/{CONNECT_ATTEMPTS} failed ({exc}), retrying in {wait}s …")
+            time.sleep(wait)
+
+
+# ── Main ──────────────────────────────────────────────────────────────────────
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply schema migrations to Azure SQL")
+    parser.add_argument("--status", action="store_true", help="only list applied/pending migrations")
+    parser.add_argument("--dry-run", action="store_true", help="show pending migrations without applying them")
+    parser.add_argument("--target", type=int, default=None, help="apply up to and including this version")
+    args = parser.parse_args()
+
+    migrations = discover_migrations()
+    if args.target is not None:
+        migrations = [m for m in migrations if m["version"] <= args.target]
+
+    try:
+        import pymssql
+    except ImportError:
+        print("pymssql not installed. Run: pip install pymssql")
+        sys.exit(1)
+
+    cfg = load_connection()
+    try:
+        conn = connect(pymssql, cfg)
+    except Exception as exc:
+        print(f"✗ Connection failed: {exc}")
+        sys.exit(1)
+    print(f"Connected to {cfg['server']}:{cfg['port']} / {cfg['database']}\n")
+
+    ensure_migrations_table(conn)
+    applied = applied_migrations(conn)
+
+    pending = []
+    for m in migrations:
+        done = applied.get(m["version"])
+        label = f"{m['version']:03d}_{m['name']}"
+        if done:
+            changed = "  (⚠ file changed since it was applied)" if done["checksum"] != m["checksum"] else ""
+            print(f"  ✓ {label}  applied {done['applied_at']}{changed}")
+        else:
+            print(f"  · {label}  pending")
+            pending.append(m)
+
+    if args.status or args.dry_run or not pending:
+        if not pending:
+            print("\nSchema is up to date.")
+        conn.close()
+        return
+
+    print()
+    for m in pending:
+        label = f"{m['version']:03d}_{m['name']}"
+        print(f"[{label}] applying …")
+        try:
+            apply_migration(conn, m)
+        except Exception as exc:
+            print(f"  ✗ {label} failed, rolled back: {exc}")
+            conn.close()
+            if m is not pending[0]:
+                touch_schema_marker()
+            sys.exit(1)
+        print(f"  ✓ {label} applied")
+        report_rejects(conn, m["version"])
+
+    conn.close()
+    touch_schema_marker()
+    print(f"\nApplied {len(pending)} migration(s).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+-- ============================================================
+-- 001: Typed numeric columns
+--
+-- Points, percentages, selection limits, reference values and SOC scores
+-- were imported as NVARCHAR(50) (Supabase export). Every column is
+-- cleansed first ("350,5" -> 350.5, "92.3%" -> 92.3, "" / "nan" / "-"
+-- -> NULL) and then converted to DECIMAL(10,4).
+-- Non-empty values that do not convert (text, out of range, fractional
+-- years) are copied with their row id to dbo.migration_rejects before
+-- the column is converted; migrate.py reports them. They end up NULL in
+-- the typed column, the original text stays in migration_rejects.
+-- competitions.PisteYear, pisteresults.TestYear and
+-- pisterefcompresults.PisteYear become INT.
+--
+-- Deliberately left as NVARCHAR:
+--   * yes/no flags (JEM/EM/WM, NationalTeam, RegionalTeam, pistemin*):
+--     the app compares them as 'yes'/'no' text.
+--   * socadditionalvalues.PisteYear / toolenvironment / quality /
+--     CompPoints*: these columns also hold the kaderthresholds rows
+--     ('global') and the injuryflags rows ('injuryflags:<year>').
+--   * selectionpoints.year and scoretables.result_min/result_max.
+--
+-- Keep db._TYPED_COLUMNS in sync with this file.
+-- ============================================================
+
+IF OBJECT_ID(N'dbo.migration_rejects', N'U') IS NULL
+CREATE TABLE dbo.migration_rejects (
+    id          INT IDENTITY(1,1) PRIMARY KEY,
+    version     INT            NOT NULL,
+    table_name  SYSNAME        NOT NULL,
+    column_name SYSNAME        NOT NULL,
+    row_id      NVARCHAR(100)  NULL,
+    value       NVARCHAR(4000) NULL,
+    recorded_at DATETIME2      NOT NULL DEFAULT SYSUTCDATETIME()
+);
+GO
+
+-- Helper for this migration only (temporary procedure, dropped with the session).
+CREATE PROCEDURE #convert_column
+    @table  SYSNAME,
+    @column SYSNAME,
+    @type   NVARCHAR(50)
+AS
+BEGIN
+    DECLARE @col NVARCHAR(300) = QUOTENAME(@column);
+    DECLARE @tbl NVARCHAR(300) = N'dbo.' + QUOTENAME(@table);
+    DECLARE @clean NVARCHAR(MAX) =
+        N'REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(LTRIM(RTRIM(' + @col + N')), ''%'', ''''), '','', ''.''), '' '', ''''), NCHAR(160), ''''), '''''''', '''')';
+    DECLARE @typed NVARCHAR(MAX) = N'TRY_CONVERT(' + @type + N', TRY_CONVERT(DECIMAL(18,4), ' + @clean + N'))';
+    DECLARE @sql NVARCHAR(MAX);
+
+    IF EXISTS (
+        SELECT 1 FROM sys.columns c JOIN sys.types t ON t.user_type_id = c.user_type_id
+        WHERE c.object_id = OBJECT_ID(@tbl) AND c.name = @column AND t.name IN (N'nvarchar', N'varchar')
+    )
+    BEGIN
+        -- Quarantine: original text of values that would silently become NULL (or lose decimals for INT)
+        SET @sql = N'INSERT INTO dbo.migration_rejects (version, table_name, column_name, row_id, value) '
+            + N'SELECT 1, @t, @c, CAST(id AS NVARCHAR(100)), CAST(' + @col + N' AS NVARCHAR(4000)) FROM ' + @tbl
+            + N' WHERE ' + @col + N' IS NOT NULL AND LOWER(' + @clean + N') NOT IN (N'''', N''nan'', N''none'', N''null'', N''-'')'
+            + N' AND (' + @typed + N' IS NULL OR TRY_CONVERT(DECIMAL(18,4), ' + @clean + N') <> ' + @typed + N');';
+        EXEC sp_executesql @sql, N'@t SYSNAME, @c SYSNAME', @t = @table, @c = @column;
+
+        SET @sql = N'UPDATE ' + @tbl + N' SET ' + @col + N' = CAST(' + @typed + N' AS NVARCHAR(50)) WHERE ' + @col + N' IS NOT NULL;';
+        EXEC sp_executesql @sql;
+    END
+
+    SET @sql = N'ALTER TABLE ' + @tbl + N' ALTER COLUMN ' + @col + N' ' + @type + N' NULL;';
+    EXEC sp_executesql @sql;
+END
+GO
+
+-- compresults
+EXEC #convert_column N'compresults', N'Points', N'DECIMAL(10,4)';
+EXEC #convert_column N'compresults', N'Difficulty', N'DECIMAL(10,4)';
+EXEC #convert_column N'compresults', N'AveragePoints', N'DECIMAL(10,4)';
+EXEC #convert_column N'compresults', N'JEM%', N'DECIMAL(10,4)';
+EXEC #convert_column N'compresults', N'EM%', N'DECIMAL(10,4)';
+EXEC #convert_column N'compresults', N'WM%', N'DECIMAL(10,4)';
+GO
+
+-- selectionpoints
+EXEC #convert_column N'selectionpoints', N'points', N'DECIMAL(10,4)';
+EXEC #convert_column N'selectionpoints', N'difficulty', N'DECIMAL(10,4)';
+GO
+
+-- pisterefcompresults
+EXEC #convert_column N'pisterefcompresults', N'points1', N'DECIMAL(10,4)';
+EXEC #convert_column N'pisterefcompresults', N'points2', N'DECIMAL(10,4)';
+EXEC #convert_column N'pisterefcompresults', N'points3', N'DECIMAL(10,4)';
+EXEC #convert_column N'pisterefcompresults', N'reference1', N'DECIMAL(10,4)';
+EXEC #convert_column N'pisterefcompresults', N'reference2', N'DECIMAL(10,4)';
+EXEC #convert_column N'pisterefcompresults', N'reference3', N'DECIMAL(10,4)';
+EXEC #convert_column N'pisterefcompresults', N'pointsaverage1', N'DECIMAL(10,4)';
+EXEC #convert_column N'pisterefcompresults', N'pointsaverage2', N'DECIMAL(10,4)';
+EXEC #convert_column N'pisterefcompresults', N'pointsaverage3', N'DECIMAL(10,4)';
+EXEC #convert_column N'pisterefcompresults', N'pointsaverageaverage', N'DECIMAL(10,4)';
+EXEC #convert_column N'pisterefcompresults', N'pointsaverageref%', N'DECIMAL(10,4)';
+EXEC #convert_column N'pisterefcompresults', N'refaverage', N'DECIMAL(10,4)';
+EXEC #convert_column N'pisterefcompresults', N'performance', N'DECIMAL(10,4)';
+EXEC #convert_column N'pisterefcompresults', N'quality', N'DECIMAL(10,4)';
+GO
+
+-- pisterefminpoints
+EXEC #convert_column N'pisterefminpoints', N'points_max', N'DECIMAL(10,4)';
+EXEC #convert_column N'pisterefminpoints', N'regio_min', N'DECIMAL(10,4)';
+EXEC #convert_column N'pisterefminpoints', N'national_min', N'DECIMAL(10,4)';
+GO
+
+-- socadditionalvalues
+EXEC #convert_column N'socadditionalvalues', N'trainingperf', N'DECIMAL(10,4)';
+EXEC #convert_column N'socadditionalvalues', N'resilience', N'DECIMAL(10,4)';
+EXEC #convert_column N'socadditionalvalues', N'trainingsince', N'DECIMAL(10,4)';
+EXEC #convert_column N'socadditionalvalues', N'trainingtime', N'DECIMAL(10,4)';
+EXEC #convert_column N'socadditionalvalues', N'piste', N'DECIMAL(10,4)';
+EXEC #convert_column N'socadditionalvalues', N'competitions', N'DECIMAL(10,4)';
+EXEC #convert_column N'socadditionalvalues', N'compenhancement', N'DECIMAL(10,4)';
+EXEC #convert_column N'socadditionalvalues', N'totalpoints', N'DECIMAL(10,4)';
+EXEC #convert_column N'socadditionalvalues', N'bioagevalue', N'DECIMAL(10,4)';
+EXEC #convert_column N'socadditionalvalues', N'mirwaldvalue', N'DECIMAL(10,4)';
+GO
+
+-- Year columns (IX_pisteresults_yr contains TestYear and is rebuilt afterwards)
+IF EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_pisteresults_yr' AND object_id = OBJECT_ID('dbo.pisteresults'))
+    DROP INDEX IX_pisteresults_yr ON dbo.pisteresults;
+EXEC #convert_column N'competitions', N'PisteYear', N'INT';
+EXEC #convert_column N'pisteresults', N'TestYear', N'INT';
+EXEC #convert_column N'pisterefcompresults', N'PisteYear', N'INT';
+CREATE INDEX IX_pisteresults_yr ON dbo.pisteresults (TestYear, athlete_id);
+GO
+
+DROP PROCEDURE #convert_column;
+GO
@@ -0,0 +1,36 @@
+-- ============================================================
+-- 002: Indexes for the real access paths
+--
+--   compresults          WHERE Competition = ...          (Bewertung, Kader, Selektionen)
+--   compresults          WHERE last_name/first_name = ... (Athlet, SOC, Korrektur)
+--   scoretables          discipline_id + category + sex, range on result_min
+--   socadditionalvalues  PisteYear + toolenvironment (+ name)
+--   pisterefcompresults  PisteYear (+ name)
+--
+-- The old name/year indexes are replaced by the covering variants below.
+-- ============================================================
+
+IF EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_compresults_name' AND object_id = OBJECT_ID('dbo.compresults'))
+    DROP INDEX IX_compresults_name ON dbo.compresults;
+IF EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_socadditional_yr' AND object_id = OBJECT_ID('dbo.socadditionalvalues'))
+    DROP INDEX IX_socadditional_yr ON dbo.socadditionalvalues;
+GO
+
+CREATE INDEX IX_compresults_competition
+    ON dbo.compresults (Competition)
+    INCLUDE (first_name, last_name, Discipline, CategoryStart, Points, sex, NationalTeam, RegionalTeam);
+
+CREATE INDEX IX_compresults_name
+    ON dbo.compresults (last_name, first_name)
+    INCLUDE (Competition, Discipline, CategoryStart, Points, AveragePoints, NationalTeam, RegionalTeam);
+
+CREATE INDEX IX_scoretables_lookup
+    ON dbo.scoretables (discipline_id, category, sex, result_min)
+    INCLUDE (result_max, points);
+
+CREATE INDEX IX_socadditional_yr_env
+    ON dbo.socadditionalvalues (PisteYear, toolenvironment, last_name, first_name);
+
+CREATE INDEX IX_pisterefcompresults_yr_name
+    ON dbo.pisterefcompresults (PisteYear, last_name, first_name);
+GO
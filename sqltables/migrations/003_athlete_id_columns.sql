@@ -0,0 +1,44 @@
+-- ============================================================
+-- 003: athlete_id on the name-keyed result tables
+--
+-- Adds a nullable athlete_id (athletes.id) plus an index to every table
+-- that so far referenced athletes only by first_name/last_name.
+-- The values are filled by `python identity.py --backfill` (run by
+-- startup.sh after migrate.py), which applies the name matching rules of
+-- the app (exact name, first/last token, full_name tokens). New rows get
+-- athlete_id when they are written through db.table_insert.
+-- No FK constraint: import_data.py re-imports tables independently.
+-- ============================================================
+
+IF COL_LENGTH('dbo.compresults', 'athlete_id') IS NULL
+    ALTER TABLE dbo.compresults ADD athlete_id UNIQUEIDENTIFIER NULL;
+GO
+
+IF COL_LENGTH('dbo.socadditionalvalues', 'athlete_id') IS NULL
+    ALTER TABLE dbo.socadditionalvalues ADD athlete_id UNIQUEIDENTIFIER NULL;
+GO
+
+IF COL_LENGTH('dbo.pisterefcompresults', 'athlete_id') IS NULL
+    ALTER TABLE dbo.pisterefcompresults ADD athlete_id UNIQUEIDENTIFIER NULL;
+GO
+
+IF COL_LENGTH('dbo.pistemirwald', 'athlete_id') IS NULL
+    ALTER TABLE dbo.pistemirwald ADD athlete_id UNIQUEIDENTIFIER NULL;
+GO
+
+IF COL_LENGTH('dbo.pisteenvironment', 'athlete_id') IS NULL
+    ALTER TABLE dbo.pisteenvironment ADD athlete_id UNIQUEIDENTIFIER NULL;
+GO
+
+IF COL_LENGTH('dbo.trainingsperformance', 'athlete_id') IS NULL
+    ALTER TABLE dbo.trainingsperformance ADD athlete_id UNIQUEIDENTIFIER NULL;
+GO
+
+CREATE INDEX IX_compresults_athlete ON dbo.compresults (athlete_id)
+    INCLUDE (Competition, Discipline, CategoryStart, Points, NationalTeam, RegionalTeam);
+CREATE INDEX IX_socadditionalvalues_athlete ON dbo.socadditionalvalues (athlete_id, PisteYear);
+CREATE INDEX IX_pisterefcompresults_athlete ON dbo.pisterefcompresults (athlete_id, PisteYear);
+CREATE INDEX IX_pistemirwald_athlete ON dbo.pistemirwald (athlete_id, PisteYear);
+CREATE INDEX IX_pisteenvironment_athlete ON dbo.pisteenvironment (athlete_id, PisteYear);
+CREATE INDEX IX_trainingsperformance_athlete ON dbo.trainingsperformance (athlete_id, PisteYear);
+GO
@@ -0,0 +1,33 @@
+-- ============================================================
+-- 004: Default kader %-thresholds
+--
+-- The thresholds live as marked rows in socadditionalvalues
+-- (toolenvironment = 'kaderthresholds', first_name = discipline,
+-- last_name = category group). The app used to seed them on every read;
+-- they are now seeded here once and only edited in the
+-- "Kader %-Schwellen" grid. Existing rows are left untouched.
+-- ============================================================
+
+INSERT INTO dbo.socadditionalvalues
+    (id, toolenvironment, PisteYear, first_name, last_name,
+     CompPointsNationalTeam, CompPointsRegionalTeam, quality)
+SELECT
+    (SELECT ISNULL(MAX(id), 0) FROM dbo.socadditionalvalues WITH (UPDLOCK, HOLDLOCK))
+        + ROW_NUMBER() OVER (ORDER BY d.sort),
+    'kaderthresholds', 'global', d.discipline, d.category_group,
+    d.national_percent, d.regional_percent, d.notes
+FROM (VALUES
+    (1, N'default',         N'all',    N'90', N'70', N'Fallback für alle Disziplinen'),
+    (2, N'high diving',     N'all',    N'90', N'70', N'High Diving gesamt'),
+    (3, N'high diving',     N'jugend', N'90', N'70', N'High Diving Jugend'),
+    (4, N'high diving',     N'elite',  N'90', N'70', N'High Diving Elite'),
+    (5, N'high diving 20m', N'all',    N'90', N'70', N'High Diving 20m'),
+    (6, N'high diving 27m', N'all',    N'90', N'70', N'High Diving 27m')
+) AS d(sort, discipline, category_group, national_percent, regional_percent, notes)
+WHERE NOT EXISTS (
+    SELECT 1 FROM dbo.socadditionalvalues s
+    WHERE s.toolenvironment = 'kaderthresholds'
+      AND LTRIM(RTRIM(s.first_name)) = d.discipline
+      AND LTRIM(RTRIM(s.last_name)) = d.category_group
+);
+GO
@@ -0,0 +1,33 @@
+-- ============================================================
+-- 005: compresults.competition_id + PisteYear
+--
+-- compresults only carried the competition name, so every year filter
+-- loaded all results and mapped Competition -> competitions.PisteYear in
+-- Python. The competition key and its PisteYear are now stored on each
+-- result (kept in sync by the app on insert and on competition edits)
+-- and the year filter is an indexed WHERE.
+-- ============================================================
+
+IF COL_LENGTH('dbo.compresults', 'competition_id') IS NULL
+    ALTER TABLE dbo.compresults ADD competition_id INT NULL;
+IF COL_LENGTH('dbo.compresults', 'PisteYear') IS NULL
+    ALTER TABLE dbo.compresults ADD PisteYear INT NULL;
+GO
+
+-- Backfill: Name-Match wie in der App (getrimmt, case-insensitive), kleinste id gewinnt.
+UPDATE cr
+SET competition_id = c.id,
+    PisteYear = TRY_CONVERT(INT, c.PisteYear)
+FROM dbo.compresults cr
+CROSS APPLY (
+    SELECT TOP 1 id, PisteYear
+    FROM dbo.competitions
+    WHERE LOWER(LTRIM(RTRIM(Name))) = LOWER(LTRIM(RTRIM(cr.Competition)))
+    ORDER BY id
+) c;
+GO
+
+CREATE INDEX IX_compresults_pisteyear ON dbo.compresults (PisteYear)
+    INCLUDE (first_name, last_name, Competition, Discipline, CategoryStart, Points, sex, NationalTeam, RegionalTeam);
+CREATE INDEX IX_compresults_competition_id ON dbo.compresults (competition_id);
+GO
@@ -0,0 +1,291 @@
+-- ============================================================
+-- 006: Long-format reference tables
+--
+-- The reference tables stored one column per age / training level and
+-- compresults one [PisteRefPoints{year}%] column per year, so the app
+-- picked values by building column names and every new year needed a
+-- schema change. They are now stored as one row per value:
+--
+--   pisterefcomppointsage       (Discipline, sex, age)     -> ref, quality
+--   pistereftrainingsincepoints (age, years)               -> points
+--   pistereftrainingtimepoints  (age, hours)               -> points
+--   compresultsrefpercent       (compresult_id, PisteYear) -> refpercent
+--
+-- The old wide tables become read-only views with the same name and
+-- columns (compresults' year columns: view compresultswide), so reports
+-- and scripts that read the old shape keep working.
+-- For duplicate (Discipline, sex) / age rows the lowest id wins, as the
+-- app took the first match.
+-- ============================================================
+
+CREATE TABLE dbo.pisterefcomppointsage (
+    id          INT           NOT NULL PRIMARY KEY,
+    Discipline  NVARCHAR(50)  NOT NULL,
+    sex         NVARCHAR(20)  NOT NULL,
+    age         INT           NOT NULL,
+    ref         DECIMAL(10,4) NULL,
+    quality     DECIMAL(10,4) NULL,
+    CONSTRAINT UQ_pisterefcomppointsage UNIQUE (Discipline, sex, age)
+);
+
+CREATE TABLE dbo.pistereftrainingsincepoints (
+    id      INT           NOT NULL PRIMARY KEY,
+    age     INT           NOT NULL,
+    years   INT           NOT NULL,
+    points  DECIMAL(10,4) NULL,
+    CONSTRAINT UQ_pistereftrainingsincepoints UNIQUE (age, years)
+);
+
+CREATE TABLE dbo.pistereftrainingtimepoints (
+    id      INT           NOT NULL PRIMARY KEY,
+    age     INT           NOT NULL,
+    hours   INT           NOT NULL,
+    points  DECIMAL(10,4) NULL,
+    CONSTRAINT UQ_pistereftrainingtimepoints UNIQUE (age, hours)
+);
+
+CREATE TABLE dbo.compresultsrefpercent (
+    compresult_id  INT           NOT NULL,
+    PisteYear      INT           NOT NULL,
+    refpercent     DECIMAL(10,2) NULL,
+    CONSTRAINT PK_compresultsrefpercent PRIMARY KEY (compresult_id, PisteYear),
+    CONSTRAINT FK_compresultsrefpercent_compresult FOREIGN KEY (compresult_id)
+        REFERENCES dbo.compresults(id) ON DELETE CASCADE
+);
+CREATE INDEX IX_compresultsrefpercent_year ON dbo.compresultsrefpercent (PisteYear) INCLUDE (refpercent);
+GO
+
+-- Backfill aus den breiten Tabellen
+INSERT INTO dbo.pisterefcomppointsage (id, Discipline, sex, age, ref, quality)
+SELECT ROW_NUMBER() OVER (ORDER BY w.id, v.age), w.d_key, w.s_key, v.age, v.ref, v.quality
+FROM (
+    SELECT *,
+        LTRIM(RTRIM(Discipline)) AS d_key, LTRIM(RTRIM(sex)) AS s_key,
+        ROW_NUMBER() OVER (PARTITION BY LTRIM(RTRIM(Discipline)), LTRIM(RTRIM(sex)) ORDER BY id) AS rn
+    FROM dbo.pisterefcomppoints
+    WHERE NULLIF(LTRIM(RTRIM(Discipline)), '') IS NOT NULL AND NULLIF(LTRIM(RTRIM(sex)), '') IS NOT NULL
+) w
+CROSS APPLY (VALUES
+        (8, w.[8], w.quality8),
+        (9, w.[9], w.quality9),
+        (10, w.[10], w.quality10),
+        (11, w.[11], w.quality11),
+        (12, w.[12], w.quality12),
+        (13, w.[13], w.quality13),
+        (14, w.[14], w.quality14),
+        (15, w.[15], w.quality15),
+        (16, w.[16], w.quality16),
+        (17, w.[17], w.quality17),
+        (18, w.[18], w.quality18),
+        (19, w.[19], w.quality19)
+) AS v(age, ref, quality)
+WHERE w.rn = 1 AND (v.ref IS NOT NULL OR v.quality IS NOT NULL);
+
+INSERT INTO dbo.pistereftrainingsincepoints (id, age, years, points)
+SELECT ROW_NUMBER() OVER (ORDER BY w.age, v.years), w.age, v.years, v.points
+FROM (
+    SELECT *, ROW_NUMBER() OVER (PARTITION BY age ORDER BY id) AS rn
+    FROM dbo.pistereftrainingsince
+    WHERE age IS NOT NULL
+) w
+CROSS APPLY (VALUES
+        (0, w.[0]),
+        (1, w.[1]),
+        (2, w.[2]),
+        (3, w.[3]),
+        (4, w.[4]),
+        (5, w.[5]),
+        (6, w.[6]),
+        (7, w.[7]),
+        (8, w.[8]),
+        (9, w.[9]),
+        (10, w.[10]),
+        (11, w.[11]),
+        (12, w.[12]),
+        (13, w.[13]),
+        (14, w.[14])
+) AS v(years, points)
+WHERE w.rn = 1 AND v.points IS NOT NULL;
+
+INSERT INTO dbo.pistereftrainingtimepoints (id, age, hours, points)
+SELECT ROW_NUMBER() OVER (ORDER BY w.age, v.hours), w.age, v.hours, v.points
+FROM (
+    SELECT *, ROW_NUMBER() OVER (PARTITION BY age ORDER BY id) AS rn
+    FROM dbo.pistereftrainingtime
+    WHERE age IS NOT NULL
+) w
+CROSS APPLY (VALUES
+        (4, w.[4]),
+        (5, w.[5]),
+        (6, w.[6]),
+        (7, w.[7]),
+        (8, w.[8]),
+        (9, w.[9]),
+        (10, w.[10]),
+        (11, w.[11]),
+        (12, w.[12]),
+        (13, w.[13]),
+        (14, w.[14]),
+        (15, w.[15]),
+        (16, w.[16]),
+        (17, w.[17]),
+        (18, w.[18]),
+        (19, w.[19]),
+        (20, w.[20]),
+        (21, w.[21]),
+        (22, w.[22]),
+        (23, w.[23]),
+        (24, w.[24]),
+        (25, w.[25]),
+        (26, w.[26]),
+        (27, w.[27]),
+        (28, w.[28]),
+        (29, w.[29]),
+        (30, w.[30])
+) AS v(hours, points)
+WHERE w.rn = 1 AND v.points IS NOT NULL;
+
+INSERT INTO dbo.compresultsrefpercent (compresult_id, PisteYear, refpercent)
+SELECT cr.id, v.PisteYear, p.refpercent
+FROM dbo.compresults cr
+CROSS APPLY (VALUES
+        (2024, cr.[PisteRefPoints2024%]),
+        (2025, cr.[PisteRefPoints2025%]),
+        (2026, cr.[PisteRefPoints2026%]),
+        (2027, cr.[PisteRefPoints2027%]),
+        (2028, cr.[PisteRefPoints2028%]),
+        (2029, cr.[PisteRefPoints2029%]),
+        (2030, cr.[PisteRefPoints2030%])
+) AS v(PisteYear, raw)
+CROSS APPLY (
+    SELECT TRY_CONVERT(DECIMAL(10,2), REPLACE(REPLACE(LTRIM(RTRIM(v.raw)), '%', ''), ',', '.')) AS refpercent
+) p
+WHERE p.refpercent IS NOT NULL;
+GO
+
+DROP TABLE dbo.pisterefcomppoints;
+DROP TABLE dbo.pistereftrainingsince;
+DROP TABLE dbo.pistereftrainingtime;
+ALTER TABLE dbo.compresults DROP COLUMN
+    [PisteRefPoints2024%],
+    [PisteRefPoints2025%],
+    [PisteRefPoints2026%],
+    [PisteRefPoints2027%],
+    [PisteRefPoints2028%],
+    [PisteRefPoints2029%],
+    [PisteRefPoints2030%];
+GO
+
+-- Kompatibilitäts-Views (nur lesen) im alten Format
+CREATE VIEW dbo.pisterefcomppoints AS
+SELECT
+    MIN(id) AS id, Discipline, sex,
+    MAX(CASE WHEN age = 8 THEN ref END) AS [8],
+    MAX(CASE WHEN age = 9 THEN ref END) AS [9],
+    MAX(CASE WHEN age = 10 THEN ref END) AS [10],
+    MAX(CASE WHEN age = 11 THEN ref END) AS [11],
+    MAX(CASE WHEN age = 12 THEN ref END) AS [12],
+    MAX(CASE WHEN age = 13 THEN ref END) AS [13],
+    MAX(CASE WHEN age = 14 THEN ref END) AS [14],
+    MAX(CASE WHEN age = 15 THEN ref END) AS [15],
+    MAX(CASE WHEN age = 16 THEN ref END) AS [16],
+    MAX(CASE WHEN age = 17 THEN ref END) AS [17],
+    MAX(CASE WHEN age = 18 THEN ref END) AS [18],
+    MAX(CASE WHEN age = 19 THEN ref END) AS [19],
+    MAX(CASE WHEN age = 8 THEN quality END) AS quality8,
+    MAX(CASE WHEN age = 9 THEN quality END) AS quality9,
+    MAX(CASE WHEN age = 10 THEN quality END) AS quality10,
+    MAX(CASE WHEN age = 11 THEN quality END) AS quality11,
+    MAX(CASE WHEN age = 12 THEN quality END) AS quality12,
+    MAX(CASE WHEN age = 13 THEN quality END) AS quality13,
+    MAX(CASE WHEN age = 14 THEN quality END) AS quality14,
+    MAX(CASE WHEN age = 15 THEN quality END) AS quality15,
+    MAX(CASE WHEN age = 16 THEN quality END) AS quality16,
+    MAX(CASE WHEN age = 17 THEN quality END) AS quality17,
+    MAX(CASE WHEN age = 18 THEN quality END) AS quality18,
+    MAX(CASE WHEN age = 19 THEN quality END) AS quality19
+FROM dbo.pisterefcomppointsage
+GROUP BY Discipline, sex;
+GO
+
+CREATE VIEW dbo.pistereftrainingsince AS
+SELECT
+    MIN(id) AS id, age,
+    MAX(CASE WHEN years = 0 THEN points END) AS [0],
+    MAX(CASE WHEN years = 1 THEN points END) AS [1],
+    MAX(CASE WHEN years = 2 THEN points END) AS [2],
+    MAX(CASE WHEN years = 3 THEN points END) AS [3],
+    MAX(CASE WHEN years = 4 THEN points END) AS [4],
+    MAX(CASE WHEN years = 5 THEN points END) AS [5],
+    MAX(CASE WHEN years = 6 THEN points END) AS [6],
+    MAX(CASE WHEN years = 7 THEN points END) AS [7],
+    MAX(CASE WHEN years = 8 THEN points END) AS [8],
+    MAX(CASE WHEN years = 9 THEN points END) AS [9],
+    MAX(CASE WHEN years = 10 THEN points END) AS [10],
+    MAX(CASE WHEN years = 11 THEN points END) AS [11],
+    MAX(CASE WHEN years = 12 THEN points END) AS [12],
+    MAX(CASE WHEN years = 13 THEN points END) AS [13],
+    MAX(CASE WHEN years = 14 THEN points END) AS [14]
+FROM dbo.pistereftrainingsincepoints
+GROUP BY age;
+GO
+
+CREATE VIEW dbo.pistereftrainingtime AS
+SELECT
+    MIN(id) AS id, age,
+    MAX(CASE WHEN hours = 4 THEN points END) AS [4],
+    MAX(CASE WHEN hours = 5 THEN points END) AS [5],
+    MAX(CASE WHEN hours = 6 THEN points END) AS [6],
+    MAX(CASE WHEN hours = 7 THEN points END) AS [7],
+    MAX(CASE WHEN hours = 8 THEN points END) AS [8],
+    MAX(CASE WHEN hours = 9 THEN points END) AS [9],
+    MAX(CASE WHEN hours = 10 THEN points END) AS [10],
+    MAX(CASE WHEN hours = 11 THEN points END) AS [11],
+    MAX(CASE WHEN hours = 12 THEN points END) AS [12],
+    MAX(CASE WHEN hours = 13 THEN points END) AS [13],
+    MAX(CASE WHEN hours = 14 THEN points END) AS [14],
+    MAX(CASE WHEN hours = 15 THEN points END) AS [15],
+    MAX(CASE WHEN hours = 16 THEN points END) AS [16],
+    MAX(CASE WHEN hours = 17 THEN points END) AS [17],
+    MAX(CASE WHEN hours = 18 THEN points END) AS [18],
+    MAX(CASE WHEN hours = 19 THEN points END) AS [19],
+    MAX(CASE WHEN hours = 20 THEN points END) AS [20],
+    MAX(CASE WHEN hours = 21 THEN points END) AS [21],
+    MAX(CASE WHEN hours = 22 THEN points END) AS [22],
+    MAX(CASE WHEN hours = 23 THEN points END) AS [23],
+    MAX(CASE WHEN hours = 24 THEN points END) AS [24],
+    MAX(CASE WHEN hours = 25 THEN points END) AS [25],
+    MAX(CASE WHEN hours = 26 THEN points END) AS [26],
+    MAX(CASE WHEN hours = 27 THEN points END) AS [27],
+    MAX(CASE WHEN hours = 28 THEN points END) AS [28],
+    MAX(CASE WHEN hours = 29 THEN points END) AS [29],
+    MAX(CASE WHEN hours = 30 THEN points END) AS [30]
+FROM dbo.pistereftrainingtimepoints
+GROUP BY age;
+GO
+
+CREATE VIEW dbo.compresultswide AS
+SELECT
+    cr.*,
+    p.[PisteRefPoints2024%],
+    p.[PisteRefPoints2025%],
+    p.[PisteRefPoints2026%],
+    p.[PisteRefPoints2027%],
+    p.[PisteRefPoints2028%],
+    p.[PisteRefPoints2029%],
+    p.[PisteRefPoints2030%]
+FROM dbo.compresults cr
+LEFT JOIN (
+    SELECT
+        compresult_id,
+        MAX(CASE WHEN PisteYear = 2024 THEN refpercent END) AS [PisteRefPoints2024%],
+        MAX(CASE WHEN PisteYear = 2025 THEN refpercent END) AS [PisteRefPoints2025%],
+        MAX(CASE WHEN PisteYear = 2026 THEN refpercent END) AS [PisteRefPoints2026%],
+        MAX(CASE WHEN PisteYear = 2027 THEN refpercent END) AS [PisteRefPoints2027%],
+        MAX(CASE WHEN PisteYear = 2028 THEN refpercent END) AS [PisteRefPoints2028%],
+        MAX(CASE WHEN PisteYear = 2029 THEN refpercent END) AS [PisteRefPoints2029%],
+        MAX(CASE WHEN PisteYear = 2030 THEN refpercent END) AS [PisteRefPoints2030%]
+    FROM dbo.compresultsrefpercent
+    GROUP BY compresult_id
+) p ON p.compresult_id = cr.id;
+GO
@@ -0,0 +1,127 @@
+"""
+Synthetic data scaled from the sqltables/*_rows.sql dumps.
+
+``scale_snapshot(snapshot, factor)`` keeps the real rows and adds
+``factor - 1`` clones of every athlete with their competitions, results and
+yearly values, so distributions, categories and edge cases stay those of
+production. Clone k gets the last name ``<name>-<k>``, competition
+``<Name> #<k>`` and fresh ids. scoretables grow by splitting every range into
+``factor`` sub-ranges with the same points, which lengthens the range scans
+without changing any score: each clone computes exactly like its original.
+
+Reference tables (age categories, selectionpoints, reference points, ...)
+are not scaled, their size does not grow with the number of athletes.
+"""
+
+import uuid
+
+from memdb import Table, clone_snapshot
+
+# Tables keyed to an athlete by name / athlete_id; cloned per athlete.
+ATHLETE_TABLES = ["compresults", "pisterefcompresults", "socadditionalvalues", "pistemirwald", "pisteenvironment", "trainingsperformance"]
+
+_NAMESPACE = uuid.UUID("6f1c2a52-3d2e-4c55-9b86-2f0e8d8f3a11")
+
+
+def _clone_id(value, k):
+    return str(uuid.uuid5(_NAMESPACE, f"{value}:{k}"))
+
+
+def _id_span(table):
+    ids = [r["id"] for r in table.rows if isinstance(r.get("id"), int)]
+    return max(ids) if ids else 0
+
+
+def _split_range(row, factor):
+    try:
+        low, high = float(row["result_min"]), float(row["result_max"])
+    except (TypeError, ValueError, KeyError):
+        return [dict(row) for _ in range(factor)]
+    if high <= low:
+        return [dict(row) for _ in range(factor)]
+    step = (high - low) / factor
+    bounds = [low + i * step for i in range(factor)] + [high]
+    return [
+        {
+            **row,
+            "result_min": str(round(bounds[i], 6)) if i else row["result_min"],
+            "result_max": str(round(bounds[i + 1], 6)) if i < factor - 1 else row["result_max"],
+        }
+        for i in range(factor)
+    ]
+
+
+def scale_snapshot(snapshot, factor):
+    """Copy of ``snapshot`` with ``factor``× the athletes and their data (factor 1 = plain copy)."""
+    factor = int(factor)
+    if factor < 1:
+        raise ValueError("factor must be >= 1")
+    scaled = clone_snapshot(snapshot)
+    if factor == 1:
+        return scaled
+
+    athletes = scaled["athletes"]
+    originals = list(athletes.rows)
+    for k in range(1, factor):
+        for a in originals:
+            last_name = f"{a.get('last_name') or ''}-{k}"
+            athletes.rows.append({
+                **a,
+                "id": _clone_id(a["id"], k),
+                "last_name": last_name,
+                "full_name": f"{a.get('first_name') or ''} {last_name}".strip(),
+            })
+
+    competitions = scaled.get("competitions")
+    comp_names = {}
+    if competitions is not None:
+        span = _id_span(competitions)
+        originals_comp = list(competitions.rows)
+        for k in range(1, factor):
+            for c in originals_comp:
+                name = f"{c['Name']} #{k}"
+                comp_names[(str(c["Name"]).strip().lower(), k)] = (name, c["id"] + k * span)
+                competitions.rows.append({**c, "id": c["id"] + k * span, "Name": name})
+
+    for table_name in ATHLETE_TABLES:
+        table = scaled.get(table_name)
+        if table is None:
+            continue
+        span = _id_span(table)
+        source = [r for r in table.rows if r.get("athlete_id")]  # z.B. Kader-Schwellen-Zeilen bleiben einfach
+        for k in range(1, factor):
+            for r in source:
+                clone = {**r, "last_name": f"{r.get('last_name') or ''}-{k}", "athlete_id": _clone_id(r["athlete_id"], k)}
+                if isinstance(r.get("id"), int):
+                    clone["id"] = r["id"] + k * span
+                for col in ("Competition", "competition1", "competition2", "competition3"):
+                    mapped = comp_names.get((str(r.get(col) or "").strip().lower(), k))
+                    if mapped:
+                        clone[col] = mapped[0]
+                        if col == "Competition" and "competition_id" in clone:
+                            clone["competition_id"] = mapped[1]
+                table.rows.append(clone)
+
+    pisteresults = scaled.get("pisteresults")
+    if pisteresults is not None:
+        originals_pr = list(pisteresults.rows)
+        for k in range(1, factor):
+            pisteresults.rows.extend(
+                {**r, "id": _clone_id(r["id"], k), "athlete_id": _clone_id(r["athlete_id"], k) if r.get("athlete_id") else None}
+                for r in originals_pr
+            )
+
+    scoretables = scaled.get("scoretables")
+    if scoretables is not None:
+        rows = []
+        for r in scoretables.rows:
+            for i, part in enumerate(_split_range(r, factor)):
+                if i:
+                    part["id"] = _clone_id(r["id"], i)
+                rows.append(part)
+        scaled["scoretables"] = Table(scoretables.name, scoretables.columns, rows)
+    return scaled
+
+
+def row_counts(snapshot, tables=("athletes", "competitions", "compresults", "pisteresults", "scoretables")):
+    return {name: len(snapshot[name].rows) for name in tables if name in snapshot}
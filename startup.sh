@@ -3,21 +3,10 @@
 # Use the active runtime interpreter for both installs and app execution.
 PYTHON_BIN=$(command -v python3)
 
-# Run data import once in the background if the flag file doesn't exist yet
+# Import, migration and backfill logs (the steps run right before streamlit, see below).
 IMPORT_FLAG=/home/site/.import_done
 IMPORT_LOG=/home/site/import.log
-
-if [ ! -f "$IMPORT_FLAG" ]; then
-    (
-        echo "=== IMPORT STARTED $(date) ===" > "$IMPORT_LOG"
-        "$PYTHON_BIN" -u /home/site/wwwroot/sqltables/import_data.py >> "$IMPORT_LOG" 2>&1
-        EXIT_CODE=$?
-        echo "--- PYTHON DONE, exit=$EXIT_CODE ---" >> "$IMPORT_LOG"
-        if [ $EXIT_CODE -eq 0 ]; then
-            touch "$IMPORT_FLAG"
-        fi
-    ) &
-fi
+MIGRATE_LOG=/home/site/migrate.log
 
 # Always run the deployed app from wwwroot to avoid stale /tmp artifacts.
 APP_PY=/home/site/wwwroot/app.py
@@ -98,6 +87,36 @@ else
     echo "Dependencies healthy in runtime env; skipping install" >> /home/site/startup_debug.log
 fi
 
+# Run data import once if the flag file doesn't exist yet, then apply pending schema
+# migrations (no-op when up to date) and backfill athlete_id. This needs the drivers
+# and dependencies above and must finish before the app serves the first session.
+if [ ! -f "$IMPORT_FLAG" ]; then
+    echo "=== IMPORT STARTED $(date) ===" > "$IMPORT_LOG"
+    "$PYTHON_BIN" -u /home/site/wwwroot/sqltables/import_data.py >> "$IMPORT_LOG" 2>&1
+    EXIT_CODE=$?
+    echo "--- PYTHON DONE, exit=$EXIT_CODE ---" >> "$IMPORT_LOG"
+    if [ $EXIT_CODE -eq 0 ]; then
+        touch "$IMPORT_FLAG"
+    fi
+fi
+
+if [ -f "$IMPORT_FLAG" ]; then
+    echo "=== MIGRATE STARTED $(date) ===" >> "$MIGRATE_LOG"
+    "$PYTHON_BIN" -u /home/site/wwwroot/sqltables/migrate.py >> "$MIGRATE_LOG" 2>&1
+    EXIT_CODE=$?
+    echo "--- MIGRATE DONE, exit=$EXIT_CODE ---" >> "$MIGRATE_LOG"
+    if [ $EXIT_CODE -ne 0 ]; then
+        # migrate.py retries the connect itself; a failure here is a real schema problem
+        echo "Migration failed (exit=$EXIT_CODE, see $MIGRATE_LOG); not starting the app" >> /home/site/startup_debug.log
+        exit $EXIT_CODE
+    fi
+    # Backfill is best effort: unmatched athlete_id fall back to the name match, the app starts anyway.
+    "$PYTHON_BIN" -u /home/site/wwwroot/identity.py --backfill >> "$MIGRATE_LOG" 2>&1
+    echo "--- ATHLETE_ID BACKFILL DONE, exit=$? ---" >> "$MIGRATE_LOG"
+else
+    echo "Import failed (see $IMPORT_LOG); skipping migrations and athlete_id backfill" >> "$MIGRATE_LOG"
+fi
+
 exec "$PYTHON_BIN" -m streamlit run "$APP_PY" \
     --server.port 8000 \
     --server.address 0.0.0.0 \
@@ -0,0 +1 @@
+"""Streamlit UI of app.py: login, shared widgets and caches, one module per page in ui.pages."""
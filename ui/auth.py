@@ -0,0 +1,149 @@
+"""Login: Entra ID (App Service authentication) or e-mail allow list."""
+
+import base64
+import json
+import os
+
+import streamlit as st
+
+
+def _get_secret_or_env(name, default=""):
+    try:
+        return st.secrets.get(name, os.getenv(name, default))
+    except Exception:
+        return os.getenv(name, default)
+
+
+def _get_allowed_login_emails():
+    configured = _get_secret_or_env("ALLOWED_LOGIN_EMAILS", "")
+    if configured:
+        return {e.strip().lower() for e in str(configured).split(",") if e and e.strip()}
+
+    # No allowlist configured -> password-only fallback for recovery.
+    return set()
+
+
+def _get_admin_entra_group_ids():
+    raw = _get_secret_or_env("ADMIN_ENTRA_GROUP_IDS", "")
+    return {g.strip().lower() for g in str(raw).split(",") if g and g.strip()}
+
+
+def _get_request_headers_lower():
+    try:
+        ctx = getattr(st, "context", None)
+        headers = getattr(ctx, "headers", None)
+        if headers:
+            return {str(k).lower(): str(v) for k, v in dict(headers).items()}
+    except Exception:
+        pass
+    return {}
+
+
+def _parse_client_principal_from_headers():
+    headers = _get_request_headers_lower()
+    raw_principal = headers.get("x-ms-client-principal")
+    if not raw_principal:
+        return None
+
+    try:
+        padded = raw_principal + "=" * (-len(raw_principal) % 4)
+        decoded = base64.b64decode(padded)
+        return json.loads(decoded.decode("utf-8"))
+    except Exception:
+        return None
+
+
+def _entra_user_from_principal(principal):
+    claims = principal.get("claims", []) if isinstance(principal, dict) else []
+    user_details = principal.get("userDetails") if isinstance(principal, dict) else None
+
+    email = None
+    group_ids = set()
+    for c in claims:
+        typ = str(c.get("typ", "")).lower()
+        val = str(c.get("val", ""))
+
+        if not email and typ in [
+            "preferred_username",
+            "email",
+            "upn",
+            "http://schemas.xmlsoap.org/ws/2005/05/identity/claims/emailaddress",
+            "http://schemas.xmlsoap.org/ws/2005/05/identity/claims/upn",
+        ]:
+            email = val
+
+        if (
+            typ == "groups"
+            or typ.endswith("/claims/groups")
+            or typ.endswith("/groups")
+            or "claims/groups" in typ
+        ) and val:
+            group_ids.add(val.lower())
+
+    if not email and user_details:
+        email = str(user_details)
+
+    return {"email": (email or "").strip(), "group_ids": group_ids}
+
+
+def try_login_with_entra_group():
+    principal = _parse_client_principal_from_headers()
+    if not principal:
+        return False
+
+    user_info = _entra_user_from_principal(principal)
+    admin_group_ids = _get_admin_entra_group_ids()
+    allowed_emails = _get_allowed_login_emails()
+
+    email_l = user_info["email"].strip().lower()
+    is_admin_by_group = bool(user_info["group_ids"] & admin_group_ids) if admin_group_ids else False
+    is_admin_by_email = email_l in allowed_emails
+
+    if not (is_admin_by_group or is_admin_by_email):
+        st.error("Kein Zugriff: Entra-Login hat keine passende Admin-Gruppe/E-Mail.")
+        return False
+
+    st.session_state["user"] = {
+        "email": user_info["email"] or "entra-user",
+        "auth_source": "entra",
+        "is_admin": True,
+    }
+    return True
+
+
+def login_view():
+    st.title("🔐 Login erforderlich")
+    st.markdown("[Mit Entra anmelden](/.auth/login/aad?post_login_redirect_uri=/)")
+
+    if try_login_with_entra_group():
+        st.rerun()
+
+    email = st.text_input("E-Mail")
+    password = st.text_input("Passwort", type="password")
+
+    erlaubte_emails = _get_allowed_login_emails()
+
+    if st.button("Einloggen") and email and password:
+        try:
+            admin_pw = _get_secret_or_env("ADMIN_PASSWORD", "")
+            if not admin_pw:
+                st.error("Login-Konfiguration fehlt: ADMIN_PASSWORD ist nicht gesetzt.")
+                return
+
+            email_l = email.strip().lower()
+            password_ok = (password == admin_pw)
+            email_ok = (not erlaubte_emails) or (email_l in erlaubte_emails)
+
+            if password_ok and email_ok:
+                st.session_state["user"] = {"email": email}
+                st.rerun()
+            else:
+                st.error("Login fehlgeschlagen – E-Mail oder Passwort falsch.")
+        except Exception as e:
+            st.error(f"Login fehlgeschlagen: {e}")
+
+
+def logout_button():
+    if st.button("🚪 Logout"):
+        st.session_state["user"] = None
+        st.rerun()
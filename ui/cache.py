@@ -0,0 +1,34 @@
+"""Table reads of the pages: st.cache_data for rarely changed tables, frames pinned per session."""
+
+import streamlit as st
+
+import db
+import refdata
+
+
+@st.cache_data
+def get_pistedisciplines():
+    return db.table_select('pistedisciplines', 'id, name')
+
+
+def get_athletes():
+    return db.table_select('athletes')
+
+
+def fetch_all_rows(table, select="*", **filters):
+    return db.table_select(table, select, **filters)
+
+
+def pinned_frame(key, loader, tables):
+    """DataFrame from ``loader()``, kept in the session until one of ``tables`` is written.
+
+    Filter changes then only rerun the fragment with mask and grid instead
+    of refetching the table; "🔄 Neu laden" forces a fresh load.
+    """
+    state_key = f"{key}_frame"
+    version = refdata.table_version(*tables)
+    pinned = st.session_state.get(state_key)
+    if st.button("🔄 Neu laden", key=f"{key}_reload") or pinned is None or pinned[0] != version:
+        pinned = (version, loader())
+        st.session_state[state_key] = pinned
+    return pinned[1]
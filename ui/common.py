@@ -0,0 +1,316 @@
+"""Widgets and helpers shared by several pages."""
+
+import datetime
+import decimal
+import math
+import os
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+import db
+import importers
+import refdata
+
+# Versionsdateien und app.py liegen im Deploy-Root, eine Ebene über ui/
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def get_app_version():
+    """Return a human-readable runtime version for live verification."""
+    env_version = os.getenv("APP_VERSION")
+    if env_version:
+        return str(env_version).strip()
+
+    for version_name in ("app_version.txt", ".app_version"):
+        version_file = os.path.join(ROOT_DIR, version_name)
+        if os.path.exists(version_file):
+            try:
+                with open(version_file, "r", encoding="utf-8") as f:
+                    value = f.read().strip()
+                    if value:
+                        return value
+            except Exception:
+                pass
+
+    try:
+        mtime = datetime.datetime.utcfromtimestamp(os.path.getmtime(os.path.join(ROOT_DIR, "app.py")))
+        return f"local-{mtime.strftime('%Y%m%d-%H%M%S')}"
+    except Exception:
+        return "local-unknown"
+
+
+def relink_compresults(tx, competition_ids=()):
+    """Refresh compresults.competition_id/Competition/PisteYear from competitions.
+
+    Rows of ``competition_ids`` take over the current Name and PisteYear by
+    id (renames, year changes); rows without competition_id are linked by
+    name, e.g. after a competition was added. Needs migration 005.
+    """
+    affected = 0
+    ids = sorted({int(i) for i in competition_ids or [] if i is not None})
+    if ids:
+        affected += tx.execute(
+            f"""
+            UPDATE cr SET Competition = c.Name, PisteYear = TRY_CONVERT(INT, c.PisteYear)
+            FROM [compresults] cr
+            JOIN [competitions] c ON c.id = cr.competition_id
+            WHERE c.id IN ({", ".join("%s" for _ in ids)})
+            """,
+            ids,
+        )
+    affected += tx.execute(
+        """
+        UPDATE cr SET competition_id = c.id, PisteYear = TRY_CONVERT(INT, c.PisteYear)
+        FROM [compresults] cr
+        CROSS APPLY (
+            SELECT TOP 1 id, PisteYear FROM [competitions]
+            WHERE LOWER(LTRIM(RTRIM(Name))) = LOWER(LTRIM(RTRIM(cr.Competition)))
+            ORDER BY id
+        ) c
+        WHERE cr.competition_id IS NULL AND cr.Competition IS NOT NULL
+        """
+    )
+    return affected
+
+
+def cascade_competition_renames(renames, tx=None, competition_ids=(), added=False):
+    """Propagate competition changes to the rows that reference them, set-based.
+
+    ``renames`` is an iterable of ``(old_name, new_name)``; ``competition_ids``
+    are the changed competitions, ``added`` is set when competitions were
+    inserted. compresults follow by competition_id
+    (``relink_compresults``) once migration 005 ran, by name before that;
+    pisterefcompresults only store names and are renamed with one UPDATE,
+    case-insensitive on the server. Runs inside ``tx`` if given, otherwise
+    in a transaction of its own. Returns the affected row counts per table.
+    """
+    pairs = {}
+    for old_name, new_name in renames or []:
+        old_val = str(old_name or "").strip()
+        new_val = str(new_name or "").strip()
+        if old_val and new_val and old_val.lower() != new_val.lower():
+            pairs.setdefault(old_val.lower(), new_val)
+    competition_ids = list(competition_ids or [])
+    counts = {"compresults": 0, "pisterefcompresults": 0}
+    linked = db.has_column("compresults", "competition_id")
+    if not pairs and not (linked and (competition_ids or added)):
+        return counts
+    if tx is None:
+        with db.transaction() as own_tx:
+            return cascade_competition_renames(pairs.items(), own_tx, competition_ids, added)
+
+    if linked:
+        counts["compresults"] = relink_compresults(tx, competition_ids)
+    if not pairs:
+        return counts
+
+    values_sql = ", ".join("(%s, %s)" for _ in pairs)
+    params = [p for pair in pairs.items() for p in pair]
+    if not linked:
+        counts["compresults"] = tx.execute(
+            f"""
+            UPDATE cr SET Competition = v.new_name
+            FROM [compresults] cr
+            JOIN (VALUES {values_sql}) AS v(old_name, new_name)
+              ON LOWER(LTRIM(RTRIM(cr.Competition))) = v.old_name
+            """,
+            params,
+        )
+    counts["pisterefcompresults"] = tx.execute(
+        f"""
+        WITH v(old_name, new_name) AS (SELECT old_name, new_name FROM (VALUES {values_sql}) AS x(old_name, new_name))
+        UPDATE r SET
+            competition1 = COALESCE(v1.new_name, r.competition1),
+            competition2 = COALESCE(v2.new_name, r.competition2),
+            competition3 = COALESCE(v3.new_name, r.competition3)
+        FROM [pisterefcompresults] r
+        LEFT JOIN v AS v1 ON LOWER(LTRIM(RTRIM(r.competition1))) = v1.old_name
+        LEFT JOIN v AS v2 ON LOWER(LTRIM(RTRIM(r.competition2))) = v2.old_name
+        LEFT JOIN v AS v3 ON LOWER(LTRIM(RTRIM(r.competition3))) = v3.old_name
+        WHERE v1.old_name IS NOT NULL OR v2.old_name IS NOT NULL OR v3.old_name IS NOT NULL
+        """,
+        params,
+    )
+    return counts
+
+
+def cascade_competition_rename(old_name, new_name, tx=None):
+    """Propagate a competition name change to name-based references."""
+    return cascade_competition_renames([(old_name, new_name)], tx)
+
+
+def read_uploaded_csv_with_fallback(uploaded_file, **kwargs):
+    """Read uploaded CSV; encoding and delimiter are sniffed once from the file prefix.
+
+    Only if the rest of the file does not match the sniffed encoding is it
+    read a second time as latin-1 (never fails). For large files prefer
+    ``importers.stream_upload``.
+    """
+    fmt = importers.sniff_upload(uploaded_file)
+    kwargs.setdefault("sep", fmt["sep"])
+    try:
+        return pd.read_csv(uploaded_file, encoding=fmt["encoding"], **kwargs)
+    except UnicodeDecodeError:
+        try:
+            uploaded_file.seek(0)
+        except Exception:
+            pass
+        return pd.read_csv(uploaded_file, encoding="latin-1", **kwargs)
+
+
+def get_lookup_dict(data, key, value):
+    return {d[key]: d[value] for d in data}
+
+
+# Alterskategorie
+def get_category_from_testyear(vintage, test_year):
+    return refdata.age_categories().category_for_vintage(vintage, test_year, "Unbekannt")
+
+
+def _grid_values_equal(a, b):
+    numeric = (int, float, decimal.Decimal, np.number)
+    if isinstance(a, numeric) and isinstance(b, numeric) and not isinstance(a, bool) and not isinstance(b, bool):
+        # Decimal aus der DB vs. float aus dem Editor
+        return math.isclose(float(a), float(b), rel_tol=1e-9, abs_tol=1e-9)
+    return a == b
+
+
+def diff_grid(orig, new, columns, normalize, id_col="id"):
+    """Compare an edited grid with the frame it was rendered from, keyed by ``id_col``.
+
+    Both frames must carry normalized ids (None for new rows). Returns
+    ``(inserts, updates, deleted_ids)``: new rows as dicts without empty cells,
+    ``[(id, {column: value})]`` with only the changed cells, and removed ids.
+    """
+    value_cols = [c for c in columns if c != id_col and c in new.columns]
+    orig_by_id = {
+        r[id_col]: {c: normalize(r.get(c)) for c in value_cols}
+        for r in orig.to_dict("records") if r.get(id_col)
+    }
+    inserts, updates, seen = [], [], set()
+    for r in new.to_dict("records"):
+        row_id = r.get(id_col)
+        values = {c: normalize(r.get(c)) for c in value_cols}
+        if not row_id or row_id not in orig_by_id:
+            payload = {k: v for k, v in values.items() if v is not None}
+            if payload:
+                inserts.append(payload)
+            continue
+        seen.add(row_id)
+        before = orig_by_id[row_id]
+        changed = {c: v for c, v in values.items() if not _grid_values_equal(v, before.get(c))}
+        if changed:
+            updates.append((row_id, changed))
+    deleted_ids = [row_id for row_id in orig_by_id if row_id not in seen]
+    return inserts, updates, deleted_ids
+
+
+def save_grid_changes(table, inserts, updates, deleted_ids, tx):
+    """Persist a ``diff_grid`` result with bulk statements inside ``tx``."""
+    return {
+        "deleted": db.delete_many(table, deleted_ids, tx=tx),
+        "updated": db.update_many(table, updates, tx=tx),
+        "inserted": db.insert_many(table, inserts, tx=tx),
+    }
+
+
+PAGED_GRID_PAGE_SIZES = [25, 50, 100, 250]
+
+
+def paged_grid(table, key, sort_columns, search_columns=None, select="*", schema=None, default_page_size=50, **filters):
+    """Search/sort/page controls over ``db.table_page``; returns ``(page_df, total)``.
+
+    Only the current page is fetched from the server, so callers render
+    widgets for at most one page of rows.
+    """
+    state_key = f"{key}_page"
+    c1, c2, c3, c4 = st.columns([3, 2, 1, 1])
+    with c1:
+        search = st.text_input("🔎 Suche", key=f"{key}_search") if search_columns else ""
+    with c2:
+        order_by = st.selectbox("Sortieren nach", sort_columns, key=f"{key}_sort")
+    with c3:
+        descending = st.checkbox("Absteigend", key=f"{key}_desc")
+    with c4:
+        page_size = st.selectbox(
+            "Pro Seite",
+            PAGED_GRID_PAGE_SIZES,
+            index=PAGED_GRID_PAGE_SIZES.index(default_page_size) if default_page_size in PAGED_GRID_PAGE_SIZES else 0,
+            key=f"{key}_size",
+        )
+
+    # Neue Suche/Sortierung/Filter -> zurück auf Seite 1
+    signature = (search, order_by, descending, page_size, tuple(sorted((k, str(v)) for k, v in filters.items())))
+    if st.session_state.get(f"{key}_signature") != signature:
+        st.session_state[f"{key}_signature"] = signature
+        st.session_state[state_key] = 1
+    page = st.session_state.get(state_key, 1)
+
+    df, total = db.table_page(
+        table,
+        select=select,
+        page=page,
+        page_size=page_size,
+        order_by=order_by,
+        descending=descending,
+        search=search,
+        search_columns=search_columns,
+        schema=schema,
+        **filters,
+    )
+    pages = max(1, math.ceil(total / page_size))
+    if page > pages:
+        st.session_state[state_key] = pages
+        st.rerun()
+
+    n1, n2, n3 = st.columns([1, 3, 1])
+    with n1:
+        if st.button("◀️ Zurück", key=f"{key}_prev", disabled=page <= 1):
+            st.session_state[state_key] = page - 1
+            st.rerun()
+    with n2:
+        st.caption(f"Seite {page} von {pages} · {total} Einträge")
+    with n3:
+        if st.button("Weiter ▶️", key=f"{key}_next", disabled=page >= pages):
+            st.session_state[state_key] = page + 1
+            st.rerun()
+    return df, total
+
+
+def import_yearly_values(uploaded_file, table, value_columns, athletes):
+    """CSV (first_name, last_name, PisteYear + ``value_columns``) -> one upsert into ``table``.
+
+    Re-importing the same file updates the existing rows instead of adding
+    new ones.
+    """
+    try:
+        df = read_uploaded_csv_with_fallback(uploaded_file)
+    except UnicodeDecodeError as e:
+        st.error(f"❌ Datei konnte nicht gelesen werden (Encoding): {e}")
+        return
+    except Exception as e:
+        st.error(f"❌ Datei konnte nicht gelesen werden: {e}")
+        return
+
+    required_columns = importers.YEARLY_KEY_COLUMNS + list(value_columns)
+    if not set(required_columns).issubset(df.columns):
+        st.error(f"❌ Die Datei muss folgende Spalten enthalten: {', '.join(required_columns)}")
+        return
+
+    rows, rejects = importers.prepare_yearly_values(df, athletes, value_columns)
+    counts = {"inserted": 0, "updated": 0}
+    if not rows.empty:
+        try:
+            counts = db.upsert_many(
+                table, importers.records(rows, list(rows.columns)), importers.YEARLY_KEY_COLUMNS
+            )
+        except Exception as e:
+            st.error(f"❌ Import fehlgeschlagen, nichts gespeichert: {e}")
+            return
+
+    st.success(f"✅ {counts['inserted']} Einträge neu, {counts['updated']} aktualisiert.")
+    if not rejects.empty:
+        st.warning(f"⚠️ {len(rejects)} Zeile(n) wurden nicht importiert:")
+        st.dataframe(rejects, hide_index=True)
@@ -0,0 +1,97 @@
+"""Bridge from the pages to the divingeval engines: progress bars, messages and background jobs."""
+
+import streamlit as st
+
+import identity
+import jobs
+import refdata
+from divingeval.competitions import run_wettkampf_bewertung
+from divingeval.pipeline import format_report, run_pipeline
+from divingeval.refpoints import run_refpoint_full_analyse
+from divingeval.scoring import run_punkte_neuberechnen
+from divingeval.soc import run_soc_full_calculation
+
+
+def streamlit_progress(label="Berechne ..."):
+    """Return a ``progress(done, total, text)`` callback drawing a Streamlit progress bar."""
+    bar = st.progress(0.0, text=label)
+
+    def _update(done, total, text=None):
+        frac = min(max(float(done) / float(total), 0.0), 1.0) if total else 1.0
+        bar.progress(frac, text=f"{text or label} ({done}/{total})")
+
+    return _update
+
+
+def render_engine_messages(messages):
+    for level, text in messages or []:
+        getattr(st, level, st.info)(text)
+
+
+def submit_job(name, params):
+    user = st.session_state.get("user") or {}
+    try:
+        jobs.submit(name, params, submitted_by=user.get("email"))
+        st.success("⏳ Job eingereiht. Fortschritt und Ergebnis unter „Jobs“.")
+    except Exception as e:
+        st.error(f"Job konnte nicht eingereiht werden: {e}")
+
+
+def _job_punkte_neuberechnen(ctx, years):
+    for year in ctx.steps(years):
+        count = run_punkte_neuberechnen(year, progress=ctx.progress)
+        ctx.log(f"Testjahr {year}: {count or 0} Resultate neu bewertet")
+    return f"Piste-Punkte für {', '.join(map(str, years))} neu berechnet"
+
+
+def _job_wettkampf_bewertung(ctx, scope="all", pisteyear=None):
+    step = str(pisteyear) if scope == "year" else scope
+    for _ in ctx.steps([step]):
+        summary = run_wettkampf_bewertung(scope, pisteyear=pisteyear, progress=ctx.progress)
+        ctx.log(f"{summary['updated']} Resultate bewertet ({step})")
+        for warning in summary["warnings"][:20]:
+            ctx.log(warning)
+    return f"Wettkampfbewertung ({step}) abgeschlossen"
+
+
+def _job_refpoint_full_analyse(ctx, years):
+    for year in ctx.steps(years):
+        for level, text in run_refpoint_full_analyse(year, progress=ctx.progress):
+            if level == "error":
+                raise RuntimeError(text)
+            ctx.log(f"{year}: {text}")
+    return f"Full Analyse für {', '.join(map(str, years))} abgeschlossen"
+
+
+def _job_soc_full_calculation(ctx, years):
+    for year in ctx.steps(years):
+        count = run_soc_full_calculation(year, progress=ctx.progress)
+        ctx.log(f"PisteYear {year}: {count} Athleten berechnet")
+    return f"SOC Full Calculation für {', '.join(map(str, years))} abgeschlossen"
+
+
+def _job_pisteyear_pipeline(ctx, years, stages=None):
+    for year in ctx.steps(years):
+        for line in format_report(run_pipeline(year, stages=stages, progress=ctx.progress)).splitlines():
+            ctx.log(line)
+    return f"PisteYear {', '.join(map(str, years))} neu berechnet"
+
+
+def _job_identity_backfill(ctx, only_missing=True):
+    summary = identity.backfill(only_missing=only_missing, progress=ctx.progress)
+    for table, counts in summary.items():
+        ctx.log(f"{table}: {counts}")
+    matched = sum(c.get("matched", 0) for c in summary.values())
+    return f"athlete_id für {matched} Zeilen gesetzt"
+
+
+def register_jobs():
+    jobs.register("punkte_neuberechnen", _job_punkte_neuberechnen, "Piste Punkte neu berechnen")
+    jobs.register("wettkampf_bewertung", _job_wettkampf_bewertung, "Wettkampf-Bewertung")
+    jobs.register("refpoint_full_analyse", _job_refpoint_full_analyse, "Piste RefPoint Full Analyse")
+    jobs.register("soc_full_calculation", _job_soc_full_calculation, "SOC Full Calculation")
+    jobs.register("pisteyear_pipeline", _job_pisteyear_pipeline, "PisteYear neu berechnen")
+    jobs.register("identity_backfill", _job_identity_backfill, "Athleten-IDs zuordnen")
+    identity.install()
+    refdata.install()
+    jobs.start_worker()
@@ -0,0 +1,52 @@
+"""Sidebar pages: label -> (module in ui.pages, render function), in menu order.
+
+A page module is imported on the first visit and then stays in
+sys.modules, so a rerun only executes the render function of the active
+page. Heavy imports (matplotlib, openpyxl) belong in the page modules
+that need them, not in the shell; sqltables/benchmark_imports.py
+measures both.
+"""
+
+import importlib
+
+PAGES = {
+    "Startseite": ("startseite", "startseite"),
+    "Athleten eingeben": ("athleten_eingeben", "athleten_eingeben"),
+    "Athleten importieren": ("athleten_importieren", "import_athletes"),
+    "Athleten bearbeiten": ("athleten_bearbeiten", "edit_athletes"),
+    "Athleten löschen": ("athleten_loeschen", "delete_athlete"),
+    "Athleten anzeigen": ("athleten_anzeigen", "athleten_anzeigen"),
+    "Piste Mirwald": ("piste_mirwald", "bio_mirwald"),
+    "Piste Resultate anzeigen": ("piste_resultate", "auswertung_starten"),
+    "Piste Ergebnisse eingeben": ("piste_eingeben", "manage_results_entry"),
+    "Piste Ergebnisse bearbeiten": ("piste_bearbeiten", "manage_pisteresults_correction"),
+    "Piste Punkte neu berechnen": ("piste_punkte", "punkte_neuberechnen"),
+    "Wettkampfauswertungen": ("wettkampfauswertungen", "auswertung_wettkampf"),
+    "Wettkampf-Bewertung": ("wettkampf_bewertung", "bewertung_wettkampf"),
+    "Wettkampfresultate eingeben": ("wettkampfresultate_eingeben", "manage_compresults_entry"),
+    "Wettkampfresultate korrigieren": ("wettkampfresultate_korrigieren", "manage_compresults_correction"),
+    "Wettkaempfe Top 3": ("top3", "show_top3_wettkaempfe"),
+    "Wettkampf-Performance pro Athlet": ("wettkampf_performance", "wettkampf_performance_per_athlete"),
+    "Piste RefPoint Competition Analyse": ("refpoint_analyse", "piste_refpoint_wettkampf_analyse"),
+    "Tool Environment": ("tool_environment", "manage_tool_environment"),
+    "Trainingsperformance - Resilienz": ("trainingsperformance", "manage_trainingsperformance_resilienz"),
+    "SOC Full Calculation": ("soc_calculation", "soc_full_calculation"),
+    "PisteYear neu berechnen": ("pisteyear", "pisteyear_neu_berechnen"),
+    "Full PISTE Results SOC": ("soc_results", "show_full_piste_results_soc"),
+    "Kaderzugehörigkeiten": ("kader", "show_kaderzugehoerigkeiten"),
+    "Full PISTE Results for Clubs": ("club_results", "show_full_piste_results_clubs"),
+    "Selektionen Wettkämpfe": ("selektionen", "selektionen_wettkaempfe"),
+    "Vergleich BIG Competitions": ("big_competitions", "vergleich_big_competitions"),
+    "Referenz- und Bewertungstabellen": ("referenztabellen", "referenztabellen_anzeigen"),
+    "Jobs": ("job_list", "jobs_anzeigen"),
+}
+
+
+def module_name(label):
+    return f"{__name__}.{PAGES[label][0]}"
+
+
+def render(label):
+    """Render page ``label``; its module is imported on the first call only."""
+    module = importlib.import_module(module_name(label))
+    getattr(module, PAGES[label][1])()
@@ -0,0 +1,79 @@
+"""Athleten anzeigen: filterable athlete list with CSV export."""
+
+import pandas as pd
+import streamlit as st
+
+from ui.cache import fetch_all_rows, pinned_frame
+
+
+def athleten_anzeigen():
+    st.header("👥 Athleten anzeigen & exportieren")
+
+    # Daten laden
+    try:
+        df = pinned_frame("athleten", lambda: pd.DataFrame(fetch_all_rows("athletes", select="*")), ("athletes",))
+    except Exception as e:
+        st.error(f"Athleten konnten nicht geladen werden: {type(e).__name__}: {e}")
+        return
+
+    if df.empty:
+        st.info("Keine Athleten gefunden.")
+        return
+    _athleten_ergebnis(df)
+
+
+@st.fragment
+def _athleten_ergebnis(df):
+    """Filter form and grid of athleten_anzeigen; reruns alone on submit."""
+    # Nur gewünschte Spalten
+    show_cols = ["first_name", "last_name", "birthdate", "club", "category", "sex", "nationalteam", "vintage", "bioage"]
+    for col in show_cols:
+        if col not in df.columns:
+            df[col] = None
+    df = df[show_cols]
+
+    def _options(series):
+        values = (
+            series.dropna()
+            .astype(str)
+            .str.strip()
+        )
+        values = values[values != ""]
+        return sorted(values.unique().tolist())
+
+    # Filter
+    st.subheader("🔎 Filter")
+    with st.form("athleten_filter"):
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            first_name = st.text_input("Vorname", "")
+            last_name = st.text_input("Nachname", "")
+        with col2:
+            club = st.selectbox("Verein", ["Alle"] + _options(df["club"]))
+            category = st.selectbox("Kategorie", ["Alle"] + _options(df["category"]))
+        with col3:
+            sex = st.selectbox("Geschlecht", ["Alle"] + _options(df["sex"]))
+            nationalteam = st.selectbox("Nationalteam", ["Alle"] + _options(df["nationalteam"]))
+        with col4:
+            vintage = st.selectbox("Jahrgang", ["Alle"] + _options(df["vintage"]))
+
+        st.form_submit_button("🔎 Filter anwenden")
+
+    filtered = df.copy()
+    if first_name:
+        filtered = filtered[filtered["first_name"].str.contains(first_name, case=False, na=False)]
+    if last_name:
+        filtered = filtered[filtered["last_name"].str.contains(last_name, case=False, na=False)]
+    if club != "Alle":
+        filtered = filtered[filtered["club"] == club]
+    if category != "Alle":
+        filtered = filtered[filtered["category"] == category]
+    if sex != "Alle":
+        filtered = filtered[filtered["sex"] == sex]
+    if nationalteam != "Alle":
+        filtered = filtered[filtered["nationalteam"] == nationalteam]
+    if vintage != "Alle":
+        filtered = filtered[filtered["vintage"].astype(str) == str(vintage)]
+
+    st.dataframe(filtered)
+    st.download_button("📥 Gefilterte Athleten als CSV", filtered.to_csv(index=False, encoding='utf-8-sig'), file_name="athleten.csv", mime="text/csv")
@@ -0,0 +1,121 @@
+"""Athleten bearbeiten: edit athletes and their injury flags."""
+
+import datetime
+
+import pandas as pd
+import streamlit as st
+
+import db
+from divingeval.common import load_athleteyearstatus_map
+from ui.cache import fetch_all_rows
+from ui.common import get_category_from_testyear
+
+
+def _injury_status_year_key(piste_year):
+    return f"injuryflags:{str(piste_year).strip()}"
+
+
+def save_athleteyearstatus(first_name, last_name, piste_year, injured):
+    year_key = _injury_status_year_key(piste_year)
+    existing = db.table_select(
+        "socadditionalvalues",
+        "id",
+        first_name=first_name,
+        last_name=last_name,
+        PisteYear=year_key,
+        toolenvironment="injuryflags",
+    )
+    if injured:
+        payload = {
+            "toolenvironment": "injuryflags",
+            "first_name": first_name,
+            "last_name": last_name,
+            "PisteYear": year_key,
+            "quality": "injured",
+        }
+        if existing:
+            db.table_update("socadditionalvalues", payload, id=existing[0]["id"])
+        else:
+            db.table_insert("socadditionalvalues", payload)
+    else:
+        if existing:
+            db.table_delete("socadditionalvalues", id=existing[0]["id"])
+
+
+# Athleten bearbeiten
+def edit_athletes():
+    st.header("✏️ Athleten bearbeiten")
+    try:
+        athletes = db.table_select('athletes')
+    except Exception as e:
+        st.error(f"Athleten konnten nicht geladen werden: {e}")
+        return
+    athlete_names = {f"{a['first_name']} {a['last_name']}": a['id'] for a in athletes}
+    selected_name = st.selectbox("Athlet auswählen", [""] + list(athlete_names.keys()), index=0)
+
+    if selected_name:
+        athlete_id = athlete_names[selected_name]
+        athlete = db.table_select('athletes', id=athlete_id)[0]
+
+        first_name = st.text_input("Vorname", athlete['first_name'])
+        last_name = st.text_input("Nachname", athlete['last_name'])
+        bd = athlete['birthdate']
+        if isinstance(bd, str):
+            bd = datetime.datetime.strptime(bd, "%Y-%m-%d").date()
+        birthdate = st.date_input("Geburtsdatum", bd)
+        sex = st.selectbox("Geschlecht", ["male", "female"], index=0 if athlete['sex'] == "male" else 1)
+        teams = db.table_select('team', 'ShortName')
+        club_options = [t['ShortName'] for t in teams if t.get('ShortName')]
+        default_index = club_options.index(athlete['club']) if athlete['club'] in club_options else 0
+        club = st.selectbox("Verein", club_options, index=default_index)
+        nationalteam = st.selectbox("Nationalteam", ["yes", "no"], index=0 if athlete['nationalteam'] == "yes" else 1)
+
+        if st.button("Aktualisieren"):
+            vintage = birthdate.year
+            full_name = f"{first_name} {last_name}"
+            category = get_category_from_testyear(vintage, datetime.date.today().year)
+            db.table_update('athletes', {
+                'first_name': first_name,
+                'last_name': last_name,
+                'birthdate': birthdate.strftime('%Y-%m-%d'),
+                'sex': sex,
+                'club': club,
+                'nationalteam': nationalteam,
+                'vintage': vintage,
+                'full_name': full_name,
+                'category': category
+            }, id=athlete_id)
+            st.success("Athletendaten aktualisiert.")
+
+        st.markdown("---")
+        st.subheader("🩹 Verletzungsstatus pro Jahr")
+        injury_map = load_athleteyearstatus_map()
+        available_year_rows = fetch_all_rows("socadditionalvalues", select="PisteYear")
+        year_options = sorted(
+            {
+                str(row.get("PisteYear")).strip()
+                for row in available_year_rows
+                if row.get("PisteYear") not in (None, "", "nan")
+            },
+            key=lambda value: (0, int(value)) if str(value).isdigit() else (1, str(value)),
+        )
+        if not year_options:
+            year_options = [str(year) for year in range(2024, 2031)]
+
+        selected_year = st.selectbox("Jahr", year_options, key=f"injury_year_{athlete_id}")
+        injury_key = (first_name.lower().strip(), last_name.lower().strip(), str(selected_year))
+        injured_default = injury_map.get(injury_key, False)
+        injured_now = st.checkbox("Verletzt", value=injured_default, key=f"injury_flag_{athlete_id}")
+        if st.button("Verletzungsstatus speichern", key=f"save_injury_{athlete_id}"):
+            save_athleteyearstatus(first_name, last_name, selected_year, injured_now)
+            st.success(f"Verletzungsstatus für {selected_year} gespeichert.")
+
+        athlete_status_rows = []
+        for year in year_options:
+            athlete_status_rows.append({
+                "PisteYear": year,
+                "injured": "yes" if injury_map.get((first_name.lower().strip(), last_name.lower().strip(), str(year)), False) else "no",
+            })
+        st.dataframe(pd.DataFrame(athlete_status_rows), use_container_width=True)
+    else:
+        st.info("Bitte zuerst einen Athleten auswählen.")
@@ -0,0 +1,86 @@
+"""Athleten eingeben: single athlete entry plus the import and edit sections."""
+
+import datetime
+
+import pandas as pd
+import streamlit as st
+
+import db
+from ui.common import get_category_from_testyear
+from ui.pages.athleten_bearbeiten import edit_athletes
+from ui.pages.athleten_importieren import import_athletes
+
+
+def get_birth_quarter(birthdate):
+    try:
+        if isinstance(birthdate, str):
+            birthdate = pd.to_datetime(birthdate)
+        month = birthdate.month
+        if 1 <= month <= 3:
+            return "q1"
+        elif 4 <= month <= 6:
+            return "q2"
+        elif 7 <= month <= 9:
+            return "q3"
+        elif 10 <= month <= 12:
+            return "q4"
+    except Exception as e:
+        return None
+    return None
+
+
+def athleten_eingeben():
+    st.header("📝 Neuen Athleten hinzufügen")
+
+    # Sekundäre Aktionen direkt hier verfügbar machen
+    st.markdown("#### ⚙️ Zusätzliche Aktionen")
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button("📥 Athleten importieren"):
+            import_athletes()
+    with col2:
+        if st.button("✏️ Athleten bearbeiten"):
+            edit_athletes()
+
+    st.markdown("---")
+
+    # Standardformular zum Hinzufügen
+    first_name = st.text_input("Vorname")
+    last_name = st.text_input("Nachname")
+    birthdate = st.date_input("Geburtsdatum", min_value=datetime.date(1920, 1, 1), max_value=datetime.date.today())
+    sex = st.selectbox("Geschlecht", ["male", "female"])
+
+    teams = db.table_select('team', 'FullName, ShortName')
+    club_options = [t['FullName'] for t in teams if t.get('FullName')]
+    club = st.selectbox("Verein", club_options)
+
+    nationalteam = st.selectbox("Nationalteam", ["yes", "no"])
+    vintage = birthdate.year
+    full_name = f"{first_name} {last_name}"
+    category = get_category_from_testyear(vintage, datetime.date.today().year)
+
+    # Quartal berechnen und in bioage speichern
+    bioage = get_birth_quarter(birthdate)
+
+    if st.button("Athlet speichern"):
+        # Prüfen, ob Athlet bereits existiert
+        existing = db.table_select('athletes', 'id',
+            first_name=first_name.strip(),
+            last_name=last_name.strip(),
+            birthdate=birthdate.strftime('%Y-%m-%d'))
+        if existing:
+            st.error(f"Athlet {full_name} mit Geburtsdatum {birthdate.strftime('%Y-%m-%d')} existiert bereits!")
+        else:
+            db.table_insert('athletes', {
+                'first_name': first_name,
+                'last_name': last_name,
+                'birthdate': birthdate.strftime('%Y-%m-%d'),
+                'sex': sex,
+                'club': club,
+                'nationalteam': nationalteam,
+                'vintage': vintage,
+                'full_name': full_name,
+                'category': category,
+                'bioage': bioage
+            })
+            st.success(f"Athlet {full_name} gespeichert!")
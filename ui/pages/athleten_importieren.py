@@ -0,0 +1,85 @@
+"""Athleten importieren: CSV import of athletes."""
+
+import datetime
+
+import pandas as pd
+import streamlit as st
+
+import db
+import identity
+import importers
+import refdata
+from ui.common import read_uploaded_csv_with_fallback
+
+
+def import_athletes():
+    st.header("📥 Athleten importieren")
+
+    # Button für Bioage-Update ALLER Athleten: ein UPDATE, Quartal aus MONTH(birthdate)
+    if st.button("🔄 Bioage für alle bestehenden Athleten berechnen und speichern"):
+        with db.transaction() as tx:
+            updated = tx.execute(
+                "UPDATE [athletes] SET [bioage] = CASE "
+                "WHEN MONTH([birthdate]) BETWEEN 1 AND 3 THEN 'q1' "
+                "WHEN MONTH([birthdate]) BETWEEN 4 AND 6 THEN 'q2' "
+                "WHEN MONTH([birthdate]) BETWEEN 7 AND 9 THEN 'q3' "
+                "ELSE 'q4' END "
+                "WHERE [birthdate] IS NOT NULL"
+            )
+            total = tx.query("SELECT COUNT(*) AS n FROM [athletes]")[0]["n"]
+        identity.invalidate()
+        st.success(f"Bioage für {updated} Athleten aktualisiert. {total - updated} Athleten übersprungen (fehlendes oder ungültiges Geburtsdatum).")
+
+    uploaded_file = st.file_uploader("CSV-Datei mit Athletendaten hochladen", type="csv")
+
+    # 📄 Beispiel-CSV zum Herunterladen anbieten
+    sample_df = pd.DataFrame([{
+        "first_name": "Max",
+        "last_name": "Mustermann",
+        "birthdate": "2005-03-15",
+        "sex": "male",
+        "club": "SC Beispiel",
+        "nationalteam": "no"
+    }])
+    st.download_button(
+        label="📄 Beispiel-CSV herunterladen",
+        data=sample_df.to_csv(index=False).encode("utf-8-sig"),
+        file_name="athleten_beispiel.csv",
+        mime="text/csv"
+    )
+
+    if uploaded_file is not None:
+        df = read_uploaded_csv_with_fallback(uploaded_file)
+        required_columns = importers.ATHLETE_REQUIRED_COLUMNS
+
+        if not set(required_columns).issubset(df.columns):
+            st.error(f"❌ Die Datei muss folgende Spalten enthalten: {', '.join(required_columns)}")
+            return
+
+        rows, rejects = importers.prepare_athletes(
+            df, refdata.age_categories(), datetime.date.today().year
+        )
+        insert_cols = [
+            "first_name", "last_name", "birthdate", "sex", "club", "nationalteam",
+            "vintage", "full_name", "category", "bioage",
+        ]
+        records = importers.records(rows, insert_cols)
+        try:
+            with db.transaction() as tx:
+                # Duplikate: ein Join der Datei-Schlüssel gegen athletes (first_name, last_name, birthdate)
+                existing = db.existing_row_indexes('athletes', records, importers.ATHLETE_KEY_COLUMNS, tx=tx)
+                new_records = [r for i, r in enumerate(records) if i not in existing]
+                inserted = db.insert_many('athletes', new_records, tx=tx)
+        except Exception as e:
+            st.error(f"❌ Import fehlgeschlagen, nichts gespeichert: {e}")
+            return
+
+        duplicates = rows.iloc[sorted(existing)] if existing else rows.iloc[0:0]
+        if not duplicates.empty:
+            st.warning(f"{len(duplicates)} Athlet(en) wurden nicht importiert, da sie bereits existieren:")
+            st.dataframe(duplicates[importers.ATHLETE_KEY_COLUMNS], hide_index=True)
+        if not rejects.empty:
+            st.warning(f"⚠️ {len(rejects)} Zeile(n) konnten nicht importiert werden:")
+            st.dataframe(rejects, hide_index=True)
+
+        st.success(f"✅ {inserted} Athleten erfolgreich importiert.")
@@ -0,0 +1,40 @@
+"""Athleten löschen."""
+
+import streamlit as st
+
+import db
+
+
+def delete_athlete():
+    st.header("🗑️ Athlet löschen")
+    athletes = db.table_select('athletes', 'id, first_name, last_name, birthdate, club')
+
+    if not athletes:
+        st.info("Keine Athleten vorhanden.")
+        return
+
+    athlete_names = {
+        f"{a['first_name']} {a['last_name']} | {a['birthdate']} | {a['club']}": a['id']
+        for a in athletes
+    }
+    selected_name = st.selectbox("Wähle einen Athleten zum Löschen", list(athlete_names.keys()))
+
+    if selected_name:
+        athlete_id = athlete_names[selected_name]
+        # Optional: Details nochmal anzeigen
+        athlete = next((a for a in athletes if a['id'] == athlete_id), None)
+        if athlete:
+            st.info(f"**Vorname:** {athlete['first_name']}  \n"
+                    f"**Nachname:** {athlete['last_name']}  \n"
+                    f"**Geburtsdatum:** {athlete['birthdate']}  \n"
+                    f"**Verein:** {athlete['club']}")
+
+        if st.button("❗ Endgültig löschen"):
+            try:
+                # Ergebnisse löschen
+                db.table_delete('pisteresults', athlete_id=athlete_id)
+                db.table_delete('athletes', id=athlete_id)
+                st.success(f"Athlet '{selected_name}' und alle zugehörigen Ergebnisse wurden gelöscht.")
+                st.rerun()
+            except Exception as e:
+                st.error(f"Fehler beim Löschen: {e}")
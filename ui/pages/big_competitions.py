@@ -0,0 +1,205 @@
+"""Vergleich BIG Competitions and the BIG competition import."""
+
+import pandas as pd
+import streamlit as st
+
+import db
+from ui.cache import fetch_all_rows
+
+
+def vergleich_big_competitions():
+    st.header("🏆 Vergleich Big Competitions")
+
+    # Daten laden
+    loaded = db.fetch_many({
+        "compresultsbig": lambda: fetch_all_rows("compresultsbig", select="*"),
+        "compresults": lambda: fetch_all_rows("compresults", select="*"),
+        "competitions": lambda: fetch_all_rows("competitions", select="*"),
+    })
+    compresultsbig = pd.DataFrame(loaded["compresultsbig"])
+    compresults = pd.DataFrame(loaded["compresults"])
+    competitions = pd.DataFrame(loaded["competitions"])
+
+    if compresultsbig.empty or compresults.empty or competitions.empty:
+        st.info("Nicht genügend Daten vorhanden.")
+        # Import-Bereich trotzdem anzeigen!
+        show_big_comp_import()
+        return
+
+    # Personenauswahl ohne Vorauswahl
+    all_names = sorted(set((row["first_name"], row["last_name"]) for _, row in compresults.iterrows()))
+    name_options = [f"{fn} {ln}" for fn, ln in all_names]
+    selected_name = st.selectbox("Person auswählen", [""] + name_options, index=0)
+    if not selected_name:
+        st.info("Bitte eine Person auswählen.")
+        return
+    sel_first, sel_last = selected_name.split(" ", 1)
+
+    # Jahr ohne Vorauswahl
+    years_big = sorted(compresultsbig["year"].dropna().unique())
+    selected_year_big = st.selectbox("Jahr (Big Competitions)", [""] + years_big, index=0)
+    if not selected_year_big:
+        st.info("Bitte ein Jahr auswählen.")
+        return
+
+    # Vergleichswettkampf ohne Vorauswahl
+    competitions_big = sorted(compresultsbig[compresultsbig["year"] == selected_year_big]["competition"].dropna().unique())
+    selected_competition_big = st.selectbox("Vergleichswettkampf (Big Competition)", [""] + competitions_big, index=0)
+    if not selected_competition_big:
+        st.info("Bitte einen Vergleichswettkampf auswählen.")
+        return
+    # Jahr aus competitions.Date
+    competitions["year"] = competitions["Date"].astype(str).str[:4]
+    years_comp = sorted(competitions["year"].dropna().unique())
+    selected_year_comp = st.selectbox("Jahr (Wettkämpfe)", [""] + years_comp, index=0)
+    if not selected_year_comp:
+        st.info("Bitte ein Jahr für Wettkämpfe auswählen.")
+        return
+
+    # Filter für Person und Jahr
+    person_results = compresults[
+        (compresults["first_name"] == sel_first) &
+        (compresults["last_name"] == sel_last)
+    ]
+    # Filter competitions auf das gewählte Jahr
+    competitions_year = competitions[competitions["year"] == str(selected_year_comp)]
+
+    # Filter big results auf Jahr und Vergleichswettkampf
+    big_results = compresultsbig[
+        (compresultsbig["year"] == selected_year_big) &
+        (compresultsbig["competition"] == selected_competition_big)
+    ]
+
+    # Mapping für schnellen Zugriff: (discipline, sex, category, rank) -> points
+    big_map = {}
+    for _, row in big_results.iterrows():
+        key = (
+            str(row["discipline"]).strip().lower(),
+            str(row["sex"]).strip().lower(),
+            str(row["category"]).strip().lower(),
+            str(row["rank"]).strip()
+        )
+        big_map[key] = row["points"]
+
+    output_rows = []
+    for _, comp in competitions_year.iterrows():
+        comp_name = comp["Name"] if "Name" in comp else comp.get("name", "")
+        comp_discipline = comp.get("Discipline", None)
+        comp_sex = comp.get("sex", None)
+        comp_category = comp.get("category", None)
+        comp_date = comp.get("Date", "")[:10]
+        # Hole alle Ergebnisse dieser Person für diesen Wettkampf
+        person_comp = person_results[person_results["Competition"] == comp_name]
+        if person_comp.empty:
+            continue
+        for _, res in person_comp.iterrows():
+            # Vereinheitliche die Keys!
+            discipline = str(res.get("Discipline", comp_discipline)).strip().lower()
+            sex = str(res.get("sex", comp_sex)).strip().lower()
+            # Hier: CategoryStart aus compresults, category aus compresultsbig
+            category = str(res.get("CategoryStart", comp_category)).strip().lower()
+            points = res.get("Points", None)
+            try:
+                points = float(points)
+            except Exception:
+                points = None
+            row_out = {
+                "Competition": comp_name,
+                "Datum": comp_date,
+                "Discipline": discipline,
+                "sex": sex,
+                "category": category,
+                "Points": points,
+                "Vergleichswettkampf": selected_competition_big  # NEU
+            }
+
+            # Für alle gewünschten Ränge vergleichen
+            for rank in ["1", "2", "3", "QualF", "QualHF"]:
+                key = (discipline, sex, category, rank)
+                big_points = big_map.get(key)
+                try:
+                    big_points = float(big_points)
+                except Exception:
+                    big_points = None
+                percent = None
+                if big_points not in (None, "", "nan") and points not in (None, "", "nan"):
+                    try:
+                        percent = round((points / big_points) * 100, 1) if big_points != 0 else None
+                    except Exception:
+                        percent = None
+                row_out[f"% zu Rank {rank}"] = percent
+            output_rows.append(row_out)
+
+    # --- CSV-Import für compresultsbig IMMER anzeigen ---
+    show_big_comp_import()
+
+    if not output_rows:
+        st.info("Keine passenden Vergleiche gefunden.")
+        return
+
+    df_out = pd.DataFrame(output_rows)
+    # Optional: Vergleichswettkampf-Spalte nach vorne
+    cols = ["Vergleichswettkampf"] + [c for c in df_out.columns if c != "Vergleichswettkampf"]
+    df_out = df_out[cols]
+    st.download_button("📥 Vergleich als CSV herunterladen", df_out.to_csv(index=False, encoding='utf-8-sig'), file_name="vergleich_big_competitions.csv", mime="text/csv")
+    st.dataframe(df_out)
+
+
+# Hilfsfunktion für den Importbereich (damit er immer angezeigt wird)
+def show_big_comp_import():
+    st.markdown("---")
+    st.subheader("📤 Big Competitions Ergebnisse importieren (CSV)")
+
+    example = pd.DataFrame([{
+        "competition": "Swiss Open",
+        "year": 2024,
+        "discipline": "1m",
+        "category": "Jugend B",
+        "sex": "male",
+        "rank": "1",
+        "points": 400
+    }])
+    st.download_button("📄 Beispiel-CSV herunterladen", example.to_csv(index=False).encode("utf-8"), file_name="big_compresults_beispiel.csv", mime="text/csv")
+
+    uploaded_file = st.file_uploader("CSV-Datei mit Big Competitions Ergebnissen hochladen", type=["csv"])
+    if uploaded_file:
+        df = pd.read_csv(uploaded_file)
+        required_cols = {"competition", "year", "discipline", "category", "sex", "rank", "points"}
+        if not required_cols.issubset(df.columns):
+            st.error(f"❌ Die Datei muss folgende Spalten enthalten: {', '.join(required_cols)}")
+            return
+
+        # Lade bestehende Einträge für schnellen Vergleich
+        existing_rows = pd.DataFrame(fetch_all_rows("compresultsbig", select="competition,year,discipline,category,sex,rank"))
+        existing_keys = set(
+            tuple(str(row[c]).strip().lower() for c in ["competition", "year", "discipline", "category", "sex", "rank"])
+            for _, row in existing_rows.iterrows()
+        )
+
+        inserted = 0
+        skipped = []
+        for _, row in df.iterrows():
+            key = tuple(str(row[c]).strip().lower() for c in ["competition", "year", "discipline", "category", "sex", "rank"])
+            if key in existing_keys:
+                skipped.append({c: row[c] for c in required_cols})
+                continue
+            # Insert
+            try:
+                db.table_insert("compresultsbig", {
+                    "competition": row["competition"],
+                    "year": int(row["year"]),
+                    "discipline": row["discipline"],
+                    "category": row["category"],
+                    "sex": row["sex"],
+                    "rank": str(row["rank"]),
+                    "points": float(row["points"])
+                })
+                inserted += 1
+                existing_keys.add(key)
+            except Exception as e:
+                st.warning(f"Fehler beim Import: {row.to_dict()} | {e}")
+
+        st.success(f"✅ {inserted} neue Ergebnisse importiert.")
+        if skipped:
+            st.warning(f"{len(skipped)} Einträge waren bereits vorhanden und wurden nicht importiert:")
+            st.dataframe(pd.DataFrame(skipped))
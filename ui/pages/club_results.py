@@ -0,0 +1,117 @@
+"""Full PISTE Results for Clubs."""
+
+import pandas as pd
+import streamlit as st
+
+import refdata
+from ui.cache import fetch_all_rows
+
+
+def show_full_piste_results_clubs():
+    st.header("📊 Full PISTE Results for Clubs")
+
+    # Daten laden
+    soc_df = pd.DataFrame(fetch_all_rows("socadditionalvalues", select="*"))
+    athletes_df = pd.DataFrame(fetch_all_rows("athletes", select="first_name,last_name,club,birthdate,sex"))
+
+    if not soc_df.empty and "toolenvironment" in soc_df.columns:
+        # Marker-Zeilen (Kader-Schwellen, Verletzungen) sind keine Athletenwerte
+        markers = soc_df["toolenvironment"].fillna("").astype(str).str.strip().str.lower()
+        soc_df = soc_df[~markers.isin(["injuryflags", refdata.KADER_THRESHOLD_MARKER])].copy()
+
+    if soc_df.empty or athletes_df.empty:
+        st.info("Keine Daten gefunden.")
+        return
+
+    # Merge für Club, Birthdate, Sex
+    merged = soc_df.merge(
+        athletes_df,
+        how="left",
+        left_on=["first_name", "last_name"],
+        right_on=["first_name", "last_name"],
+        suffixes=("", "_athlete")
+    )
+
+    # Alter berechnen (aus PisteYear und birthdate)
+    merged["Age"] = merged.apply(
+        lambda r: int(r["PisteYear"]) - int(str(r["birthdate"])[:4]) if pd.notnull(r["birthdate"]) and pd.notnull(r["PisteYear"]) else None,
+        axis=1
+    )
+
+    # Bio berechnen
+    bio_fields = [
+        "trainingperf", "compenhancement", "resilience", "trainingtime",
+        "trainingsince", "toolenvironment", "quality", "bioagevalue", "mirwaldvalue"
+    ]
+    merged["Bio"] = merged[bio_fields].apply(
+        lambda row: sum([float(row[f]) for f in bio_fields if pd.notnull(row[f]) and str(row[f]) not in ("", "nan")]), axis=1
+    )
+
+    # Spalten umbenennen und zusammenstellen
+    show_cols = {
+        "PisteYear": "Piste Year",
+        "first_name": "First Name",
+        "last_name": "Last Name",
+        "birthdate": "Birthdate",
+        "Age": "Age",
+        "Category": "Category",
+        "sex_athlete": "Sex",
+        "club": "Club",
+        "piste": "Piste Sport",
+        "Bio": "Bio",
+        "competitions": "Performance",
+        "totalpoints": "Totalpoints",
+        "pisteminregio": "Piste Regional Min",
+        "CompPointsRegionalTeam": "Competition RegionalTeam",
+        "pisteminnational": "Piste National Min",
+        "CompPointsNationalTeam": "Competition NationalTeam",
+        "talentcard": "SOC"
+        
+
+    }
+    # Füge fehlende Spalten als None hinzu
+    for k in show_cols:
+        if k not in merged.columns:
+            merged[k] = None
+
+    df_show = merged[list(show_cols.keys())].rename(columns=show_cols)
+
+    # Filter
+    clubs = sorted(df_show["Club"].dropna().unique())
+    socs = sorted(df_show["SOC"].dropna().unique())
+    years = sorted(df_show["Piste Year"].dropna().unique())
+
+    club = st.selectbox("Club", ["Alle"] + clubs)
+    soc = st.selectbox("SOC", ["Alle"] + socs)
+    year = st.selectbox("Piste Year", ["Alle"] + [str(y) for y in years])
+
+    filtered = df_show.copy()
+    if club != "Alle":
+        filtered = filtered[filtered["Club"] == club]
+    if soc != "Alle":
+        filtered = filtered[filtered["SOC"] == soc]
+    if year != "Alle":
+        filtered = filtered[filtered["Piste Year"].astype(str) == year]
+
+    st.dataframe(filtered)
+
+    # CSV-Export
+    st.download_button(
+        "📥 Gefilterte Ergebnisse als CSV",
+        filtered.to_csv(index=False, encoding='utf-8-sig'),
+        file_name="full_piste_results_clubs.csv",
+        mime="text/csv"
+    )
+
+    # XLSX-Export
+    import io
+    output = io.BytesIO()
+    with pd.ExcelWriter(output, engine='openpyxl') as writer:
+        filtered.to_excel(writer, index=False, sheet_name="Full PISTE Results Clubs")
+    output.seek(0)
+    st.download_button(
+        "📥 Gefilterte Ergebnisse als Excel",
+        output.getvalue(),
+        file_name="full_piste_results_clubs.xlsx",
+        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    )
@@ -0,0 +1,84 @@
+"""Jobs: queue of the background calculations."""
+
+import datetime
+import json
+
+import pandas as pd
+import streamlit as st
+
+import jobs
+from ui.engine import submit_job
+
+
+def _format_job_time(ts):
+    if not ts:
+        return ""
+    return datetime.datetime.fromtimestamp(ts).strftime("%d.%m.%Y %H:%M:%S")
+
+
+def _job_duration(job):
+    start = job.get("started_at")
+    if not start:
+        return ""
+    end = job.get("finished_at") or (datetime.datetime.now().timestamp() if job.get("status") == jobs.STATUS_RUNNING else None)
+    if not end:
+        return ""
+    return f"{end - start:.1f}s"
+
+
+@st.fragment(run_every=3)
+def _render_jobs():
+    """Job table and details; only this part polls every 3 s."""
+    job_list = jobs.list_jobs()
+    if not job_list:
+        st.info("Noch keine Jobs eingereiht.")
+        return
+    df = pd.DataFrame([{
+        "Job": j.get("label") or j.get("name"),
+        "Status": j.get("status"),
+        "Fortschritt": f"{j.get('done') or 0}/{j.get('total') or 0}",
+        "Meldung": j.get("message") or "",
+        "Parameter": json.dumps(j.get("params") or {}, ensure_ascii=False),
+        "Eingereiht": _format_job_time(j.get("created_at")),
+        "Dauer": _job_duration(j),
+        "Von": j.get("submitted_by") or "",
+    } for j in job_list])
+    st.dataframe(df, use_container_width=True, hide_index=True)
+
+    for j in job_list:
+        status = j.get("status")
+        title = f"{j.get('label') or j.get('name')} – {status} – {_format_job_time(j.get('created_at'))}"
+        with st.expander(title, expanded=status == jobs.STATUS_RUNNING):
+            total = j.get("total") or 0
+            if status == jobs.STATUS_RUNNING and total:
+                st.progress(min((j.get("done") or 0) / total, 1.0), text=j.get("message") or "")
+            if j.get("checkpoints"):
+                st.write("Erledigte Schritte: " + ", ".join(j["checkpoints"]))
+            if j.get("log"):
+                st.code("\n".join(j["log"][-30:]))
+            if j.get("error"):
+                st.error(j["error"])
+            col1, col2 = st.columns(2)
+            with col1:
+                if status in (jobs.STATUS_QUEUED, jobs.STATUS_RUNNING) and st.button("⛔ Abbrechen", key=f"job_cancel_{j['id']}"):
+                    jobs.cancel(j["id"])
+                    st.rerun()
+            with col2:
+                if status in (jobs.STATUS_FAILED, jobs.STATUS_CANCELLED) and st.button("🔁 Fortsetzen", key=f"job_retry_{j['id']}"):
+                    jobs.retry(j["id"])
+                    st.rerun()
+
+
+def jobs_anzeigen():
+    st.header("⏳ Jobs")
+    st.caption("Hintergrund-Berechnungen laufen unabhängig von der Browser-Sitzung weiter. Abgebrochene Jobs setzen beim erneuten Start nach dem letzten fertigen Jahr fort.")
+
+    _render_jobs()
+
+    if st.button("🧹 Abgeschlossene Jobs entfernen"):
+        removed = jobs.delete_finished()
+        st.success(f"{removed} Jobs entfernt.")
+        st.rerun()
+
+    if st.button("🔗 Athleten-IDs in Resultattabellen zuordnen"):
+        submit_job("identity_backfill", {"only_missing": True})
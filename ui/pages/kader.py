@@ -0,0 +1,128 @@
+"""Kaderzugehörigkeiten."""
+
+import datetime
+
+import pandas as pd
+import streamlit as st
+
+import db
+from divingeval.common import load_compresults_for_year
+from ui.cache import fetch_all_rows
+
+
+def show_kaderzugehoerigkeiten():
+    st.header("🎯 Kaderzugehörigkeiten")
+
+    loaded = db.fetch_many({
+        "soc": lambda: fetch_all_rows("socadditionalvalues", select="*"),
+        "competitions": lambda: fetch_all_rows("competitions", select="id, Name, PisteYear, [qual-JEM], [qual-EM], [qual-WM]"),
+    })
+    soc_df = pd.DataFrame(loaded["soc"])
+    if not soc_df.empty and "toolenvironment" in soc_df.columns:
+        soc_df = soc_df[soc_df["toolenvironment"].fillna("").astype(str).str.lower() != "injuryflags"].copy()
+
+    competitions_df = pd.DataFrame(loaded["competitions"])
+
+    if soc_df.empty and competitions_df.empty:
+        st.info("Keine Daten für Kaderzugehörigkeiten gefunden.")
+        return
+
+    def _yes(v):
+        return str(v or "").strip().lower() == "yes"
+
+    available_years = set()
+    if not soc_df.empty and "PisteYear" in soc_df.columns:
+        available_years.update(str(v).strip() for v in soc_df["PisteYear"].dropna().tolist() if str(v).strip())
+    if not competitions_df.empty and "PisteYear" in competitions_df.columns:
+        available_years.update(str(v).strip() for v in competitions_df["PisteYear"].dropna().tolist() if str(v).strip())
+
+    years = sorted(available_years, reverse=True)
+    if not years:
+        st.info("Keine Jahre (PisteYear) verfügbar.")
+        return
+
+    current_year = str(datetime.datetime.now().year)
+    default_idx = years.index(current_year) if current_year in years else 0
+    selected_year = st.selectbox("Jahr", years, index=default_idx, key="kaderzugehoerigkeit_year")
+
+    # Jugendkader stammt aus SOC (Piste-basiert).
+    nat_youth = pd.DataFrame(columns=["first_name", "last_name", "sex", "Category", "PisteYear"])
+    reg_youth = pd.DataFrame(columns=["first_name", "last_name", "sex", "Category", "PisteYear"])
+    if not soc_df.empty:
+        for col in ["first_name", "last_name", "sex", "Category", "PisteYear", "talentcard"]:
+            if col not in soc_df.columns:
+                soc_df[col] = None
+
+        soc_year = soc_df[soc_df["PisteYear"].astype(str).str.strip() == str(selected_year).strip()].copy()
+        soc_year = soc_year[soc_year["Category"].astype(str).str.strip().str.lower() != "elite"]
+        soc_year = soc_year[soc_year["talentcard"].notna()]
+
+        nat_youth = soc_year[soc_year["talentcard"].astype(str).str.strip().str.lower() == "national"][
+            ["first_name", "last_name", "sex", "Category", "PisteYear"]
+        ].drop_duplicates().sort_values(["last_name", "first_name"]).reset_index(drop=True)
+
+        reg_youth = soc_year[soc_year["talentcard"].astype(str).str.strip().str.lower() == "regional"][
+            ["first_name", "last_name", "sex", "Category", "PisteYear"]
+        ].drop_duplicates().sort_values(["last_name", "first_name"]).reset_index(drop=True)
+
+    # Elite: nur Wettkampfresultate und nur Wettkämpfe mit Nationalteam-Relevanz.
+    nat_elite = pd.DataFrame(columns=["first_name", "last_name", "sex", "CategoryStart", "Competition", "Discipline", "Points", "PisteYear"])
+    comp_df = pd.DataFrame(load_compresults_for_year(selected_year))
+    if not comp_df.empty:
+        for col in ["first_name", "last_name", "sex", "CategoryStart", "Competition", "Discipline", "Points", "NationalTeam"]:
+            if col not in comp_df.columns:
+                comp_df[col] = None
+
+        qual_cols = ["qual-JEM", "qual-EM", "qual-WM"]
+        if not competitions_df.empty:
+            if "competition_id" in comp_df.columns:
+                comp_quals = competitions_df[["id"] + qual_cols].rename(columns={"id": "competition_id"})
+                comp_df = comp_df.merge(comp_quals, on="competition_id", how="left")
+            else:
+                comp_quals = competitions_df.assign(
+                    _name_key=competitions_df["Name"].astype(str).str.strip().str.lower()
+                ).drop_duplicates(subset=["_name_key"], keep="first")[["_name_key"] + qual_cols]
+                comp_df["_name_key"] = comp_df["Competition"].astype(str).str.strip().str.lower()
+                comp_df = comp_df.merge(comp_quals, on="_name_key", how="left")
+        for col in qual_cols:
+            if col not in comp_df.columns:
+                comp_df[col] = None
+
+        comp_df["_nt_relevant_comp"] = comp_df[qual_cols].apply(lambda col: col.map(_yes)).any(axis=1)
+
+        nat_elite = comp_df[
+            (comp_df["CategoryStart"].astype(str).str.strip().str.lower() == "elite")
+            & (comp_df["NationalTeam"].astype(str).str.strip().str.lower() == "yes")
+            & (comp_df["_nt_relevant_comp"])
+        ][["first_name", "last_name", "sex", "CategoryStart", "Competition", "Discipline", "Points", "PisteYear"]]
+
+        nat_elite = nat_elite.drop_duplicates().sort_values(["last_name", "first_name", "Competition", "Discipline"]).reset_index(drop=True)
+
+    st.caption("Jugend-Kader werden aus SOC (Piste) gelesen. Elite-Nationalkader werden aus Wettkampfresultaten gelesen und nur für Nationalteam-relevante Wettkämpfe berücksichtigt.")
+
+    st.subheader(f"Nationalkader Elite ({len(nat_elite)})")
+    st.dataframe(nat_elite)
+    st.download_button(
+        "📥 Nationalkader Elite als CSV",
+        nat_elite.to_csv(index=False, encoding="utf-8-sig"),
+        file_name=f"kader_national_elite_{selected_year}.csv",
+        mime="text/csv",
+    )
+
+    st.subheader(f"Nationalkader Jugend ({len(nat_youth)})")
+    st.dataframe(nat_youth)
+    st.download_button(
+        "📥 Nationalkader Jugend als CSV",
+        nat_youth.to_csv(index=False, encoding="utf-8-sig"),
+        file_name=f"kader_national_jugend_{selected_year}.csv",
+        mime="text/csv",
+    )
+
+    st.subheader(f"Regionalkader Jugend ({len(reg_youth)})")
+    st.dataframe(reg_youth)
+    st.download_button(
+        "📥 Regionalkader Jugend als CSV",
+        reg_youth.to_csv(index=False, encoding="utf-8-sig"),
+        file_name=f"kader_regional_jugend_{selected_year}.csv",
+        mime="text/csv",
+    )
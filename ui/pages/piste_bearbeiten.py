@@ -0,0 +1,106 @@
+"""Piste Ergebnisse bearbeiten."""
+
+import pandas as pd
+import streamlit as st
+
+import db
+import identity
+from ui.cache import get_athletes, get_pistedisciplines
+from ui.common import diff_grid, paged_grid
+
+
+def manage_pisteresults_correction():
+    st.header("🛠️ Piste Ergebnisse bearbeiten")
+
+    years = sorted(
+        {int(y) for y in db.table_distinct("pisteresults", "TestYear") if str(y).isdigit()},
+        reverse=True,
+    )
+    if not years:
+        st.info("Keine Piste-Ergebnisse vorhanden.")
+        return
+
+    selected_year = st.selectbox("Testjahr", [""] + [str(y) for y in years], index=0)
+    if not selected_year:
+        st.info("Bitte zuerst ein Testjahr auswählen.")
+        return
+
+    athletes = get_athletes()
+    disciplines = get_pistedisciplines()
+    athlete_by_id = {identity.normalize_id(a.get("id")): a for a in athletes if a.get("id")}
+    discipline_name_by_id = {identity.normalize_id(d.get("id")): d.get("name") for d in disciplines if d.get("id")}
+
+    # Athlet und Disziplin werden serverseitig gefiltert, nicht über die ganze Tabelle im Speicher
+    athlete_labels = {
+        f"{str(a.get('first_name') or '').strip()} {str(a.get('last_name') or '').strip()}".strip(): a.get("id")
+        for a in athletes
+        if a.get("id")
+    }
+    discipline_labels = {d.get("name"): d.get("id") for d in disciplines if d.get("id")}
+    f1, f2 = st.columns(2)
+    with f1:
+        selected_athlete = st.selectbox("Athlet", ["Alle"] + sorted(athlete_labels), key="piste_corr_athlete")
+    with f2:
+        selected_discipline = st.selectbox("Disziplin", ["Alle"] + sorted(discipline_labels), key="piste_corr_discipline")
+
+    filters = {"TestYear": selected_year}
+    if selected_athlete != "Alle":
+        filters["athlete_id"] = athlete_labels[selected_athlete]
+    if selected_discipline != "Alle":
+        filters["discipline_id"] = discipline_labels[selected_discipline]
+
+    grid_cols = ["id", "athlete_id", "discipline_id", "raw_result", "points", "category", "sex"]
+    page_df, total = paged_grid(
+        "pisteresults",
+        key="piste_corr",
+        sort_columns=["category", "sex", "points", "raw_result"],
+        search_columns=["category", "sex"],
+        select=", ".join(f"[{c}]" for c in grid_cols),
+        **filters,
+    )
+    if not total:
+        st.info("Keine Einträge für die gewählten Filter gefunden.")
+        return
+
+    page_df = page_df.reindex(columns=grid_cols)
+    page_df.insert(
+        1,
+        "athlete_label",
+        page_df["athlete_id"].map(
+            lambda aid: " ".join(
+                str((athlete_by_id.get(identity.normalize_id(aid)) or {}).get(k) or "").strip()
+                for k in ("first_name", "last_name")
+            ).strip()
+        ),
+    )
+    page_df.insert(
+        2,
+        "discipline_name",
+        page_df["discipline_id"].map(lambda did: discipline_name_by_id.get(identity.normalize_id(did), "Unbekannt")),
+    )
+    editable = page_df.reset_index(drop=True)
+    edited = st.data_editor(
+        editable,
+        hide_index=True,
+        num_rows="fixed",
+        disabled=["id", "athlete_label", "discipline_name", "athlete_id", "discipline_id"],
+        column_config={"id": None, "athlete_id": None, "discipline_id": None},
+        key=f"piste_corr_editor_{st.session_state.get('piste_corr_page', 1)}",
+    )
+
+    if st.button("💾 Änderungen speichern", key="piste_corr_save"):
+        def _norm_piste_value(v):
+            if v is None or (not isinstance(v, str) and pd.isna(v)):
+                return None
+            if isinstance(v, str):
+                return v.strip() or None
+            return v.item() if hasattr(v, "item") else v
+
+        orig = editable.copy()
+        new = edited.copy()
+        orig["id"] = orig["id"].map(identity.normalize_id)
+        new["id"] = new["id"].map(identity.normalize_id)
+        _, updates, _ = diff_grid(orig, new, ["id", "raw_result", "points", "category", "sex"], _norm_piste_value)
+        changed = db.update_many("pisteresults", updates)
+        st.success(f"{changed} Piste-Ergebnisse aktualisiert.")
+        st.rerun()
@@ -0,0 +1,172 @@
+"""Piste Ergebnisse eingeben."""
+
+import datetime
+import time
+
+import pandas as pd
+import streamlit as st
+
+import db
+import importers
+import refdata
+from divingeval.scoring import get_points
+from ui.cache import get_athletes, get_pistedisciplines
+from ui.common import get_category_from_testyear
+from ui.engine import streamlit_progress
+
+
+def manage_results_entry():
+    st.header("🎯 Ergebnisse für einen Athleten eingeben")
+
+    athletes = get_athletes()
+
+    pistedisciplines = get_pistedisciplines()
+
+    athlete_names = {
+        f"{a.get('first_name', '').strip()} {a.get('last_name', '').strip()}": a['id']
+        for a in athletes if a.get('first_name') and a.get('last_name') and 'id' in a
+    }
+    if not athlete_names:
+        st.warning("Keine Athleten mit Vor- und Nachnamen gefunden! Prüfe die Datenbank und die Feldnamen.")
+        return
+
+    selected_athlete_name = st.selectbox("Wähle einen Athleten", [""] + list(athlete_names.keys()), index=0)
+    test_year = st.text_input("Testjahr (Format: yyyy)", value=str(datetime.date.today().year))
+
+    if not test_year.isdigit() or len(test_year) != 4:
+        st.error("Bitte ein gültiges Jahr im Format yyyy eingeben!")
+        return
+
+    if selected_athlete_name:
+        athlete_id = athlete_names[selected_athlete_name]
+        athlete_data = next(a for a in athletes if a['id'] == athlete_id)
+        sex = athlete_data.get("sex")
+        vintage = athlete_data.get("vintage")
+        category = get_category_from_testyear(vintage, test_year)
+
+        st.subheader(f"Ergebnisse für {selected_athlete_name} ({category}, {sex}) eingeben")
+
+        input_data = []
+        allowed_disciplines = [
+            "BodySize", "UpperBodySize", "JumpHeight", "102c", "202c", "302c", "402c",
+            "ABSWallbar", "ShoulderEvel", "ShoulderExt", "PikePosition", "Split",
+            "Handstand", "PullUp", "GlobalCore"
+        ]
+        discipline_map = {d["name"]: d for d in pistedisciplines}
+        for discipline_name in allowed_disciplines:
+            discipline = discipline_map.get(discipline_name)
+            if not discipline:
+                continue
+            discipline_id = discipline["id"]
+            value = st.number_input(f"{discipline_name}", min_value=0.0, step=0.1, format="%.2f", key=f"{discipline_id}")
+            input_data.append((discipline_id, value))
+
+        if st.button("💾 Ergebnisse speichern"):
+            excluded_ids = {
+                "640260ec-a094-462d-a69e-d91bbe35d94c",  # BodyWeight
+                "5906836a-24aa-40e1-a71f-614a7ea4a825",  # BodySize
+                "7eb062f7-3329-4cde-8875-bd6fd362137b",  # UpperBodySize
+            }
+
+            # Einzelpunkte speichern
+            for discipline_id, raw_result in input_data:
+                if raw_result <= 0:
+                    continue
+                # 9999-Logik EINZEL-EINGABE
+                if str(raw_result).strip() == "9999":
+                    points = 0
+                elif discipline_id in excluded_ids:
+                    points = 0
+                else:
+                    points = get_points(discipline_id, raw_result, category, sex)
+
+                existing = db.table_select('pisteresults', 'id', athlete_id=athlete_id, discipline_id=discipline_id, TestYear=int(test_year))
+
+                if existing:
+                    db.table_update('pisteresults', {
+                        'raw_result': raw_result,
+                        'points': points,
+                        'category': category,
+                        'sex': sex
+                    }, id=existing[0]['id'])
+                else:
+                    db.table_insert('pisteresults', {
+                        'athlete_id': athlete_id,
+                        'discipline_id': discipline_id,
+                        'raw_result': raw_result,
+                        'points': points,
+                        'category': category,
+                        'sex': sex,
+                        'TestYear': int(test_year)
+                    })
+
+            st.success("✅ Ergebnisse gespeichert und Punkte berechnet!")
+
+    st.markdown("---")
+    st.subheader("📤 Ergebnisse per Datei importieren")
+
+    uploaded_file = st.file_uploader("CSV/XLSX-Datei mit Ergebnissen hochladen", type=["csv", "xlsx"])
+
+    if uploaded_file:
+        started = time.perf_counter()
+        piste_import = importers.PisteImport(
+            get_athletes(),
+            pistedisciplines,
+            refdata.age_categories(),
+            db.table_select('scoretables', 'discipline_id, category, sex, result_min, result_max, points'),
+        )
+        counts = {"inserted": 0, "updated": 0, "values": 0, "rows": 0}
+        reject_chunks = []
+
+        # Datei blockweise lesen und direkt schreiben; alles in einer Transaktion
+        try:
+            with db.transaction() as tx:
+                def _write_chunk(chunk, first_row):
+                    rows, rejects = piste_import.prepare(chunk, first_row=first_row)
+                    if not rejects.empty:
+                        reject_chunks.append(rejects)
+                    if rows.empty:
+                        return
+                    result = db.upsert_many(
+                        'pisteresults',
+                        importers.records(rows, ["athlete_id", "discipline_id", "raw_result", "points", "category", "sex", "TestYear"]),
+                        keys=importers.PISTE_KEY_COLUMNS,
+                        tx=tx,
+                    )
+                    counts["inserted"] += result["inserted"]
+                    counts["updated"] += result["updated"]
+                    counts["values"] += len(rows)
+                    counts["rows"] += rows["_row"].nunique()
+
+                stats = importers.stream_upload(
+                    uploaded_file,
+                    _write_chunk,
+                    required_columns=importers.PISTE_BASE_COLUMNS,
+                    progress=streamlit_progress("Importiere Piste-Ergebnisse ..."),
+                )
+        except ValueError as e:
+            st.error(f"❌ {e}")
+            return
+        except Exception as e:
+            st.error(f"❌ Import fehlgeschlagen, nichts gespeichert: {e}")
+            return
+        elapsed = time.perf_counter() - started
+
+        rejects = pd.concat(reject_chunks, ignore_index=True) if reject_chunks else pd.DataFrame()
+        if not counts["values"] and rejects.empty:
+            st.warning("Keine Disziplin-Spalten mit Werten gefunden.")
+            return
+        st.success(
+            f"✅ {counts['values']} Ergebnisse aus {counts['rows']} von {stats['rows']} Zeile(n) importiert "
+            f"({counts['inserted']} neu, {counts['updated']} aktualisiert) in {elapsed:.1f}s "
+            f"≈ {stats['rows'] / max(elapsed, 1e-6):.0f} Zeilen/s."
+        )
+        if not rejects.empty:
+            st.warning(f"⚠️ {len(rejects)} Wert(e)/Zeile(n) wurden nicht importiert:")
+            st.dataframe(rejects, hide_index=True)
+            st.download_button(
+                "📄 Abgewiesene Zeilen herunterladen",
+                data=rejects.to_csv(index=False).encode("utf-8-sig"),
+                file_name="piste_import_rejects.csv",
+                mime="text/csv",
+            )
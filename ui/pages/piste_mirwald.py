@@ -0,0 +1,59 @@
+"""Piste Mirwald: bio age / Mirwald values per PisteYear."""
+
+import datetime
+
+import pandas as pd
+import streamlit as st
+
+import db
+import importers
+from ui.common import import_yearly_values
+
+
+def bio_mirwald():
+    st.header("🧬 Bio Mirwald Eingabe & Import")
+
+    # --- Einzel-Eingabe ---
+    athletes = db.table_select('athletes', 'first_name, last_name')
+    athlete_names = [f"{a['first_name']} {a['last_name']}" for a in athletes]
+
+    st.subheader("Einzel-Eingabe")
+    selected_name = st.selectbox("Athlet auswählen", [""] + athlete_names, index=0)
+    pisteyear = st.number_input("PisteYear", min_value=2000, max_value=2100, value=datetime.date.today().year)
+    bioentwstand = st.selectbox("bioentwstand", [1, 2, 3])
+
+    if st.button("Speichern"):
+        if not selected_name:
+            st.warning("Bitte zuerst einen Athleten auswählen.")
+            return
+        first_name, last_name = selected_name.split(" ", 1)
+        db.upsert_many("pistemirwald", [{
+            "first_name": first_name,
+            "last_name": last_name,
+            "PisteYear": int(pisteyear),
+            "bioentwstand": int(bioentwstand),
+        }], importers.YEARLY_KEY_COLUMNS)
+        st.success(f"Eintrag für {selected_name} gespeichert.")
+
+    st.markdown("---")
+
+    # --- CSV-Import ---
+    st.subheader("CSV-Import")
+    sample_df = pd.DataFrame([{
+        "first_name": "Max",
+        "last_name": "Mustermann",
+        "PisteYear": 2024,
+        "bioentwstand": 1
+    }])
+    st.download_button(
+        "📄 Beispiel-CSV herunterladen",
+        data=sample_df.to_csv(index=False).encode("utf-8"),
+        file_name="bio_mirwald_beispiel.csv",
+        mime="text/csv"
+    )
+
+    uploaded_file = st.file_uploader("CSV-Datei mit Mirwald-Daten hochladen", type="csv")
+    if uploaded_file is not None:
+        st.info("Datei geladen. Klicke auf '📤 Import starten', um den Import auszuführen.")
+        if st.button("📤 Import starten", key="bio_mirwald_import_submit"):
+            import_yearly_values(uploaded_file, "pistemirwald", {"bioentwstand": "int"}, athletes)
@@ -0,0 +1,38 @@
+"""Piste Punkte neu berechnen."""
+
+import streamlit as st
+
+from divingeval.scoring import run_punkte_neuberechnen
+from ui.cache import fetch_all_rows
+from ui.engine import streamlit_progress, submit_job
+
+
+def punkte_neuberechnen():
+    st.header("🔄 Punkte neu berechnen für ein bestimmtes Testjahr")
+
+    st.info("""
+    **Hinweis:**  
+    „Piste Punkte neu berechnen“ wird **nur benötigt**, wenn sich etwas an den Bewertungsgrundlagen ändert, z.B.:
+
+    - Die Scoretabelle (`scoretables`) wird angepasst (z.B. neue Punkteverteilung, neue Kategorien, neue Altersgrenzen).
+    - Die Alterskategorien ändern sich.
+    - Es gibt sonstige Regeländerungen, die die Punkteberechnung beeinflussen.
+
+    Im normalen Ablauf (Eingabe oder Import von Ergebnissen) werden die Punkte immer direkt nach aktueller Scoretabelle berechnet und gespeichert.
+    **Nur wenn sich die Regeln nachträglich ändern, müssen die bestehenden Ergebnisse mit „Piste Punkte neu berechnen“ aktualisiert werden.**
+    """)
+
+    # Jahre aus pisteresults holen
+    years_data = fetch_all_rows("pisteresults", select="TestYear")
+    all_years = sorted(set(r["TestYear"] for r in years_data if r["TestYear"]), reverse=True)
+    selected_year = st.selectbox("📅 Testjahr für Neuberechnung wählen", all_years)
+
+    if st.button("🔄 Neuberechnung starten"):
+        updated_count = run_punkte_neuberechnen(selected_year, progress=streamlit_progress())
+        if updated_count is None:
+            st.warning(f"⚠️ Keine Resultate für das Jahr {selected_year} gefunden.")
+            return
+        st.success(f"✅ {updated_count} Resultate für das Jahr {selected_year} wurden neu bewertet.")
+
+    if selected_year and st.button("🔄 Neuberechnung als Hintergrund-Job einreihen"):
+        submit_job("punkte_neuberechnen", {"years": [selected_year]})
@@ -0,0 +1,104 @@
+"""Piste Resultate anzeigen."""
+
+import pandas as pd
+import streamlit as st
+
+from ui.cache import fetch_all_rows, get_athletes, get_pistedisciplines
+from ui.common import get_lookup_dict
+
+
+# Auswertung starten
+def auswertung_starten():
+    st.header("📈 Piste Resultate anzeigen")
+
+    # Daten laden (jetzt mit Caching und Utilitys)
+    try:
+        results = fetch_all_rows("pisteresults", select="*")
+        athletes = get_athletes()
+        disciplines = get_pistedisciplines()
+    except Exception as e:
+        st.error(f"Piste Resultate konnten nicht geladen werden: {e}")
+        return
+
+    # Lookup-Tabellen
+    athlete_lookup = get_lookup_dict(athletes, "id", "full_name")
+    discipline_lookup = get_lookup_dict(disciplines, "id", "name")
+
+    # Filteroptionen extrahieren
+    all_years = sorted(set([r['TestYear'] for r in results if r['TestYear']]), reverse=True)
+    all_categories = sorted(set([r['category'] for r in results if r['category']]))
+    all_sexes = sorted(set([r['sex'] for r in results if r.get('sex')]))
+    all_names = sorted(set([athlete_lookup.get(r['athlete_id'], "Unbekannt") for r in results]))
+
+    # Dynamische Multiselect-Funktion
+    def dynamic_multiselect(label, options, key):
+        default = st.session_state.get(f"{key}_default", ["Alle"])
+        selected = st.multiselect(label, ["Alle"] + options, default=default, key=key)
+        if "Alle" in selected and len(selected) > 1:
+            selected = [s for s in selected if s != "Alle"]
+            st.session_state[f"{key}_default"] = selected
+            st.rerun()
+        if not selected:
+            selected = ["Alle"]
+            st.session_state[f"{key}_default"] = selected
+            st.rerun()
+        return selected
+
+    # Filter mit automatischem "Alle"-Verhalten
+    selected_years = dynamic_multiselect("📅 Testjahr wählen", all_years, "jahr")
+    selected_categories = dynamic_multiselect("📂 Kategorie wählen", all_categories, "kategorie")
+    selected_sexes = dynamic_multiselect("⚧ Geschlecht wählen", all_sexes, "geschlecht")
+    selected_names = dynamic_multiselect("👤 Name wählen", all_names, "name")
+
+    # Daten filtern
+    filtered = results
+    if "Alle" not in selected_years:
+        filtered = [r for r in filtered if r['TestYear'] in selected_years]
+    if "Alle" not in selected_categories:
+        filtered = [r for r in filtered if r['category'] in selected_categories]
+    if "Alle" not in selected_sexes:
+        filtered = [r for r in filtered if r.get('sex') in selected_sexes]
+    if "Alle" not in selected_names:
+        filtered = [r for r in filtered if athlete_lookup.get(r['athlete_id'], "Unbekannt") in selected_names]
+
+    # Ergebnisstruktur
+    results_dict = {}
+    for entry in filtered:
+        athlete_id = entry['athlete_id']
+        discipline_id = entry['discipline_id']
+        year = entry['TestYear']
+        category = entry['category']
+        points = entry['points']
+        sex = entry.get('sex')
+        full_name = athlete_lookup.get(athlete_id, "Unbekannt")
+        discipline_name = discipline_lookup.get(discipline_id, "Unbekannt")
+        raw_value = entry.get('raw_result', None)
+
+        key = (athlete_id, year)
+        if key not in results_dict:
+            results_dict[key] = {
+                "Name": full_name,
+                "Kategorie": category,
+                "Geschlecht": sex,
+                "Testjahr": year,
+                "Totalpunkte": 0
+            }
+
+        results_dict[key][f"{discipline_name}_Wert"] = raw_value
+        results_dict[key][f"{discipline_name}_Punkte"] = points
+        results_dict[key]["Totalpunkte"] += points if points not in (None, "", "nan") else 0
+
+    # DataFrame erzeugen
+    df = pd.DataFrame.from_dict(results_dict, orient='index').reset_index(drop=True)
+    st.dataframe(df)
+
+    st.download_button("📥 CSV herunterladen", df.to_csv(index=False, encoding='utf-8-sig'), file_name="resultate.csv", mime='text/csv')
+
+    try:
+        import io
+        excel_buffer = io.BytesIO()
+        df.to_excel(excel_buffer, index=False, engine='openpyxl')
+        excel_buffer.seek(0)
+        st.download_button("📥 Excel herunterladen", excel_buffer, file_name="resultate.xlsx")
+    except ImportError:
+        st.info("📦 Modul 'openpyxl' ist nicht installiert – Excel-Export nicht verfügbar.")
@@ -0,0 +1,42 @@
+"""PisteYear neu berechnen: the whole pipeline for one PisteYear."""
+
+import pandas as pd
+import streamlit as st
+
+from divingeval.pipeline import STAGES as PIPELINE_STAGES, run_pipeline
+from ui.engine import streamlit_progress, submit_job
+
+
+def pisteyear_neu_berechnen():
+    st.header("🚀 PisteYear neu berechnen")
+    st.info(
+        "Rechnet alle Stufen eines PisteYears in einem Durchlauf neu: "
+        "Piste Punkte → Wettkampf-Bewertung → RefPoint Full Analyse → SOC. "
+        "Die Zwischenergebnisse bleiben im Speicher, geschrieben wird erst am Schluss in einer Transaktion."
+    )
+    years = [str(y) for y in range(2024, 2031)]
+    selected_year = st.selectbox("PisteYear wählen", years, key="pipeline_year")
+    stage_labels = {name: label for name, (label, _, _) in PIPELINE_STAGES.items()}
+    selected_stages = st.multiselect(
+        "Stufen (Abhängigkeiten werden mitgerechnet)",
+        list(stage_labels),
+        default=list(stage_labels),
+        format_func=stage_labels.get,
+    )
+
+    if st.button("🚀 PisteYear neu berechnen"):
+        try:
+            report = run_pipeline(selected_year, stages=selected_stages or None, progress=streamlit_progress())
+        except (ValueError, RuntimeError) as e:
+            st.error(str(e))
+            return
+        timings = pd.DataFrame(
+            [{"Stufe": s["label"], "Sekunden": round(s["seconds"], 2)} for s in report["stages"]]
+            + [{"Stufe": "Schreiben", "Sekunden": round(report["commit_seconds"], 2)}]
+        )
+        st.success(f"✅ PisteYear {selected_year} in {report['total_seconds']:.1f}s neu berechnet.")
+        st.dataframe(timings, hide_index=True)
+        st.dataframe(pd.DataFrame.from_dict(report["counts"], orient="index"))
+
+    if st.button("🚀 Als Hintergrund-Job einreihen"):
+        submit_job("pisteyear_pipeline", {"years": [selected_year], "stages": selected_stages or None})
@@ -0,0 +1,401 @@
+"""Referenz- und Bewertungstabellen: editable reference tables and the score table."""
+
+import datetime
+
+import pandas as pd
+import streamlit as st
+
+import db
+import refdata
+from ui.cache import fetch_all_rows
+from ui.common import cascade_competition_renames, diff_grid, save_grid_changes
+
+
+def referenztabellen_anzeigen():
+    st.header("📚 Referenz- und Bewertungstabellen")
+
+    pistedisciplines = pd.DataFrame(fetch_all_rows("pistedisciplines", select="id,name"))
+    discipline_name_by_id = {}
+    if not pistedisciplines.empty:
+        discipline_name_by_id = dict(zip(pistedisciplines["id"], pistedisciplines["name"]))
+
+    def _norm(v):
+        if pd.isna(v):
+            return None
+        if isinstance(v, pd.Timestamp):
+            return v.date().isoformat()
+        if isinstance(v, datetime.datetime):
+            return v.date().isoformat()
+        if isinstance(v, datetime.date):
+            return v.isoformat()
+        if isinstance(v, str):
+            s = v.strip()
+            return s if s else None
+        return v
+
+    def _render_inline_table(title, table_name, columns, key_prefix, filters=None, int_id=False, sort_by=None, persist_columns=None, disabled_cols=None, preprocess_fn=None, hidden_cols=None):
+        st.subheader(title)
+        # Langtabellen erst nach Migration 006 editierbar; die alten breiten Tabellen sind dann Views
+        if table_name in refdata.LONG_TABLE_PROBES and not refdata.has_long_table(table_name):
+            st.warning(f"⚠️ {refdata.MIGRATION_006_PENDING}")
+            return
+        rows = fetch_all_rows(table_name, select="*", **(filters or {}))
+        df = pd.DataFrame(rows)
+
+        def _normalize_id_value(v):
+            if pd.isna(v):
+                return None
+            if isinstance(v, str):
+                s = v.strip()
+                if not s or s.lower() == "nan":
+                    return None
+                if int_id:
+                    try:
+                        return str(int(float(s)))
+                    except Exception:
+                        return None
+                return s
+            if int_id:
+                try:
+                    return str(int(float(v)))
+                except Exception:
+                    return None
+            return str(v)
+
+        for col in columns:
+            if col not in df.columns:
+                df[col] = None
+
+        if sort_by:
+            safe_sort = [c for c in sort_by if c in df.columns]
+            if safe_sort and not df.empty:
+                df = df.sort_values(safe_sort)
+
+        if preprocess_fn:
+            df = preprocess_fn(df)
+
+        editable = df[columns].copy().reset_index(drop=True)
+        persist_cols = persist_columns or columns
+        disabled = disabled_cols or (["id"] if "id" in columns else [])
+        hidden = set(hidden_cols or [])
+        column_config = {col: None for col in hidden if col in editable.columns}
+        edited = st.data_editor(
+            editable,
+            hide_index=True,
+            num_rows="dynamic",
+            disabled=disabled,
+            column_config=column_config,
+            key=f"{key_prefix}_editor",
+        )
+
+        if st.button(f"💾 {title} speichern", key=f"{key_prefix}_save"):
+            if "id" not in columns:
+                st.error("Diese Tabelle kann nicht gespeichert werden (id-Spalte fehlt).")
+                return
+
+            orig = editable.copy()
+            new = edited.copy()
+
+            orig["id"] = orig["id"].apply(_normalize_id_value)
+            new["id"] = new["id"].apply(_normalize_id_value)
+
+            inserts, updates, deleted_ids = diff_grid(orig, new, persist_cols, _norm)
+
+            renames = []
+            changed_ids = []
+            if table_name == "competitions" and "Name" in orig.columns:
+                orig_names = dict(zip(orig["id"], orig["Name"].apply(lambda v: str(_norm(v) or "").strip())))
+                renames = [
+                    (orig_names.get(row_id, ""), str(changed["Name"] or "").strip())
+                    for row_id, changed in updates
+                    if "Name" in changed
+                ]
+                changed_ids = [int(row_id) for row_id, changed in updates if "Name" in changed or "PisteYear" in changed]
+
+            def _db_id(v):
+                return int(v) if int_id else v
+
+            with db.transaction() as tx:
+                save_grid_changes(
+                    table_name,
+                    inserts,
+                    [(_db_id(row_id), changed) for row_id, changed in updates],
+                    [_db_id(row_id) for row_id in deleted_ids],
+                    tx,
+                )
+                cascade_counts = cascade_competition_renames(
+                    renames, tx, changed_ids, added=table_name == "competitions" and bool(inserts)
+                )
+
+            if table_name == "competitions":
+                st.success(
+                    f"{title} gespeichert. Verknüpfungen aktualisiert: "
+                    f"compresults={cascade_counts['compresults']}, "
+                    f"pisterefcompresults={cascade_counts['pisterefcompresults']}."
+                )
+            else:
+                st.success(f"{title} gespeichert.")
+            st.rerun()
+
+    def _add_discipline_name(df):
+        if "discipline_id" in df.columns:
+            df = df.copy()
+            df["discipline_name"] = df["discipline_id"].map(lambda v: discipline_name_by_id.get(v, "Unbekannt"))
+        return df
+
+    # Haupttabellen
+    _render_inline_table(
+        title="🏅 Scoretabelle",
+        table_name="scoretables",
+        columns=["id", "discipline_name", "discipline_id", "category", "sex", "result_min", "result_max", "points"],
+        persist_columns=["id", "discipline_id", "category", "sex", "result_min", "result_max", "points"],
+        disabled_cols=["id", "discipline_name"],
+        hidden_cols=["id", "discipline_id"],
+        preprocess_fn=_add_discipline_name,
+        key_prefix="scoretables",
+        int_id=False,
+        sort_by=["discipline_id", "category", "sex", "result_min"],
+    )
+
+    _render_inline_table(
+        title="🎯 Selectionpoints",
+        table_name="selectionpoints",
+        columns=["id", "Competition", "year", "category", "Discipline", "sex", "points", "difficulty"],
+        key_prefix="selectionpoints",
+        int_id=True,
+        sort_by=["Competition", "year", "category", "Discipline", "sex"],
+    )
+
+    st.subheader("🧮 Kader %-Schwellen")
+    try:
+        threshold_rows = fetch_all_rows(
+            "socadditionalvalues",
+            select="id, first_name, last_name, CompPointsNationalTeam, CompPointsRegionalTeam, quality",
+            toolenvironment=refdata.KADER_THRESHOLD_MARKER,
+        )
+        df_thr = pd.DataFrame(threshold_rows)
+        for c in ["id", "first_name", "last_name", "CompPointsNationalTeam", "CompPointsRegionalTeam", "quality"]:
+            if c not in df_thr.columns:
+                df_thr[c] = None
+        df_thr = df_thr[["id", "first_name", "last_name", "CompPointsNationalTeam", "CompPointsRegionalTeam", "quality"]].copy()
+        df_thr = df_thr.rename(
+            columns={
+                "first_name": "discipline",
+                "last_name": "category_group",
+                "CompPointsNationalTeam": "national_percent",
+                "CompPointsRegionalTeam": "regional_percent",
+                "quality": "notes",
+            }
+        )
+        df_thr = df_thr.sort_values(["discipline", "category_group"], na_position="last").reset_index(drop=True)
+
+        edited_thr = st.data_editor(
+            df_thr,
+            hide_index=True,
+            num_rows="dynamic",
+            key="kaderthresholds_editor",
+        )
+
+        if st.button("💾 🧮 Kader %-Schwellen speichern", key="kaderthresholds_save"):
+            orig = df_thr.copy()
+            new = edited_thr.copy()
+
+            def _norm_id(v):
+                if pd.isna(v):
+                    return None
+                try:
+                    return str(int(float(v)))
+                except Exception:
+                    return None
+
+            orig["id"] = orig["id"].apply(_norm_id)
+            new["id"] = new["id"].apply(_norm_id)
+
+            # Grid-Spalten -> Spalten der Marker-Zeilen in socadditionalvalues
+            db_columns = {
+                "discipline": "first_name",
+                "category_group": "last_name",
+                "national_percent": "CompPointsNationalTeam",
+                "regional_percent": "CompPointsRegionalTeam",
+                "notes": "quality",
+            }
+            orig = orig.rename(columns=db_columns)
+            new = new.rename(columns=db_columns)
+            # leere Gruppe gilt als "all" (wie KaderThresholds), auf beiden Seiten -> keine Schein-Änderung
+            for frame in (orig, new):
+                frame["last_name"] = frame["last_name"].apply(lambda v: _norm(v) or "all")
+            # Zeilen ohne Disziplin werden wie bisher ignoriert: neue nicht anlegen, bestehende nicht anfassen
+            blank = new["first_name"].apply(_norm).isna()
+            kept_ids = set(new.loc[blank, "id"].dropna())
+            new = new[~blank | new["id"].notna()]
+
+            inserts, updates, deleted_ids = diff_grid(orig, new, ["id", *db_columns.values()], _norm)
+            inserts = [
+                {**row, "toolenvironment": refdata.KADER_THRESHOLD_MARKER, "PisteYear": "global"}
+                for row in inserts
+            ]
+            updates = [(int(row_id), changed) for row_id, changed in updates if row_id not in kept_ids]
+            deleted_ids = [int(row_id) for row_id in deleted_ids]
+            # alles in einer Transaktion; der Regel-Cache wird erst nach dem Commit verworfen
+            with db.transaction() as tx:
+                save_grid_changes("socadditionalvalues", inserts, updates, deleted_ids, tx)
+
+            refdata.invalidate("kader_thresholds")
+            st.success("Kader %-Schwellen gespeichert.")
+            st.rerun()
+    except Exception as e:
+        st.warning(f"Kader-Schwellen konnten nicht angezeigt werden: {e}")
+
+    _render_inline_table(
+        title="🏟️ Wettkämpfe (Competitions)",
+        table_name="competitions",
+        columns=[
+            "id",
+            "Name",
+            "Date",
+            "PisteYear",
+            "Type",
+            "qual-Regional",
+            "qual-National",
+            "qual-JEM",
+            "qual-EM",
+            "qual-WM",
+            "qual-Piste",
+        ],
+        key_prefix="competitions",
+        int_id=True,
+        sort_by=["Date", "Name"],
+    )
+
+    _render_inline_table(
+        title="⏱️ Piste Ref Training Time",
+        table_name="pistereftrainingtimepoints",
+        columns=["id", "age", "hours", "points"],
+        key_prefix="pistereftrainingtime",
+        int_id=True,
+        sort_by=["age", "hours"],
+    )
+
+    _render_inline_table(
+        title="📅 Piste Ref Training Since",
+        table_name="pistereftrainingsincepoints",
+        columns=["id", "age", "years", "points"],
+        key_prefix="pistereftrainingsince",
+        int_id=True,
+        sort_by=["age", "years"],
+    )
+
+    _render_inline_table(
+        title="🔢 Piste Ref Min Points",
+        table_name="pisterefminpoints",
+        columns=["id", "age", "points_max", "regio_min", "national_min"],
+        key_prefix="pisterefminpoints",
+        int_id=True,
+        sort_by=["age"],
+    )
+
+    _render_inline_table(
+        title="🏆 Piste Ref Comp Points",
+        table_name="pisterefcomppointsage",
+        columns=["id", "Discipline", "sex", "age", "ref", "quality"],
+        key_prefix="pisterefcomppoints",
+        int_id=True,
+        sort_by=["Discipline", "sex", "age"],
+    )
+
+    if not pistedisciplines.empty:
+        special_disciplines = [
+            ("🏅 Piste Points (PisteTotalinPoints)", "PisteTotalinPoints", "piste_totalinpoints"),
+            ("📈 Leistungsentwicklung (CompPerfEnhance)", "CompPerfEnhance", "comp_perf_enhance"),
+            ("🏅 Wettkampf Performance (CompPerfPointsCalc)", "CompPerfPointsCalc", "comp_perf_points"),
+            ("🤸 Sprung Qualität (CompPerfQualityCalc)", "CompPerfQualityCalc", "comp_perf_quality"),
+        ]
+        for title, disc_name, key_prefix in special_disciplines:
+            matches = pistedisciplines[pistedisciplines["name"] == disc_name]
+            if matches.empty:
+                st.info(f"Disziplin '{disc_name}' nicht gefunden.")
+                continue
+            discipline_id = matches["id"].iloc[0]
+            _render_inline_table(
+                title=title,
+                table_name="scoretables",
+                columns=["id", "discipline_name", "discipline_id", "category", "sex", "result_min", "result_max", "points"],
+                persist_columns=["id", "discipline_id", "category", "sex", "result_min", "result_max", "points"],
+                disabled_cols=["id", "discipline_name", "discipline_id"],
+                hidden_cols=["id", "discipline_id"],
+                preprocess_fn=_add_discipline_name,
+                key_prefix=key_prefix,
+                filters={"discipline_id": discipline_id},
+                int_id=False,
+                sort_by=["category", "sex", "result_min"],
+            )
+
+
+def manage_scoretable():
+    st.header("📋 Scoretabelle verwalten")
+
+    disciplines = db.table_select('pistedisciplines', 'id, name')
+    discipline_map = {d['name']: d['id'] for d in disciplines}
+    selected_discipline = st.selectbox("Disziplin auswählen", list(discipline_map.keys()))
+
+    categories = db.table_select('agecategories', 'category')
+    category_options = sorted(list(set(c['category'] for c in categories)))
+
+    if selected_discipline:
+        discipline_id = discipline_map[selected_discipline]
+        entries = db.query("SELECT * FROM [scoretables] WHERE [discipline_id] = ? ORDER BY result_min", [discipline_id])
+
+        st.subheader(f"Aktuelle Punktebereiche für {selected_discipline}")
+        if entries:
+            for entry in entries:
+                with st.expander(f"Bearbeiten: {entry['category']} / {entry['sex']} | {entry['result_min']} - {entry['result_max']} → {entry['points']} Punkte"):
+                    new_min = st.number_input("Von (inkl.)", value=entry['result_min'], key=f"min_{entry['id']}", format="%.1f")
+                    new_max = st.number_input("Bis (inkl.)", value=entry['result_max'], key=f"max_{entry['id']}", format="%.1f")
+                    new_points = st.number_input("Punkte", value=entry['points'], key=f"points_{entry['id']}", step=1)
+                    new_category = st.selectbox("Kategorie", category_options, index=category_options.index(entry.get('category', category_options[0])), key=f"cat_{entry['id']}")
+                    new_sex = st.selectbox("Geschlecht", ["male", "female"], index=0 if entry.get('sex') == "male" else 1, key=f"sex_{entry['id']}")
+
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        if st.button("💾 Speichern", key=f"save_{entry['id']}"):
+                            if new_max >= new_min:
+                                db.table_update('scoretables', {
+                                    'result_min': new_min,
+                                    'result_max': new_max,
+                                    'points': new_points,
+                                    'category': new_category,
+                                    'sex': new_sex
+                                }, id=entry['id'])
+                                st.success("Eintrag aktualisiert.")
+                                st.rerun()
+                            else:
+                                st.error("❗ 'Bis' muss größer oder gleich 'Von' sein.")
+                    with col2:
+                        if st.button("🗑️ Löschen", key=f"delete_{entry['id']}"):
+                            db.table_delete('scoretables', id=entry['id'])
+                            st.warning("Eintrag gelöscht.")
+                            st.rerun()
+        else:
+            st.info("Noch keine Punktebereiche vorhanden für diese Disziplin.")
+
+        st.subheader("➕ Neuen Eintrag hinzufügen")
+        result_min = st.number_input("Von (inkl.)", min_value=0.0, step=0.1, format="%.1f", key="add_min")
+        result_max = st.number_input("Bis (inkl.)", min_value=0.0, step=0.1, format="%.1f", key="add_max")
+        points = st.number_input("Punkte", min_value=0, step=1, key="add_points")
+        new_category = st.selectbox("Kategorie", category_options, key="add_category")
+        new_sex = st.selectbox("Geschlecht", ["male", "female"], key="add_sex")
+
+        if st.button("➕ Eintrag speichern", key="add_save"):
+            if result_max >= result_min:
+                db.table_insert('scoretables', {
+                    'discipline_id': discipline_id,
+                    'result_min': result_min,
+                    'result_max': result_max,
+                    'points': points,
+                    'category': new_category,
+                    'sex': new_sex
+                })
+                st.success("Eintrag hinzugefügt!")
+                st.rerun()
+            else:
+                st.error("❗ 'Bis' muss größer oder gleich 'Von' sein.")
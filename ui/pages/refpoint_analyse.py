@@ -0,0 +1,27 @@
+"""Piste RefPoint Competition Analyse."""
+
+import streamlit as st
+
+from divingeval.refpoints import run_refpoint_full_analyse
+from ui.engine import render_engine_messages, streamlit_progress, submit_job
+
+
+def piste_refpoint_wettkampf_analyse():
+    st.header("📊 Piste RefPoint Wettkampf Analyse")
+
+    st.info("""
+    **Hinweis:**  
+    Der Button **"Full Analyse"** berechnet für das angegebene Jahr:
+    - die RefPoints (Prozent-Erreichung zum Referenzwert) für alle Wettkampfergebnisse,
+    - die Top 3 Wettkämpfe pro Athlet,
+    - und die Entwicklung (Vergleich zum Vorjahr), **sofern mindestens für das angegebene Jahr und das Jahr davor Daten vorhanden sind**.
+    """)
+
+    years = [str(y) for y in range(2024, 2031)]
+    selected_year = st.selectbox("Jahr für Analyse wählen", years)
+
+    if st.button("Full Analyse"):
+        render_engine_messages(run_refpoint_full_analyse(selected_year, progress=streamlit_progress()))
+
+    if st.button("Full Analyse als Hintergrund-Job einreihen"):
+        submit_job("refpoint_full_analyse", {"years": [selected_year]})
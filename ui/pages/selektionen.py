@@ -0,0 +1,231 @@
+"""Selektionen Wettkämpfe."""
+
+import pandas as pd
+import streamlit as st
+
+import db
+from divingeval.common import SELECTIONPOINTS_SCHEMA, compresults_years, load_compresults_for_year
+
+
+def selektionen_wettkaempfe():
+    st.header("🏅 Selektionen Wettkämpfe")
+
+    df_selectionpoints = db.table_select_df(
+        'selectionpoints',
+        select='Competition, year, Discipline, sex, category, points',
+        schema=SELECTIONPOINTS_SCHEMA,
+    )
+
+    def _norm_text(val):
+        return str(val or "").strip().lower()
+
+    # Limiten einmal nach (Wettkampf, Jahr, Disziplin, Geschlecht, Kategorie) indexieren; erster Treffer gilt.
+    limit_lookup = {}
+    if not df_selectionpoints.empty:
+        limit_keys = zip(
+            df_selectionpoints["Competition"].astype(str).str.strip().str.lower(),
+            df_selectionpoints["year"].astype(str).str.strip(),
+            df_selectionpoints["Discipline"].astype(str).str.strip().str.lower(),
+            df_selectionpoints["sex"].astype(str).str.strip().str.lower(),
+            df_selectionpoints["category"].astype(str).str.strip().str.lower(),
+        )
+        for key, limit_points in zip(limit_keys, df_selectionpoints["points"]):
+            limit_lookup.setdefault(key, limit_points)
+
+    def _safe_float(val):
+        if val in (None, "", "nan"):
+            return None
+        try:
+            if isinstance(val, str):
+                val = val.strip().replace("%", "").replace(",", ".")
+            return float(val)
+        except Exception:
+            return None
+
+    def _is_yes(val):
+        return _norm_text(val) == "yes"
+
+    def _calc_limit_pct(result_row, limit_competition, sex_fallback=None):
+        points_val = _safe_float(result_row.get("Points"))
+        if points_val is None:
+            return None, None
+
+        discipline = _norm_text(result_row.get("Discipline"))
+        sex = _norm_text(result_row.get("sex")) or _norm_text(sex_fallback)
+        category = _norm_text(result_row.get("CategoryStart"))
+
+        limit_val = limit_lookup.get(
+            (_norm_text(limit_competition), str(selected_year).strip(), discipline, sex, category)
+        )
+        if limit_val is None or pd.isna(limit_val) or not limit_val:
+            return None, None
+        limit_val = float(limit_val)
+
+        return limit_val, round((points_val / limit_val) * 100, 1)
+
+    years = compresults_years()
+    selected_year = st.selectbox("Jahr wählen", years)
+
+    selektionstypen = {
+        "Nationalkader": "NationalTeam",
+        "JEM": "JEM",
+        "EM": "EM",
+        "WM": "WM"
+    }
+    selected_tab = st.selectbox("Selektionstyp", list(selektionstypen.keys()))
+
+    # Filter nach Jahr direkt in der DB (compresults.PisteYear)
+    filtered_year = load_compresults_for_year(selected_year) if selected_year else []
+
+    # Filter nach Selektionstyp
+    spalte = selektionstypen[selected_tab]
+    filtered = [r for r in filtered_year if _is_yes(r.get(spalte, ""))]
+
+    # Anzeige-Spalten
+    show_cols = ["first_name", "last_name", "sex", "CategoryStart", "Competition", "Discipline", "Points"]
+
+    def _pct_style(val):
+        if val in (None, "", "nan"):
+            return ""
+        try:
+            v = float(val)
+        except Exception:
+            return ""
+        if v >= 100:
+            return "background-color: #d1fae5; color: #065f46; font-weight: 600;"
+        if v >= 90:
+            return "background-color: #ffedd5; color: #9a3412; font-weight: 600;"
+        return "background-color: #f3f4f6; color: #374151;"
+
+    df = pd.DataFrame(filtered)
+    if selected_tab in ["JEM", "EM"] and not df.empty:
+        # Robuste Verknüpfung über Name; Sex bei Zusatzdisziplinen kann fehlen/abweichen.
+        yes_athletes = set(
+            (
+                _norm_text(r.get("first_name")),
+                _norm_text(r.get("last_name")),
+            )
+            for _, r in df.iterrows()
+        )
+
+        sex_by_athlete = {}
+        for _, r in df.iterrows():
+            key = (_norm_text(r.get("first_name")), _norm_text(r.get("last_name")))
+            sex_val = _norm_text(r.get("sex"))
+            if key != ("", "") and sex_val and key not in sex_by_athlete:
+                sex_by_athlete[key] = sex_val
+
+        integrated_rows = []
+        for r in filtered_year:
+            athlete_key = (
+                _norm_text(r.get("first_name")),
+                _norm_text(r.get("last_name")),
+            )
+            if athlete_key not in yes_athletes:
+                continue
+
+            athlete_name_key = (_norm_text(r.get("first_name")), _norm_text(r.get("last_name")))
+            sex_fallback = sex_by_athlete.get(athlete_name_key)
+
+            limit_val, pct = _calc_limit_pct(r, selected_tab, sex_fallback=sex_fallback)
+            is_yes = _is_yes(r.get(spalte, ""))
+            is_extra_90 = pct is not None and pct >= 90
+
+            # Hauptliste integriert: Selektion=yes ODER zusätzliche Disziplin >=90%
+            if not is_yes and not is_extra_90:
+                continue
+
+            if pct is None:
+                ampel = "⚪"
+            elif pct >= 100:
+                ampel = "🟢"
+            elif pct >= 90:
+                ampel = "🟠"
+            else:
+                ampel = "⚪"
+
+            integrated_rows.append({
+                "Ampel": ampel,
+                "Quelle": "Direkt qualifiziert" if is_yes else "Zusatzdisziplin 90+",
+                "first_name": r.get("first_name"),
+                "last_name": r.get("last_name"),
+                "sex": r.get("sex"),
+                "CategoryStart": r.get("CategoryStart"),
+                "Competition": r.get("Competition"),
+                "Discipline": r.get("Discipline"),
+                "Points": _safe_float(r.get("Points")),
+                f"{selected_tab} Limite": limit_val,
+                "% zur Limite": pct,
+            })
+
+        df_show = pd.DataFrame(integrated_rows)
+        if not df_show.empty:
+            key_cols = ["first_name", "last_name", "sex", "CategoryStart", "Competition", "Discipline"]
+            df_show = (
+                df_show.sort_values("% zur Limite", ascending=False, na_position="last")
+                .drop_duplicates(subset=key_cols, keep="first")
+                .sort_values(["last_name", "first_name", "Competition", "Discipline"])
+                .reset_index(drop=True)
+            )
+
+            # Zusatzfilter für die integrierte JEM/EM-Tabelle
+            st.subheader("🔎 Tabellenfilter")
+            col_f1, col_f2, col_f3 = st.columns(3)
+            with col_f1:
+                first_filter = st.text_input("Vorname enthält", key=f"sel_{selected_tab}_first_filter")
+            with col_f2:
+                last_filter = st.text_input("Nachname enthält", key=f"sel_{selected_tab}_last_filter")
+            with col_f3:
+                threshold_filter = st.selectbox(
+                    "Schwelle",
+                    ["Alle", ">=100%", "nur 90% bis <100%"],
+                    key=f"sel_{selected_tab}_threshold_filter",
+                )
+
+            categories = sorted([c for c in df_show["CategoryStart"].dropna().astype(str).unique().tolist() if c.strip()])
+            selected_categories = st.multiselect(
+                "Kategorie",
+                categories,
+                default=categories,
+                key=f"sel_{selected_tab}_category_filter",
+            )
+
+            df_filtered_show = df_show.copy()
+            if first_filter:
+                df_filtered_show = df_filtered_show[df_filtered_show["first_name"].astype(str).str.contains(first_filter, case=False, na=False)]
+            if last_filter:
+                df_filtered_show = df_filtered_show[df_filtered_show["last_name"].astype(str).str.contains(last_filter, case=False, na=False)]
+            if selected_categories:
+                df_filtered_show = df_filtered_show[df_filtered_show["CategoryStart"].astype(str).isin(selected_categories)]
+            if threshold_filter == ">=100%":
+                df_filtered_show = df_filtered_show[pd.to_numeric(df_filtered_show["% zur Limite"], errors="coerce") >= 100]
+            elif threshold_filter == "nur 90% bis <100%":
+                pct_num = pd.to_numeric(df_filtered_show["% zur Limite"], errors="coerce")
+                df_filtered_show = df_filtered_show[(pct_num >= 90) & (pct_num < 100)]
+
+            st.dataframe(df_filtered_show.style.map(_pct_style, subset=["% zur Limite"]))
+            st.download_button("📥 Ergebnisse als CSV herunterladen", df_filtered_show.to_csv(index=False, encoding='utf-8-sig'), file_name=f"{selected_tab}_{selected_year}.csv", mime="text/csv")
+        else:
+            st.info("Keine passenden Einträge gefunden.")
+    else:
+        if not df.empty:
+            df_show = df[show_cols]
+            st.dataframe(df_show)
+            st.download_button("📥 Ergebnisse als CSV herunterladen", df_show.to_csv(index=False, encoding='utf-8-sig'), file_name=f"{selected_tab}_{selected_year}.csv", mime="text/csv")
+        else:
+            st.info("Keine passenden Einträge gefunden.")
+
+    # --- NEU: Einzigartige Liste (jede Person nur einmal) ---
+    st.subheader("👤 Einzigartige Liste (jede Person nur einmal)")
+    if not df.empty:
+        unique_cols = ["first_name", "last_name", "sex", "CategoryStart"]
+        df_unique = df.drop_duplicates(subset=unique_cols)[unique_cols]
+        st.dataframe(df_unique)
+        st.download_button(
+            "📥 Einzigartige Liste als CSV herunterladen",
+            df_unique.to_csv(index=False, encoding='utf-8-sig'),
+            file_name=f"{selected_tab}_{selected_year}_einzigartig.csv",
+            mime="text/csv"
+        )
+    else:
+        st.info("Keine Einträge für die einzigartige Liste gefunden.")
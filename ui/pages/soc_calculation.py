@@ -0,0 +1,22 @@
+"""SOC Full Calculation."""
+
+import streamlit as st
+
+from divingeval.soc import run_soc_full_calculation
+from ui.engine import streamlit_progress, submit_job
+
+
+def soc_full_calculation():
+    st.header("🔢 SOC Full Calculation")
+    years = [str(y) for y in range(2024, 2031)]
+    selected_year = st.selectbox("PisteYear wählen", years)
+    if st.button("SOC Full Calculation starten"):
+        try:
+            run_soc_full_calculation(selected_year, progress=streamlit_progress())
+        except ValueError as e:
+            st.error(str(e))
+            return
+        st.success(f"Berechnung abgeschlossen und alle Einträge für {selected_year} aktualisiert.")
+
+    if st.button("SOC Full Calculation als Hintergrund-Job einreihen"):
+        submit_job("soc_full_calculation", {"years": [selected_year]})
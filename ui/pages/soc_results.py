@@ -0,0 +1,151 @@
+"""Full PISTE Results SOC."""
+
+import datetime
+
+import matplotlib.pyplot as plt
+import pandas as pd
+import streamlit as st
+
+from divingeval.common import load_athleteyearstatus_map
+from ui.cache import fetch_all_rows, pinned_frame
+from ui.common import get_app_version
+
+
+def show_full_piste_results_soc():
+    st.header("📊 Full PISTE Results SOC")
+
+    def _load():
+        # Daten laden
+        soc_df = pd.DataFrame(fetch_all_rows("socadditionalvalues", select="*"))
+        if not soc_df.empty and "toolenvironment" in soc_df.columns:
+            soc_df = soc_df[soc_df["toolenvironment"].fillna("").astype(str).str.lower() != "injuryflags"].copy()
+        if soc_df.empty:
+            return soc_df
+
+        injury_map = load_athleteyearstatus_map()
+
+        # Nur gewünschte Spalten anzeigen (inkl. CompPointsNationalTeam und talentcard)
+        show_cols = [
+            "first_name", "last_name", "Category", "sex", "PisteYear",
+            "competitions", "trainingperf", "piste", "compenhancement",
+            "resilience", "trainingtime", "trainingsince", "toolenvironment",
+            "quality", "bioagevalue", "mirwaldvalue", "totalpoints", "pisteminregio", "pisteminnational", "CompPointsRegionalTeam", "CompPointsNationalTeam", "talentcard"
+        ]
+        # Füge fehlende Spalten als leere Spalten hinzu (für robustes Verhalten)
+        for col in show_cols:
+            if col not in soc_df.columns:
+                soc_df[col] = None
+        soc_df = soc_df[show_cols]
+        soc_df["injured"] = soc_df.apply(
+            lambda row: "yes"
+            if injury_map.get((
+                str(row.get("first_name") or "").strip().lower(),
+                str(row.get("last_name") or "").strip().lower(),
+                str(row.get("PisteYear") or "").strip(),
+            ), False)
+            else "no",
+            axis=1,
+        )
+        return soc_df
+
+    soc_df = pinned_frame("soc_results", _load, ("socadditionalvalues",))
+    if soc_df.empty:
+        st.info("Keine Daten in socadditionalvalues gefunden.")
+        return
+    _soc_ergebnis(soc_df)
+
+
+@st.fragment
+def _soc_ergebnis(soc_df):
+    """Filter form, grid, exports and charts of show_full_piste_results_soc; reruns alone on submit."""
+    # Filter
+    st.subheader("🔎 Filter")
+    with st.form("soc_filter"):
+        years = sorted(soc_df["PisteYear"].dropna().unique())
+        current_year = datetime.datetime.now().year
+        year_default_index = next((index for index, value in enumerate(years) if str(value) == str(current_year)), 0)
+        selected_year = st.selectbox("Jahr", years, index=year_default_index, key=f"soc_year_filter_{get_app_version()}")
+        year = [selected_year]
+
+        last_names = sorted(soc_df["last_name"].dropna().unique())
+        last_name = st.selectbox("Nachname", ["Alle"] + last_names)
+        first_names = sorted(soc_df["first_name"].dropna().unique())
+        first_name = st.selectbox("Vorname", ["Alle"] + first_names)
+        sexes = sorted(soc_df["sex"].dropna().unique())
+        sex = st.selectbox("Geschlecht", ["Alle"] + sexes)
+        categories = sorted(soc_df["Category"].dropna().unique())
+        category = st.multiselect("Kategorie", categories, default=categories)
+        talentcard_values = ["Alle", "Verletzt"] + sorted([v for v in soc_df["talentcard"].dropna().unique() if v != ""])
+        talentcard_filter = st.selectbox("Talentcard", list(dict.fromkeys(talentcard_values)), key="talentcard_filter_v2")
+
+        st.form_submit_button("🔎 Filter anwenden")
+
+    # Anwenden der Filter
+    filtered = soc_df[
+        soc_df["PisteYear"].astype(str).isin([str(y) for y in year]) &
+        (soc_df["first_name"].str.lower().str.strip() == first_name.lower().strip() if first_name != "Alle" else True) &
+        (soc_df["last_name"].str.lower().str.strip() == last_name.lower().strip() if last_name != "Alle" else True) &
+        soc_df["Category"].astype(str).isin([str(c) for c in category]) &
+        (soc_df["sex"].astype(str) == str(sex) if sex != "Alle" else True) &
+        (
+            soc_df["injured"] == "yes"
+            if talentcard_filter == "Verletzt"
+            else (soc_df["talentcard"] == talentcard_filter if talentcard_filter != "Alle" else True)
+        )
+    ]
+
+    st.dataframe(filtered)
+    st.download_button(
+        "📥 Gefilterte Ergebnisse als CSV",
+        filtered.to_csv(index=False, encoding='utf-8-sig'),
+        file_name="full_piste_results_soc.csv",
+        mime="text/csv"
+    )
+
+    import io
+
+    # XLSX-Export
+    output = io.BytesIO()
+    with pd.ExcelWriter(output, engine='openpyxl') as writer:
+        filtered.to_excel(writer, index=False, sheet_name="Full PISTE Results SOC")
+    output.seek(0)
+    st.download_button(
+        "📥 Gefilterte Ergebnisse als Excel",
+        output.getvalue(),
+        file_name="full_piste_results_soc.xlsx",
+        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    )
+
+    # --- Grafik: Kurve und Durchschnittswert für Totalpunkte ---
+    if not filtered.empty and "totalpoints" in filtered.columns:
+        df_plot = filtered.copy()
+        df_plot["totalpoints"] = pd.to_numeric(df_plot["totalpoints"], errors="coerce")
+        df_plot = df_plot.dropna(subset=["totalpoints"])
+        df_plot = df_plot.sort_values("totalpoints", ascending=True).reset_index(drop=True)
+
+        fig, ax = plt.subplots(figsize=(8, 4))
+        ax.plot(df_plot.index + 1, df_plot["totalpoints"], marker="o", label="Totalpunkte")
+        mean_val = df_plot["totalpoints"].mean()
+        ax.axhline(mean_val, color="red", linestyle="--", label=f"Ø Totalpunkte: {mean_val:.1f}")
+        ax.set_xlabel("Athlet (sortiert)")
+        ax.set_ylabel("Totalpunkte")
+        ax.set_title("Totalpunkte aller gefilterten Athleten")
+        ax.legend()
+        st.pyplot(fig)
+
+    # --- Grafik für Talentcard-Verteilung ---
+    if not filtered.empty and "talentcard" in filtered.columns:
+        chart_labels = filtered.apply(
+            lambda row: "Verletzt" if str(row.get("injured", "")).strip().lower() == "yes" else row.get("talentcard"),
+            axis=1,
+        )
+        card_counts = chart_labels.value_counts().reindex(["Verletzt", "National", "Regional", "noCard"], fill_value=0)
+        fig2, ax2 = plt.subplots(figsize=(5, 3))
+        bars = ax2.bar(card_counts.index, card_counts.values, color=["#9467bd", "#1f77b4", "#2ca02c", "#d62728"])
+        ax2.set_ylabel("Anzahl Athleten")
+        ax2.set_title("Verteilung Talentcard")
+        for bar in bars:
+            height = bar.get_height()
+            ax2.annotate(f"{int(height)}", xy=(bar.get_x() + bar.get_width() / 2, height),
+                         xytext=(0, 3), textcoords="offset points", ha="center", va="bottom")
+        st.pyplot(fig2)
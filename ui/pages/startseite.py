@@ -0,0 +1,101 @@
+"""Start page with shortcuts to the most used pages."""
+
+import streamlit as st
+
+
+def startseite():
+    st.title("🏊‍♂️ Diving Analysis")
+    st.markdown("Willkommen beim Auswertungstool von Swiss-Aquatics Diving")
+
+    st.header("👤 Athletes")
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        if st.button("Athleten anzeigen"):
+            st.session_state["page"] = "Athleten anzeigen"
+            st.rerun()
+        if st.button("Athleten eingeben"):
+            st.session_state["page"] = "Athleten eingeben"
+            st.rerun()
+    with col2:
+        if st.button("Athleten importieren"):
+            st.session_state["page"] = "Athleten importieren"
+            st.rerun()
+    with col3:
+        if st.button("Athleten bearbeiten"):
+            st.session_state["page"] = "Athleten bearbeiten"
+            st.rerun()
+    with col4:
+        if st.button("Athleten löschen"):
+            st.session_state["page"] = "Athleten löschen"
+            st.rerun()
+
+    st.header("📊 Piste")
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        if st.button("Piste Resultate anzeigen"):
+            st.session_state["page"] = "Piste Resultate anzeigen"
+            st.rerun()
+        if st.button("Piste Ergebnisse eingeben"):
+            st.session_state["page"] = "Piste Ergebnisse eingeben"
+            st.rerun()
+        if st.button("Piste Ergebnisse bearbeiten"):
+            st.session_state["page"] = "Piste Ergebnisse bearbeiten"
+            st.rerun()
+    with col2:
+        if st.button("Piste Punkte neu berechnen"):
+            st.session_state["page"] = "Piste Punkte neu berechnen"
+            st.rerun()
+        if st.button("Piste RefPoint Competition Analyse"):
+            st.session_state["page"] = "Piste RefPoint Competition Analyse"
+            st.rerun()
+    with col3:
+        if st.button("Tool Environment"):
+            st.session_state["page"] = "Tool Environment"
+            st.rerun()
+        if st.button("Trainingsperformance - Resilienz"):
+            st.session_state["page"] = "Trainingsperformance - Resilienz"
+            st.rerun()
+    with col4:
+        if st.button("SOC Full Calculation"):
+            st.session_state["page"] = "SOC Full Calculation"
+            st.rerun()
+        if st.button("Full PISTE Results SOC"):
+            st.session_state["page"] = "Full PISTE Results SOC"
+            st.rerun()
+        if st.button("Kaderzugehörigkeiten"):
+            st.session_state["page"] = "Kaderzugehörigkeiten"
+            st.rerun()
+
+    st.header("🏆 Wettkampf")
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        if st.button("Wettkampfauswertungen"):
+            st.session_state["page"] = "Wettkampfauswertungen"
+            st.rerun()
+    with col2:
+        if st.button("Wettkampfresultate eingeben"):
+            st.session_state["page"] = "Wettkampfresultate eingeben"
+            st.rerun()
+        if st.button("Wettkampfresultate korrigieren"):
+            st.session_state["page"] = "Wettkampfresultate korrigieren"
+            st.rerun()
+    with col3:
+        if st.button("Vergleich BIG Competitions"):
+            st.session_state["page"] = "Vergleich BIG Competitions"
+            st.rerun()
+    with col4:
+        if st.button("Selektionen Wettkämpfe"):
+            st.session_state["page"] = "Selektionen Wettkämpfe"
+            st.rerun()
+
+    # --- Admin-Bereich ---
+    st.header("⚙️ Admin")
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button("Referenz- und Bewertungstabellen"):
+            st.session_state["page"] = "Referenz- und Bewertungstabellen"
+            st.rerun()
+    with col2:
+        if st.button("Jobs"):
+            st.session_state["page"] = "Jobs"
+            st.rerun()
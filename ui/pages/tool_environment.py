@@ -0,0 +1,60 @@
+"""Tool Environment: yearly tool environment values."""
+
+import datetime
+
+import pandas as pd
+import streamlit as st
+
+import db
+import importers
+from ui.common import import_yearly_values
+
+
+def manage_tool_environment():
+    st.header("🛠️ Tool Environment Werte eingeben oder importieren")
+
+    # Athleten laden
+    athletes = db.table_select('athletes', 'first_name, last_name, birthdate')
+    athlete_names = [f"{a['first_name']} {a['last_name']}" for a in athletes]
+
+     # Manuelle Eingabe
+    st.subheader("🔹 Einzelnen Wert eingeben")
+    pisteyear = st.number_input("PisteYear", min_value=2020, max_value=2100, value=datetime.date.today().year, step=1)
+    selected_athlete = st.selectbox("Athlet auswählen", [""] + athlete_names, index=0)
+    toolenvvalue = st.number_input("Tool Environment Wert", min_value=0.0, max_value=100.0, value=0.0, step=0.1, format="%.2f")
+
+    if st.button("💾 Wert speichern", key="tool_environment_save"):
+        if not selected_athlete:
+            st.warning("Bitte zuerst einen Athleten auswählen.")
+        else:
+            first_name, last_name = selected_athlete.split(" ", 1)
+            db.upsert_many("pisteenvironment", [{
+                "first_name": first_name,
+                "last_name": last_name,
+                "PisteYear": int(pisteyear),
+                "toolenvvalue": float(toolenvvalue),
+            }], importers.YEARLY_KEY_COLUMNS)
+            st.success(f"Eintrag für {selected_athlete} gespeichert.")
+
+    st.markdown("---")
+    st.subheader("🔹 CSV-Import")
+
+    # Beispiel-CSV
+    example = pd.DataFrame([{
+        "first_name": "Max",
+        "last_name": "Mustermann",
+        "PisteYear": 2024,
+        "toolenvvalue": 7.5
+    }])
+    st.download_button(
+        label="📄 Beispiel-CSV herunterladen",
+        data=example.to_csv(index=False).encode("utf-8"),
+        file_name="tool_environment_beispiel.csv",
+        mime="text/csv"
+    )
+
+    uploaded_file = st.file_uploader("CSV-Datei mit Tool Environment-Werten hochladen", type="csv")
+    if uploaded_file:
+        st.info("Datei geladen. Klicke auf '📤 Import starten', um den Import auszuführen.")
+        if st.button("📤 Import starten", key="tool_environment_import_submit"):
+            import_yearly_values(uploaded_file, "pisteenvironment", {"toolenvvalue": "float"}, athletes)
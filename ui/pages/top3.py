@@ -0,0 +1,105 @@
+"""Wettkaempfe Top 3: the top three competitions per athlete and year."""
+
+import pandas as pd
+import streamlit as st
+
+from ui.cache import fetch_all_rows, pinned_frame
+
+
+def show_top3_wettkaempfe():
+    st.header("🏆 Top 3 Wettkämpfe pro Athlet und Jahr")
+
+    df = pinned_frame(
+        "top3", lambda: pd.DataFrame(fetch_all_rows("pisterefcompresults", select="*")), ("pisterefcompresults",)
+    )
+    if df.empty:
+        st.info("Keine Top-3-Wettkämpfe für die Auswahl gefunden.")
+        return
+    _top3_ergebnis(df)
+
+
+@st.fragment
+def _top3_ergebnis(df):
+    """Filter form and top-3 grid of show_top3_wettkaempfe; reruns alone on submit."""
+    with st.form("top3_filter"):
+        jahre = sorted(df["PisteYear"].dropna().unique())
+        jahr = st.multiselect("Jahr", jahre, default=jahre)
+        alter = sorted(df["age"].dropna().unique())
+        age = st.multiselect("Alter", alter, default=alter)
+
+        # --- Namensfilter ---
+        first_name_filter = st.text_input("Vorname (Teilstring möglich)", "")
+        last_name_filter = st.text_input("Nachname (Teilstring möglich)", "")
+        # Resultate bleiben nach dem ersten Klick stehen, auch wenn der Download-Button neu rendert
+        if st.form_submit_button("Show Results"):
+            st.session_state["top3_show"] = True
+
+    if st.session_state.get("top3_show"):
+        filtered = df[df["PisteYear"].isin(jahr)]
+        if age:
+            filtered = filtered[filtered["age"].isin(age)]
+        if first_name_filter:
+            filtered = filtered[filtered["first_name"].str.contains(first_name_filter, case=False, na=False)]
+        if last_name_filter:
+            filtered = filtered[filtered["last_name"].str.contains(last_name_filter, case=False, na=False)]
+
+        rows = []
+        for _, row in filtered.iterrows():
+            for i in range(1, 4):
+                comp = row.get(f"competition{i}")
+                pts = row.get(f"points{i}")
+                discipline = row.get(f"discipline{i}")
+                reference = row.get(f"reference{i}")
+                pointsaverage = row.get(f"pointsaverage{i}")
+                if comp not in (None, "", "nan") and pts not in (None, "", "nan"):
+                    rows.append({
+                        "Vorname": row.get("first_name"),
+                        "Nachname": row.get("last_name"),
+                        "Jahr": row.get("PisteYear"),
+                        "Wettkampf": comp,
+                        "Disziplin": discipline,
+                        "Alter": row.get("age"),
+                        "Reference": reference,
+                        "RefAverage": row.get("refaverage"),
+                        "Points": pts,
+                        "PointsAverage": pointsaverage,
+                        "PointsAverageAverage": row.get("pointsaverageaverage"),
+                        "PointsAverageRef%": row.get("pointsaverageref%"),
+                        "Quality": row.get("quality"),
+                        "PisteYear": row.get("PisteYear")
+                    })
+        top3_df = pd.DataFrame(rows)
+
+        if top3_df.empty:
+            st.info("Keine Top-3-Wettkämpfe für die Auswahl gefunden.")
+            return
+
+        show_cols = [
+            "Vorname", "Nachname", "Jahr", "Wettkampf", "Disziplin", "Alter",
+            "Reference", "RefAverage", "Points", "PointsAverage", "PointsAverageAverage",
+            "PointsAverageRef%", "Quality", "PisteYear"
+        ]
+        for col in show_cols:
+            if col not in top3_df.columns:
+                top3_df[col] = None
+        top3_df = top3_df[show_cols]
+
+        st.dataframe(top3_df)
+        st.download_button(
+            "📥 Top 3 Wettkämpfe als CSV",
+            top3_df.to_csv(index=False, encoding='utf-8-sig'),
+            file_name="top3_wettkaempfe.csv",
+            mime="text/csv"
+        )
+
+        import io
+        output = io.BytesIO()
+        with pd.ExcelWriter(output, engine='openpyxl') as writer:
+            top3_df.to_excel(writer, index=False, sheet_name="Top 3 Wettkämpfe")
+        output.seek(0)
+        st.download_button(
+            "📥 Top 3 Wettkämpfe als Excel",
+            output.getvalue(),
+            file_name="top3_wettkaempfe.xlsx",
+            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        )
@@ -0,0 +1,127 @@
+"""Trainingsperformance - Resilienz."""
+
+import datetime
+
+import pandas as pd
+import streamlit as st
+
+import db
+import importers
+from divingeval.soc import get_trainingsince_value, get_trainingstime_value
+from ui.common import get_category_from_testyear, import_yearly_values
+
+
+TRAININGSPERFORMANCE_VALUE_COLUMNS = {
+    **{f"q{i}": "float" for i in range(1, 11)},
+    "trainingtime": "float",
+    "trainingsince": "text",
+}
+
+
+def manage_trainingsperformance_resilienz():
+    st.header("💪 Trainingsperformance - Resilienz")
+
+    # Athleten laden
+    athletes = db.table_select('athletes', 'first_name, last_name, vintage')
+    athlete_names = [f"{a['first_name']} {a['last_name']}" for a in athletes]
+    athlete_lookup = {(a['first_name'], a['last_name']): a for a in athletes}
+
+    st.subheader("🔹 Einzelnen Wert eingeben")
+    pisteyear = st.number_input("PisteYear", min_value=2020, max_value=2100, value=datetime.date.today().year, step=1)
+    selected_athlete = st.selectbox("Athlet auswählen", [""] + athlete_names, index=0)
+    if selected_athlete:
+        first_name, last_name = selected_athlete.split(" ", 1)
+        cols = st.columns(5)
+        q1 = cols[0].number_input("q1", min_value=0.0, max_value=5.0, value=0.0, step=0.5)
+        q2 = cols[1].number_input("q2", min_value=0.0, max_value=5.0, value=0.0, step=0.5)
+        q3 = cols[2].number_input("q3", min_value=0.0, max_value=5.0, value=0.0, step=0.5)
+        q4 = cols[3].number_input("q4", min_value=0.0, max_value=5.0, value=0.0, step=0.5)
+        q5 = cols[4].number_input("q5", min_value=0.0, max_value=5.0, value=0.0, step=0.5)
+        cols2 = st.columns(5)
+        q6 = cols2[0].number_input("q6", min_value=0.0, max_value=5.0, value=0.0, step=0.5)
+        q7 = cols2[1].number_input("q7", min_value=0.0, max_value=5.0, value=0.0, step=0.5)
+        q8 = cols2[2].number_input("q8", min_value=0.0, max_value=5.0, value=0.0, step=0.5)
+        q9 = cols2[3].number_input("q9", min_value=0.0, max_value=5.0, value=0.0, step=0.5)
+        q10 = cols2[4].number_input("q10", min_value=0.0, max_value=5.0, value=0.0, step=0.5)
+        trainingtime = st.number_input("Trainingtime (Stunden)", min_value=0, max_value=40, value=0)
+        trainingsince = st.text_input("Trainingsince (z.B. 2018)", value="2015")
+
+        if st.button("💾 Wert speichern"):
+            data = {
+                "first_name": first_name,
+                "last_name": last_name,
+                "PisteYear": pisteyear,
+                "q1": q1, "q2": q2, "q3": q3, "q4": q4, "q5": q5,
+                "q6": q6, "q7": q7, "q8": q8, "q9": q9, "q10": q10,
+                "trainingtime": trainingtime,
+                "trainingsince": trainingsince
+            }
+            db.upsert_many("trainingsperformance", [data], importers.YEARLY_KEY_COLUMNS)
+            # Summen berechnen und socadditionalvalues upsert
+            trainingperf = sum([q2, q3, q4, q5, q7, q8, q9, q10])
+            resilience = q1 + q6
+            # Trainingsince- und Trainingstime-Wert berechnen
+            athlete = athlete_lookup.get((first_name, last_name))
+            vintage = athlete.get("vintage") if athlete else None
+            trainingsince_value = get_trainingsince_value(pisteyear, trainingsince, vintage)
+            trainingstime_value = get_trainingstime_value(pisteyear, trainingtime, vintage)
+            category = get_category_from_testyear(vintage, pisteyear) if vintage else None
+
+            data2 = {
+                "first_name": first_name,
+                "last_name": last_name,
+                "PisteYear": pisteyear,
+                "trainingperf": trainingperf,
+                "resilience": resilience,
+                "trainingsince": trainingsince_value,
+                "trainingtime": trainingstime_value,
+                "Category": category
+            }
+            existing2 = db.table_select("socadditionalvalues", "first_name", first_name=first_name, last_name=last_name, PisteYear=pisteyear)
+            if existing2:
+                db.table_update("socadditionalvalues", data2, first_name=first_name, last_name=last_name, PisteYear=pisteyear)
+            else:
+                db.table_insert("socadditionalvalues", data2)
+            st.success("Wert gespeichert!")
+    else:
+        st.info("Bitte zuerst einen Athleten auswählen.")
+
+    st.markdown("---")
+    st.subheader("🔹 CSV-Import")
+
+    # Beispiel-CSV
+    example = pd.DataFrame([{
+        "first_name": "Max",
+        "last_name": "Mustermann",
+        "PisteYear": 2024,
+        "q1": 1,
+        "q2": 0.5,
+        "q3": 2,
+        "q4": 2,
+        "q5": 1,
+        "q6": 2,
+        "q7": 1,
+        "q8": 2,
+        "q9": 1,
+        "q10": 2,
+        "trainingtime": 12,
+        "trainingsince": "2018"
+    }])
+    st.download_button(
+        "📄 Beispiel-CSV herunterladen",
+        example.to_csv(index=False).encode("utf-8"),
+        file_name="trainingsperformance_beispiel.csv",
+        mime="text/csv"
+    )
+
+    uploaded_file = st.file_uploader("CSV-Datei mit Trainingsperformance-Werten hochladen", type="csv")
+    if uploaded_file:
+        st.info("Datei geladen. Klicke auf '📤 Import starten', um den Import auszuführen.")
+        if st.button("📤 Import starten", key="trainingsperformance_import_submit"):
+            # birthdate ist optional; wenn im CSV ausgefüllt, muss es zum Athleten passen
+            import_yearly_values(
+                uploaded_file,
+                "trainingsperformance",
+                TRAININGSPERFORMANCE_VALUE_COLUMNS,
+                db.table_select('athletes', 'first_name, last_name, birthdate'),
+            )
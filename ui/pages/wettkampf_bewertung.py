@@ -0,0 +1,74 @@
+"""Wettkampf-Bewertung."""
+
+import pandas as pd
+import streamlit as st
+
+import db
+from divingeval.competitions import run_wettkampf_bewertung
+from ui.cache import fetch_all_rows
+from ui.engine import streamlit_progress, submit_job
+
+
+def bewertung_wettkampf():
+    st.header("🔄 Wettkampfbewertungen berechnen")
+
+    competitions = fetch_all_rows('competitions', select='PisteYear')
+
+    # --- Nur ein PisteYear neu berechnen (z.B. 2026) ---
+    # Wichtig: PisteYear kommt aus competitions.PisteYear und kann sich vom Kalenderjahr des Datums unterscheiden.
+    try:
+        pisteyears = sorted({str(c.get("PisteYear")) for c in competitions if c.get("PisteYear")}, reverse=True)
+    except Exception:
+        pisteyears = []
+    if pisteyears:
+        selected_pisteyear = st.selectbox("PisteYear gezielt neu berechnen", pisteyears, index=0)
+    else:
+        selected_pisteyear = None
+
+    if st.button("🔄 Alle Wettkampfbewertungen berechnen"):
+        summary = run_wettkampf_bewertung("all", progress=streamlit_progress())
+        for warning in summary["warnings"]:
+            st.warning(warning)
+        st.success("Alle Wettkampfbewertungen wurden neu berechnet!")
+
+    if selected_pisteyear and st.button(f"🔄 Nur PisteYear {selected_pisteyear} neu berechnen"):
+        summary = run_wettkampf_bewertung("year", pisteyear=selected_pisteyear, progress=streamlit_progress())
+        missing_selection_combos = summary["missing_selection_combos"]
+        seen_regional_labels = summary["seen_regional_labels"]
+
+        st.success(f"✅ {summary['updated']} Resultate für PisteYear {selected_pisteyear} wurden neu berechnet.")
+        st.info(
+            f"Diagnose: total in PisteYear={selected_pisteyear}: {summary['total_in_scope']} | "
+            f"ohne selectionpoints-Match: {len(missing_selection_combos)} | "
+            f"selectionpoints vorhanden aber keine JEM/EM/WM/Regional-Zeile: {summary['no_threshold_rows']} | "
+            f"Regional qualifiziert (nicht Synchro C/D), aber ohne Regional- und ohne JEM-Referenz: {summary['no_regional_ref_rows']}"
+        )
+        if seen_regional_labels:
+            st.info("Gefundene selectionpoints-Competition Labels für Regional: " + ", ".join(sorted(seen_regional_labels)))
+        if missing_selection_combos:
+            df_missing = pd.DataFrame(missing_selection_combos)
+            df_missing = df_missing.drop_duplicates().sort_values(["sex", "Discipline", "CategoryStart"])
+            st.warning("Für diese (sex/Discipline/CategoryStart) Kombinationen gibt es keine passenden selectionpoints → NationalTeam/RegionalTeam bleibt immer 'no'.")
+            st.dataframe(df_missing)
+
+    if st.button("🔄 Nur neue Einträge berechnen"):
+        run_wettkampf_bewertung("new", progress=streamlit_progress())
+        st.success("Neue Einträge wurden berechnet!")
+
+    with st.expander("⏳ Als Hintergrund-Job ausführen"):
+        st.caption("Läuft weiter, auch wenn die Seite gewechselt oder der Browser geschlossen wird. Status unter „Jobs“.")
+        if st.button("Alle Wettkampfbewertungen als Job einreihen"):
+            submit_job("wettkampf_bewertung", {"scope": "all"})
+        if selected_pisteyear and st.button(f"PisteYear {selected_pisteyear} als Job einreihen"):
+            submit_job("wettkampf_bewertung", {"scope": "year", "pisteyear": selected_pisteyear})
+
+    # TESTTOOL: Timestamps zurücksetzen
+    with st.expander("🧪 Test-Tools"):
+        if st.button("❌ Alle Timestamps in compresults zurücksetzen"):
+            try:
+                comp_results = fetch_all_rows("compresults")
+                for row in comp_results:
+                    db.table_update('compresults', {"timestamp": None}, id=row["id"])
+                st.success("Alle Timestamps wurden zurückgesetzt.")
+            except Exception as e:
+                st.error(f"Fehler beim Zurücksetzen: {e}")
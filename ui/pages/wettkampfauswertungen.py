@@ -0,0 +1,95 @@
+"""Wettkampfauswertungen: filterable compresults with CSV/Excel export."""
+
+import pandas as pd
+import streamlit as st
+
+from divingeval.common import with_competition_year
+from ui.cache import fetch_all_rows, pinned_frame
+
+
+def auswertung_wettkampf():
+    st.header("🏅 Wettkampfauswertungen")
+
+    # Button zur Bewertungsseite
+    if st.button("🔄 Zu Wettkampf-Bewertung"):
+        st.session_state["page"] = "Wettkampf-Bewertung"
+        st.rerun()
+
+    def _load():
+        comp_results = fetch_all_rows("compresults")
+        if not comp_results:
+            return pd.DataFrame()
+        # PisteYear steht seit Migration 005 in compresults selbst
+        return with_competition_year(pd.DataFrame(comp_results))
+
+    df_output = pinned_frame("wettkampfauswertung", _load, ("compresults", "competitions"))
+    if df_output.empty:
+        st.info("Keine Wettkampfergebnisse vorhanden.")
+        return
+    _wettkampfauswertung_ergebnis(df_output)
+
+
+@st.fragment
+def _wettkampfauswertung_ergebnis(df_output):
+    """Filter form and result grid of auswertung_wettkampf; reruns alone on submit."""
+    # Filter für die wichtigsten Felder
+    with st.form("wettkampfauswertung_filter"):
+        with st.expander("🔎 Filter anzeigen"):
+            first_name_filter = st.text_input("Vorname (Teilstring möglich)", "")
+            last_name_filter = st.text_input("Nachname (Teilstring möglich)", "")
+            competition_filter = st.multiselect("Wettkampf (Competition)", sorted(df_output["Competition"].dropna().unique()))
+            pisteyear_filter = st.multiselect("PisteYear", sorted(df_output["PisteYear"].dropna().unique().tolist()))
+            discipline_filter = st.multiselect("Disziplin", sorted(df_output["Discipline"].dropna().unique()))
+            category_filter = st.multiselect("Kategorie", sorted(df_output["CategoryStart"].dropna().unique()))
+            sex_filter = st.multiselect("Geschlecht", sorted(df_output["sex"].dropna().unique()))
+            prefin_filter = st.multiselect("PreFin", sorted(df_output["PreFin"].dropna().unique()))
+            jem_yes = st.checkbox("Nur JEM = yes", value=False)
+            em_yes = st.checkbox("Nur EM = yes", value=False)
+            wm_yes = st.checkbox("Nur WM = yes", value=False)
+            nationalteam_yes = st.checkbox("Nur NationalTeam = yes", value=False)
+            regionalteam_yes = st.checkbox("Nur RegionalTeam = yes", value=False)
+        st.form_submit_button("🔎 Filter anwenden")
+
+    # Filter anwenden
+    filtered = df_output.copy()
+    if first_name_filter:
+        filtered = filtered[filtered["first_name"].str.contains(first_name_filter, case=False, na=False)]
+    if last_name_filter:
+        filtered = filtered[filtered["last_name"].str.contains(last_name_filter, case=False, na=False)]
+    if competition_filter:
+        filtered = filtered[filtered["Competition"].isin(competition_filter)]
+    if pisteyear_filter:
+        filtered = filtered[filtered["PisteYear"].isin(pisteyear_filter)]
+    if discipline_filter:
+        filtered = filtered[filtered["Discipline"].isin(discipline_filter)]
+    if category_filter:
+        filtered = filtered[filtered["CategoryStart"].isin(category_filter)]
+    if sex_filter:
+        filtered = filtered[filtered["sex"].isin(sex_filter)]
+    if prefin_filter:
+        filtered = filtered[filtered["PreFin"].isin(prefin_filter)]
+    if jem_yes:
+        filtered = filtered[filtered["JEM"] == "yes"]
+    if em_yes:
+        filtered = filtered[filtered["EM"] == "yes"]
+    if wm_yes:
+        filtered = filtered[filtered["WM"] == "yes"]
+    if nationalteam_yes:
+        filtered = filtered[filtered["NationalTeam"] == "yes"]
+    if regionalteam_yes:
+        filtered = filtered[filtered["RegionalTeam"] == "yes"]
+
+    st.dataframe(filtered)
+    st.download_button("📥 Gefilterte Ergebnisse als CSV", filtered.to_csv(index=False, encoding='utf-8-sig'),
+                    file_name="wettkampfauswertung_gefilt.csv", mime="text/csv")
+
+    import io
+    excel_buffer = io.BytesIO()
+    filtered.to_excel(excel_buffer, index=False, engine='openpyxl')
+    excel_buffer.seek(0)
+    st.download_button(
+        "📥 Gefilterte Ergebnisse als Excel",
+        excel_buffer,
+        file_name="wettkampfauswertung_gefilt.xlsx",
+        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    )
@@ -0,0 +1,470 @@
+"""Wettkampfresultate eingeben: manual entry, pair entry and file import."""
+
+import datetime
+import time
+
+import pandas as pd
+import streamlit as st
+
+import db
+import importers
+from divingeval.common import SELECTIONPOINTS_SCHEMA, normalize_sex_value
+from divingeval.competitions import compute_compresult_team_flags, compute_compresult_team_flags_frame
+from ui.cache import fetch_all_rows
+from ui.common import cascade_competition_renames, diff_grid, save_grid_changes
+from ui.engine import streamlit_progress
+
+
+COMPRESULT_IMPORT_COLUMNS = ["first_name", "last_name", "sex", "Competition", "Discipline", "CategoryStart", "PreFin", "Points", "Difficulty"]
+
+
+def _import_compresults_upload(uploaded_file, prepare_chunk, competitions_df, selectionpoints_df, required_columns=()):
+    """Stream an upload into compresults and render the report.
+
+    ``prepare_chunk(chunk, first_row)`` returns ``(rows, rejects)`` with the
+    COMPRESULT_IMPORT_COLUMNS. Per chunk: team flags in one pass, duplicate
+    check against stored keys (one query per new competition set) and
+    earlier chunks, bulk insert. The whole file is one transaction.
+    """
+    started = time.perf_counter()
+    reject_chunks = []
+    known_keys = set()
+    loaded_competitions = set()
+    inserted = 0
+
+    try:
+        with db.transaction() as tx:
+            def _write_chunk(chunk, first_row):
+                nonlocal inserted
+                rows, rejects = prepare_chunk(chunk, first_row)
+                if rejects is not None and not rejects.empty:
+                    reject_chunks.append(rejects)
+                if rows.empty:
+                    return
+                rows = rows.join(compute_compresult_team_flags_frame(rows, competitions_df, selectionpoints_df))
+                new_competitions = set(rows["Competition"].dropna().astype(str).str.strip()) - loaded_competitions
+                if new_competitions:
+                    known_keys.update(importers.existing_compresult_keys(new_competitions))
+                    loaded_competitions.update(new_competitions)
+                rows, duplicates = importers.split_duplicates(rows, known_keys)
+                if not duplicates.empty:
+                    reject_chunks.append(
+                        importers.reject_frame(duplicates, "Bereits vorhanden (Wettkampf/Athlet/Disziplin/PreFin)")
+                    )
+                known_keys.update(importers.compresult_keys(rows))
+                inserted += db.insert_many(
+                    "compresults",
+                    importers.records(rows, COMPRESULT_IMPORT_COLUMNS + ["NationalTeam", "RegionalTeam"]),
+                    tx=tx,
+                )
+
+            stats = importers.stream_upload(
+                uploaded_file,
+                _write_chunk,
+                required_columns=required_columns,
+                progress=streamlit_progress("Importiere Wettkampfresultate ..."),
+            )
+    except ValueError as e:
+        st.error(f"❌ {e}")
+        return 0
+    except Exception as e:
+        st.error(f"❌ Import fehlgeschlagen, nichts gespeichert: {e}")
+        return 0
+
+    elapsed = time.perf_counter() - started
+    st.success(
+        f"✅ {inserted} von {stats['rows']} Resultaten importiert in {elapsed:.1f}s "
+        f"≈ {stats['rows'] / max(elapsed, 1e-6):.0f} Zeilen/s."
+    )
+    if reject_chunks:
+        rejected = pd.concat(reject_chunks, ignore_index=True).sort_values("row")
+        st.warning(f"⚠️ {len(rejected)} Zeile(n) wurden nicht importiert:")
+        st.dataframe(rejected, hide_index=True)
+    return inserted
+
+
+def manage_compresults_entry():
+    st.header("🏅 Wettkampfresultate eingeben")
+
+    st.caption("Wettkämpfe können direkt hier oder unter 'Referenz- und Bewertungstabellen' bearbeitet werden.")
+    st.caption("Synchro unterstützt Paar-Erfassung: weiblich, männlich und mixed (1x weiblich + 1x männlich).")
+    col_jump, col_inline = st.columns([1, 2])
+    with col_jump:
+        if st.button("⚙️ Zu Wettkämpfe-Tabelle", key="goto_competitions_table"):
+            st.session_state["page"] = "Referenz- und Bewertungstabellen"
+            st.rerun()
+    with col_inline:
+        show_inline_comp_editor = st.checkbox("Wettkämpfe hier bearbeiten", value=False, key="show_inline_comp_editor")
+
+    if show_inline_comp_editor:
+        st.subheader("🏟️ Wettkämpfe bearbeiten")
+        competitions_inline = fetch_all_rows("competitions", select="*")
+        df_comp_inline = pd.DataFrame(competitions_inline)
+        comp_cols = [
+            "id",
+            "Name",
+            "Date",
+            "PisteYear",
+            "Type",
+            "qual-Regional",
+            "qual-National",
+            "qual-JEM",
+            "qual-EM",
+            "qual-WM",
+            "qual-Piste",
+        ]
+        for c in comp_cols:
+            if c not in df_comp_inline.columns:
+                df_comp_inline[c] = None
+        if not df_comp_inline.empty:
+            df_comp_inline = df_comp_inline.sort_values(["Date", "Name"], na_position="last")
+
+        editable_comp = df_comp_inline[comp_cols].copy().reset_index(drop=True)
+        edited_comp = st.data_editor(
+            editable_comp,
+            hide_index=True,
+            num_rows="dynamic",
+            disabled=["id"],
+            key="inline_competitions_editor",
+        )
+
+        if st.button("💾 Wettkämpfe speichern", key="save_inline_competitions"):
+            def _norm_comp_value(v):
+                if pd.isna(v):
+                    return None
+                if isinstance(v, pd.Timestamp):
+                    return v.date().isoformat()
+                if isinstance(v, datetime.datetime):
+                    return v.date().isoformat()
+                if isinstance(v, datetime.date):
+                    return v.isoformat()
+                if isinstance(v, str):
+                    s = v.strip()
+                    return s if s else None
+                return v
+
+            def _norm_comp_id(x):
+                try:
+                    return None if pd.isna(x) else str(int(float(x)))
+                except (TypeError, ValueError):
+                    return None
+
+            orig = editable_comp.copy()
+            new = edited_comp.copy()
+            orig["id"] = orig["id"].apply(_norm_comp_id)
+            new["id"] = new["id"].apply(_norm_comp_id)
+
+            inserts, updates, deleted_ids = diff_grid(orig, new, comp_cols, _norm_comp_value)
+            orig_names = dict(zip(orig["id"], orig["Name"].apply(lambda v: str(_norm_comp_value(v) or "").strip())))
+            renames = [
+                (orig_names.get(row_id, ""), str(changed["Name"] or "").strip())
+                for row_id, changed in updates
+                if "Name" in changed
+            ]
+            # Nur geänderte Zellen schreiben; Wettkämpfe und Verknüpfungen gemeinsam: alles oder nichts.
+            changed_ids = [int(row_id) for row_id, changed in updates if "Name" in changed or "PisteYear" in changed]
+            with db.transaction() as tx:
+                save_grid_changes("competitions", inserts, updates, [int(i) for i in deleted_ids], tx)
+                cascade_counts = cascade_competition_renames(renames, tx, changed_ids, added=bool(inserts))
+
+            st.success(
+                f"Wettkämpfe gespeichert. Verknüpfungen aktualisiert: "
+                f"compresults={cascade_counts['compresults']}, "
+                f"pisterefcompresults={cascade_counts['pisterefcompresults']}."
+            )
+            st.rerun()
+
+    # --- Neuer Wettkampf anlegen ---
+    if "show_new_comp_form" not in st.session_state:
+        st.session_state["show_new_comp_form"] = False
+
+    if st.button("➕ Neuer Wettkampf aufnehmen", key="show_new_comp_form_btn"):
+        st.session_state["show_new_comp_form"] = True
+
+    if st.session_state.get("show_new_comp_form", False):
+        st.subheader("Neuen Wettkampf anlegen")
+        comp_name = st.text_input("Name", key="comp_name_field")
+        comp_date = st.date_input("Datum", key="comp_date_field")
+        try:
+            default_year = comp_date.year
+        except Exception:
+            default_year = datetime.date.today().year
+        qual_regional = st.checkbox("qual-Regional", key="qual_regional_field")
+        qual_national = st.checkbox("qual-National", key="qual_national_field")
+        qual_jem = st.checkbox("qual-JEM", key="qual_jem_field")
+        qual_em = st.checkbox("qual-EM", key="qual_em_field")
+        qual_wm = st.checkbox("qual-WM", key="qual_wm_field")
+        qual_piste = st.checkbox("qual-Piste", key="qual_piste_field")
+        comp_type = st.selectbox("Type", ["National", "Regional", "International"], key="comp_type_field")
+        piste_year = st.number_input("PisteYear", min_value=2000, max_value=2100, value=default_year, key="piste_year_field")
+
+        if st.button("💾 Wettkampf speichern", key="save_competition"):
+            if not comp_name:
+                st.error("Bitte einen Namen eingeben.")
+            else:
+                with db.transaction() as tx:
+                    tx.table_insert("competitions", {
+                        "Name": comp_name,
+                        "Date": comp_date.strftime("%Y-%m-%d"),
+                        "qual-Regional": qual_regional,
+                        "qual-National": qual_national,
+                        "qual-JEM": qual_jem,
+                        "qual-EM": qual_em,
+                        "qual-WM": qual_wm,
+                        "qual-Piste": qual_piste,
+                        "Type": comp_type,
+                        "PisteYear": int(piste_year)
+                    })
+                    # bereits importierte Resultate mit diesem Namen verknüpfen
+                    cascade_competition_renames([], tx, added=True)
+                st.success("Wettkampf gespeichert!")
+                st.session_state["show_new_comp_form"] = False
+        st.stop()
+
+    # --- Athleten und Wettkämpfe laden ---
+    athletes = fetch_all_rows('athletes', select='id, first_name, last_name, sex')
+
+    competitions = fetch_all_rows('competitions', select='Name, Date, PisteYear, [qual-Regional], [qual-JEM], [qual-EM], [qual-WM]')
+    competition_names = [c['Name'] for c in competitions]
+    selected_competition = st.selectbox("Wettkampf", competition_names)
+
+    selectionpoints_df = db.table_select_df('selectionpoints', schema=SELECTIONPOINTS_SCHEMA)
+    competitions_df = pd.DataFrame(competitions)
+
+    discipline = st.selectbox(
+        "Disziplin",
+        [
+            "1m",
+            "3m",
+            "platform",
+            "3m synchro",
+            "platform synchro",
+            "high diving",
+            "high diving 20m",
+            "high diving 27m",
+        ],
+    )
+    is_synchro = discipline in ["3m synchro", "platform synchro"]
+
+    # --- Synchro: Modus (gleich / mixed) ---
+    if is_synchro:
+        synchro_mode = st.radio(
+            "Synchro Modus",
+            ["weiblich (Pair)", "männlich (Pair)", "mixed (1 weiblich + 1 männlich)"],
+            horizontal=True,
+            key="synchro_mode_radio",
+        )
+        is_mixed = "mixed" in synchro_mode
+        female_names = {f"{a['first_name']} {a['last_name']}": a for a in athletes if normalize_sex_value(a.get('sex')) == 'female'}
+        male_names = {f"{a['first_name']} {a['last_name']}": a for a in athletes if normalize_sex_value(a.get('sex')) == 'male'}
+
+        if is_mixed:
+            st.info("Mixed Synchro: 1 weibliche + 1 männliche Athletin/Athlet. Beide Ergebnisse werden mit sex='mixed' gespeichert.")
+            selected_female = st.selectbox("Athletin (weiblich)", list(female_names.keys()), key="synchro_female_sel")
+            selected_male = st.selectbox("Athlet (männlich)", list(male_names.keys()), key="synchro_male_sel")
+            synchro_athletes = [female_names.get(selected_female), male_names.get(selected_male)]
+            sex_to_save = "mixed"
+        elif "weiblich" in synchro_mode:
+            selected_ath1 = st.selectbox("Athletin 1 (weiblich)", list(female_names.keys()), key="synchro_f1_sel")
+            selected_ath2 = st.selectbox("Athletin 2 (weiblich)", list(female_names.keys()), key="synchro_f2_sel")
+            synchro_athletes = [female_names.get(selected_ath1), female_names.get(selected_ath2)]
+            sex_to_save = "female"
+        else:
+            selected_ath1 = st.selectbox("Athlet 1 (männlich)", list(male_names.keys()), key="synchro_m1_sel")
+            selected_ath2 = st.selectbox("Athlet 2 (männlich)", list(male_names.keys()), key="synchro_m2_sel")
+            synchro_athletes = [male_names.get(selected_ath1), male_names.get(selected_ath2)]
+            sex_to_save = "male"
+        athlete_data = None
+    else:
+        is_mixed = False
+        synchro_athletes = []
+        sex_to_save = None
+        athlete_names = {f"{a['first_name']} {a['last_name']}": a for a in athletes}
+        selected_athlete = st.selectbox("Athlet", list(athlete_names.keys()))
+        athlete_data = athlete_names[selected_athlete] if selected_athlete else None
+        if athlete_data:
+            sex_to_save = athlete_data['sex']
+
+    category_start = st.selectbox("Kategorie", ["Jugend A", "Jugend B", "Jugend C", "Jugend D", "Elite"])
+    prefin = st.selectbox("PreFin", ["FinalOnly", "Preliminary", "Final"])
+    points = st.number_input("Punkte", min_value=0.0, step=0.1, format="%.2f")
+    difficulty = st.number_input("Difficulty", min_value=0.0, step=0.1, format="%.2f")
+
+    if st.button("💾 Ergebnis speichern"):
+        if is_synchro:
+            valid_athletes = [a for a in synchro_athletes if a]
+            if len(valid_athletes) < 2:
+                st.error("Bitte beide Athleten auswählen.")
+            else:
+                team_flags = compute_compresult_team_flags(
+                    competition_name=selected_competition,
+                    sex=sex_to_save,
+                    discipline=discipline,
+                    category_start=category_start,
+                    points=points,
+                    competitions_df=competitions_df,
+                    selectionpoints_df=selectionpoints_df,
+                )
+                for ath in valid_athletes:
+                    db.table_insert('compresults', {
+                        "first_name": ath['first_name'],
+                        "last_name": ath['last_name'],
+                        "sex": sex_to_save,
+                        "Competition": selected_competition,
+                        "Discipline": discipline,
+                        "CategoryStart": category_start,
+                        "PreFin": prefin,
+                        "Points": points,
+                        "Difficulty": difficulty,
+                        **team_flags,
+                    })
+                label = "Mixed-Paar" if is_mixed else "Synchro-Paar"
+                st.success(f"Wettkampfresultat für {label} gespeichert (2 Einträge)!")
+        elif athlete_data:
+            team_flags = compute_compresult_team_flags(
+                competition_name=selected_competition,
+                sex=athlete_data['sex'],
+                discipline=discipline,
+                category_start=category_start,
+                points=points,
+                competitions_df=competitions_df,
+                selectionpoints_df=selectionpoints_df,
+            )
+            db.table_insert('compresults', {
+                "first_name": athlete_data['first_name'],
+                "last_name": athlete_data['last_name'],
+                "sex": athlete_data['sex'],
+                "Competition": selected_competition,
+                "Discipline": discipline,
+                "CategoryStart": category_start,
+                "PreFin": prefin,
+                "Points": points,
+                "Difficulty": difficulty,
+                **team_flags,
+            })
+            st.success("Wettkampfresultat gespeichert!")
+
+    st.markdown("---")
+    st.subheader("📤 Ergebnisse per Datei importieren")
+
+    # Beispiel-Datei
+    example_data = {
+        "first_name": ["Max"],
+        "last_name": ["Mustermann"],
+        "Competition": [competition_names[0] if competition_names else ""],
+        "Discipline": ["1m"],
+        "CategoryStart": ["Jugend B"],
+        "PreFin": ["FinalOnly"],
+        "Points": [350.5],
+        "Difficulty": [2.8]
+    }
+    example_df = pd.DataFrame(example_data)
+    st.download_button("📄 Beispiel-Datei herunterladen", example_df.to_csv(index=False).encode("utf-8"), file_name="beispiel_wettkampfresultate.csv", mime="text/csv")
+
+    uploaded_file = st.file_uploader("CSV-Datei mit Wettkampfresultaten hochladen", type=["csv"])
+    if uploaded_file:
+        required_cols = ["first_name", "last_name", "Competition", "Discipline", "CategoryStart", "PreFin", "Points", "Difficulty"]
+
+        def _prepare_csv_chunk(chunk, first_row):
+            df = chunk[required_cols].copy()
+            df["_row"] = range(first_row, first_row + len(df))
+            df["first_name"] = df["first_name"].astype(str).str.strip()
+            df["last_name"] = df["last_name"].astype(str).str.strip()
+            df = importers.attach_athletes(df, athletes)
+            unknown = ~df["_known"]
+            rows = df[~unknown].copy()
+            rows["sex"] = rows["athlete_sex"]
+            return rows, importers.reject_frame(df[unknown], "Athlet nicht gefunden")
+
+        _import_compresults_upload(
+            uploaded_file, _prepare_csv_chunk, competitions_df, selectionpoints_df, required_columns=required_cols
+        )
+
+    st.markdown("---")
+    st.subheader("Import DiveLive")
+
+    # Beispiel-Datei (DiveLive)
+    sample_divelive = pd.DataFrame(
+        {
+            "Category": ["Jugend B"],
+            "gender": ["female"],
+            "event_height": ["3"],
+            "total_award": ["350.50"],
+            "firstname": ["Max"],
+            "lastname": ["Mustermann"],
+        }
+    )
+    st.download_button(
+        "📄 Beispiel DiveLive CSV herunterladen",
+        data=sample_divelive.to_csv(index=False).encode("utf-8-sig"),
+        file_name="divelive_beispiel.csv",
+        mime="text/csv",
+        key="divelive_sample_download",
+    )
+
+    if not competition_names:
+        st.warning("Keine Wettkämpfe in der Tabelle competitions vorhanden. Bitte zuerst einen Wettkampf anlegen.")
+        return
+
+    selected_competition_divelive = st.selectbox(
+        "Wettkampf für DiveLive Import",
+        competition_names,
+        index=competition_names.index(selected_competition) if selected_competition in competition_names else 0,
+        key="divelive_selected_competition",
+    )
+
+    divelive_file = st.file_uploader(
+        "DiveLive CSV-Datei hochladen",
+        type=["csv"],
+        key="divelive_compresults_uploader",
+    )
+
+    if divelive_file is not None:
+        if st.button("Import DiveLive", key="import_divelive_btn"):
+            required_src = ["category", "gender", "event_height", "total_award", "firstname", "lastname"]
+
+            def _prepare_divelive_chunk(chunk, first_row):
+                cols_by_lower = {str(c).strip().lower(): c for c in chunk.columns}
+                missing = [c for c in required_src if c not in cols_by_lower]
+                if missing:
+                    raise ValueError(
+                        f"DiveLive CSV muss folgende Spalten enthalten: {', '.join(required_src)} "
+                        f"(fehlend: {', '.join(missing)})"
+                    )
+
+                df = pd.DataFrame({
+                    "_row": range(first_row, first_row + len(chunk)),
+                    "first_name": chunk[cols_by_lower["firstname"]].fillna("").astype(str).str.strip().values,
+                    "last_name": chunk[cols_by_lower["lastname"]].fillna("").astype(str).str.strip().values,
+                    "CategoryStart": chunk[cols_by_lower["category"]].fillna("").astype(str).str.strip().values,
+                    "gender": chunk[cols_by_lower["gender"]].values,
+                    "Points": importers.parse_number_series(chunk[cols_by_lower["total_award"]]).values,
+                    "Discipline": importers.normalize_divelive_disciplines(chunk[cols_by_lower["event_height"]]).values,
+                })
+                df = importers.attach_athletes(df, athletes)
+
+                rejects = []
+                # in dieser Reihenfolge: eine Zeile bekommt nur den ersten Grund
+                checks = [
+                    (lambda d: d["first_name"].str.lower().isin(["", "nan"]) | d["last_name"].str.lower().isin(["", "nan"]), "Vor-/Nachname fehlt"),
+                    (lambda d: ~d["_known"], "Athlet nicht in athletes gefunden"),
+                    (lambda d: d["CategoryStart"].str.lower().isin(["", "nan"]), "Category fehlt"),
+                    (lambda d: d["Discipline"].astype(str).str.strip() == "", "event_height/Discipline fehlt"),
+                    (lambda d: d["Points"].isna(), "total_award/Points leer/ungültig"),
+                ]
+                for check, reason in checks:
+                    mask = check(df)
+                    if mask.any():
+                        rejects.append(importers.reject_frame(df[mask], reason))
+                        df = df[~mask]
+
+                rows = df.copy()
+                sex_from_file = rows["gender"].map(normalize_sex_value)
+                rows["sex"] = sex_from_file.where(sex_from_file.notna(), rows["athlete_sex"].map(normalize_sex_value))
+                rows["Competition"] = selected_competition_divelive
+                rows["PreFin"] = "FinalOnly"
+                rows["Difficulty"] = 0.0
+                return rows, (pd.concat(rejects, ignore_index=True) if rejects else None)
+
+            st.caption(f"Wettkampf: {selected_competition_divelive}")
+            _import_compresults_upload(divelive_file, _prepare_divelive_chunk, competitions_df, selectionpoints_df)
@@ -0,0 +1,166 @@
+"""Wettkampfresultate korrigieren."""
+
+import pandas as pd
+import streamlit as st
+
+import db
+from divingeval.common import SELECTIONPOINTS_SCHEMA
+from divingeval.competitions import compute_compresult_team_flags
+from ui.cache import fetch_all_rows
+from ui.common import paged_grid
+
+
+def manage_compresults_correction():
+    st.header("🛠️ Wettkampfresultate korrigieren")
+
+    competitions = db.table_distinct("compresults", "Competition")
+    if not competitions:
+        st.info("Keine Wettkampfresultate vorhanden.")
+        return
+
+    selected_competition = st.selectbox("Wettkampf", [""] + competitions, index=0)
+    if not selected_competition:
+        st.info("Bitte zuerst einen Wettkampf auswählen.")
+        return
+
+    # Nur die sichtbare Seite des Wettkampfs laden; Suche/Sortierung laufen auf dem Server
+    required_cols = ["id", "first_name", "last_name", "sex", "Competition", "Discipline", "CategoryStart", "PreFin", "Points", "Difficulty"]
+    page_df, total = paged_grid(
+        "compresults",
+        key="compresults_corr",
+        sort_columns=["last_name", "first_name", "Discipline", "CategoryStart", "Points"],
+        search_columns=["first_name", "last_name", "Discipline", "CategoryStart"],
+        select=", ".join(f"[{c}]" for c in required_cols),
+        Competition=selected_competition,
+    )
+    if not total or page_df.empty:
+        st.info("Keine Resultate für den gewählten Wettkampf gefunden.")
+        return
+
+    page_df = page_df.reindex(columns=required_cols)
+    st.dataframe(
+        page_df[["first_name", "last_name", "Discipline", "CategoryStart", "PreFin", "Points", "Difficulty"]],
+        hide_index=True,
+        use_container_width=True,
+    )
+
+    row_labels = {
+        f"{str(row.get('first_name') or '').strip()} {str(row.get('last_name') or '').strip()} | "
+        f"{row.get('Discipline')} | PreFin={row.get('PreFin')} | Punkte={row.get('Points')} | id={row.get('id')}": idx
+        for idx, row in page_df.iterrows()
+    }
+    selected_row = st.selectbox("Eintrag", list(row_labels.keys()))
+    current = page_df.loc[row_labels[selected_row]]
+
+    def _safe_float(value, fallback=0.0):
+        try:
+            if value in (None, "", "nan"):
+                return fallback
+            return float(value)
+        except Exception:
+            return fallback
+
+    current_discipline = str(current.get("Discipline") or "").strip()
+    current_category = str(current.get("CategoryStart") or "").strip()
+    current_prefin = str(current.get("PreFin") or "").strip()
+    current_points = _safe_float(current.get("Points"), 0.0)
+    current_difficulty = _safe_float(current.get("Difficulty"), 0.0)
+
+    all_discipline_values = db.table_distinct("compresults", "Discipline")
+    discipline_options = sorted(
+        set(
+            [
+                "1m",
+                "3m",
+                "platform",
+                "3m synchro",
+                "platform synchro",
+                "high diving",
+                "high diving 20m",
+                "high diving 27m",
+            ]
+            + all_discipline_values
+            + [current_discipline]
+        )
+    )
+    category_options = ["Jugend A", "Jugend B", "Jugend C", "Jugend D", "Elite"]
+    prefin_options = ["FinalOnly", "Preliminary", "Final"]
+
+    new_discipline = st.selectbox(
+        "Neue Disziplin",
+        discipline_options,
+        index=discipline_options.index(current_discipline) if current_discipline in discipline_options else 0,
+    )
+    new_category = st.selectbox(
+        "Neue Kategorie",
+        category_options,
+        index=category_options.index(current_category) if current_category in category_options else 0,
+    )
+    new_prefin = st.selectbox(
+        "Neuer PreFin",
+        prefin_options,
+        index=prefin_options.index(current_prefin) if current_prefin in prefin_options else 0,
+    )
+    new_points = st.number_input("Neue Punktzahl", min_value=0.0, step=0.1, format="%.2f", value=current_points)
+    new_difficulty = st.number_input("Neue Difficulty", min_value=0.0, step=0.1, format="%.2f", value=current_difficulty)
+    current_id = int(current["id"])
+
+    st.markdown("---")
+    st.caption(f"Aktueller Eintrag: id={current_id}")
+    delete_confirmed = st.checkbox(
+        "Ich möchte diesen Eintrag dauerhaft löschen",
+        key=f"compresult_delete_confirm_{current_id}",
+    )
+    if st.button("🗑️ Eintrag löschen", key=f"compresult_delete_btn_{current_id}"):
+        if not delete_confirmed:
+            st.error("Bitte das Löschen zuerst bestätigen.")
+        else:
+            try:
+                db.table_delete("compresults", id=current_id)
+                st.success(f"Eintrag id={current_id} wurde gelöscht.")
+                st.rerun()
+            except Exception as e:
+                st.error(f"Löschen fehlgeschlagen: {e}")
+
+    st.markdown("---")
+
+    if st.button("💾 Korrektur speichern"):
+        competitions_data = fetch_all_rows('competitions', select='Name, Date, PisteYear, [qual-Regional], [qual-JEM], [qual-EM], [qual-WM]')
+        competitions_df = pd.DataFrame(competitions_data)
+        selectionpoints_df = db.table_select_df('selectionpoints', schema=SELECTIONPOINTS_SCHEMA)
+
+        sex_value = current.get("sex")
+        if sex_value in (None, "", "nan"):
+            athletes_data = fetch_all_rows("athletes", select="first_name, last_name, sex")
+            for athlete in athletes_data:
+                if (
+                    str(athlete.get("first_name", "")).strip().lower() == str(current.get("first_name", "")).strip().lower()
+                    and str(athlete.get("last_name", "")).strip().lower() == str(current.get("last_name", "")).strip().lower()
+                ):
+                    sex_value = athlete.get("sex")
+                    break
+
+        team_flags = {"NationalTeam": "no", "RegionalTeam": "no"}
+        if sex_value not in (None, "", "nan"):
+            team_flags = compute_compresult_team_flags(
+                competition_name=selected_competition,
+                sex=sex_value,
+                discipline=new_discipline,
+                category_start=new_category,
+                points=new_points,
+                competitions_df=competitions_df,
+                selectionpoints_df=selectionpoints_df,
+            )
+
+        update_payload = {
+            "Discipline": new_discipline,
+            "CategoryStart": new_category,
+            "PreFin": new_prefin,
+            "Points": new_points,
+            "Difficulty": new_difficulty,
+            "timestamp": None,
+            **team_flags,
+        }
+        db.table_update("compresults", update_payload, id=current_id)
+        st.success(f"Eintrag id={current_id} wurde korrigiert. timestamp wurde auf NULL gesetzt.")
+        st.rerun()